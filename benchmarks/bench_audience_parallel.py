@@ -0,0 +1,78 @@
+# benchmarks/bench_audience_parallel.py
+"""
+Benchmark de escalabilidade da análise de público em paralelo.
+
+Mede o tempo de AudienceSketch sequencial vs. sketch_users_parallel com
+1, 2, 4, ... processos (até o número de núcleos) e imprime o speedup.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_audience_parallel --users 2000000 --repeat 3
+"""
+
+import argparse
+import os
+import random
+import time
+
+from src.audience_analyzer.parallel import (
+    sketch_users_parallel,
+    start_audience_pool,
+    stop_audience_pool,
+)
+from src.audience_analyzer.sketch import AudienceSketch
+
+GENDERS = ["female", "male", "other"]
+REGIONS = [f"Região {i}" for i in range(300)]
+
+
+def _make_users(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [
+        {
+            "age": rng.randint(13, 80),
+            "gender": rng.choice(GENDERS),
+            "region": rng.choice(REGIONS),
+        }
+        for _ in range(n)
+    ]
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    users = _make_users(args.users)
+
+    baseline = _best_of(args.repeat, lambda: AudienceSketch.from_users(users))
+    print(f"usuários={args.users}  núcleos={os.cpu_count()}")
+    print(f"{'processos':>10} {'tempo (s)':>10} {'speedup':>8}")
+    print(f"{'seq':>10} {baseline:>10.3f} {1.0:>8.2f}")
+
+    workers = 1
+    while workers <= args.max_workers:
+        # Pool do tamanho da linha criado e aquecido fora da medição, como na
+        # API (pool de vida longa); o tempo inclui só o envio dos shards
+        start_audience_pool(workers)
+        sketch_users_parallel(users[: workers * 1000], workers=workers)
+        elapsed = _best_of(
+            args.repeat, lambda: sketch_users_parallel(users, workers=workers)
+        )
+        print(f"{workers:>10} {elapsed:>10.3f} {baseline / elapsed:>8.2f}")
+        workers *= 2
+    stop_audience_pool()
+
+
+if __name__ == "__main__":
+    main()
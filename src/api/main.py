@@ -7,8 +7,17 @@ from src.api.routes.auth import router as auth_router
 from src.api.routes.users import router as users_router
 from src.api.routes.content_strategy import router as content_strategy_router
 from src.api.routes.projects import router as projects_router
+from src.api.routes.audience import router as audience_router
+from src.api.routes.posting_time import router as posting_time_router
 from src.database.sqlmodel_db import init_db_sqlmodel
 from src.database.db import init_db as init_history_db
+from src.core.config import settings
+from src.audience_analyzer.parallel import start_audience_pool, stop_audience_pool
+from src.posting_time_optimizer.rules import get_posting_rules
+from src.services.heatmap_refresh import (
+    start_heatmap_scheduler,
+    stop_heatmap_scheduler,
+)
 
 from src.api.routes.meta import router as meta_router
 
@@ -27,6 +36,8 @@ app.include_router(auth_router, prefix="/api")
 app.include_router(users_router, prefix="/api")
 app.include_router(content_strategy_router, prefix="/api")
 app.include_router(projects_router, prefix="/api")
+app.include_router(audience_router, prefix="/api")
+app.include_router(posting_time_router, prefix="/api")
 app.include_router(meta_router, prefix="/api")
 app.include_router(meta_router, prefix="/api")
 
@@ -74,3 +85,17 @@ def on_startup():
     init_db_sqlmodel()
     # DB de histórico (sqlite simples)
     init_history_db()
+    # Regras de horário compiladas já na subida (recarregadas se o JSON mudar)
+    get_posting_rules()
+    # Job noturno dos mapas de engajamento (projetos com ig_user_id)
+    if settings.POSTING_HEATMAP_JOB_ENABLED:
+        start_heatmap_scheduler()
+    # Pool de processos das análises grandes (forkserver, um só para a API)
+    if settings.AUDIENCE_PARALLEL_MIN_USERS > 0:
+        start_audience_pool()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_heatmap_scheduler()
+    stop_audience_pool()
@@ -1,7 +1,26 @@
-from typing import List
-from fastapi import APIRouter
-from pydantic import BaseModel
-from src.audience_analyzer.audience_core import analyze_audience, profile_audience
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, SkipValidation
+from src.audience_analyzer.age_schemes import (
+    AgeScheme,
+    UnknownAgeScheme,
+    get_age_scheme,
+)
+from src.audience_analyzer.columnar import summarize_columns
+from src.audience_analyzer.regions import RegionLevel
+from src.audience_analyzer.payload import (
+    InvalidAudiencePayload,
+    audience_columns_from_payload,
+)
+from src.audience_analyzer.sampling import sampling_report
+from src.audience_analyzer.streaming import (
+    InvalidAudienceRecord,
+    analyze_ndjson_stream,
+)
+from src.api.routes.auth import get_current_user
+from src.schemas.user import UserRead
+from src.services.audience_cache import audience_cache_stats
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -20,7 +39,25 @@ class AudienceUser(BaseModel):
 
 
 class AudienceRequest(BaseModel):
-    users: List[AudienceUser]
+    # Validado em colunas por audience_columns_from_payload
+    users: SkipValidation[List[AudienceUser]]
+
+
+def _audience_columns(payload: AudienceRequest, sample: Optional[int]):
+    try:
+        return audience_columns_from_payload(payload.users, sample=sample)
+    except InvalidAudiencePayload as e:
+        raise RequestValidationError(e.errors)
+
+
+def _age_scheme(scheme_id: Optional[str]) -> AgeScheme:
+    try:
+        return get_age_scheme(scheme_id)
+    except UnknownAgeScheme:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Esquema de faixa etária desconhecido: {scheme_id}",
+        )
 
 
 # ----------------------------
@@ -29,19 +66,33 @@ class AudienceRequest(BaseModel):
 
 
 @router.post("/audience/analyze")
-def analyze_audience_endpoint(payload: AudienceRequest):
+def analyze_audience_endpoint(
+    payload: AudienceRequest,
+    sample: Optional[int] = Query(None, ge=1),
+    age_scheme: Optional[str] = None,
+    region_level: Optional[RegionLevel] = None,
+):
     """
     Retorna análise simples do público.
+
+    Com `?sample=N`, a análise usa uma amostra aleatória de N usuários e
+    devolve, em `sampling`, cada percentual com intervalo de confiança.
+
+    Com `?region_level=` (city, state, macro_region, country), by_region vem
+    somado nesse nível da hierarquia de regiões.
     """
-    logger.info(f"Analisando {len(payload.users)} usuários")
+    columns = _audience_columns(payload, sample)
+    logger.info(f"Analisando {len(columns)} de {len(payload.users)} usuários")
 
-    users_dicts = [user.dict() for user in payload.users]
-    result = analyze_audience(users_dicts)
+    result, _ = summarize_columns(columns, _age_scheme(age_scheme), region_level)
 
-    return {
+    response = {
         "summary": result,
         "input_size": len(payload.users),
     }
+    if len(columns) < len(payload.users):
+        response["sampling"] = sampling_report(result, len(payload.users))
+    return response
 
 
 # ----------------------------
@@ -50,16 +101,66 @@ def analyze_audience_endpoint(payload: AudienceRequest):
 
 
 @router.post("/audience/profile")
-def audience_profile_endpoint(payload: AudienceRequest):
+def audience_profile_endpoint(
+    payload: AudienceRequest,
+    sample: Optional[int] = Query(None, ge=1),
+    age_scheme: Optional[str] = None,
+):
     """
-    Gera perfis simplificados do público.
+    Gera perfis simplificados do público (opcionalmente sobre uma amostra
+    de `?sample=N` usuários e com outro esquema de faixas, `?age_scheme=`).
     """
-    logger.info(f"Gerando perfil para {len(payload.users)} usuários")
+    columns = _audience_columns(payload, sample)
+    logger.info(f"Gerando perfil para {len(columns)} de {len(payload.users)} usuários")
 
-    users_dicts = [user.dict() for user in payload.users]
-    profiles = profile_audience(users_dicts)
+    summary, profiles = summarize_columns(columns, _age_scheme(age_scheme))
 
-    return {
+    response = {
         "total_users": len(payload.users),
         "profiles": profiles,
     }
+    if len(columns) < len(payload.users):
+        response["sampling"] = sampling_report(summary, len(payload.users))
+    return response
+
+
+# ----------------------------
+# ENDPOINT 3 — /audience/analyze/stream
+# ----------------------------
+
+
+@router.post("/audience/analyze/stream")
+async def analyze_audience_stream_endpoint(request: Request):
+    """
+    Mesma análise de /audience/analyze, mas lendo o público em streaming
+    (NDJSON: um usuário ou um array de usuários por linha).
+    A memória não cresce com o tamanho do público.
+    """
+    try:
+        stream = await analyze_ndjson_stream(request.stream())
+    except InvalidAudienceRecord as e:
+        raise RequestValidationError(e.errors)
+
+    summary, profiles = stream.result()
+    logger.info(f"Analisados {stream.total_users} usuários via streaming")
+
+    return {
+        "summary": summary,
+        "profiles": profiles,
+        "input_size": stream.total_users,
+    }
+
+
+# ----------------------------
+# ENDPOINT 4 — /audience/cache/stats
+# ----------------------------
+
+
+@router.get("/audience/cache/stats")
+def audience_cache_stats_endpoint(
+    current_user: UserRead = Depends(get_current_user),
+):
+    """
+    Métricas do cache de análises por digest do público (hits/misses).
+    """
+    return audience_cache_stats()
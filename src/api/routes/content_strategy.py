@@ -1,28 +1,78 @@
 # src/api/routes/content_strategy.py
 
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 import json
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    status,
+)
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, SkipValidation, model_validator
+from sqlalchemy.exc import SQLAlchemyError
 from sqlmodel import Session
 
 from src.suggestion_engine.suggestion_core import (
     get_basic_suggestions,
     get_platform_suggestions,
 )
-from src.audience_analyzer.audience_core import analyze_audience, profile_audience
+from src.audience_analyzer.payload import (
+    InvalidAudiencePayload,
+    audience_columns_from_breakdown,
+    audience_columns_from_payload,
+)
+from src.audience_analyzer.age_schemes import (
+    AGE_SCHEMES,
+    get_age_scheme,
+    resolve_age_scheme_id,
+)
+from src.audience_analyzer.columnar import AudienceColumns
+from src.audience_analyzer.compare import COMPARE_FIELDS, compare_summaries
+from src.audience_analyzer.cube import AudienceCube, CubeTooLarge
+from src.audience_analyzer.regions import RegionLevel, rollup_region_counts
+from src.audience_analyzer.sampling import sampling_report
+from src.audience_analyzer.segments import MAX_SEGMENTS, segment_columns
+from src.audience_analyzer.sketch import AudienceSketch
+from src.audience_analyzer.storage import save_audience_columns, users_from_columns
+from src.audience_analyzer.streaming import (
+    InvalidAudienceRecord,
+    analyze_ndjson_stream,
+)
+from src.posting_time_optimizer.heatmap import EngagementHeatmap
 from src.posting_time_optimizer.time_core import suggest_best_times
 from src.utils.logger import get_logger
 from src.api.routes.auth import get_current_user
+from src.schemas.content_strategy import AudienceBreakdownRow
 from src.schemas.user import UserRead
-from src.database.sqlmodel_db import get_session
+from src.database.sqlmodel_db import engine, get_session
 from src.services.analyses import (
     create_analysis,
     list_analyses,
     get_analysis_by_id,
+    get_analyses_by_ids,
+    get_analysis_cube,
+    get_analysis_users,
+    save_analysis_cube,
+    update_analysis_audience,
 )
 from src.services.projects import get_project
+from src.core.config import settings
+from src.services.project_audience import (
+    get_project_audience,
+    get_project_audience_totals,
+    merge_project_audience_totals,
+)
+from src.services.project_heatmap import get_project_heatmap
+from src.services.audience_cache import (
+    analysis_digest,
+    get_cached_sketch,
+    store_cached_sketch,
+)
 
 logger = get_logger(__name__)
 
@@ -39,54 +89,94 @@ class ContentStrategyRequest(BaseModel):
     topic: str
     platform: str
     mode: str = "rich"
-    users: Optional[List[AudienceUser]] = None
+    # Validado por audience_columns_from_payload (colunas, sem um modelo por
+    # usuário); o tipo fica aqui para a documentação OpenAPI
+    users: Optional[SkipValidation[List[AudienceUser]]] = None
+    # Alternativa a `users`: público já agregado (uma linha por combinação
+    # idade/faixa × gênero × região, com `count`)
+    audience_breakdown: Optional[SkipValidation[List[AudienceBreakdownRow]]] = None
     project_id: Optional[int] = None
+    # Top-N de regiões no resumo (None = padrão do servidor, 0 = exato)
+    region_top_k: Optional[int] = None
+    # Gera e salva o cubo idade × gênero × região (consultas de fatia)
+    build_cube: bool = False
+    # Usa o público salvo do projeto (mantido por deltas) em vez de `users`
+    use_project_audience: bool = False
+    # Nível de by_region no resumo (None = rótulos como vieram no público)
+    region_level: Optional[RegionLevel] = None
+    # Esquema de faixas etárias (None = o do projeto, senão o padrão)
+    age_scheme: Optional[str] = None
+    # Nº de personas (k-means sobre idade, gênero e região); cada uma recebe
+    # sugestões e horários próprios em audience.segments
+    segments: Optional[int] = Field(None, ge=1, le=MAX_SEGMENTS)
+    segments_seed: int = 0
 
 
-@router.post("/strategy")
-def generate_content_strategy(
-    payload: ContentStrategyRequest,
-    current_user: UserRead = Depends(get_current_user),
-    session: Session = Depends(get_session),
-):
-    """
-    Gera uma estratégia de conteúdo, salva no histórico (SQLModel)
-    e retorna o resultado completo.
-    """
-    logger.info(
-        f"[user={current_user.username}] Gerando estratégia para "
-        f"topic={payload.topic}, platform={payload.platform}, "
-        f"users={len(payload.users or [])}, project_id={payload.project_id}"
+# Limite de alvos por chamada de /history/compare
+MAX_COMPARE_TARGETS = 500
+
+
+class AudienceRef(BaseModel):
+    # Uma análise do histórico OU o público de um projeto
+    analysis_id: Optional[int] = None
+    project_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _exactly_one(self):
+        if (self.analysis_id is None) == (self.project_id is None):
+            raise ValueError("Informe analysis_id ou project_id (apenas um).")
+        return self
+
+
+class AudienceCompareRequest(BaseModel):
+    baseline: AudienceRef
+    targets: List[AudienceRef] = Field(
+        ..., min_length=1, max_length=MAX_COMPARE_TARGETS
     )
+    fields: List[Literal["gender", "region", "age_bucket"]] = list(COMPARE_FIELDS)
 
-    users_dicts = [u.model_dump() for u in (payload.users or [])]
 
-    audience_summary = analyze_audience(users_dicts)
-    audience_profiles = profile_audience(users_dicts)
+def _build_strategy_response(
+    topic: str,
+    platform: str,
+    mode: str,
+    project_id: Optional[int],
+    audience_sketch: AudienceSketch,
+    region_level: Optional[str] = None,
+    heatmap: Optional[EngagementHeatmap] = None,
+) -> Dict[str, Any]:
+    """
+    Monta a resposta de estratégia a partir do sketch do público.
+    A região dominante vem do heavy hitter (memória fixa) do sketch; os
+    horários usam o mapa de engajamento do projeto, se houver.
+    """
+    audience_summary, audience_profiles = audience_sketch.result()
+    if region_level:
+        audience_summary["by_region"] = rollup_region_counts(
+            audience_summary["by_region"], region_level
+        )
 
     dominant_profile = audience_profiles[0] if audience_profiles else None
     dominant_age_bucket = dominant_profile["age_bucket"] if dominant_profile else None
-    dominant_region = (
-        max(audience_summary["by_region"], key=audience_summary["by_region"].get)
-        if audience_summary.get("by_region")
-        else None
-    )
+    dominant_region = audience_sketch.dominant("region")
 
-    if payload.mode == "basic":
-        suggestions = get_basic_suggestions(payload.topic)
+    if mode == "basic":
+        suggestions = get_basic_suggestions(topic)
     else:
-        suggestions = get_platform_suggestions(payload.topic, payload.platform)
+        suggestions = get_platform_suggestions(topic, platform)
 
     time_slots = suggest_best_times(
-        platform=payload.platform,
+        platform=platform,
         main_age_bucket=dominant_age_bucket,
         region_main=dominant_region,
+        heatmap=heatmap,
+        region_shares=audience_summary["by_region"],
     )
 
-    final_response = {
-        "topic": payload.topic,
-        "platform": payload.platform,
-        "mode": payload.mode,
+    return {
+        "topic": topic,
+        "platform": platform,
+        "mode": mode,
         "audience": {
             "summary": audience_summary,
             "profiles": audience_profiles,
@@ -94,9 +184,363 @@ def generate_content_strategy(
         },
         "suggestions": suggestions,
         "best_times": time_slots,
-        "project_id": payload.project_id,
+        "project_id": project_id,
+    }
+
+
+def _attach_segments(
+    response: Dict[str, Any],
+    columns: AudienceColumns,
+    payload: ContentStrategyRequest,
+    age_scheme: str,
+    heatmap: Optional[EngagementHeatmap] = None,
+) -> None:
+    """
+    Segmenta o público em personas e gera sugestões e horários para cada
+    uma (em vez de só para o perfil dominante).
+    """
+    if not payload.segments:
+        return
+
+    personas = segment_columns(
+        columns,
+        k=payload.segments,
+        seed=payload.segments_seed,
+        scheme=get_age_scheme(age_scheme),
+    )
+    for persona in personas:
+        if payload.mode == "basic":
+            persona["suggestions"] = get_basic_suggestions(payload.topic)
+        else:
+            persona["suggestions"] = get_platform_suggestions(
+                payload.topic, payload.platform, persona=persona
+            )
+        persona["best_times"] = suggest_best_times(
+            platform=payload.platform,
+            main_age_bucket=persona["age_bucket"],
+            region_main=next(iter(persona["region"]), None),
+            heatmap=heatmap,
+            region_shares=persona["region"],
+        )
+    response["audience"]["segments"] = personas
+
+
+def _project_heatmap(
+    session: Session, owner_id: int, project_id: Optional[int], platform: str
+) -> Optional[EngagementHeatmap]:
+    if project_id is None:
+        return None
+    return get_project_heatmap(session, owner_id, project_id, platform)
+
+
+def _region_top_k(requested: Optional[int]) -> Optional[int]:
+    """
+    Top-N de regiões a usar: o pedido na requisição ou o padrão do servidor.
+    0 desliga o modo aproximado.
+    """
+    top_k = settings.AUDIENCE_REGION_TOP_K if requested is None else requested
+    return top_k or None
+
+
+def _update_project_audience(
+    session: Session,
+    owner_id: int,
+    project_id: Optional[int],
+    sketch: AudienceSketch,
+) -> None:
+    """
+    Soma o público desta análise aos totais do projeto (se houver projeto).
+    """
+    if project_id is None or sketch.total_users == 0:
+        return
+    try:
+        merge_project_audience_totals(session, owner_id, project_id, sketch)
+    except (ValueError, SQLAlchemyError) as e:
+        # Ex.: o esquema de faixas etárias do projeto mudou. A análise já
+        # está salva: uma falha nos totais não derruba a resposta
+        session.rollback()
+        logger.warning(f"Totais do projeto {project_id} não atualizados: {e}")
+
+
+def _require_project(
+    session: Session, owner_id: int, project_id: Optional[int]
+) -> None:
+    """
+    404 se a análise aponta para um projeto que não existe ou não é do
+    usuário (nada é salvo nesse caso).
+    """
+    if project_id is None:
+        return
+    if get_project(session, owner_id=owner_id, project_id=project_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Projeto não encontrado",
+        )
+
+
+def _resolve_age_scheme(
+    session: Session,
+    owner_id: int,
+    project_id: Optional[int],
+    requested: Optional[str] = None,
+) -> str:
+    """
+    Esquema de faixas etárias da análise: o pedido, senão o do projeto, senão
+    o padrão.
+    """
+    if requested is not None and requested not in AGE_SCHEMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Esquema de faixa etária desconhecido: {requested}",
+        )
+    project_scheme = None
+    if project_id is not None:
+        project = get_project(session, owner_id=owner_id, project_id=project_id)
+        project_scheme = project.age_scheme if project else None
+    return resolve_age_scheme_id(project_scheme, requested)
+
+
+def _process_audience(
+    session: Session,
+    columns: AudienceColumns,
+    top_k: Optional[int],
+    age_scheme: str,
+    build_cube: bool,
+) -> Tuple[Optional[str], str, AudienceSketch, Optional[AudienceCube]]:
+    """
+    Salva o público em disco e calcula o sketch (via cache) e, se pedido, o
+    cubo. Devolve (audience_id, users_json, sketch, cubo).
+    """
+    audience_id = None
+    users_json = "[]"
+    if len(columns):
+        try:
+            audience_id = save_audience_columns(columns)
+        except OSError as e:
+            # Sem disco disponível, mantém o formato antigo (JSON no banco)
+            logger.warning(f"Público não salvo em disco: {e}")
+            users_json = json.dumps(users_from_columns(columns), ensure_ascii=False)
+
+    # O audience_id é o hash do público: mesmo público => mesma análise
+    digest = analysis_digest(audience_id, top_k, age_scheme) if audience_id else None
+    audience_sketch = get_cached_sketch(session, digest) if digest else None
+    if audience_sketch is None:
+        audience_sketch = AudienceSketch(top_k=top_k, age_scheme=age_scheme)
+        audience_sketch.add_columns(columns)
+        if digest:
+            store_cached_sketch(session, digest, audience_sketch)
+
+    audience_cube = None
+    if build_cube:
+        try:
+            audience_cube = AudienceCube.from_columns(
+                columns, get_age_scheme(age_scheme)
+            )
+        except CubeTooLarge as e:
+            logger.warning(f"Cubo não gerado: {e}")
+
+    return audience_id, users_json, audience_sketch, audience_cube
+
+
+def _exact_strategy_pass(
+    analysis_id: int,
+    owner_id: int,
+    payload: ContentStrategyRequest,
+    top_k: Optional[int],
+    age_scheme: str,
+) -> None:
+    """
+    Passada exata (em background) de uma análise feita por amostragem:
+    processa o público inteiro e substitui o resultado salvo no histórico.
+    """
+    try:
+        columns = audience_columns_from_payload(payload.users)
+    except InvalidAudiencePayload as e:
+        logger.warning(f"Passada exata da análise {analysis_id} ignorada: {e}")
+        return
+
+    with Session(engine) as session:
+        audience_id, users_json, audience_sketch, audience_cube = _process_audience(
+            session, columns, top_k, age_scheme, payload.build_cube
+        )
+        heatmap = _project_heatmap(
+            session, owner_id, payload.project_id, payload.platform
+        )
+        final_response = _build_strategy_response(
+            topic=payload.topic,
+            platform=payload.platform,
+            mode=payload.mode,
+            project_id=payload.project_id,
+            audience_sketch=audience_sketch,
+            region_level=payload.region_level,
+            heatmap=heatmap,
+        )
+        _attach_segments(final_response, columns, payload, age_scheme, heatmap)
+        update_analysis_audience(
+            session,
+            analysis_id=analysis_id,
+            result_json=json.dumps(final_response, ensure_ascii=False),
+            users_json=users_json,
+            audience_id=audience_id,
+        )
+        _update_project_audience(session, owner_id, payload.project_id, audience_sketch)
+        if audience_cube is not None:
+            save_analysis_cube(session, owner_id, analysis_id, audience_cube)
+
+    logger.info(f"Passada exata da análise {analysis_id} concluída")
+
+
+def _strategy_from_project_audience(
+    payload: ContentStrategyRequest,
+    current_user: UserRead,
+    session: Session,
+) -> Dict[str, Any]:
+    """
+    Estratégia a partir do público salvo do projeto: nenhum usuário é
+    recontado, o sketch guardado já tem as contagens.
+    """
+    if payload.project_id is None or payload.users:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="use_project_audience exige project_id e nenhum users",
+        )
+
+    stored = get_project_audience(session, current_user.id, payload.project_id)
+    if stored is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Projeto sem público salvo",
+        )
+
+    audience_sketch = AudienceSketch.from_bytes(stored.sketch)
+    top_k = _region_top_k(payload.region_top_k)
+    if top_k:
+        # O público salvo é exato; o resumo segue o top-N pedido
+        audience_sketch = AudienceSketch(
+            top_k=top_k, age_scheme=audience_sketch.age_scheme
+        ).merge(audience_sketch)
+
+    logger.info(
+        f"[user={current_user.username}] Gerando estratégia para "
+        f"topic={payload.topic}, platform={payload.platform}, "
+        f"users={audience_sketch.total_users} (público do projeto), "
+        f"project_id={payload.project_id}"
+    )
+
+    heatmap = _project_heatmap(
+        session, current_user.id, payload.project_id, payload.platform
+    )
+    final_response = _build_strategy_response(
+        topic=payload.topic,
+        platform=payload.platform,
+        mode=payload.mode,
+        project_id=payload.project_id,
+        audience_sketch=audience_sketch,
+        region_level=payload.region_level,
+        heatmap=heatmap,
+    )
+    analysis = create_analysis(
+        session=session,
+        owner_id=current_user.id,
+        project_id=payload.project_id,
+        topic=payload.topic,
+        platform=payload.platform,
+        mode=payload.mode,
+        users_json="[]",
+        result_json=json.dumps(final_response, ensure_ascii=False),
+    )
+
+    return {
+        **final_response,
+        "analysis_id": analysis.id,
+        "cube_available": False,
+        "exact_pending": False,
     }
 
+
+@router.post("/strategy")
+def generate_content_strategy(
+    payload: ContentStrategyRequest,
+    background_tasks: BackgroundTasks,
+    sample: Optional[int] = Query(None, ge=1),
+    current_user: UserRead = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Gera uma estratégia de conteúdo, salva no histórico (SQLModel)
+    e retorna o resultado completo.
+
+    Com `?sample=N`, públicos maiores que N são analisados sobre uma amostra
+    aleatória de N usuários (percentuais com intervalo de confiança em
+    audience.sampling). A passada exata roda em background e substitui o
+    resultado salvo no histórico.
+
+    Com `use_project_audience`, usa o público salvo do projeto
+    (POST /projects/{id}/audience/add|remove) em vez de `users`.
+    """
+    _require_project(session, current_user.id, payload.project_id)
+    if payload.use_project_audience:
+        return _strategy_from_project_audience(payload, current_user, session)
+    if payload.users and payload.audience_breakdown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe users ou audience_breakdown, não ambos",
+        )
+
+    try:
+        # Uma única conversão em colunas alimenta o sketch, o cubo e o
+        # arquivo colunar do público
+        if payload.audience_breakdown:
+            # O custo já é proporcional às linhas: não há amostragem
+            columns = audience_columns_from_breakdown(payload.audience_breakdown)
+            population = columns.total_users
+        else:
+            columns = audience_columns_from_payload(payload.users, sample=sample)
+            population = len(payload.users or [])
+    except InvalidAudiencePayload as e:
+        raise RequestValidationError(e.errors)
+
+    sampled = columns.total_users < population
+
+    logger.info(
+        f"[user={current_user.username}] Gerando estratégia para "
+        f"topic={payload.topic}, platform={payload.platform}, "
+        f"users={population}, sample={len(columns) if sampled else None}, "
+        f"project_id={payload.project_id}"
+    )
+
+    top_k = _region_top_k(payload.region_top_k)
+    age_scheme = _resolve_age_scheme(
+        session, current_user.id, payload.project_id, payload.age_scheme
+    )
+
+    if sampled:
+        audience_id, users_json, audience_cube = None, "[]", None
+        audience_sketch = AudienceSketch(top_k=top_k, age_scheme=age_scheme)
+        audience_sketch.add_columns(columns)
+    else:
+        audience_id, users_json, audience_sketch, audience_cube = _process_audience(
+            session, columns, top_k, age_scheme, payload.build_cube
+        )
+
+    heatmap = _project_heatmap(
+        session, current_user.id, payload.project_id, payload.platform
+    )
+    final_response = _build_strategy_response(
+        topic=payload.topic,
+        platform=payload.platform,
+        mode=payload.mode,
+        project_id=payload.project_id,
+        audience_sketch=audience_sketch,
+        region_level=payload.region_level,
+        heatmap=heatmap,
+    )
+    if sampled:
+        final_response["audience"]["sampling"] = sampling_report(
+            final_response["audience"]["summary"], population
+        )
+    _attach_segments(final_response, columns, payload, age_scheme, heatmap)
+
     # Salvar no histórico (SQLModel)
     analysis = create_analysis(
         session=session,
@@ -105,11 +549,98 @@ def generate_content_strategy(
         topic=payload.topic,
         platform=payload.platform,
         mode=payload.mode,
-        users_json=json.dumps(users_dicts, ensure_ascii=False),
+        users_json=users_json,
+        result_json=json.dumps(final_response, ensure_ascii=False),
+        audience_id=audience_id,
+    )
+
+    if sampled:
+        background_tasks.add_task(
+            _exact_strategy_pass,
+            analysis.id,
+            current_user.id,
+            payload,
+            top_k,
+            age_scheme,
+        )
+    else:
+        _update_project_audience(
+            session, current_user.id, payload.project_id, audience_sketch
+        )
+        if audience_cube is not None:
+            save_analysis_cube(session, current_user.id, analysis.id, audience_cube)
+
+    # Retornamos o mesmo final_response (sem depender do objeto salvo),
+    # acrescido do id da análise para consultas posteriores (ex.: cubo)
+    return {
+        **final_response,
+        "analysis_id": analysis.id,
+        "cube_available": audience_cube is not None,
+        "exact_pending": sampled,
+    }
+
+
+@router.post("/strategy/stream")
+async def generate_content_strategy_stream(
+    request: Request,
+    topic: str,
+    platform: str,
+    mode: str = "rich",
+    project_id: Optional[int] = None,
+    region_top_k: Optional[int] = None,
+    region_level: Optional[RegionLevel] = None,
+    age_scheme: Optional[str] = None,
+    current_user: UserRead = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Variante de /strategy para públicos grandes: os parâmetros vão na query
+    string e o público chega em streaming no corpo (NDJSON, um usuário ou um
+    array de usuários por linha). A memória não cresce com o público.
+
+    O público bruto não é guardado no histórico (users_json fica vazio);
+    apenas o resultado da análise.
+    """
+    _require_project(session, current_user.id, project_id)
+    age_scheme = _resolve_age_scheme(session, current_user.id, project_id, age_scheme)
+    try:
+        stream = await analyze_ndjson_stream(
+            request.stream(), top_k=_region_top_k(region_top_k), age_scheme=age_scheme
+        )
+    except InvalidAudienceRecord as e:
+        raise RequestValidationError(e.errors)
+
+    logger.info(
+        f"[user={current_user.username}] Gerando estratégia (stream) para "
+        f"topic={topic}, platform={platform}, "
+        f"users={stream.total_users}, project_id={project_id}"
+    )
+
+    stream.flush()
+    audience_sketch = stream.sketch
+
+    final_response = _build_strategy_response(
+        topic=topic,
+        platform=platform,
+        mode=mode,
+        project_id=project_id,
+        audience_sketch=audience_sketch,
+        region_level=region_level,
+        heatmap=_project_heatmap(session, current_user.id, project_id, platform),
+    )
+
+    create_analysis(
+        session=session,
+        owner_id=current_user.id,
+        project_id=project_id,
+        topic=topic,
+        platform=platform,
+        mode=mode,
+        users_json="[]",
         result_json=json.dumps(final_response, ensure_ascii=False),
     )
+    _update_project_audience(session, current_user.id, project_id, audience_sketch)
 
-    # Retornamos o mesmo final_response (sem depender do objeto salvo)
     return final_response
 
 
@@ -183,6 +714,161 @@ def get_history_entry(
         "platform": analysis.platform,
         "mode": analysis.mode,
         "project_id": analysis.project_id,
-        "users": json.loads(analysis.users_json),
+        "users": get_analysis_users(analysis),
         "result": json.loads(analysis.result_json),
     }
+
+
+@router.get("/history/{entry_id}/cube")
+def query_history_cube(
+    entry_id: int,
+    age_bucket: Optional[List[str]] = Query(None),
+    gender: Optional[List[str]] = Query(None),
+    region: Optional[List[str]] = Query(None),
+    group_by: Optional[List[str]] = Query(None),
+    current_user: UserRead = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Consulta de fatia / roll-up no cubo idade × gênero × região salvo com a
+    análise (ex.: ?gender=female&age_bucket=25-34&region=Sudeste, ou
+    ?group_by=region). Não reprocessa os usuários.
+    """
+    cube = get_analysis_cube(
+        session=session,
+        owner_id=current_user.id,
+        analysis_id=entry_id,
+    )
+    if cube is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cubo não encontrado para esta análise",
+        )
+
+    try:
+        result = cube.query(
+            age_bucket=age_bucket,
+            gender=gender,
+            region=region,
+            group_by=group_by or (),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return {"id": entry_id, **result}
+
+
+@router.get("/history/{entry_id}/regions")
+def get_history_regions(
+    entry_id: int,
+    level: RegionLevel = "state",
+    current_user: UserRead = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """
+    by_region da análise salva somado em outro nível da hierarquia (city,
+    state, macro_region, country). Usa as contagens guardadas, sem
+    reprocessar o público; regiões mais agregadas que o nível ficam como estão.
+    """
+    analysis = get_analysis_by_id(
+        session=session,
+        owner_id=current_user.id,
+        analysis_id=entry_id,
+    )
+    if analysis is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Análise não encontrada",
+        )
+
+    summary = (json.loads(analysis.result_json).get("audience") or {}).get(
+        "summary"
+    ) or {}
+    return {
+        "id": entry_id,
+        "level": level,
+        "by_region": rollup_region_counts(summary.get("by_region", {}), level),
+    }
+
+
+def _project_summary(
+    session: Session, owner_id: int, project_id: int
+) -> Optional[Dict[str, Any]]:
+    # Público salvo do projeto (deltas), senão o acumulado das análises
+    stored = get_project_audience(session, owner_id=owner_id, project_id=project_id)
+    if stored is None:
+        stored = get_project_audience_totals(
+            session, owner_id=owner_id, project_id=project_id
+        )
+    if stored is None:
+        return None
+    return AudienceSketch.from_bytes(stored.sketch).summary()
+
+
+def _compare_summaries_for(
+    session: Session, owner_id: int, refs: List[AudienceRef]
+) -> List[Dict[str, Any]]:
+    """
+    Resumos (contagens de analyze_audience) das referências, na ordem pedida.
+    As análises vêm do result_json salvo, numa única consulta.
+    """
+    analyses = get_analyses_by_ids(
+        session,
+        owner_id=owner_id,
+        analysis_ids=[r.analysis_id for r in refs if r.analysis_id is not None],
+    )
+
+    summaries: List[Dict[str, Any]] = []
+    missing: List[Dict[str, int]] = []
+    for ref in refs:
+        summary = None
+        if ref.analysis_id is not None:
+            analysis = analyses.get(ref.analysis_id)
+            if analysis is not None:
+                result = json.loads(analysis.result_json)
+                summary = (result.get("audience") or {}).get("summary") or {}
+        else:
+            summary = _project_summary(session, owner_id, ref.project_id)
+
+        if summary is None:
+            missing.append(ref.model_dump(exclude_none=True))
+        summaries.append(summary)
+
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"message": "Público não encontrado", "missing": missing},
+        )
+    return summaries
+
+
+@router.post("/history/compare")
+def compare_audiences(
+    payload: AudienceCompareRequest,
+    current_user: UserRead = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Compara o público de uma análise/projeto base com até MAX_COMPARE_TARGETS
+    outros (drift entre campanhas): qui-quadrado, divergência de
+    Jensen-Shannon e lift por categoria, para gênero, região e faixa etária.
+    """
+    baseline, *targets = _compare_summaries_for(
+        session, current_user.id, [payload.baseline, *payload.targets]
+    )
+    metrics = compare_summaries(baseline, targets, fields=payload.fields)
+
+    return {
+        "baseline": {
+            **payload.baseline.model_dump(exclude_none=True),
+            "total_users": baseline.get("total_users", 0),
+        },
+        "comparisons": [
+            {
+                **ref.model_dump(exclude_none=True),
+                "total_users": summary.get("total_users", 0),
+                "fields": fields,
+            }
+            for ref, summary, fields in zip(payload.targets, targets, metrics)
+        ],
+    }
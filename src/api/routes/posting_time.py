@@ -1,17 +1,60 @@
-from typing import Optional
-from fastapi import APIRouter
-from pydantic import BaseModel
-from src.posting_time_optimizer.time_core import suggest_best_times
+from typing import Annotated, Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+from sqlmodel import Session
+
+from src.api.routes.auth import get_current_user
+from src.database.sqlmodel_db import get_session
+from src.posting_time_optimizer.time_core import (
+    BestTimesQuery,
+    suggest_best_times,
+    suggest_best_times_batch,
+)
+from src.schemas.user import UserRead
+from src.services.project_heatmap import get_project_heatmaps
+from src.services.projects import list_projects
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+# Limite de consultas por chamada de /posting/best-times/batch
+MAX_BEST_TIMES_BATCH = 10_000
+
+
+# Contagem ou participação de uma categoria do público
+Share = Annotated[float, Field(ge=0, allow_inf_nan=False)]
+
 
 class PostingTimeRequest(BaseModel):
     platform: str
     main_age_bucket: Optional[str] = None
     region_main: Optional[str] = None
+    # Participação (contagem ou %) de cada região do público; as janelas
+    # passam a considerar o fuso de cada uma
+    regions: Optional[Dict[str, Share]] = None
+
+
+class AudienceSummaryInput(BaseModel):
+    # Só os campos usados do resumo de analyze_audience (os demais são
+    # ignorados)
+    by_age_bucket: Optional[Dict[str, Share]] = None
+    by_region: Optional[Dict[str, Share]] = None
+
+
+class BestTimesBatchItem(PostingTimeRequest):
+    # Com projeto, o mapa de engajamento salvo dele é usado quando houver
+    project_id: Optional[int] = None
+    # Resumo do público (by_age_bucket, by_region): preenche a faixa, a
+    # região e as participações que não vierem explícitas
+    audience_summary: Optional[AudienceSummaryInput] = None
+
+
+class BestTimesBatchRequest(BaseModel):
+    items: List[BestTimesBatchItem] = Field(
+        ..., min_length=1, max_length=MAX_BEST_TIMES_BATCH
+    )
 
 
 @router.post("/posting/best-times")
@@ -29,6 +72,68 @@ def posting_best_times(payload: PostingTimeRequest):
         platform=payload.platform,
         main_age_bucket=payload.main_age_bucket,
         region_main=payload.region_main,
+        region_shares=payload.regions,
     )
 
     return result
+
+
+def _dominant(counts: Optional[Dict[str, float]]) -> Optional[str]:
+    if not counts:
+        return None
+    return max(counts, key=counts.get)
+
+
+@router.post("/posting/best-times/batch")
+def posting_best_times_batch(
+    payload: BestTimesBatchRequest,
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Melhores horários de várias combinações (projeto, plataforma, público)
+    numa chamada, na ordem dos itens. O mapa de engajamento de cada
+    projeto/plataforma é lido uma vez e todas as consultas são avaliadas
+    juntas. 404 lista os projetos não encontrados.
+    """
+    project_ids = {item.project_id for item in payload.items} - {None}
+    if project_ids:
+        owned = {project.id for project in list_projects(session, current_user.id)}
+        missing = sorted(project_ids - owned)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={"message": "Projetos não encontrados", "missing": missing},
+            )
+
+    heatmaps = get_project_heatmaps(
+        session,
+        current_user.id,
+        {
+            (item.project_id, item.platform)
+            for item in payload.items
+            if item.project_id is not None
+        },
+    )
+    queries = []
+    for item in payload.items:
+        summary = item.audience_summary or AudienceSummaryInput()
+        queries.append(
+            BestTimesQuery(
+                platform=item.platform,
+                main_age_bucket=item.main_age_bucket
+                or _dominant(summary.by_age_bucket),
+                region_main=item.region_main or _dominant(summary.by_region),
+                heatmap=heatmaps.get((item.project_id, item.platform.lower())),
+                region_shares=item.regions or summary.by_region,
+            )
+        )
+
+    logger.info(f"Melhores horários em lote: {len(queries)} consultas")
+    results = suggest_best_times_batch(queries)
+    return {
+        "results": [
+            {"project_id": item.project_id, **result}
+            for item, result in zip(payload.items, results)
+        ]
+    }
@@ -1,21 +1,130 @@
 # src/api/routes/projects.py
-from typing import List
+from collections import Counter
+from typing import Annotated, Any, Dict, List, Literal, Optional
 
-from fastapi import APIRouter, Depends
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, SkipValidation, field_validator
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 
 from src.database.sqlmodel_db import get_session
+from src.models.project_audience import ProjectAudience
+from src.schemas.content_strategy import AudienceUser
 from src.schemas.project import ProjectCreate, ProjectRead
 from src.schemas.user import UserRead
 from src.services.projects import (
     create_project as service_create_project,
+    get_project,
+    get_projects_by_ids,
     list_projects,
 )
+from src.services.project_audience import (
+    apply_project_audience_delta,
+    get_project_audience as service_get_project_audience,
+    get_project_audience_totals,
+)
+from src.audience_analyzer.age_schemes import resolve_age_scheme_id
+from src.audience_analyzer.payload import (
+    InvalidAudiencePayload,
+    audience_columns_from_payload,
+)
+from src.audience_analyzer.sketch import AudienceSketch
+from src.core.config import settings
+from src.posting_time_optimizer.heatmap import (
+    build_heatmap,
+    heatmap_matrix,
+    newest_post,
+    utc_datetime,
+)
+from src.posting_time_optimizer.scheduler import (
+    DEFAULT_MAX_PER_DAY,
+    DEFAULT_MIN_GAP_HOURS,
+    MAX_MIN_GAP_HOURS,
+    MAX_POSTS_PER_WEEK,
+    ScheduleConstraints,
+    blackout_mask,
+)
+from src.posting_time_optimizer.time_core import suggest_best_times
+from src.services.posting_schedule import ScheduleJob, build_schedules
+from src.services.project_heatmap import (
+    get_project_heatmap,
+    get_project_heatmap_row,
+    store_project_heatmap,
+)
+from src.services.slot_posterior import get_slot_posterior, ingest_project_media
 from src.api.routes.auth import get_current_user
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
+class AudienceDelta(BaseModel):
+    # Validado em colunas por audience_columns_from_payload
+    users: SkipValidation[List[AudienceUser]]
+
+
+# Limite de posts por envio do mapa de engajamento
+MAX_HEATMAP_MEDIA = 50_000
+
+
+class HeatmapUpload(BaseModel):
+    platform: str
+    # Itens no formato de get_recent_media_insights: {timestamp, metrics}
+    media: List[Dict[str, Any]] = Field(..., max_length=MAX_HEATMAP_MEDIA)
+    # Fuso do público em horas (None = POSTING_UTC_OFFSET_HOURS)
+    utc_offset_hours: Optional[float] = Field(None, ge=-12, le=14)
+
+
+# Limite de projetos por chamada de /projects/schedule/batch
+MAX_SCHEDULE_BATCH = 1_000
+
+_HOUR_PATTERN = r"^([01]?\d|2[0-4]):[0-5]\d$"
+
+
+class BlackoutWindow(BaseModel):
+    # Sem `day`, a janela vale para todos os dias ("seg", ..., "dom")
+    day: Optional[Literal["seg", "ter", "qua", "qui", "sex", "sab", "dom"]] = None
+    start: str = Field(..., pattern=_HOUR_PATTERN)
+    end: str = Field(..., pattern=_HOUR_PATTERN)
+
+
+class ScheduleRequest(BaseModel):
+    # Meta de posts na semana por plataforma
+    platforms: Dict[str, Annotated[int, Field(ge=1, le=MAX_POSTS_PER_WEEK)]] = Field(
+        ..., min_length=1
+    )
+    min_gap_hours: int = Field(DEFAULT_MIN_GAP_HOURS, ge=1, le=MAX_MIN_GAP_HOURS)
+    max_per_day: int = Field(DEFAULT_MAX_PER_DAY, ge=1, le=24)
+    blackout: List[BlackoutWindow] = []
+    main_age_bucket: Optional[str] = None
+    # Scores por plataforma (24, 7 x 24 ou 168 valores); sem isso, usa o
+    # mapa de engajamento do projeto ou as regras da plataforma
+    scores: Optional[Dict[str, List[Any]]] = None
+
+
+class ProjectScheduleRequest(ScheduleRequest):
+    project_id: int
+
+
+class ScheduleBatchRequest(BaseModel):
+    projects: List[ProjectScheduleRequest] = Field(
+        ..., min_length=1, max_length=MAX_SCHEDULE_BATCH
+    )
+
+    @field_validator("projects")
+    @classmethod
+    def _projetos_sem_repeticao(
+        cls, value: List[ProjectScheduleRequest]
+    ) -> List[ProjectScheduleRequest]:
+        # Cada projeto uma vez: as plataformas de um mesmo projeto vão juntas
+        counts = Counter(item.project_id for item in value)
+        repeated = sorted(project_id for project_id, n in counts.items() if n > 1)
+        if repeated:
+            raise ValueError(f"Projetos repetidos no lote: {repeated}")
+        return value
+
+
 @router.get("/", response_model=List[ProjectRead])
 def get_my_projects(
     session: Session = Depends(get_session),
@@ -32,3 +141,377 @@ def create_project_endpoint(
     current_user: UserRead = Depends(get_current_user),
 ):
     return service_create_project(session, owner_id=current_user.id, data=payload)
+
+
+@router.get("/{project_id}/audience")
+def get_project_audience(
+    project_id: int,
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Público acumulado do projeto (soma de todas as análises com público),
+    calculado a partir do sketch salvo, sem reler o histórico.
+    """
+    totals = get_project_audience_totals(
+        session, owner_id=current_user.id, project_id=project_id
+    )
+    if totals is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhum público acumulado para este projeto",
+        )
+
+    sketch = AudienceSketch.from_bytes(totals.sketch)
+
+    return {
+        "project_id": project_id,
+        "analyses_count": totals.analyses_count,
+        "updated_at": totals.updated_at.isoformat(),
+        "summary": sketch.summary(),
+        "profiles": sketch.profiles(),
+    }
+
+
+def _stored_audience_response(audience: ProjectAudience) -> Dict[str, Any]:
+    sketch = AudienceSketch.from_bytes(audience.sketch)
+    return {
+        "project_id": audience.project_id,
+        "age_scheme": audience.age_scheme,
+        "updated_at": audience.updated_at.isoformat(),
+        "summary": sketch.summary(),
+        "profiles": sketch.profiles(),
+    }
+
+
+def _apply_delta(
+    project_id: int,
+    payload: AudienceDelta,
+    removing: bool,
+    session: Session,
+    current_user: UserRead,
+) -> Dict[str, Any]:
+    project = get_project(session, owner_id=current_user.id, project_id=project_id)
+    if project is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Projeto não encontrado",
+        )
+
+    try:
+        columns = audience_columns_from_payload(payload.users)
+    except InvalidAudiencePayload as e:
+        raise RequestValidationError(e.errors)
+
+    try:
+        audience = apply_project_audience_delta(
+            session,
+            owner_id=current_user.id,
+            project_id=project_id,
+            age_scheme=resolve_age_scheme_id(project.age_scheme),
+            added=None if removing else columns,
+            removed=columns if removing else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except IntegrityError:
+        # Outra requisição criou o público do projeto ao mesmo tempo
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Público do projeto alterado por outra requisição; tente de novo.",
+        )
+
+    return _stored_audience_response(audience)
+
+
+@router.post("/{project_id}/audience/add")
+def add_project_audience_users(
+    project_id: int,
+    payload: AudienceDelta,
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Soma usuários ao público salvo do projeto (custo proporcional ao delta).
+    """
+    return _apply_delta(project_id, payload, False, session, current_user)
+
+
+@router.post("/{project_id}/audience/remove")
+def remove_project_audience_users(
+    project_id: int,
+    payload: AudienceDelta,
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Remove usuários do público salvo do projeto. 409 se a remoção não
+    couber nas contagens atuais.
+    """
+    return _apply_delta(project_id, payload, True, session, current_user)
+
+
+@router.get("/{project_id}/audience/current")
+def get_project_current_audience(
+    project_id: int,
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Público salvo do projeto (mantido pelos deltas add/remove).
+    """
+    audience = service_get_project_audience(
+        session, owner_id=current_user.id, project_id=project_id
+    )
+    if audience is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Projeto sem público salvo",
+        )
+    return _stored_audience_response(audience)
+
+
+def _owned_project(session: Session, owner_id: int, project_id: int):
+    project = get_project(session, owner_id=owner_id, project_id=project_id)
+    if project is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Projeto não encontrado",
+        )
+    return project
+
+
+@router.post("/{project_id}/heatmap")
+def upload_project_heatmap(
+    project_id: int,
+    payload: HeatmapUpload,
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Monta o mapa de engajamento dia × hora a partir dos posts enviados e o
+    guarda para o projeto/plataforma (substitui o anterior). As sugestões
+    de horário do projeto passam a usar o mapa.
+    """
+    _owned_project(session, current_user.id, project_id)
+
+    offset = payload.utc_offset_hours
+    if offset is None:
+        offset = settings.POSTING_UTC_OFFSET_HOURS
+    heatmap = build_heatmap(payload.media, utc_offset_hours=offset)
+    row = store_project_heatmap(
+        session,
+        current_user.id,
+        project_id,
+        payload.platform,
+        heatmap,
+        offset,
+        last_post_at=utc_datetime(newest_post(payload.media)),
+    )
+
+    return {
+        "project_id": project_id,
+        "platform": row.platform,
+        "utc_offset_hours": row.utc_offset_hours,
+        "updated_at": row.updated_at.isoformat(),
+        "ignored_media": len(payload.media) - heatmap.total_posts,
+        "heatmap": heatmap_matrix(heatmap),
+        "best_times": suggest_best_times(platform=payload.platform, heatmap=heatmap),
+    }
+
+
+@router.get("/{project_id}/heatmap")
+def get_project_heatmap_endpoint(
+    project_id: int,
+    platform: str = Query(...),
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Mapa de engajamento salvo do projeto para a plataforma.
+    """
+    row = get_project_heatmap_row(session, current_user.id, project_id, platform)
+    heatmap = get_project_heatmap(session, current_user.id, project_id, platform)
+    if row is None or heatmap is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Projeto sem mapa de engajamento para esta plataforma",
+        )
+
+    return {
+        "project_id": project_id,
+        "platform": row.platform,
+        "utc_offset_hours": row.utc_offset_hours,
+        "updated_at": row.updated_at.isoformat(),
+        "heatmap": heatmap_matrix(heatmap),
+    }
+
+
+@router.post("/{project_id}/posterior")
+def ingest_project_posts(
+    project_id: int,
+    payload: HeatmapUpload,
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Soma os posts enviados à posterior de horários do projeto/plataforma
+    (só os mais novos que o último já incluído). As sugestões com
+    strategy=adaptive passam a usar os resultados.
+    """
+    _owned_project(session, current_user.id, project_id)
+
+    offset = payload.utc_offset_hours
+    if offset is None:
+        offset = settings.POSTING_UTC_OFFSET_HOURS
+    row, posterior, added = ingest_project_media(
+        session, current_user.id, project_id, payload.platform, payload.media, offset
+    )
+
+    return {
+        "project_id": project_id,
+        "platform": row.platform,
+        "utc_offset_hours": row.utc_offset_hours,
+        "ingested_media": added,
+        "ignored_media": len(payload.media) - added,
+        "posts": row.posts_count,
+        "last_post_at": row.last_post_at.isoformat() if row.last_post_at else None,
+        "best_times": suggest_best_times(
+            platform=payload.platform, strategy="adaptive", posterior=posterior
+        ),
+    }
+
+
+@router.get("/{project_id}/best-times")
+def get_project_best_times(
+    project_id: int,
+    platform: str = Query(...),
+    main_age_bucket: Optional[str] = None,
+    region_main: Optional[str] = None,
+    strategy: Literal["heuristic", "adaptive"] = "heuristic",
+    method: Literal["thompson", "ucb"] = "thompson",
+    seed: Optional[int] = None,
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Melhores horários do projeto: janelas do mapa de engajamento salvo ou,
+    sem mapa (ou com poucos posts), as heurísticas da plataforma. Com
+    strategy=adaptive, janelas da posterior do projeto (Thompson ou UCB;
+    `seed` fixa o sorteio).
+    """
+    _owned_project(session, current_user.id, project_id)
+    if strategy == "adaptive":
+        return suggest_best_times(
+            platform=platform,
+            main_age_bucket=main_age_bucket,
+            strategy=strategy,
+            posterior=get_slot_posterior(
+                session, current_user.id, project_id, platform
+            ),
+            method=method,
+            rng=np.random.default_rng(seed),
+        )
+    return suggest_best_times(
+        platform=platform,
+        main_age_bucket=main_age_bucket,
+        region_main=region_main,
+        heatmap=get_project_heatmap(session, current_user.id, project_id, platform),
+    )
+
+
+def _schedule_jobs(project_id: int, payload: ScheduleRequest) -> List[ScheduleJob]:
+    constraints = ScheduleConstraints(
+        min_gap_hours=payload.min_gap_hours,
+        max_per_day=payload.max_per_day,
+        allowed=blackout_mask([w.model_dump() for w in payload.blackout]),
+    )
+    scores = payload.scores or {}
+    return [
+        ScheduleJob(
+            project_id=project_id,
+            platform=platform,
+            posts_per_week=posts,
+            constraints=constraints,
+            main_age_bucket=payload.main_age_bucket,
+            scores=scores.get(platform),
+        )
+        for platform, posts in payload.platforms.items()
+    ]
+
+
+def _run_schedules(
+    session: Session, owner_id: int, jobs: List[ScheduleJob]
+) -> List[Dict[str, Any]]:
+    try:
+        return build_schedules(session, owner_id, jobs)
+    except ValueError as e:
+        # Ex.: scores informados com tamanho inválido
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/schedule/batch")
+def schedule_projects_batch(
+    payload: ScheduleBatchRequest,
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Agenda semanal de vários projetos numa chamada (todas as agendas vão
+    juntas para o agendador). 404 lista os projetos não encontrados; 422
+    se um projeto aparece mais de uma vez.
+    """
+    owned = get_projects_by_ids(
+        session, current_user.id, [item.project_id for item in payload.projects]
+    )
+    missing = [
+        item.project_id for item in payload.projects if item.project_id not in owned
+    ]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"message": "Projetos não encontrados", "missing": missing},
+        )
+
+    jobs = [
+        job
+        for item in payload.projects
+        for job in _schedule_jobs(item.project_id, item)
+    ]
+    schedules = _run_schedules(session, current_user.id, jobs)
+
+    by_project: Dict[int, Dict[str, Any]] = {}
+    for schedule in schedules:
+        project = by_project.setdefault(schedule["project_id"], {})
+        project[schedule.pop("platform")] = schedule
+        schedule.pop("project_id")
+    return {
+        "projects": [
+            {"project_id": project_id, "platforms": platforms}
+            for project_id, platforms in by_project.items()
+        ]
+    }
+
+
+@router.post("/{project_id}/schedule")
+def schedule_project(
+    project_id: int,
+    payload: ScheduleRequest,
+    session: Session = Depends(get_session),
+    current_user: UserRead = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Agenda semanal de posts do projeto por plataforma, respeitando a meta
+    de posts, o intervalo mínimo, o máximo por dia e as janelas bloqueadas.
+    """
+    _owned_project(session, current_user.id, project_id)
+    schedules = _run_schedules(
+        session, current_user.id, _schedule_jobs(project_id, payload)
+    )
+
+    platforms = {}
+    for schedule in schedules:
+        schedule.pop("project_id")
+        platforms[schedule.pop("platform")] = schedule
+    return {"project_id": project_id, "platforms": platforms}
@@ -0,0 +1,176 @@
+# src/audience_analyzer/age_schemes.py
+"""
+Esquemas de faixas etárias (limites + rótulos + tipo de perfil).
+
+Cada esquema é compilado uma única vez numa tabela de consulta indexada pela
+idade (0..MAX_AGE) e guardado em cache pelo id: descobrir a faixa de uma
+idade vira `lut[idade]`, tanto no caminho escalar quanto no vetorizado.
+
+O esquema de uma análise é o pedido na requisição, senão o do projeto
+(Project.age_scheme), senão o esquema padrão; a plataforma não muda o
+esquema sozinha.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Idades fora de 0..MAX_AGE são limitadas ao intervalo antes da consulta
+MAX_AGE = 130
+
+DEFAULT_SCHEME_ID = "default"
+
+# Limites inferiores das faixas (exceto a primeira) + rótulo e tipo de perfil
+# de cada faixa (len(labels) == len(edges) + 1)
+AGE_SCHEMES: Dict[str, Dict[str, Sequence]] = {
+    DEFAULT_SCHEME_ID: {
+        "edges": (18, 25, 35, 45, 60),
+        "labels": ("menos de 18", "18-24", "25-34", "35-44", "45-59", "60+"),
+        "types": (
+            "iniciante",
+            "iniciante",
+            "intermediário",
+            "intermediário",
+            "avançado",
+            "avançado",
+        ),
+    },
+    # Público jovem (ex.: TikTok / Reels): faixas mais finas até os 30
+    "jovem": {
+        "edges": (13, 18, 22, 26, 30, 40),
+        "labels": ("menos de 13", "13-17", "18-21", "22-25", "26-29", "30-39", "40+"),
+        "types": (
+            "iniciante",
+            "iniciante",
+            "iniciante",
+            "intermediário",
+            "intermediário",
+            "avançado",
+            "avançado",
+        ),
+    },
+    # Público profissional (ex.: LinkedIn)
+    "profissional": {
+        "edges": (25, 35, 50),
+        "labels": ("até 24", "25-34", "35-49", "50+"),
+        "types": ("iniciante", "intermediário", "avançado", "avançado"),
+    },
+}
+
+
+# Faixas no formato das plataformas: "25-34", "65+"
+_AGE_RANGE = re.compile(r"^\s*(\d{1,3})\s*(?:-\s*(\d{1,3})|(\+))\s*$")
+
+
+class UnknownAgeScheme(KeyError):
+    pass
+
+
+@dataclass(frozen=True, eq=False)
+class AgeScheme:
+    scheme_id: str
+    edges: Tuple[int, ...]
+    labels: Tuple[str, ...]
+    types: Tuple[str, ...]
+    lut: np.ndarray  # faixa de cada idade 0..MAX_AGE (uint8)
+
+    @property
+    def n_buckets(self) -> int:
+        return len(self.labels)
+
+    def bucket_index(self, age: int) -> int:
+        return int(self.lut[min(max(age, 0), MAX_AGE)])
+
+    def bucket_label(self, age: int) -> str:
+        return self.labels[self.bucket_index(age)]
+
+    def bucket_codes(self, ages: np.ndarray) -> np.ndarray:
+        """
+        Índice da faixa de cada idade (vetorizado: uma indexação na tabela).
+        """
+        return self.lut[np.clip(ages, 0, MAX_AGE)]
+
+    def type_of(self, label: str) -> Optional[str]:
+        try:
+            return self.types[self.labels.index(label)]
+        except ValueError:
+            return None
+
+
+def compile_age_scheme(
+    scheme_id: str,
+    edges: Sequence[int],
+    labels: Sequence[str],
+    types: Sequence[str],
+) -> AgeScheme:
+    """
+    Valida o esquema e gera a tabela idade -> faixa.
+    """
+    edges = tuple(int(e) for e in edges)
+    if len(labels) != len(edges) + 1 or len(types) != len(labels):
+        raise ValueError(
+            f"Esquema {scheme_id}: são necessários len(edges) + 1 rótulos e tipos."
+        )
+    if list(edges) != sorted(set(edges)) or not all(0 < e <= MAX_AGE for e in edges):
+        raise ValueError(
+            f"Esquema {scheme_id}: limites devem ser crescentes, entre 1 e {MAX_AGE}."
+        )
+
+    lut = np.digitize(np.arange(MAX_AGE + 1), edges).astype(np.uint8)
+    lut.setflags(write=False)
+    return AgeScheme(scheme_id, edges, tuple(labels), tuple(types), lut)
+
+
+@lru_cache(maxsize=None)
+def _compiled_scheme(scheme_id: str) -> AgeScheme:
+    spec = AGE_SCHEMES.get(scheme_id)
+    if spec is None:
+        raise UnknownAgeScheme(scheme_id)
+    return compile_age_scheme(scheme_id, spec["edges"], spec["labels"], spec["types"])
+
+
+def get_age_scheme(scheme_id: Optional[str] = None) -> AgeScheme:
+    """
+    Esquema compilado (em cache por id). None = esquema padrão.
+    """
+    return _compiled_scheme(scheme_id or DEFAULT_SCHEME_ID)
+
+
+def resolve_age_scheme_id(
+    project_scheme: Optional[str] = None,
+    requested: Optional[str] = None,
+) -> str:
+    """
+    Esquema de uma análise: o pedido, senão o do projeto, senão o padrão.
+    """
+    return requested or project_scheme or DEFAULT_SCHEME_ID
+
+
+@lru_cache(maxsize=None)
+def _scheme_label_ranges() -> Dict[str, Tuple[int, int]]:
+    ranges: Dict[str, Tuple[int, int]] = {}
+    for spec in AGE_SCHEMES.values():
+        bounds = (0, *spec["edges"], MAX_AGE + 1)
+        for i, label in enumerate(spec["labels"]):
+            ranges.setdefault(label, (bounds[i], bounds[i + 1] - 1))
+    return ranges
+
+
+def parse_age_range(label: str) -> Tuple[int, int]:
+    """
+    Intervalo de idades (inclusivo) de uma faixa: "25-34", "65+" ou um
+    rótulo de algum esquema conhecido (ex.: "menos de 18").
+    """
+    match = _AGE_RANGE.match(label)
+    if match:
+        low = int(match.group(1))
+        high = MAX_AGE if match.group(3) else int(match.group(2))
+        if low <= high <= MAX_AGE:
+            return low, high
+    elif label in _scheme_label_ranges():
+        return _scheme_label_ranges()[label]
+
+    raise ValueError(f"Faixa etária inválida: {label!r}")
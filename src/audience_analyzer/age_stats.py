@@ -0,0 +1,66 @@
+# src/audience_analyzer/age_stats.py
+"""
+Estatísticas de idade (média, p10, mediana, p90) a partir de um histograma.
+
+As idades são inteiras e limitadas (0..MAX_AGE), então um histograma de
+MAX_AGE + 1 contagens é um "sketch de quantis" exato e de tamanho fixo:
+preenchido com um bincount na mesma passada das faixas, somável entre
+lotes/shards/projetos (e subtraível, para deltas) e serializável junto do
+AudienceSketch. Não há erro de aproximação como num t-digest ou KLL.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.audience_analyzer.age_schemes import MAX_AGE
+
+AGE_HISTOGRAM_SIZE = MAX_AGE + 1
+
+QUANTILES = {"p10": 0.10, "median": 0.50, "p90": 0.90}
+
+
+def empty_age_histogram() -> np.ndarray:
+    return np.zeros(AGE_HISTOGRAM_SIZE, dtype=np.int64)
+
+
+def age_histogram(ages: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Contagem por idade (idades fora de 0..MAX_AGE entram nos extremos).
+    Com `weights`, cada idade conta o seu peso (linhas agregadas).
+    """
+    return np.bincount(
+        np.clip(ages, 0, MAX_AGE).astype(np.intp, copy=False),
+        weights=weights,
+        minlength=AGE_HISTOGRAM_SIZE,
+    ).astype(np.int64, copy=False)
+
+
+def histogram_quantile(histogram: np.ndarray, q: float) -> Optional[int]:
+    """
+    Quantil por posto mais próximo: menor idade com acumulado >= ceil(q * n)
+    (igual a np.percentile(..., method="inverted_cdf") sobre as idades).
+    """
+    cumulative = np.cumsum(histogram)
+    total = int(cumulative[-1]) if cumulative.size else 0
+    if total == 0:
+        return None
+    rank = max(int(np.ceil(q * total)), 1)
+    return int(np.searchsorted(cumulative, rank))
+
+
+def age_stats(histogram: np.ndarray) -> Optional[Dict[str, Any]]:
+    """
+    Média e quantis das idades (None sem idades válidas).
+    """
+    total = int(histogram.sum())
+    if total == 0:
+        return None
+
+    stats: Dict[str, Any] = {
+        "count": total,
+        "mean": round(float(np.dot(histogram, np.arange(histogram.size)) / total), 1),
+    }
+    for name, q in QUANTILES.items():
+        stats[name] = histogram_quantile(histogram, q)
+    return stats
@@ -1,55 +1,111 @@
-from collections import Counter
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.audience_analyzer.age_schemes import DEFAULT_SCHEME_ID, get_age_scheme
+from src.audience_analyzer.columnar import (
+    AudienceColumns,
+    columns_from_breakdown,
+    columns_from_users,
+    summarize_columns,
+)
+from src.audience_analyzer.parallel import (
+    columns_from_users_parallel,
+    should_parallelize,
+    sketch_users_parallel,
+)
+from src.audience_analyzer.regions import rollup_region_counts
+from src.audience_analyzer.segments import segment_columns
+from src.audience_analyzer.sketch import AudienceSketch
+
+
+def _age_bucket(age: int, scheme_id: Optional[str] = None) -> str:
+    """
+    Converte idade para faixa etária aproximada (tabela do esquema).
+    """
+    return get_age_scheme(scheme_id).bucket_label(age)
 
 
-def _age_bucket(age: int) -> str:
+def build_audience_columns(users: List[Dict[str, Any]]) -> AudienceColumns:
     """
-    Converte idade para faixa etária aproximada.
+    Converte o público em colunas (em paralelo acima de
+    AUDIENCE_PARALLEL_MIN_USERS).
     """
-    if age < 18:
-        return "menos de 18"
-    elif age < 25:
-        return "18-24"
-    elif age < 35:
-        return "25-34"
-    elif age < 45:
-        return "35-44"
-    elif age < 60:
-        return "45-59"
-    else:
-        return "60+"
+    if should_parallelize(len(users)):
+        return columns_from_users_parallel(users)
+    return columns_from_users(users)
+
+
+def build_audience_sketch(
+    users: List[Dict[str, Any]],
+    top_k: Optional[int] = None,
+    top_k_fields: Tuple[str, ...] = ("region",),
+    age_scheme: Optional[str] = None,
+) -> AudienceSketch:
+    """
+    Monta o AudienceSketch do público. Acima de AUDIENCE_PARALLEL_MIN_USERS
+    o trabalho é dividido em shards processados em paralelo.
+    """
+    if should_parallelize(len(users)):
+        return sketch_users_parallel(
+            users, top_k=top_k, top_k_fields=top_k_fields, age_scheme=age_scheme
+        )
+    sketch = AudienceSketch(
+        top_k=top_k,
+        top_k_fields=top_k_fields,
+        age_scheme=age_scheme or DEFAULT_SCHEME_ID,
+    )
+    return sketch.add_batch(users)
+
+
+def analyze_and_profile(
+    users: List[Dict[str, Any]],
+    age_scheme: Optional[str] = None,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Calcula resumo estatístico e perfis do público em uma única passada
+    (motor colunar). Equivale a chamar `analyze_audience` e `profile_audience`.
+    """
+    if should_parallelize(len(users)):
+        return sketch_users_parallel(users, age_scheme=age_scheme).result()
+    return summarize_columns(columns_from_users(users), get_age_scheme(age_scheme))
 
 
-def analyze_audience(users: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_audience(
+    users: List[Dict[str, Any]],
+    top_k: Optional[int] = None,
+    top_k_fields: Tuple[str, ...] = ("region",),
+    region_level: Optional[str] = None,
+) -> Dict[str, Any]:
     """
     Recebe uma lista de usuários (idade, gênero, região) e
     retorna um resumo estatístico simples.
-    """
-    genders = []
-    regions = []
-    age_buckets = []
 
-    for user in users:
-        age = user.get("age")
-        gender = user.get("gender", "unknown")
-        region = user.get("region", "unknown")
+    Com `top_k`, os campos de `top_k_fields` usam heavy hitters (memória fixa):
+    voltam só o top N; o restante e os limites de erro vão em `approximate`.
 
-        if isinstance(age, int):
-            age_buckets.append(_age_bucket(age))
+    Com `region_level` ("city", "state", "macro_region", "country"), by_region
+    vem somado nesse nível da hierarquia de regiões.
+    """
+    if top_k:
+        summary = build_audience_sketch(users, top_k, top_k_fields).summary()
+    else:
+        summary, _ = analyze_and_profile(users)
 
-        genders.append(gender)
-        regions.append(region)
+    if region_level:
+        summary["by_region"] = rollup_region_counts(summary["by_region"], region_level)
+    return summary
 
-    gender_counts = Counter(genders)
-    region_counts = Counter(regions)
-    age_bucket_counts = Counter(age_buckets)
 
-    return {
-        "total_users": len(users),
-        "by_gender": dict(gender_counts),
-        "by_region": dict(region_counts),
-        "by_age_bucket": dict(age_bucket_counts),
-    }
+def segment_audience(
+    users: List[Dict[str, Any]],
+    k: int = 4,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Personas do público (mini-batch k-means sobre idade, gênero e região):
+    participação, centróide e composição de cada uma. Ao contrário de
+    `profile_audience`, combina os três atributos.
+    """
+    return segment_columns(build_audience_columns(users), k=k, seed=seed)
 
 
 def profile_audience(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -59,32 +115,32 @@ def profile_audience(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     if not users:
         return []
 
-    age_buckets = []
-
-    for user in users:
-        age = user.get("age")
-        if isinstance(age, int):
-            age_buckets.append(_age_bucket(age))
-
-    total = len(age_buckets)
-    if total == 0:
-        return []
-
-    counts = Counter(age_buckets)
+    _, profiles = analyze_and_profile(users)
+    return profiles
 
-    profiles = []
-    for bucket, count in counts.items():
-        percent = round((count / total) * 100, 1)
 
-        if bucket in ("menos de 18", "18-24"):
-            label = "iniciante"
-        elif bucket in ("25-34", "35-44"):
-            label = "intermediário"
-        else:
-            label = "avançado"
+def analyze_breakdown(
+    rows: List[Dict[str, Any]],
+    top_k: Optional[int] = None,
+    top_k_fields: Tuple[str, ...] = ("region",),
+) -> Dict[str, Any]:
+    """
+    Igual a `analyze_audience`, mas recebe o público já agregado: linhas com
+    age (ou age_bucket), gender, region e count. O resultado é o mesmo de
+    expandir cada linha em `count` usuários, sem criar esses usuários.
+    """
+    columns = columns_from_breakdown(rows)
+    if top_k:
+        sketch = AudienceSketch(top_k=top_k, top_k_fields=top_k_fields)
+        return sketch.add_columns(columns).summary()
 
-        profiles.append({"age_bucket": bucket, "type": label, "percent": percent})
+    summary, _ = summarize_columns(columns)
+    return summary
 
-    profiles.sort(key=lambda x: x["percent"], reverse=True)
 
+def profile_breakdown(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Igual a `profile_audience`, para o público agregado (ver analyze_breakdown).
+    """
+    _, profiles = summarize_columns(columns_from_breakdown(rows))
     return profiles
@@ -0,0 +1,390 @@
+# src/audience_analyzer/columnar.py
+"""
+Motor colunar (NumPy) da análise de público.
+
+Em vez de percorrer a lista de dicts várias vezes, o público é convertido
+uma única vez em colunas (idade + gênero/região dictionary-encoded) e todas
+as contagens saem de operações vetorizadas (tabela de faixas + bincount).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.audience_analyzer.age_schemes import (
+    MAX_AGE,
+    AgeScheme,
+    get_age_scheme,
+    parse_age_range,
+)
+from src.audience_analyzer.age_stats import age_histogram, age_stats
+from src.audience_analyzer.regions import region_codes_at_level
+
+# Faixas do esquema padrão (ver age_schemes.py)
+_DEFAULT_SCHEME = get_age_scheme()
+AGE_BUCKET_EDGES = np.array(_DEFAULT_SCHEME.edges, dtype=np.int64)
+AGE_BUCKET_LABELS: Tuple[str, ...] = _DEFAULT_SCHEME.labels
+AGE_BUCKET_TYPES: Tuple[str, ...] = _DEFAULT_SCHEME.types
+
+
+@dataclass
+class AudienceColumns:
+    """
+    Público em formato colunar (uma posição por usuário em cada coluna).
+
+    - ages / age_valid: idade e máscara de idades válidas (int; uint8 quando
+      as colunas vêm do arquivo colunar em disco)
+    - gender_codes / genders: códigos int32 + vocabulário
+    - region_codes / regions: códigos int32 + vocabulário
+
+    Os vocabulários ficam na ordem de primeira aparição, o que preserva a
+    ordem das chaves que o Counter produzia na versão anterior.
+
+    Público agregado (breakdown das plataformas, ex. "25-34,F: 1200") usa
+    uma posição por linha do breakdown:
+    - weights: quantos usuários a linha representa (None = 1 por posição)
+    - age_upper: fim do intervalo de idades da linha quando ela só traz a
+      faixa (`ages` guarda o início; None = todas as idades são exatas)
+    """
+
+    ages: np.ndarray
+    age_valid: np.ndarray
+    gender_codes: np.ndarray
+    genders: List[Any]
+    region_codes: np.ndarray
+    regions: List[Any]
+    weights: Optional[np.ndarray] = None
+    age_upper: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return int(self.gender_codes.shape[0])
+
+    @property
+    def total_users(self) -> int:
+        if self.weights is None:
+            return len(self)
+        return int(self.weights.sum())
+
+    def age_bucket_codes(self, scheme: Optional[AgeScheme] = None) -> np.ndarray:
+        """
+        Índice da faixa etária (nos rótulos do esquema) de cada idade válida
+        (colunas já ajustadas ao esquema por fit_age_ranges).
+        """
+        codes, _ = _age_codes(self, scheme or _DEFAULT_SCHEME)
+        return codes
+
+
+def fit_age_ranges(columns: AudienceColumns, scheme: AgeScheme) -> AudienceColumns:
+    """
+    Ajusta as linhas com faixa etária ao esquema. Uma faixa que atravessa
+    faixas do esquema (ex.: "55-64" das plataformas no esquema padrão, que
+    separa 45-59 e 60+) vira uma linha por faixa, com o peso repartido
+    proporcionalmente aos anos de cada pedaço (idades uniformes dentro da
+    faixa; maiores restos, então o total da linha se mantém). Sem linhas
+    atravessando, devolve as próprias colunas.
+    """
+    if columns.age_upper is None:
+        return columns
+    low = np.clip(columns.ages, 0, MAX_AGE)
+    high = np.clip(columns.age_upper, 0, MAX_AGE)
+    crossing = columns.age_valid & (scheme.lut[low] != scheme.lut[high])
+    if not crossing.any():
+        return columns
+
+    weights = (
+        columns.weights
+        if columns.weights is not None
+        else np.ones(len(columns), dtype=np.int64)
+    )
+    bounds = (0, *scheme.edges, MAX_AGE + 1)
+    rows: List[int] = []
+    pieces: List[Tuple[int, int, int]] = []  # (início, fim, peso)
+    for i in range(len(columns)):
+        if not crossing[i]:
+            rows.append(i)
+            pieces.append((int(columns.ages[i]), int(columns.age_upper[i]), -1))
+            continue
+        a, b = int(low[i]), int(high[i])
+        spans = [
+            (max(a, bounds[k]), min(b, bounds[k + 1] - 1))
+            for k in range(int(scheme.lut[a]), int(scheme.lut[b]) + 1)
+        ]
+        years = np.array([end - start + 1 for start, end in spans], dtype=np.int64)
+        share = years * int(weights[i]) / years.sum()
+        split = np.floor(share).astype(np.int64)
+        rest = int(weights[i]) - int(split.sum())
+        split[np.argsort(split - share, kind="stable")[:rest]] += 1
+        for (start, end), weight in zip(spans, split.tolist()):
+            if weight:
+                rows.append(i)
+                pieces.append((start, end, weight))
+
+    index = np.array(rows, dtype=np.int64)
+    starts, ends, split_weights = (np.array(v, dtype=np.int64) for v in zip(*pieces))
+    return AudienceColumns(
+        ages=starts,
+        age_valid=columns.age_valid[index],
+        gender_codes=columns.gender_codes[index],
+        genders=columns.genders,
+        region_codes=columns.region_codes[index],
+        regions=columns.regions,
+        weights=np.where(split_weights < 0, weights[index], split_weights),
+        age_upper=ends,
+    )
+
+
+def _age_codes(
+    columns: AudienceColumns, scheme: AgeScheme
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Faixa de cada idade válida e, quando há intervalos, a máscara das idades
+    exatas (as únicas que entram no histograma). Intervalos que atravessam
+    faixas já devem ter passado por fit_age_ranges.
+    """
+    ages = np.clip(columns.ages[columns.age_valid], 0, MAX_AGE)
+    codes = scheme.lut[ages]
+    if columns.age_upper is None:
+        return codes, None
+    upper = np.clip(columns.age_upper[columns.age_valid], 0, MAX_AGE)
+    return codes, upper == ages
+
+
+def _encode(values: Sequence[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Dictionary-encoding: devolve os códigos e o vocabulário (ordem de aparição).
+    """
+    index: Dict[Any, int] = {}
+    setdefault = index.setdefault
+    codes = np.fromiter(
+        (setdefault(v, len(index)) for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    return codes, list(index)
+
+
+def columns_from_users(users: Sequence[Dict[str, Any]]) -> AudienceColumns:
+    """
+    Converte a lista de usuários (dicts) em colunas.
+    """
+    n = len(users)
+
+    raw_ages = [user.get("age") for user in users]
+    age_valid = np.fromiter(
+        (isinstance(age, int) for age in raw_ages), dtype=bool, count=n
+    )
+    ages = np.fromiter(
+        (age if isinstance(age, int) else 0 for age in raw_ages),
+        dtype=np.int64,
+        count=n,
+    )
+
+    gender_codes, genders = _encode([user.get("gender", "unknown") for user in users])
+    region_codes, regions = _encode([user.get("region", "unknown") for user in users])
+
+    return AudienceColumns(
+        ages=ages,
+        age_valid=age_valid,
+        gender_codes=gender_codes,
+        genders=genders,
+        region_codes=region_codes,
+        regions=regions,
+    )
+
+
+def _row_age_range(row: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    if row.get("age") is not None:
+        # Mesmo limite aplicado às idades na contagem
+        age = min(max(row["age"], 0), MAX_AGE)
+        return age, age
+    if row.get("age_bucket"):
+        return parse_age_range(row["age_bucket"])
+    return None, None  # sem idade nem faixa: idade ausente
+
+
+def columns_from_breakdown(rows: Sequence[Dict[str, Any]]) -> AudienceColumns:
+    """
+    Converte linhas agregadas (age ou age_bucket, gender, region, count) em
+    colunas com peso: o custo depende do número de linhas, não de usuários.
+    Linhas com count 0 são descartadas (não geram chave nas contagens).
+    """
+    rows = [row for row in rows if row["count"]]
+    n = len(rows)
+
+    ranges = [_row_age_range(row) for row in rows]
+    age_valid = np.fromiter((low is not None for low, _ in ranges), bool, count=n)
+    ages = np.fromiter((low or 0 for low, _ in ranges), np.int64, count=n)
+    age_upper = np.fromiter((high or 0 for _, high in ranges), np.int64, count=n)
+
+    gender_codes, genders = _encode([row.get("gender", "unknown") for row in rows])
+    region_codes, regions = _encode([row.get("region", "unknown") for row in rows])
+
+    return AudienceColumns(
+        ages=ages,
+        age_valid=age_valid,
+        gender_codes=gender_codes,
+        genders=genders,
+        region_codes=region_codes,
+        regions=regions,
+        weights=np.fromiter((row["count"] for row in rows), np.int64, count=n),
+        age_upper=None if np.array_equal(ages, age_upper) else age_upper,
+    )
+
+
+def concat_columns(parts: Sequence[AudienceColumns]) -> AudienceColumns:
+    """
+    Concatena colunas de vários lotes/shards, unificando os vocabulários
+    (a ordem de primeira aparição global é preservada).
+    """
+    merged_codes: Dict[str, List[np.ndarray]] = {"gender": [], "region": []}
+    vocabs: Dict[str, Dict[Any, int]] = {"gender": {}, "region": {}}
+
+    for part in parts:
+        for name, codes, values in (
+            ("gender", part.gender_codes, part.genders),
+            ("region", part.region_codes, part.regions),
+        ):
+            index = vocabs[name]
+            remap = np.fromiter(
+                (index.setdefault(v, len(index)) for v in values),
+                dtype=np.int32,
+                count=len(values),
+            )
+            merged_codes[name].append(remap[codes])
+
+    def _cat(arrays: List[np.ndarray], dtype) -> np.ndarray:
+        return np.concatenate(arrays) if arrays else np.zeros(0, dtype=dtype)
+
+    weights = None
+    if any(p.weights is not None for p in parts):
+        weights = _cat(
+            [
+                p.weights if p.weights is not None else np.ones(len(p), np.int64)
+                for p in parts
+            ],
+            np.int64,
+        )
+    age_upper = None
+    if any(p.age_upper is not None for p in parts):
+        age_upper = _cat(
+            [p.age_upper if p.age_upper is not None else p.ages for p in parts],
+            np.int64,
+        )
+
+    return AudienceColumns(
+        ages=_cat([p.ages for p in parts], np.int64),
+        age_valid=_cat([p.age_valid for p in parts], bool),
+        gender_codes=_cat(merged_codes["gender"], np.int32),
+        genders=list(vocabs["gender"]),
+        region_codes=_cat(merged_codes["region"], np.int32),
+        regions=list(vocabs["region"]),
+        weights=weights,
+        age_upper=age_upper,
+    )
+
+
+def _bucket_counts_in_order(
+    bucket_codes: np.ndarray,
+    n_buckets: int,
+    weights: Optional[np.ndarray] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Retorna (índice da faixa, contagem) na ordem de primeira aparição.
+    """
+    if bucket_codes.size == 0:
+        return []
+
+    counts = np.bincount(bucket_codes, weights=weights, minlength=n_buckets)
+    present, first_seen = np.unique(bucket_codes, return_index=True)
+    ordered = present[np.argsort(first_seen, kind="stable")]
+
+    return [(int(b), int(counts[b])) for b in ordered]
+
+
+def profiles_from_age_buckets(
+    by_age_bucket: Dict[str, int], scheme: Optional[AgeScheme] = None
+) -> List[Dict[str, Any]]:
+    """
+    Monta os perfis de `profile_audience` a partir das contagens por faixa
+    (dict faixa -> contagem, na ordem de primeira aparição).
+    """
+    total = sum(by_age_bucket.values())
+    if total == 0:
+        return []
+
+    scheme = scheme or _DEFAULT_SCHEME
+    profiles = [
+        {
+            "age_bucket": bucket,
+            "type": scheme.type_of(bucket),
+            "percent": round((count / total) * 100, 1),
+        }
+        for bucket, count in by_age_bucket.items()
+    ]
+    profiles.sort(key=lambda x: x["percent"], reverse=True)
+
+    return profiles
+
+
+def count_columns(
+    columns: AudienceColumns,
+    scheme: Optional[AgeScheme] = None,
+    region_level: Optional[str] = None,
+) -> Tuple[Dict[str, Any], np.ndarray]:
+    """
+    Contagens do público numa única passada pelas colunas: devolve o resumo
+    de `analyze_audience` e o histograma de idades (base das age_stats).
+    As regiões saem com o rótulo recebido, ou somadas no `region_level`
+    pedido (ex.: "macro_region") pela hierarquia de regiões.
+    """
+    scheme = scheme or _DEFAULT_SCHEME
+    columns = fit_age_ranges(columns, scheme)
+    weights = columns.weights
+    gender_counts = np.bincount(
+        columns.gender_codes, weights=weights, minlength=len(columns.genders)
+    )
+    region_codes, regions = columns.region_codes, columns.regions
+    if region_level is not None:
+        region_codes, regions = region_codes_at_level(
+            region_codes, regions, region_level
+        )
+    region_counts = np.bincount(region_codes, weights=weights, minlength=len(regions))
+
+    # A mesma idade limitada alimenta a tabela de faixas e o histograma
+    ages = np.clip(columns.ages[columns.age_valid], 0, MAX_AGE)
+    age_weights = weights[columns.age_valid] if weights is not None else None
+    bucket_codes, exact = _age_codes(columns, scheme)
+    if exact is None:
+        histogram = age_histogram(ages, age_weights)
+    else:
+        # Linhas só com a faixa contam nas faixas, mas não no histograma
+        histogram = age_histogram(
+            ages[exact], age_weights[exact] if age_weights is not None else None
+        )
+    by_age_bucket = {
+        scheme.labels[b]: c
+        for b, c in _bucket_counts_in_order(bucket_codes, scheme.n_buckets, age_weights)
+    }
+
+    summary = {
+        "total_users": columns.total_users,
+        "by_gender": {g: int(c) for g, c in zip(columns.genders, gender_counts)},
+        "by_region": {r: int(c) for r, c in zip(regions, region_counts)},
+        "by_age_bucket": by_age_bucket,
+        "age_stats": age_stats(histogram),
+    }
+    return summary, histogram
+
+
+def summarize_columns(
+    columns: AudienceColumns,
+    scheme: Optional[AgeScheme] = None,
+    region_level: Optional[str] = None,
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Calcula, numa única passada pelas colunas, o resumo de `analyze_audience`
+    e os perfis de `profile_audience` (faixas etárias do esquema informado).
+    """
+    summary, _ = count_columns(columns, scheme, region_level)
+    return summary, profiles_from_age_buckets(summary["by_age_bucket"], scheme)
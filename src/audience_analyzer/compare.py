@@ -0,0 +1,144 @@
+# src/audience_analyzer/compare.py
+"""
+Comparação de distribuições de público (drift entre campanhas/análises).
+
+Para cada campo (gênero, região, faixa etária), a base e os N alvos viram
+uma matriz de contagens sobre o vocabulário comum; qui-quadrado, divergência
+de Jensen-Shannon e lift por categoria saem de operações NumPy sobre a
+matriz inteira, então comparar uma base com centenas de análises custa
+praticamente o mesmo que com uma.
+
+Resumos com top-k (heavy hitters) trazem o restante fora do top N em
+`approximate`; ele entra nas métricas como uma categoria própria (chave
+REMAINDER, fora do espaço de rótulos reais) e o lift dele sai em
+`other_lift`.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+COMPARE_FIELDS = ("gender", "region", "age_bucket")
+
+# Categoria do restante fora do top N; não é str, então nunca colide com um
+# rótulo real (ex.: uma região chamada "other")
+REMAINDER = object()
+
+
+def _count_matrix(
+    baseline: Dict[Any, int], targets: Sequence[Dict[Any, int]]
+) -> Tuple[List[Any], np.ndarray, np.ndarray]:
+    """
+    Vocabulário comum (ordem da base, depois dos alvos) + vetor da base +
+    matriz (n_alvos x categorias).
+    """
+    index: Dict[Any, int] = {}
+    for counts in (baseline, *targets):
+        for key in counts:
+            index.setdefault(key, len(index))
+
+    base = np.zeros(len(index), dtype=np.float64)
+    base[[index[k] for k in baseline]] = list(baseline.values())
+
+    matrix = np.zeros((len(targets), len(index)), dtype=np.float64)
+    for row, counts in enumerate(targets):
+        matrix[row, [index[k] for k in counts]] = list(counts.values())
+
+    return list(index), base, matrix
+
+
+def _xlogy(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # x * log2(x / y), com 0 * log(0) = 0
+    out = np.zeros_like(x)
+    mask = x > 0
+    out[mask] = x[mask] * np.log2(x[mask] / y[mask])
+    return out
+
+
+def compare_distributions(
+    baseline: Dict[Any, int], targets: Sequence[Dict[Any, int]]
+) -> List[Dict[str, Any]]:
+    """
+    Compara a distribuição base com cada alvo. Para cada alvo devolve:
+    - chi_square / dof: teste de homogeneidade (tabela 2 x categorias);
+    - jsd: divergência de Jensen-Shannon (log2, entre 0 e 1);
+    - lift: participação da categoria no alvo / participação na base
+      (None para categorias ausentes da base); o da categoria REMAINDER
+      sai à parte, em `other_lift`.
+    """
+    if not targets:
+        return []
+
+    keys, base, matrix = _count_matrix(baseline, targets)
+    base_total = base.sum()
+    target_totals = matrix.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = base / base_total if base_total else np.zeros_like(base)
+        q = np.where(target_totals[:, None] > 0, matrix / target_totals[:, None], 0.0)
+
+        # Qui-quadrado de homogeneidade: esperado = total_linha * total_coluna / N
+        grand = base_total + target_totals
+        col_totals = base[None, :] + matrix
+        expected_base = np.where(
+            grand[:, None] > 0, col_totals * base_total / grand[:, None], 0.0
+        )
+        expected_target = col_totals - expected_base
+        chi = np.where(
+            expected_base > 0, (base[None, :] - expected_base) ** 2 / expected_base, 0.0
+        ) + np.where(
+            expected_target > 0, (matrix - expected_target) ** 2 / expected_target, 0.0
+        )
+        chi_square = chi.sum(axis=1)
+        dof = np.maximum((col_totals > 0).sum(axis=1) - 1, 0)
+
+        m = (p[None, :] + q) / 2
+        jsd = 0.5 * _xlogy(np.broadcast_to(p, q.shape).copy(), m).sum(axis=1)
+        jsd += 0.5 * _xlogy(q, m).sum(axis=1)
+
+        lift = np.where(p[None, :] > 0, q / p[None, :], np.nan)
+
+    results = []
+    for row in range(len(targets)):
+        row_lift: Dict[Any, Optional[float]] = {}
+        for col, key in enumerate(keys):
+            value = lift[row, col]
+            row_lift[key] = None if np.isnan(value) else round(float(value), 4)
+        result = {
+            "chi_square": round(float(chi_square[row]), 4),
+            "dof": int(dof[row]),
+            "jsd": round(float(np.clip(jsd[row], 0.0, 1.0)), 6),
+            "lift": row_lift,
+        }
+        if REMAINDER in row_lift:
+            result["other_lift"] = row_lift.pop(REMAINDER)
+        results.append(result)
+    return results
+
+
+def _summary_counts(summary: Dict[str, Any], name: str) -> Dict[Any, int]:
+    # Contagens do campo + o restante fora do top N, se o resumo for top-k
+    counts = dict(summary.get(f"by_{name}", {}))
+    info = (summary.get("approximate") or {}).get(f"by_{name}") or {}
+    if info.get("other"):
+        counts[REMAINDER] = info["other"]
+    return counts
+
+
+def compare_summaries(
+    baseline: Dict[str, Any],
+    targets: Sequence[Dict[str, Any]],
+    fields: Sequence[str] = COMPARE_FIELDS,
+) -> List[Dict[str, Dict[str, Any]]]:
+    """
+    Compara resumos no formato de `analyze_audience` (by_gender, by_region,
+    by_age_bucket). Devolve, por alvo, {campo: métricas}.
+    """
+    per_field = {
+        name: compare_distributions(
+            _summary_counts(baseline, name),
+            [_summary_counts(target, name) for target in targets],
+        )
+        for name in fields
+    }
+    return [{name: per_field[name][i] for name in fields} for i in range(len(targets))]
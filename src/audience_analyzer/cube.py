@@ -0,0 +1,188 @@
+# src/audience_analyzer/cube.py
+"""
+Cubo denso faixa etária × gênero × região.
+
+Construído numa única passada (um np.bincount sobre o índice achatado das
+três colunas) e guardado junto da análise. Consultas de fatia / roll-up
+(ex.: mulheres 25-34 no Sudeste, ou total por região) viram somas sobre
+eixos do array, sem reprocessar os usuários.
+"""
+
+import json
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.audience_analyzer.age_schemes import (
+    DEFAULT_SCHEME_ID,
+    AgeScheme,
+    get_age_scheme,
+)
+from src.audience_analyzer.columnar import AudienceColumns, fit_age_ranges
+
+# Eixo de idade = faixas do esquema + usuários sem idade válida
+NO_AGE_LABEL = "sem idade"
+
+DIMENSIONS = ("age_bucket", "gender", "region")
+
+# Limite de células do cubo denso (protege contra regiões de altíssima
+# cardinalidade; nesses casos o cubo não é gerado)
+MAX_CELLS = 5_000_000
+
+# MAGIC | versão (u8) | tamanho do JSON de metadados (u32) | JSON | counts zlib
+_MAGIC = b"ACUB"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBI")
+
+
+class CubeTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class AudienceCube:
+    genders: List[Any]
+    regions: List[Any]
+    counts: np.ndarray  # shape (len(age_axis), len(genders), len(regions))
+    age_scheme: str = DEFAULT_SCHEME_ID
+
+    @property
+    def age_axis(self) -> tuple:
+        return get_age_scheme(self.age_scheme).labels + (NO_AGE_LABEL,)
+
+    @classmethod
+    def from_columns(
+        cls, columns: AudienceColumns, scheme: Optional[AgeScheme] = None
+    ) -> "AudienceCube":
+        scheme = scheme or get_age_scheme()
+        columns = fit_age_ranges(columns, scheme)
+        n_age, n_gender, n_region = (
+            scheme.n_buckets + 1,
+            len(columns.genders),
+            len(columns.regions),
+        )
+        cells = n_age * n_gender * n_region
+        if cells > MAX_CELLS:
+            raise CubeTooLarge(
+                f"Cubo com {cells} células excede o limite de {MAX_CELLS}."
+            )
+
+        age_codes = np.full(len(columns), n_age - 1, dtype=np.int64)
+        age_codes[columns.age_valid] = columns.age_bucket_codes(scheme)
+
+        flat = (age_codes * n_gender + columns.gender_codes) * n_region
+        flat += columns.region_codes
+        counts = np.bincount(flat, weights=columns.weights, minlength=cells)
+        counts = counts.astype(np.int64, copy=False).reshape(n_age, n_gender, n_region)
+
+        return cls(
+            genders=list(columns.genders),
+            regions=list(columns.regions),
+            counts=counts,
+            age_scheme=scheme.scheme_id,
+        )
+
+    # ---------- consultas ----------
+
+    def _axis_labels(self) -> Dict[str, Sequence[Any]]:
+        return {
+            "age_bucket": self.age_axis,
+            "gender": self.genders,
+            "region": self.regions,
+        }
+
+    def _selector(self, dim: str, values: Optional[Sequence[Any]]) -> np.ndarray:
+        labels = self._axis_labels()[dim]
+        if not values:
+            return np.arange(len(labels))
+        index = {label: i for i, label in enumerate(labels)}
+        # Valores desconhecidos simplesmente não contribuem
+        return np.array([index[v] for v in values if v in index], dtype=np.int64)
+
+    def query(
+        self,
+        age_bucket: Optional[Sequence[str]] = None,
+        gender: Optional[Sequence[Any]] = None,
+        region: Optional[Sequence[Any]] = None,
+        group_by: Sequence[str] = (),
+    ) -> Dict[str, Any]:
+        """
+        Fatia o cubo pelos filtros informados e agrega (roll-up) todas as
+        dimensões que não estão em `group_by`.
+        """
+        for dim in group_by:
+            if dim not in DIMENSIONS:
+                raise ValueError(f"Dimensão inválida: {dim}")
+
+        selectors = [
+            self._selector("age_bucket", age_bucket),
+            self._selector("gender", gender),
+            self._selector("region", region),
+        ]
+        sliced = self.counts[np.ix_(*selectors)]
+
+        total = int(self.counts.sum())
+        result: Dict[str, Any] = {"count": int(sliced.sum()), "total": total}
+
+        if group_by:
+            kept = [DIMENSIONS.index(dim) for dim in group_by]
+            dropped = tuple(i for i in range(3) if i not in kept)
+            grouped = sliced.sum(axis=dropped)
+            # Reordena os eixos na ordem pedida em group_by
+            order = np.argsort(np.argsort(kept))
+            grouped = np.transpose(grouped, order)
+
+            labels = self._axis_labels()
+            axis_values = [
+                [labels[dim][i] for i in selectors[DIMENSIONS.index(dim)]]
+                for dim in group_by
+            ]
+            groups = []
+            for cell in zip(*np.nonzero(grouped)):
+                row = {dim: axis_values[k][cell[k]] for k, dim in enumerate(group_by)}
+                row["count"] = int(grouped[cell])
+                groups.append(row)
+            groups.sort(key=lambda g: g["count"], reverse=True)
+            result["groups"] = groups
+
+        return result
+
+    # ---------- serialização ----------
+
+    def to_bytes(self) -> bytes:
+        dtype = (
+            "<u4" if self.counts.max(initial=0) <= np.iinfo(np.uint32).max else "<u8"
+        )
+        meta = json.dumps(
+            {
+                "genders": self.genders,
+                "regions": self.regions,
+                "shape": list(self.counts.shape),
+                "dtype": dtype,
+                "age_scheme": self.age_scheme,
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+        body = zlib.compress(self.counts.astype(dtype).tobytes(), level=1)
+        return _HEADER.pack(_MAGIC, _VERSION, len(meta)) + meta + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AudienceCube":
+        magic, version, meta_len = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Formato de AudienceCube inválido.")
+
+        offset = _HEADER.size
+        meta = json.loads(data[offset : offset + meta_len].decode("utf-8"))
+        raw = zlib.decompress(data[offset + meta_len :])
+        counts = np.frombuffer(raw, dtype=meta["dtype"]).reshape(meta["shape"])
+
+        return cls(
+            genders=meta["genders"],
+            regions=meta["regions"],
+            counts=counts,
+            age_scheme=meta.get("age_scheme", DEFAULT_SCHEME_ID),
+        )
@@ -0,0 +1,173 @@
+# src/audience_analyzer/heavy_hitters.py
+"""
+Heavy hitters (top-k aproximado) com memória fixa — algoritmo Space-Saving.
+
+Usado para campos categóricos de alta cardinalidade (ex.: região em nível
+de cidade ou texto livre), onde um Counter exato cresce sem limite.
+
+Garantias (N = total de ocorrências, k = capacidade):
+- cada item monitorado tem `count` >= contagem real >= `count - error`;
+- qualquer item fora do resumo tem contagem real <= `max_error` <= N / k.
+
+As atualizações são feitas por lote (contagens exatas do lote) usando a
+regra de merge de resumos Space-Saving, o que também permite combinar
+resumos de shards diferentes.
+"""
+
+import json
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_HEADER = struct.Struct("<IQBI")
+_COUNT_DTYPE = np.dtype("<u8")
+
+
+@dataclass(frozen=True)
+class HeavyHitter:
+    item: Any
+    count: int
+    error: int
+
+
+class SpaceSaving:
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity deve ser >= 1")
+        self.capacity = capacity
+        self.total = 0
+        self.truncated = False
+        # Ordem de inserção = ordem de primeira aparição (desempate estável)
+        self.counts: Dict[Any, int] = {}
+        self.errors: Dict[Any, int] = {}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SpaceSaving):
+            return NotImplemented
+        return (
+            self.capacity == other.capacity
+            and self.total == other.total
+            and self.truncated == other.truncated
+            and self.counts == other.counts
+            and self.errors == other.errors
+        )
+
+    @property
+    def max_error(self) -> int:
+        """
+        Limite superior da contagem de qualquer item não monitorado.
+        """
+        if not self.truncated:
+            return 0
+        return min(self.counts.values())
+
+    def _combine(
+        self,
+        counts: Dict[Any, int],
+        errors: Dict[Any, int],
+        floor: int,
+        total: int,
+    ) -> None:
+        own_floor = self.max_error
+        keys = list(self.counts)
+        keys.extend(k for k in counts if k not in self.counts)
+
+        merged_counts = np.fromiter(
+            (self.counts.get(k, own_floor) + counts.get(k, floor) for k in keys),
+            dtype=np.int64,
+            count=len(keys),
+        )
+        merged_errors = np.fromiter(
+            (self.errors.get(k, own_floor) + errors.get(k, floor) for k in keys),
+            dtype=np.int64,
+            count=len(keys),
+        )
+
+        if len(keys) > self.capacity:
+            order = np.argsort(-merged_counts, kind="stable")[: self.capacity]
+            keep = np.sort(order)
+            keys = [keys[i] for i in keep]
+            merged_counts = merged_counts[keep]
+            merged_errors = merged_errors[keep]
+            self.truncated = True
+
+        self.counts = {k: int(c) for k, c in zip(keys, merged_counts)}
+        self.errors = {k: int(e) for k, e in zip(keys, merged_errors)}
+        self.total += total
+
+    def update_counts(self, counts: Dict[Any, int]) -> "SpaceSaving":
+        """
+        Soma as contagens exatas de um lote (dict item -> contagem).
+        """
+        if counts:
+            self._combine(counts, {}, 0, sum(counts.values()))
+        return self
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Mescla outro resumo (ex.: de outro shard) neste, in place.
+        """
+        self._combine(other.counts, other.errors, other.max_error, other.total)
+        return self
+
+    def top(self, n: Optional[int] = None) -> List[HeavyHitter]:
+        items = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        if n is not None:
+            items = items[:n]
+        return [HeavyHitter(k, c, self.errors[k]) for k, c in items]
+
+    def report(self, n: int) -> Tuple[Dict[Any, int], Dict[str, Any]]:
+        """
+        Retorna (contagens do top N, informações de erro). O restante fora do
+        top N vai em `info["other"]`, e não nas contagens, para não colidir
+        com um item real de mesmo nome.
+        """
+        top = self.top(n)
+        counts = {h.item: h.count for h in top}
+
+        info = {
+            "top_k": n,
+            "capacity": self.capacity,
+            "exact": not self.truncated,
+            "max_error": self.max_error,
+            "other": max(self.total - sum(counts.values()), 0),
+            "errors": {h.item: h.error for h in top if h.error},
+        }
+        return counts, info
+
+    # ---------- serialização ----------
+
+    def to_bytes(self) -> bytes:
+        vocab = json.dumps(list(self.counts), ensure_ascii=False).encode("utf-8")
+        return b"".join(
+            [
+                _HEADER.pack(self.capacity, self.total, self.truncated, len(vocab)),
+                vocab,
+                np.fromiter(self.counts.values(), dtype=_COUNT_DTYPE).tobytes(),
+                np.fromiter(self.errors.values(), dtype=_COUNT_DTYPE).tobytes(),
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes, offset: int = 0) -> Tuple["SpaceSaving", int]:
+        """
+        Lê um resumo a partir de `offset`; devolve (resumo, próximo offset).
+        """
+        capacity, total, truncated, vocab_len = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        vocab = json.loads(data[offset : offset + vocab_len].decode("utf-8"))
+        offset += vocab_len
+
+        counts = np.frombuffer(data, _COUNT_DTYPE, count=len(vocab), offset=offset)
+        offset += counts.nbytes
+        errors = np.frombuffer(data, _COUNT_DTYPE, count=len(vocab), offset=offset)
+        offset += errors.nbytes
+
+        hh = cls(capacity)
+        hh.total = total
+        hh.truncated = bool(truncated)
+        hh.counts = {k: int(c) for k, c in zip(vocab, counts)}
+        hh.errors = {k: int(e) for k, e in zip(vocab, errors)}
+        return hh, offset
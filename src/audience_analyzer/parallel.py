@@ -0,0 +1,185 @@
+# src/audience_analyzer/parallel.py
+"""
+Análise de público em paralelo (multi-processo).
+
+Públicos muito grandes são divididos em shards contíguos; cada shard vira
+um AudienceSketch (ou um lote de colunas) num processo do pool e o processo
+pai mescla os resultados na ordem original (o que preserva a ordem de
+primeira aparição das chaves).
+
+O pool é único e de vida longa: criado na subida da API (start_audience_pool)
+ou no primeiro uso, e encerrado no shutdown. Pedir outro número de processos
+troca o pool (o anterior termina o que já recebeu). Os processos nascem por
+`forkserver` (ou `spawn`, onde não houver), nunca por `fork` do processo da
+API: ele tem o threadpool do FastAPI e a thread do agendador, e um fork com
+um lock preso por outra thread pode travar o filho. Os shards são enviados
+aos workers serializados, e análises de requisições diferentes dividem o
+mesmo pool sem serializar umas às outras.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.audience_analyzer.age_schemes import DEFAULT_SCHEME_ID
+from src.audience_analyzer.columnar import (
+    AudienceColumns,
+    columns_from_users,
+    concat_columns,
+)
+from src.audience_analyzer.sketch import AudienceSketch
+from src.core.config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+# Só protege a criação/troca do pool (as submissões não passam por aqui)
+_pool_lock = threading.Lock()
+
+
+def parallel_workers() -> int:
+    """
+    Número de processos configurado (0 = um por núcleo).
+    """
+    return settings.AUDIENCE_PARALLEL_WORKERS or os.cpu_count() or 1
+
+
+def should_parallelize(total_users: int) -> bool:
+    return (
+        settings.AUDIENCE_PARALLEL_MIN_USERS > 0
+        and total_users >= settings.AUDIENCE_PARALLEL_MIN_USERS
+        and parallel_workers() > 1
+    )
+
+
+def start_audience_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Pool de processos compartilhado com `workers` processos (padrão:
+    parallel_workers()). Chamadas com o mesmo tamanho devolvem o mesmo pool;
+    outro tamanho cria um novo e encerra o anterior sem esperar.
+    """
+    global _pool, _pool_size
+    workers = workers or parallel_workers()
+    with _pool_lock:
+        previous = None
+        if _pool is not None and _pool_size != workers:
+            previous, _pool = _pool, None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(_START_METHOD),
+            )
+            _pool_size = workers
+        pool = _pool
+    if previous is not None:
+        previous.shutdown(wait=False)
+    return pool
+
+
+def stop_audience_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    # Pool quebrado (worker morto): o próximo uso cria outro
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _sketch_shard(
+    users: Sequence[Dict[str, Any]],
+    top_k: Optional[int],
+    top_k_fields: Tuple[str, ...],
+    age_scheme: str,
+) -> bytes:
+    # Volta em bytes: bem mais barato de serializar entre processos
+    sketch = AudienceSketch(
+        top_k=top_k, top_k_fields=top_k_fields, age_scheme=age_scheme
+    )
+    return sketch.add_batch(users).to_bytes()
+
+
+def _run_shards(
+    task: Callable,
+    users: Sequence[Dict[str, Any]],
+    workers: int,
+    shards: Optional[int],
+    *args: Any,
+) -> List[Any]:
+    """
+    Executa `task(shard, *args)` para cada shard contíguo do público no pool
+    compartilhado e devolve os resultados na ordem dos shards.
+    """
+    shards = shards or workers
+    shard_size = max(math.ceil(len(users) / shards), 1)
+    chunks = [users[i : i + shard_size] for i in range(0, len(users), shard_size)]
+
+    logger.info(
+        f"Processando {len(users)} usuários em {len(chunks)} shards "
+        f"(pool de processos, {_START_METHOD})"
+    )
+
+    pool = start_audience_pool(workers)
+    try:
+        return list(pool.map(task, chunks, *(repeat(arg) for arg in args)))
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+def sketch_users_parallel(
+    users: Sequence[Dict[str, Any]],
+    top_k: Optional[int] = None,
+    top_k_fields: Tuple[str, ...] = ("region",),
+    workers: Optional[int] = None,
+    shards: Optional[int] = None,
+    age_scheme: Optional[str] = None,
+) -> AudienceSketch:
+    """
+    Calcula o AudienceSketch do público (no esquema de faixas `age_scheme`)
+    dividindo-o em `shards` (padrão: um por processo) processados no pool.
+    """
+    workers = workers or parallel_workers()
+    age_scheme = age_scheme or DEFAULT_SCHEME_ID
+    parts = _run_shards(
+        _sketch_shard, users, workers, shards, top_k, top_k_fields, age_scheme
+    )
+
+    merged = AudienceSketch(
+        top_k=top_k, top_k_fields=top_k_fields, age_scheme=age_scheme
+    )
+    for data in parts:
+        merged.merge(AudienceSketch.from_bytes(data))
+
+    return merged
+
+
+def columns_from_users_parallel(
+    users: Sequence[Dict[str, Any]],
+    workers: Optional[int] = None,
+    shards: Optional[int] = None,
+) -> AudienceColumns:
+    """
+    Converte o público em colunas em paralelo: cada processo codifica o seu
+    shard e o pai concatena, unificando os vocabulários (vetorizado).
+    """
+    workers = workers or parallel_workers()
+    return concat_columns(_run_shards(columns_from_users, users, workers, shards))
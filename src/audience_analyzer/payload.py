@@ -0,0 +1,144 @@
+# src/audience_analyzer/payload.py
+"""
+Parser do público recebido no corpo JSON das requisições.
+
+Em vez de criar um modelo Pydantic por usuário (e logo depois convertê-lo de
+volta em dict), o público é lido direto em colunas. A validação é feita por
+coluna: se todas as idades são int e todos os gêneros/regiões são str, as
+colunas são codificadas sem nenhum objeto intermediário.
+
+Qualquer coisa fora desse caminho rápido (campo faltando, tipo que o Pydantic
+aceitaria convertendo, ex. "28", ou valor inválido) cai na validação completa
+do Pydantic, o que mantém exatamente os mesmos erros 422 de antes.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+
+from src.audience_analyzer.columnar import (
+    AudienceColumns,
+    _encode,
+    columns_from_breakdown,
+    columns_from_users,
+)
+from src.audience_analyzer.parallel import (
+    columns_from_users_parallel,
+    should_parallelize,
+)
+from src.audience_analyzer.sampling import sample_indices
+from src.schemas.content_strategy import AudienceBreakdownRow, AudienceUser
+
+_USERS_ADAPTER = TypeAdapter(List[AudienceUser])
+_BREAKDOWN_ADAPTER = TypeAdapter(List[AudienceBreakdownRow])
+
+_INT64 = np.iinfo(np.int64)
+
+
+class InvalidAudiencePayload(ValueError):
+    """
+    Público inválido. `errors` segue o formato do Pydantic com `loc` já
+    prefixado (ex.: ("body", "users", 3, "age")), pronto para um 422.
+    """
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        self.errors = errors
+        super().__init__("Público inválido")
+
+
+def _only(values: List[Any], expected: type) -> bool:
+    # Checagem por coluna (map/set rodam em C); bool não passa como int
+    return set(map(type, values)) <= {expected}
+
+
+def _validate(adapter: TypeAdapter, raw: Any, loc: Tuple[Any, ...]) -> List[Any]:
+    try:
+        return adapter.validate_python(raw)
+    except ValidationError as e:
+        errors = e.errors(include_url=False)
+        for error in errors:
+            error["loc"] = (*loc, *error["loc"])
+        raise InvalidAudiencePayload(errors)
+
+
+def audience_columns_from_payload(
+    raw: Any,
+    loc: Tuple[Any, ...] = ("body", "users"),
+    sample: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> AudienceColumns:
+    """
+    Valida o público (lista de dicts vinda do JSON) e devolve as colunas.
+
+    Com `sample`, só uma amostra aleatória de até `sample` usuários vira
+    colunas, mas o público inteiro é validado antes (a checagem de tipos
+    por coluna é barata): o 422 não depende de quem caiu na amostra.
+    """
+    if raw is None:
+        raw = []
+
+    try:
+        ages = [user["age"] for user in raw]
+        genders = [user["gender"] for user in raw]
+        regions = [user["region"] for user in raw]
+        fast = (
+            isinstance(raw, list)
+            and _only(ages, int)
+            and _only(genders, str)
+            and _only(regions, str)
+        )
+    except (KeyError, TypeError):
+        fast = False
+
+    if not fast:
+        users = [user.model_dump() for user in _validate(_USERS_ADAPTER, raw, loc)]
+        if sample and len(users) > sample:
+            users = [users[i] for i in sample_indices(len(users), sample, seed)]
+        return columns_from_users(users)
+
+    if sample and len(raw) > sample:
+        positions = sample_indices(len(raw), sample, seed).tolist()
+        raw = [raw[i] for i in positions]
+        ages = [ages[i] for i in positions]
+        genders = [genders[i] for i in positions]
+        regions = [regions[i] for i in positions]
+
+    if should_parallelize(len(raw)):
+        return columns_from_users_parallel(raw)
+
+    n = len(raw)
+    try:
+        age_column = np.fromiter(ages, dtype=np.int64, count=n)
+    except OverflowError:
+        # Idades absurdas (fora do int64) são válidas para o Pydantic
+        age_column = np.fromiter(
+            (min(max(age, _INT64.min), _INT64.max) for age in ages),
+            dtype=np.int64,
+            count=n,
+        )
+
+    gender_codes, gender_vocab = _encode(genders)
+    region_codes, region_vocab = _encode(regions)
+
+    return AudienceColumns(
+        ages=age_column,
+        age_valid=np.ones(n, dtype=bool),
+        gender_codes=gender_codes,
+        genders=gender_vocab,
+        region_codes=region_codes,
+        regions=region_vocab,
+    )
+
+
+def audience_columns_from_breakdown(
+    raw: Any,
+    loc: Tuple[Any, ...] = ("body", "audience_breakdown"),
+) -> AudienceColumns:
+    """
+    Valida o público agregado (linhas com `count`) e devolve as colunas com
+    peso. As linhas são poucas (uma por combinação do breakdown), então
+    aqui não há caminho rápido: cada linha passa pelo Pydantic.
+    """
+    rows = _validate(_BREAKDOWN_ADAPTER, raw or [], loc)
+    return columns_from_breakdown([row.model_dump() for row in rows])
@@ -0,0 +1,240 @@
+# src/audience_analyzer/regions.py
+"""
+Hierarquia de regiões (cidade -> estado -> macrorregião -> país).
+
+As regiões chegam em granularidades e grafias diferentes ("SP", "sao paulo",
+"São Paulo, SP", "Sudeste", "Brazil"). A hierarquia é lida uma única vez de
+um JSON (data/regions_br.json) e compilada em:
+
+- um mapa de aliases normalizados -> nó (O(1) por grafia); siglas ("SP",
+  "TO", "BRA") só valem como o valor inteiro, para não casar com texto livre;
+- ponteiros para o pai e, por nível, o ancestral de cada nó (roll-up O(1)).
+
+A resolução acontece sobre o vocabulário de regiões (valores distintos), não
+por usuário: os códigos das colunas são só remapeados com uma indexação.
+Regiões desconhecidas mantêm o rótulo original em todos os níveis.
+
+A contagem só troca os rótulos do público pelos da hierarquia quando um
+nível é pedido (region_level); sem ele, by_region mantém os rótulos brutos.
+"""
+
+import json
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.config import settings
+
+DEFAULT_HIERARCHY_PATH = Path(__file__).parent / "data" / "regions_br.json"
+
+# Do mais fino ao mais agregado
+REGION_LEVELS = ("city", "state", "macro_region", "country")
+RegionLevel = Literal["city", "state", "macro_region", "country"]
+
+# Grafias já resolvidas guardadas por hierarquia (o vocabulário vem do
+# usuário, então a memória é limitada)
+_MEMO_LIMIT = 100_000
+
+_PARENTHESES = re.compile(r"\([^)]*\)")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+# Siglas (UF, país): não entram no mapa de grafias normalizadas
+_CODE_ALIAS = re.compile(r"^[A-Z]{2,3}$")
+# Prefixos/sufixos genéricos ("Estado de São Paulo", "Região Sul", "Bahia State")
+_GENERIC = re.compile(r"^(?:estado d[aeo]s? |regiao |state of )|(?: state| region)$")
+
+
+class UnknownRegionLevel(ValueError):
+    pass
+
+
+def normalize_region(name: str) -> str:
+    """
+    Chave de comparação: sem acentos, parênteses, pontuação e maiúsculas.
+    """
+    text = unicodedata.normalize("NFKD", _PARENTHESES.sub(" ", name))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = _NON_WORD.sub(" ", text).strip()
+    return _GENERIC.sub("", text).strip()
+
+
+@dataclass
+class RegionHierarchy:
+    ids: List[str]  # id de cada nó no JSON (ex.: "BR-SP")
+    names: List[str]  # rótulo canônico de cada nó
+    levels: np.ndarray  # índice em REGION_LEVELS de cada nó
+    parents: np.ndarray  # nó pai (-1 na raiz)
+    ancestors: np.ndarray  # [nível, nó] -> ancestral no nível (ou o próprio nó)
+    aliases: Dict[str, int]  # grafia normalizada -> nó
+    scoped: Dict[Tuple[str, int], int]  # (grafia, ancestral) -> nó
+    exact: Dict[str, int]  # grafia original (nomes, aliases e siglas) -> nó
+    _memo: Dict[str, Optional[int]] = field(default_factory=dict, repr=False)
+
+    def resolve(self, name: Any) -> Optional[int]:
+        """
+        Nó de uma região (None se desconhecida). "Cidade, Estado[, País]" é
+        resolvido dentro do escopo do restante; cidade desconhecida num
+        estado conhecido fica no estado.
+        """
+        if not isinstance(name, str):
+            return None
+        if name in self._memo:
+            return self._memo[name]
+
+        node = self.exact.get(name.strip())
+        if node is None:
+            node = self.aliases.get(normalize_region(name))
+        if node is None and "," in name:
+            head, rest = name.split(",", 1)
+            scope = self.resolve(rest)
+            if scope is not None:
+                node = self.scoped.get((normalize_region(head), scope), scope)
+
+        if len(self._memo) < _MEMO_LIMIT:
+            self._memo[name] = node
+        return node
+
+    def label(self, name: Any, level: Optional[str] = None) -> Any:
+        """
+        Rótulo canônico da região, opcionalmente no nível pedido. Regiões
+        mais agregadas que o nível ficam no próprio nó.
+        """
+        node = self.resolve(name)
+        if node is None:
+            return name
+        if level is not None:
+            node = int(self.ancestors[level_index(level), node])
+        return self.names[node]
+
+    def level_of(self, name: Any) -> Optional[str]:
+        node = self.resolve(name)
+        return None if node is None else REGION_LEVELS[int(self.levels[node])]
+
+
+def level_index(level: str) -> int:
+    try:
+        return REGION_LEVELS.index(level)
+    except ValueError:
+        raise UnknownRegionLevel(f"Nível de região desconhecido: {level}")
+
+
+def compile_region_hierarchy(nodes: Sequence[Dict[str, Any]]) -> RegionHierarchy:
+    """
+    Compila a lista de nós ({id, name, level, parent?, aliases?}) nas
+    tabelas de consulta. Os pais precisam existir; em grafias ambíguas
+    ("São Paulo" estado x cidade) vence o nível mais agregado.
+    """
+    ids = {node["id"]: i for i, node in enumerate(nodes)}
+    if len(ids) != len(nodes):
+        raise ValueError("Hierarquia de regiões com ids repetidos.")
+
+    n = len(nodes)
+    levels = np.array([level_index(node["level"]) for node in nodes], dtype=np.int8)
+    parents = np.full(n, -1, dtype=np.int32)
+    for i, node in enumerate(nodes):
+        if node.get("parent") is not None:
+            parent = ids.get(node["parent"])
+            if parent is None or levels[parent] <= levels[i]:
+                raise ValueError(f"Pai inválido para a região {node['id']}.")
+            parents[i] = parent
+
+    # ancestors[l, i]: sobe pelos pais até o primeiro nó de nível >= l
+    ancestors = np.tile(np.arange(n, dtype=np.int32), (len(REGION_LEVELS), 1))
+    for level in range(len(REGION_LEVELS)):
+        row = ancestors[level]
+        for _ in range(len(REGION_LEVELS)):
+            climb = (levels[row] < level) & (parents[row] >= 0)
+            if not climb.any():
+                break
+            row[climb] = parents[row[climb]]
+
+    aliases: Dict[str, int] = {}
+    scoped: Dict[Tuple[str, int], int] = {}
+    exact: Dict[str, int] = {}
+    # Níveis mais agregados primeiro: ganham as grafias ambíguas
+    for i in sorted(range(n), key=lambda i: -int(levels[i])):
+        for spelling in (nodes[i]["name"], *nodes[i].get("aliases", ())):
+            exact.setdefault(spelling, i)
+            if _CODE_ALIAS.match(spelling):
+                continue
+            key = normalize_region(spelling)
+            aliases.setdefault(key, i)
+            ancestor = int(parents[i])
+            while ancestor >= 0:
+                scoped.setdefault((key, ancestor), i)
+                ancestor = int(parents[ancestor])
+
+    return RegionHierarchy(
+        ids=[node["id"] for node in nodes],
+        names=[node["name"] for node in nodes],
+        levels=levels,
+        parents=parents,
+        ancestors=ancestors,
+        aliases=aliases,
+        scoped=scoped,
+        exact=exact,
+    )
+
+
+@lru_cache(maxsize=None)
+def _load_hierarchy(path: str) -> RegionHierarchy:
+    with open(path, encoding="utf-8") as f:
+        return compile_region_hierarchy(json.load(f)["nodes"])
+
+
+def get_region_hierarchy(path: Optional[str] = None) -> RegionHierarchy:
+    """
+    Hierarquia compilada (carregada uma vez por caminho). Sem caminho, usa
+    AUDIENCE_REGION_HIERARCHY ou a hierarquia do Brasil embutida.
+    """
+    return _load_hierarchy(
+        str(path or settings.AUDIENCE_REGION_HIERARCHY or DEFAULT_HIERARCHY_PATH)
+    )
+
+
+def region_codes_at_level(
+    codes: np.ndarray,
+    vocab: Sequence[Any],
+    level: Optional[str] = None,
+    hierarchy: Optional[RegionHierarchy] = None,
+) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Remapeia códigos dictionary-encoded para os rótulos canônicos (ou do
+    nível pedido). Grafias que viram o mesmo rótulo passam a ter o mesmo
+    código; a ordem de primeira aparição do vocabulário é mantida.
+    """
+    hierarchy = hierarchy or get_region_hierarchy()
+    if level is not None:
+        level_index(level)
+    index: Dict[Any, int] = {}
+    remap = np.fromiter(
+        (index.setdefault(hierarchy.label(v, level), len(index)) for v in vocab),
+        dtype=np.int32,
+        count=len(vocab),
+    )
+    if len(index) == len(vocab) and list(index) == list(vocab):
+        return codes, list(vocab)
+    return remap[codes], list(index)
+
+
+def rollup_region_counts(
+    counts: Dict[Any, int],
+    level: Optional[str] = None,
+    hierarchy: Optional[RegionHierarchy] = None,
+) -> Dict[Any, int]:
+    """
+    Soma contagens por região (ex.: summary["by_region"]) no nível pedido,
+    sem reprocessar o público. Chaves fora da hierarquia são mantidas.
+    """
+    hierarchy = hierarchy or get_region_hierarchy()
+    if level is not None:
+        level_index(level)
+    rolled: Dict[Any, int] = {}
+    for region, count in counts.items():
+        label = hierarchy.label(region, level)
+        rolled[label] = rolled.get(label, 0) + count
+    return rolled
@@ -0,0 +1,74 @@
+# src/audience_analyzer/sampling.py
+"""
+Análise de público por amostragem (modo interativo).
+
+Uma amostra aleatória simples (sem reposição) de tamanho fixo é sorteada do
+público; as distribuições são calculadas sobre ela e cada percentual vem com
+um intervalo de confiança de Wilson. O custo passa a depender do tamanho da
+amostra, não do público.
+"""
+
+import math
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# z para 95% de confiança
+DEFAULT_Z = 1.959964
+DEFAULT_CONFIDENCE = 0.95
+
+_DISTRIBUTIONS = ("by_gender", "by_region", "by_age_bucket")
+
+
+def sample_indices(
+    population: int, size: int, seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Posições (ordenadas) de uma amostra sem reposição. Para amostras pequenas
+    frente ao público, o custo é O(size).
+    """
+    if size >= population:
+        return np.arange(population)
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(population, size=size, replace=False))
+
+
+def wilson_interval(count: int, n: int, z: float = DEFAULT_Z) -> Tuple[float, float]:
+    """
+    Intervalo de Wilson para a proporção count / n (em 0..1).
+    """
+    if n <= 0:
+        return 0.0, 0.0
+    p = count / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(center - half, 0.0), min(center + half, 1.0)
+
+
+def sampling_report(
+    summary: Dict[str, Any], population: int, z: float = DEFAULT_Z
+) -> Dict[str, Any]:
+    """
+    Percentual + intervalo de confiança (em %) de cada valor das
+    distribuições de um resumo calculado sobre a amostra.
+    """
+    n = summary["total_users"]
+    intervals: Dict[str, Dict[Any, Dict[str, float]]] = {}
+
+    for field in _DISTRIBUTIONS:
+        intervals[field] = {}
+        for key, count in summary.get(field, {}).items():
+            low, high = wilson_interval(count, n, z)
+            intervals[field][key] = {
+                "percent": round(count / n * 100, 2) if n else 0.0,
+                "low": round(low * 100, 2),
+                "high": round(high * 100, 2),
+            }
+
+    return {
+        "sample_size": n,
+        "population": population,
+        "confidence": DEFAULT_CONFIDENCE if z == DEFAULT_Z else None,
+        "intervals": intervals,
+    }
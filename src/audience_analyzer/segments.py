@@ -0,0 +1,303 @@
+# src/audience_analyzer/segments.py
+"""
+Segmentação do público em personas (mini-batch k-means em NumPy).
+
+Cada usuário vira um vetor [idade / AGE_SCALE | one-hot do gênero | one-hot
+da região], montado lote a lote a partir das colunas: a matriz densa
+usuários × atributos nunca existe inteira, então a memória depende do
+tamanho do lote e não do público.
+
+O treino segue o mini-batch k-means (Sculley, 2010): a cada iteração um
+lote aleatório é atribuído ao centróide mais próximo e cada centróide anda
+na direção da média do lote com taxa 1 / (pontos já vistos). Uma passada
+final pelas colunas (também em lotes) atribui todo o público e calcula a
+participação, a composição e o centróide (média dos atribuídos) de cada
+persona. Com o mesmo `seed`, o resultado é sempre o mesmo.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.audience_analyzer.age_schemes import MAX_AGE, AgeScheme, get_age_scheme
+from src.audience_analyzer.columnar import AudienceColumns, fit_age_ranges
+
+# 1 unidade de distância = AGE_SCALE anos (one-hot de gênero/região vale até √2)
+AGE_SCALE = 15.0
+
+# Categorias com coluna própria; as demais dividem uma coluna "outros"
+MAX_GENDER_FEATURES = 8
+MAX_REGION_FEATURES = 20
+
+MAX_SEGMENTS = 12
+DEFAULT_BATCH_SIZE = 4096
+DEFAULT_MAX_ITER = 100
+# Passada final (atribuição de todo o público) em blocos deste tamanho
+ASSIGN_CHUNK = 65_536
+
+# Categorias listadas por persona
+TOP_CATEGORIES = 3
+
+OTHER_LABEL = "outros"
+
+
+def _feature_columns(
+    codes: np.ndarray, n_values: int, weights: Optional[np.ndarray], limit: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Coluna de atributo de cada código: as `limit` categorias mais frequentes
+    têm coluna própria, as demais caem na última ("outros").
+    Devolve (coluna por código, códigos com coluna própria).
+    """
+    counts = np.bincount(codes, weights=weights, minlength=n_values)
+    if n_values <= limit:
+        return np.arange(n_values), np.arange(n_values)
+
+    top = np.argsort(-counts, kind="stable")[: limit - 1]
+    column = np.full(n_values, limit - 1)
+    column[top] = np.arange(top.size)
+    return column, top
+
+
+class _Encoder:
+    """
+    Monta os vetores de atributos de um conjunto de linhas das colunas.
+    """
+
+    def __init__(
+        self, columns: AudienceColumns, region_codes: np.ndarray, n_regions: int
+    ):
+        weights = columns.weights
+        self.columns = columns
+        self.region_codes = region_codes
+        self.gender_column, self.gender_top = _feature_columns(
+            columns.gender_codes, len(columns.genders), weights, MAX_GENDER_FEATURES
+        )
+        self.region_column, self.region_top = _feature_columns(
+            region_codes, n_regions, weights, MAX_REGION_FEATURES
+        )
+        self.n_genders = int(self.gender_column.max(initial=-1)) + 1
+        self.n_regions = int(self.region_column.max(initial=-1)) + 1
+        self.dims = 1 + self.n_genders + self.n_regions
+
+        valid = columns.age_valid
+        ages = np.clip(columns.ages[valid], 0, MAX_AGE)
+        age_weights = weights[valid] if weights is not None else None
+        # Idade ausente = idade média (não puxa nenhum centróide)
+        self.age_fill = float(np.average(ages, weights=age_weights)) if ages.size else 0
+
+    def ages(self, rows: np.ndarray) -> np.ndarray:
+        ages = np.clip(self.columns.ages[rows], 0, MAX_AGE).astype(np.float64)
+        return np.where(self.columns.age_valid[rows], ages, self.age_fill)
+
+    def encode(self, rows: np.ndarray) -> np.ndarray:
+        features = np.zeros((rows.size, self.dims))
+        features[:, 0] = self.ages(rows) / AGE_SCALE
+        positions = np.arange(rows.size)
+        features[positions, 1 + self.gender_column[self.columns.gender_codes[rows]]] = 1
+        features[
+            positions,
+            1 + self.n_genders + self.region_column[self.region_codes[rows]],
+        ] = 1
+        return features
+
+
+def _squared_distances(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    return (
+        (points**2).sum(axis=1)[:, None]
+        - 2 * points @ centers.T
+        + (centers**2).sum(axis=1)[None, :]
+    ).clip(min=0)
+
+
+def _kmeans_plus_plus(
+    points: np.ndarray, k: int, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Sementes do k-means++: cada novo centro é sorteado com probabilidade
+    proporcional à distância ao centro mais próximo já escolhido.
+    """
+    centers = [points[rng.integers(points.shape[0])]]
+    closest = _squared_distances(points, centers[0][None, :])[:, 0]
+    for _ in range(1, k):
+        total = closest.sum()
+        if total <= 0:
+            # Todos os pontos já coincidem com algum centro
+            centers.append(points[rng.integers(points.shape[0])])
+            continue
+        chosen = rng.choice(points.shape[0], p=closest / total)
+        centers.append(points[chosen])
+        closest = np.minimum(
+            closest, _squared_distances(points, points[chosen][None, :])[:, 0]
+        )
+    return np.array(centers)
+
+
+def _sample_rows(
+    rng: np.random.Generator, n: int, size: int, p: Optional[np.ndarray]
+) -> np.ndarray:
+    # Com peso (público agregado), linhas são sorteadas pelo nº de usuários
+    if p is None:
+        return rng.integers(n, size=size)
+    return rng.choice(n, size=size, p=p)
+
+
+def segment_columns(
+    columns: AudienceColumns,
+    k: int = 4,
+    seed: int = 0,
+    scheme: Optional[AgeScheme] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_iter: int = DEFAULT_MAX_ITER,
+    tol: float = 1e-4,
+) -> List[Dict[str, Any]]:
+    """
+    Agrupa o público em até `k` personas. Cada persona traz a participação
+    (`percent`, `users`), o centróide (idade e pesos de gênero/região) e a
+    composição real dos usuários atribuídos (faixa, gênero e região
+    dominantes). Ordenadas da maior para a menor.
+    """
+    if not 1 <= k <= MAX_SEGMENTS:
+        raise ValueError(f"k deve estar entre 1 e {MAX_SEGMENTS}.")
+    n = len(columns)
+    if n == 0 or columns.total_users == 0:
+        return []
+
+    scheme = scheme or get_age_scheme()
+    # Faixas que atravessam as do esquema (ex.: "55-64") viram uma linha por
+    # faixa, como no resumo; assim a faixa dominante de cada persona bate
+    columns = fit_age_ranges(columns, scheme)
+    n = len(columns)
+    region_codes, regions = columns.region_codes, columns.regions
+    encoder = _Encoder(columns, region_codes, len(regions))
+    weights = columns.weights
+    p = weights / weights.sum() if weights is not None else None
+    rng = np.random.default_rng(seed)
+
+    # ---------- treino ----------
+    init_rows = _sample_rows(rng, n, min(n, max(10 * k, batch_size)), p)
+    centers = _kmeans_plus_plus(encoder.encode(init_rows), k, rng)
+    seen = np.zeros(k)
+
+    for _ in range(max_iter):
+        batch = encoder.encode(_sample_rows(rng, n, batch_size, p))
+        labels = _squared_distances(batch, centers).argmin(axis=1)
+
+        batch_counts = np.bincount(labels, minlength=k).astype(np.float64)
+        batch_sums = np.zeros_like(centers)
+        np.add.at(batch_sums, labels, batch)
+
+        seen += batch_counts
+        moved = batch_counts > 0
+        step = batch_sums[moved] - batch_counts[moved, None] * centers[moved]
+        previous = centers.copy()
+        centers[moved] += step / seen[moved, None]
+
+        if np.abs(centers - previous).max() < tol:
+            break
+
+    # ---------- atribuição de todo o público ----------
+    n_genders, n_regions = len(columns.genders), len(regions)
+    n_buckets = scheme.n_buckets
+    users = np.zeros(k)
+    age_sum = np.zeros(k)
+    age_users = np.zeros(k)
+    by_bucket = np.zeros(k * n_buckets)
+    by_gender = np.zeros(k * n_genders)
+    by_region = np.zeros(k * n_regions)
+    feature_sums = np.zeros_like(centers)
+
+    for start in range(0, n, ASSIGN_CHUNK):
+        rows = np.arange(start, min(start + ASSIGN_CHUNK, n))
+        features = encoder.encode(rows)
+        labels = _squared_distances(features, centers).argmin(axis=1)
+        w = weights[rows].astype(np.float64) if weights is not None else None
+        ones = w if w is not None else np.ones(rows.size)
+        np.add.at(feature_sums, labels, features * ones[:, None])
+
+        users += np.bincount(labels, weights=ones, minlength=k)
+        valid = columns.age_valid[rows]
+        ages = np.clip(columns.ages[rows], 0, MAX_AGE)
+        age_sum += np.bincount(labels[valid], weights=(ages * ones)[valid], minlength=k)
+        age_users += np.bincount(labels[valid], weights=ones[valid], minlength=k)
+        by_bucket += np.bincount(
+            labels[valid] * n_buckets + scheme.lut[ages[valid]],
+            weights=ones[valid],
+            minlength=k * n_buckets,
+        )
+        by_gender += np.bincount(
+            labels * n_genders + columns.gender_codes[rows],
+            weights=ones,
+            minlength=k * n_genders,
+        )
+        by_region += np.bincount(
+            labels * n_regions + region_codes[rows],
+            weights=ones,
+            minlength=k * n_regions,
+        )
+
+    total = users.sum()
+    by_bucket = by_bucket.reshape(k, n_buckets)
+    by_gender = by_gender.reshape(k, n_genders)
+    by_region = by_region.reshape(k, n_regions)
+
+    gender_labels = _feature_labels(
+        columns.genders, encoder.gender_top, encoder.n_genders
+    )
+    region_labels = _feature_labels(regions, encoder.region_top, encoder.n_regions)
+
+    personas = []
+    for s in np.argsort(-users, kind="stable"):
+        if users[s] == 0:
+            continue
+        # Centróide final = média dos usuários atribuídos (um passo exato)
+        center = feature_sums[s] / users[s]
+        bucket = (
+            scheme.labels[int(by_bucket[s].argmax())] if by_bucket[s].any() else None
+        )
+        personas.append(
+            {
+                "users": int(users[s]),
+                "percent": round(float(users[s] / total) * 100, 1),
+                "age_mean": (
+                    round(float(age_sum[s] / age_users[s]), 1) if age_users[s] else None
+                ),
+                "age_bucket": bucket,
+                "type": scheme.type_of(bucket) if bucket else None,
+                "gender": _top_shares(columns.genders, by_gender[s]),
+                "region": _top_shares(regions, by_region[s]),
+                "centroid": {
+                    "age": round(float(center[0] * AGE_SCALE), 1),
+                    "gender": _centroid_weights(
+                        gender_labels, center[1 : 1 + encoder.n_genders]
+                    ),
+                    "region": _centroid_weights(
+                        region_labels, center[1 + encoder.n_genders :]
+                    ),
+                },
+            }
+        )
+
+    for i, persona in enumerate(personas):
+        persona["segment"] = i
+    return personas
+
+
+def _feature_labels(vocab: List[Any], top: np.ndarray, n_features: int) -> List[Any]:
+    labels = [vocab[int(code)] for code in top]
+    return labels + [OTHER_LABEL] * (n_features - len(labels))
+
+
+def _top_shares(vocab: List[Any], counts: np.ndarray) -> Dict[Any, float]:
+    total = counts.sum()
+    order = np.argsort(-counts, kind="stable")[:TOP_CATEGORIES]
+    return {
+        vocab[int(i)]: round(float(counts[i] / total) * 100, 1)
+        for i in order
+        if counts[i] > 0
+    }
+
+
+def _centroid_weights(labels: List[Any], values: np.ndarray) -> Dict[Any, float]:
+    order = np.argsort(-values, kind="stable")[:TOP_CATEGORIES]
+    return {labels[int(i)]: round(float(values[i]), 3) for i in order if values[i] > 0}
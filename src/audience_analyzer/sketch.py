@@ -0,0 +1,367 @@
+# src/audience_analyzer/sketch.py
+"""
+AudienceSketch: agregado compacto e mesclável do público.
+
+Guarda apenas as contagens por gênero, região e faixa etária (na ordem de
+primeira aparição) e o histograma de idades, o suficiente para reconstruir
+a saída de `analyze_audience` e `profile_audience`. Sketches de lotes, shards ou
+uploads diferentes podem ser somados com `merge()` e persistidos em
+formato binário (`to_bytes()` / `from_bytes()`).
+
+Com `top_k`, os campos de `top_k_fields` (região por padrão) deixam de ter
+contagem exata e passam a usar Space-Saving com memória fixa: o resumo traz
+só o top N; o restante ("other") e os limites de erro vão em
+`summary["approximate"]`.
+"""
+
+import json
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.audience_analyzer.age_schemes import DEFAULT_SCHEME_ID, get_age_scheme
+from src.audience_analyzer.age_stats import (
+    AGE_HISTOGRAM_SIZE,
+    age_stats,
+    empty_age_histogram,
+)
+from src.audience_analyzer.columnar import (
+    AudienceColumns,
+    columns_from_users,
+    count_columns,
+    profiles_from_age_buckets,
+)
+from src.audience_analyzer.heavy_hitters import SpaceSaving
+
+# Formato binário: MAGIC | versão (u8) | total_users (u64) | 3 seções
+# Cada seção: tamanho do vocabulário em JSON (u32) | JSON | contagens (u64 LE)
+# Depois: top_k (u32, 0 = exato) | nº de heavy hitters (u8) | para cada um:
+# tamanho do nome (u8) | nome | SpaceSaving.to_bytes()
+# Depois: tamanho (u8) | id do esquema de faixas etárias
+# Por fim: histograma de idades (AGE_HISTOGRAM_SIZE x u64 LE)
+_MAGIC = b"ASKT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBQ")
+_SECTION = struct.Struct("<I")
+_TOP_K = struct.Struct("<IB")
+_NAME = struct.Struct("<B")
+_COUNT_DTYPE = np.dtype("<u8")
+
+
+def _pack_name(name: str) -> List[bytes]:
+    encoded = name.encode("utf-8")
+    if len(encoded) > 255:
+        raise ValueError(f"Nome longo demais para o formato do sketch: {name!r}")
+    return [_NAME.pack(len(encoded)), encoded]
+
+
+def _unpack_name(data: bytes, offset: int) -> Tuple[str, int]:
+    (size,) = _NAME.unpack_from(data, offset)
+    offset += _NAME.size
+    return data[offset : offset + size].decode("utf-8"), offset + size
+
+
+# Capacidade do Space-Saving = top_k * fator (mais folga => menos erro)
+TOP_K_CAPACITY_FACTOR = 10
+
+# Com heavy hitters, o público é processado em lotes deste tamanho para que
+# o dicionário exato de cada lote também fique limitado.
+TOP_K_BATCH_SIZE = 50_000
+
+_CATEGORICAL_FIELDS = ("gender", "region")
+
+
+def _add_counts(totals: Dict[Any, int], counts: Dict[Any, int]) -> None:
+    for key, count in counts.items():
+        totals[key] = totals.get(key, 0) + count
+
+
+@dataclass
+class AudienceSketch:
+    total_users: int = 0
+    by_gender: Dict[Any, int] = field(default_factory=dict)
+    by_region: Dict[Any, int] = field(default_factory=dict)
+    by_age_bucket: Dict[str, int] = field(default_factory=dict)
+
+    # Modo top-k aproximado (None = contagem exata)
+    top_k: Optional[int] = None
+    top_k_fields: Tuple[str, ...] = ("region",)
+    heavy_hitters: Dict[str, SpaceSaving] = field(default_factory=dict)
+
+    # Esquema de faixas etárias de by_age_bucket (ver age_schemes.py)
+    age_scheme: str = DEFAULT_SCHEME_ID
+
+    # Contagem por idade 0..MAX_AGE (quantis exatos, ver age_stats.py)
+    age_histogram: np.ndarray = field(default_factory=empty_age_histogram)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AudienceSketch):
+            return NotImplemented
+        return (
+            self.total_users == other.total_users
+            and self.by_gender == other.by_gender
+            and self.by_region == other.by_region
+            and self.by_age_bucket == other.by_age_bucket
+            and self.top_k == other.top_k
+            and self.top_k_fields == other.top_k_fields
+            and self.heavy_hitters == other.heavy_hitters
+            and self.age_scheme == other.age_scheme
+            and np.array_equal(self.age_histogram, other.age_histogram)
+        )
+
+    def __post_init__(self) -> None:
+        get_age_scheme(self.age_scheme)  # valida o id
+        if self.top_k is None:
+            return
+        for name in self.top_k_fields:
+            if name not in _CATEGORICAL_FIELDS:
+                raise ValueError(f"Campo sem suporte a top-k: {name}")
+            self.heavy_hitters.setdefault(
+                name, SpaceSaving(self.top_k * TOP_K_CAPACITY_FACTOR)
+            )
+
+    def _exact_counts(self, name: str) -> Dict[Any, int]:
+        return getattr(self, f"by_{name}")
+
+    def _add_categorical(self, name: str, counts: Dict[Any, int]) -> None:
+        hh = self.heavy_hitters.get(name)
+        if hh is not None:
+            hh.update_counts(counts)
+        else:
+            _add_counts(self._exact_counts(name), counts)
+
+    # ---------- construção ----------
+
+    @classmethod
+    def from_users(
+        cls,
+        users: Sequence[Dict[str, Any]],
+        top_k: Optional[int] = None,
+        age_scheme: str = DEFAULT_SCHEME_ID,
+    ) -> "AudienceSketch":
+        return cls(top_k=top_k, age_scheme=age_scheme).add_batch(users)
+
+    @classmethod
+    def from_columns(cls, columns: AudienceColumns) -> "AudienceSketch":
+        return cls().add_columns(columns)
+
+    def add_batch(self, users: Sequence[Dict[str, Any]]) -> "AudienceSketch":
+        """
+        Soma um lote de usuários (dicts) ao sketch.
+        """
+        step = TOP_K_BATCH_SIZE if self.heavy_hitters else max(len(users), 1)
+        for start in range(0, len(users), step):
+            self.add_columns(columns_from_users(users[start : start + step]))
+        return self
+
+    def add_columns(self, columns: AudienceColumns) -> "AudienceSketch":
+        """
+        Soma um lote já em formato colunar ao sketch.
+        """
+        summary, histogram = count_columns(columns, get_age_scheme(self.age_scheme))
+        self.age_histogram = self.age_histogram + histogram
+        self.total_users += summary["total_users"]
+        self._add_categorical("gender", summary["by_gender"])
+        self._add_categorical("region", summary["by_region"])
+        _add_counts(self.by_age_bucket, summary["by_age_bucket"])
+        return self
+
+    def merge(self, other: "AudienceSketch") -> "AudienceSketch":
+        """
+        Mescla outro sketch neste (in place). A operação é associativa, então
+        shards/uploads podem ser combinados em qualquer agrupamento.
+        Só sketches com o mesmo esquema de faixas etárias podem ser somados.
+        """
+        if other.age_scheme != self.age_scheme:
+            if self.total_users or other.total_users:
+                raise ValueError(
+                    f"Esquemas de faixa etária diferentes: "
+                    f"{self.age_scheme} x {other.age_scheme}"
+                )
+            self.age_scheme = other.age_scheme
+
+        self.total_users += other.total_users
+        self.age_histogram = self.age_histogram + other.age_histogram
+        _add_counts(self.by_age_bucket, other.by_age_bucket)
+
+        for name in _CATEGORICAL_FIELDS:
+            other_hh = other.heavy_hitters.get(name)
+            if other_hh is None:
+                self._add_categorical(name, other._exact_counts(name))
+                continue
+
+            hh = self.heavy_hitters.get(name)
+            if hh is None:
+                # Este sketch era exato nesse campo: passa a ser aproximado
+                hh = SpaceSaving(other_hh.capacity)
+                hh.update_counts(self._exact_counts(name))
+                self._exact_counts(name).clear()
+                self.heavy_hitters[name] = hh
+                self.top_k = self.top_k or other.top_k
+            hh.merge(other_hh)
+        return self
+
+    def subtract(self, other: "AudienceSketch") -> "AudienceSketch":
+        """
+        Remove deste sketch (in place) as contagens de outro, ex.: usuários
+        que saíram do público. Só vale para sketches exatos (o Space-Saving
+        não suporta remoção) e nenhuma contagem pode ficar negativa.
+        """
+        if self.heavy_hitters or other.heavy_hitters:
+            raise ValueError("Remoção só é suportada em sketches exatos.")
+        if other.total_users == 0:
+            return self
+        if other.age_scheme != self.age_scheme:
+            raise ValueError(
+                f"Esquemas de faixa etária diferentes: "
+                f"{self.age_scheme} x {other.age_scheme}"
+            )
+
+        pairs = (
+            (self.by_gender, other.by_gender),
+            (self.by_region, other.by_region),
+            (self.by_age_bucket, other.by_age_bucket),
+        )
+        # Valida tudo antes de alterar qualquer contagem
+        if other.total_users > self.total_users or np.any(
+            other.age_histogram > self.age_histogram
+        ):
+            raise ValueError("Remoção maior que o público atual.")
+        for totals, counts in pairs:
+            for key, count in counts.items():
+                if totals.get(key, 0) < count:
+                    raise ValueError(f"Remoção maior que a contagem de {key!r}.")
+
+        self.total_users -= other.total_users
+        self.age_histogram = self.age_histogram - other.age_histogram
+        for totals, counts in pairs:
+            for key, count in counts.items():
+                totals[key] -= count
+                if totals[key] == 0:
+                    del totals[key]
+        return self
+
+    def dominant(self, name: str) -> Any:
+        """
+        Valor mais frequente de um campo categórico (None se vazio).
+        Em modo top-k usa o Space-Saving, com memória fixa.
+        """
+        hh = self.heavy_hitters.get(name)
+        if hh is not None:
+            top = hh.top(1)
+            return top[0].item if top else None
+
+        counts = self._exact_counts(name)
+        return max(counts, key=counts.get) if counts else None
+
+    # ---------- saídas ----------
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Mesmo formato de `analyze_audience`.
+        """
+        summary: Dict[str, Any] = {
+            "total_users": self.total_users,
+            "by_gender": dict(self.by_gender),
+            "by_region": dict(self.by_region),
+            "by_age_bucket": dict(self.by_age_bucket),
+            "age_stats": self.age_stats(),
+        }
+
+        approximate = {}
+        for name, hh in self.heavy_hitters.items():
+            counts, info = hh.report(self.top_k or hh.capacity)
+            summary[f"by_{name}"] = counts
+            # Só expõe os metadados quando algo foi de fato aproximado/cortado
+            if hh.truncated or len(hh.counts) > info["top_k"]:
+                approximate[f"by_{name}"] = info
+
+        if approximate:
+            summary["approximate"] = approximate
+        return summary
+
+    def age_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Média e quantis das idades exatas (linhas do breakdown só com a faixa
+        contam nas faixas, não aqui; `count` diz quantas idades entraram),
+        como em summarize_columns.
+        """
+        return age_stats(self.age_histogram)
+
+    def profiles(self) -> List[Dict[str, Any]]:
+        """
+        Mesmo formato de `profile_audience`.
+        """
+        return profiles_from_age_buckets(
+            self.by_age_bucket, get_age_scheme(self.age_scheme)
+        )
+
+    def result(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        return self.summary(), self.profiles()
+
+    # ---------- serialização ----------
+
+    def to_bytes(self) -> bytes:
+        parts = [_HEADER.pack(_MAGIC, _VERSION, self.total_users)]
+
+        for counts in (self.by_gender, self.by_region, self.by_age_bucket):
+            vocab = json.dumps(list(counts), ensure_ascii=False).encode("utf-8")
+            parts.append(_SECTION.pack(len(vocab)))
+            parts.append(vocab)
+            parts.append(np.fromiter(counts.values(), dtype=_COUNT_DTYPE).tobytes())
+
+        parts.append(_TOP_K.pack(self.top_k or 0, len(self.heavy_hitters)))
+        for name, hh in self.heavy_hitters.items():
+            parts.extend(_pack_name(name))
+            parts.append(hh.to_bytes())
+
+        parts.extend(_pack_name(self.age_scheme))
+        parts.append(self.age_histogram.astype(_COUNT_DTYPE).tobytes())
+
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AudienceSketch":
+        magic, version, total_users = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Formato de AudienceSketch inválido.")
+
+        offset = _HEADER.size
+        sections = []
+        for _ in range(3):
+            (vocab_len,) = _SECTION.unpack_from(data, offset)
+            offset += _SECTION.size
+            vocab = json.loads(data[offset : offset + vocab_len].decode("utf-8"))
+            offset += vocab_len
+            counts = np.frombuffer(
+                data, dtype=_COUNT_DTYPE, count=len(vocab), offset=offset
+            )
+            offset += counts.nbytes
+            sections.append({k: int(c) for k, c in zip(vocab, counts)})
+
+        heavy_hitters: Dict[str, SpaceSaving] = {}
+        top_k, n_heavy = _TOP_K.unpack_from(data, offset)
+        offset += _TOP_K.size
+        for _ in range(n_heavy):
+            name, offset = _unpack_name(data, offset)
+            heavy_hitters[name], offset = SpaceSaving.from_bytes(data, offset)
+
+        age_scheme, offset = _unpack_name(data, offset)
+        histogram = np.frombuffer(
+            data, dtype=_COUNT_DTYPE, count=AGE_HISTOGRAM_SIZE, offset=offset
+        ).astype(np.int64)
+
+        by_gender, by_region, by_age_bucket = sections
+        return cls(
+            total_users=total_users,
+            by_gender=by_gender,
+            by_region=by_region,
+            by_age_bucket=by_age_bucket,
+            top_k=top_k or None,
+            top_k_fields=tuple(heavy_hitters) or cls.top_k_fields,
+            heavy_hitters=heavy_hitters,
+            age_scheme=age_scheme,
+            age_histogram=histogram,
+        )
@@ -0,0 +1,240 @@
+# src/audience_analyzer/storage.py
+"""
+Armazenamento colunar compacto de públicos em disco.
+
+Cada público é salvo uma única vez num arquivo `<audience_id>.aud` dentro de
+AUDIENCE_DATA_DIR; o id é o hash do conteúdo (públicos idênticos viram o mesmo
+arquivo). As análises guardam só o id, em vez de repetir o JSON dos usuários.
+
+Retenção: os arquivos não expiram nem são coletados por este módulo — ficam
+enquanto existirem no disco. Se o diretório for limpo ou não acompanhar o
+banco (ex.: outro servidor), as análises afetadas continuam no histórico,
+só que sem o público (`users = None`).
+
+Layout (little-endian, seções alinhadas em 8 bytes para o np.memmap):
+
+    cabeçalho (64 bytes): MAGIC | versão | n usuários | offset/tamanho do JSON
+    age_valid     bits[n]     (np.packbits: 1 = idade informada)
+    idades        u1/u2/i2/i4/i8[n] (menor tipo que comporta as idades, sem
+                  cortes; idades ausentes ficam 0)
+    gender_codes  u1/u2/u4[n] (menor tipo que comporta o vocabulário)
+    region_codes  u1/u2/u4[n]
+    weights       u8[n]       (só público agregado com peso)
+    age_upper     mesmo esquema das idades (só linhas com faixa etária)
+    JSON          vocabulários + dtypes + seções opcionais presentes
+
+A leitura mapeia o arquivo e devolve as colunas como views do mmap, sem
+nenhum parsing por usuário.
+"""
+
+import hashlib
+import json
+import os
+import re
+import struct
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.audience_analyzer.age_schemes import MAX_AGE
+from src.audience_analyzer.columnar import AudienceColumns
+from src.core.config import settings
+
+_MAGIC = b"AUDC"
+_VERSION = 1
+_HEADER = struct.Struct("<4sB3xQQQ")
+_DATA_OFFSET = 64
+_ALIGN = 8
+_SUFFIX = ".aud"
+
+_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class AudienceNotFound(LookupError):
+    pass
+
+
+def _data_dir(data_dir: Optional[str]) -> Path:
+    return Path(data_dir or settings.AUDIENCE_DATA_DIR)
+
+
+def _audience_path(audience_id: str, data_dir: Optional[str]) -> Path:
+    # O id vira nome de arquivo: só aceitamos o formato gerado aqui
+    if not _ID_PATTERN.match(audience_id):
+        raise ValueError(f"audience_id inválido: {audience_id!r}")
+    return _data_dir(data_dir) / f"{audience_id}{_SUFFIX}"
+
+
+def _code_dtype(vocab_size: int) -> np.dtype:
+    for dtype in ("<u1", "<u2"):
+        if vocab_size <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype("<u4")
+
+
+def _age_dtype(ages: np.ndarray) -> np.dtype:
+    # Menor tipo que guarda as idades exatas (inclusive negativas ou absurdas)
+    if not len(ages):
+        return np.dtype("<u1")
+    low, high = int(ages.min()), int(ages.max())
+    for dtype in ("<u1", "<u2", "<i2", "<i4"):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype("<i8")
+
+
+def _pad(size: int) -> int:
+    return -size % _ALIGN
+
+
+def encode_audience(columns: AudienceColumns) -> bytes:
+    """
+    Serializa as colunas no formato `.aud`.
+    """
+    n = len(columns)
+    ages = np.where(columns.age_valid, columns.ages, 0)
+    age_dtype = _age_dtype(ages)
+    gender_dtype = _code_dtype(len(columns.genders))
+    region_dtype = _code_dtype(len(columns.regions))
+
+    arrays = [
+        (ages, age_dtype),
+        (columns.gender_codes, gender_dtype),
+        (columns.region_codes, region_dtype),
+    ]
+    meta = {
+        "genders": list(columns.genders),
+        "regions": list(columns.regions),
+        "age_dtype": age_dtype.str,
+        "gender_dtype": gender_dtype.str,
+        "region_dtype": region_dtype.str,
+        "weighted": columns.weights is not None,
+        "age_ranges": columns.age_upper is not None,
+    }
+    if columns.weights is not None:
+        arrays.append((columns.weights, np.dtype("<u8")))
+    if columns.age_upper is not None:
+        upper_dtype = _age_dtype(columns.age_upper)
+        meta["age_upper_dtype"] = upper_dtype.str
+        arrays.append((columns.age_upper, upper_dtype))
+
+    sections = [np.packbits(np.asarray(columns.age_valid, dtype=bool)).tobytes()]
+    for values, dtype in arrays:
+        sections.append(b"\0" * _pad(_DATA_OFFSET + sum(map(len, sections))))
+        sections.append(np.asarray(values).astype(dtype).tobytes())
+
+    vocab = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    vocab_offset = _DATA_OFFSET + sum(map(len, sections))
+
+    header = _HEADER.pack(_MAGIC, _VERSION, n, vocab_offset, len(vocab))
+    header += b"\0" * (_DATA_OFFSET - len(header))
+    return b"".join([header, *sections, vocab])
+
+
+def save_audience_columns(
+    columns: AudienceColumns, data_dir: Optional[str] = None
+) -> str:
+    """
+    Grava o público (se ainda não existir) e devolve o seu audience_id.
+    """
+    data = encode_audience(columns)
+    audience_id = hashlib.sha256(data).hexdigest()[:32]
+
+    path = _audience_path(audience_id, data_dir)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escrita atômica: leitores nunca veem um arquivo pela metade
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    return audience_id
+
+
+def _decode_header(buf: np.ndarray) -> Tuple[int, Dict[str, Any]]:
+    magic, version, n, vocab_offset, vocab_len = _HEADER.unpack_from(
+        buf[: _HEADER.size].tobytes()
+    )
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError("Formato de público (.aud) inválido.")
+    vocab = json.loads(buf[vocab_offset : vocab_offset + vocab_len].tobytes())
+    return n, vocab
+
+
+def load_audience_columns(
+    audience_id: str, data_dir: Optional[str] = None
+) -> AudienceColumns:
+    """
+    Mapeia o arquivo do público em memória e devolve as colunas (views
+    somente leitura do mmap).
+    """
+    path = _audience_path(audience_id, data_dir)
+    if not path.exists():
+        raise AudienceNotFound(f"Público {audience_id} não encontrado.")
+
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    n, vocab = _decode_header(buf)
+
+    offset = _DATA_OFFSET
+    n_bits = -(-n // 8)
+    age_valid = np.unpackbits(buf[offset : offset + n_bits], count=n).astype(bool)
+    offset += n_bits
+
+    dtypes = [
+        np.dtype(vocab["age_dtype"]),
+        np.dtype(vocab["gender_dtype"]),
+        np.dtype(vocab["region_dtype"]),
+    ]
+    if vocab["weighted"]:
+        dtypes.append(np.dtype("<u8"))
+    if vocab["age_ranges"]:
+        dtypes.append(np.dtype(vocab["age_upper_dtype"]))
+
+    arrays = []
+    for dtype in dtypes:
+        offset += _pad(offset)
+        arrays.append(buf[offset : offset + n * dtype.itemsize].view(dtype))
+        offset += n * dtype.itemsize
+    extra = iter(arrays[3:])
+
+    return AudienceColumns(
+        ages=arrays[0],
+        age_valid=age_valid,
+        gender_codes=arrays[1],
+        genders=vocab["genders"],
+        region_codes=arrays[2],
+        regions=vocab["regions"],
+        weights=next(extra) if vocab["weighted"] else None,
+        age_upper=next(extra) if vocab["age_ranges"] else None,
+    )
+
+
+def users_from_columns(columns: AudienceColumns) -> List[Dict[str, Any]]:
+    """
+    Reconstrói a lista de usuários (dicts) a partir das colunas. Públicos
+    agregados voltam como as linhas do breakdown (com `count` e, nas linhas
+    sem idade exata, `age_bucket`).
+    """
+    ages = np.asarray(columns.ages, dtype=object)
+    ages[~np.asarray(columns.age_valid, dtype=bool)] = None
+    genders = np.asarray(columns.genders, dtype=object)[columns.gender_codes]
+    regions = np.asarray(columns.regions, dtype=object)[columns.region_codes]
+
+    users = [
+        {"age": age, "gender": gender, "region": region}
+        for age, gender, region in zip(
+            ages.tolist(), genders.tolist(), regions.tolist()
+        )
+    ]
+    if columns.age_upper is not None:
+        for user, high in zip(users, columns.age_upper.tolist()):
+            low = user["age"]
+            if low is not None and high != low:
+                del user["age"]
+                user["age_bucket"] = f"{low}+" if high >= MAX_AGE else f"{low}-{high}"
+    if columns.weights is not None:
+        for user, count in zip(users, columns.weights.tolist()):
+            user["count"] = count
+    return users
@@ -0,0 +1,164 @@
+# src/audience_analyzer/streaming.py
+"""
+Ingestão de público em streaming (NDJSON).
+
+Cada linha do corpo é um usuário (objeto JSON) ou um lote de usuários
+(array JSON). Os registros são validados um a um e acumulados em lotes
+pequenos, que são contados pelo motor colunar e somados a um
+AudienceSketch. A memória fica limitada ao tamanho do lote + número de valores
+distintos de gênero/região, independente do tamanho do público. Linhas
+acima de DEFAULT_MAX_LINE_BYTES são rejeitadas (uma linha sem quebra não
+cresce o buffer sem limite).
+"""
+
+import json
+from typing import Any, AsyncIterable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from src.audience_analyzer.age_schemes import DEFAULT_SCHEME_ID
+from src.audience_analyzer.sketch import AudienceSketch
+from src.schemas.content_strategy import AudienceUser
+
+DEFAULT_BATCH_SIZE = 10_000
+# Cabe um lote (array) de dezenas de milhares de usuários numa linha
+DEFAULT_MAX_LINE_BYTES = 8 * 1024 * 1024
+
+
+class InvalidAudienceRecord(ValueError):
+    """
+    Registro inválido no corpo NDJSON.
+
+    `errors` segue o formato de erros do Pydantic, com `loc` prefixado
+    pelo número da linha (1-based), para virar um 422 igual ao do FastAPI.
+    """
+
+    def __init__(self, line: int, errors: List[Dict[str, Any]]):
+        self.line = line
+        self.errors = errors
+        super().__init__(f"Registro inválido na linha {line}")
+
+
+class AudienceStream:
+    """
+    Acumulador incremental com a mesma saída de `analyze_audience`
+    e `profile_audience`. Os lotes são somados num AudienceSketch.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        top_k: Optional[int] = None,
+        age_scheme: str = DEFAULT_SCHEME_ID,
+    ):
+        self.batch_size = batch_size
+        self.sketch = AudienceSketch(top_k=top_k, age_scheme=age_scheme)
+        self._buffer: List[Dict[str, Any]] = []
+
+    @property
+    def total_users(self) -> int:
+        return self.sketch.total_users + len(self._buffer)
+
+    def add(self, user: Dict[str, Any]) -> None:
+        self._buffer.append(user)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self.sketch.add_batch(self._buffer)
+        self._buffer = []
+
+    def result(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Devolve (summary, profiles) no formato de `analyze_and_profile`.
+        """
+        self.flush()
+        return self.sketch.result()
+
+
+def _line_too_long(line_no: int, max_line_bytes: int) -> InvalidAudienceRecord:
+    return InvalidAudienceRecord(
+        line_no,
+        [
+            {
+                "type": "line_too_long",
+                "loc": ("body", line_no),
+                "msg": f"Linha maior que {max_line_bytes} bytes",
+                "input": {},
+            }
+        ],
+    )
+
+
+def _validate_line(line_no: int, raw: bytes) -> List[Dict[str, Any]]:
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        raise InvalidAudienceRecord(
+            line_no,
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", line_no),
+                    "msg": f"JSON decode error: {e}",
+                    "input": {},
+                }
+            ],
+        )
+
+    is_batch = isinstance(data, list)
+    records = data if is_batch else [data]
+    users = []
+    for position, record in enumerate(records):
+        try:
+            users.append(AudienceUser.model_validate(record).model_dump())
+        except ValidationError as e:
+            prefix = ("body", line_no, position) if is_batch else ("body", line_no)
+            raise InvalidAudienceRecord(
+                line_no,
+                [{**err, "loc": prefix + tuple(err["loc"])} for err in e.errors()],
+            )
+    return users
+
+
+async def analyze_ndjson_stream(
+    chunks: AsyncIterable[bytes],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    top_k: Optional[int] = None,
+    age_scheme: str = DEFAULT_SCHEME_ID,
+    max_line_bytes: int = DEFAULT_MAX_LINE_BYTES,
+) -> AudienceStream:
+    """
+    Consome um corpo NDJSON (em pedaços arbitrários) e devolve o acumulador
+    já alimentado. Linhas vazias são ignoradas. Com `top_k`, as regiões são
+    contadas em modo aproximado (Space-Saving). Uma linha com mais de
+    `max_line_bytes` levanta InvalidAudienceRecord.
+    """
+    stream = AudienceStream(batch_size=batch_size, top_k=top_k, age_scheme=age_scheme)
+    pending = bytearray()
+    line_no = 0
+
+    async for chunk in chunks:
+        # Só os bytes novos são varridos atrás de "\n"; o resto da última
+        # linha incompleta fica no início do buffer
+        searched = len(pending)
+        pending += chunk
+        start = 0
+        while (end := pending.find(b"\n", searched)) >= 0:
+            line_no += 1
+            if end - start > max_line_bytes:
+                raise _line_too_long(line_no, max_line_bytes)
+            raw = pending[start:end]
+            if raw.strip():
+                for user in _validate_line(line_no, raw):
+                    stream.add(user)
+            start = searched = end + 1
+        del pending[:start]
+        if len(pending) > max_line_bytes:
+            raise _line_too_long(line_no + 1, max_line_bytes)
+
+    if pending.strip():
+        for user in _validate_line(line_no + 1, pending):
+            stream.add(user)
+
+    return stream
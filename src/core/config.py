@@ -13,6 +13,79 @@ class Settings(BaseModel):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24h
 
+    # Top-N de regiões no resumo de público (Space-Saving com memória fixa,
+    # contagens aproximadas). 0 (padrão) mantém a contagem exata de todas
+    # as regiões.
+    AUDIENCE_REGION_TOP_K: int = int(os.getenv("AUDIENCE_REGION_TOP_K", "0"))
+
+    # Públicos a partir deste tamanho são analisados em paralelo (shards em
+    # processos separados). 0 desativa. WORKERS = 0 usa um processo por núcleo.
+    AUDIENCE_PARALLEL_MIN_USERS: int = int(
+        os.getenv("AUDIENCE_PARALLEL_MIN_USERS", "200000")
+    )
+    AUDIENCE_PARALLEL_WORKERS: int = int(os.getenv("AUDIENCE_PARALLEL_WORKERS", "0"))
+
+    # Diretório dos públicos salvos em formato colunar (.aud)
+    AUDIENCE_DATA_DIR: str = os.getenv("AUDIENCE_DATA_DIR", "./data/audiences")
+
+    # Cache de análises por digest do público (LRU em memória; 0 desativa).
+    # PERSIST = 1 também guarda os resultados no banco SQLModel, mantendo só
+    # as PERSIST_MAX_ROWS linhas mais recentes (0 = sem limite).
+    AUDIENCE_CACHE_SIZE: int = int(os.getenv("AUDIENCE_CACHE_SIZE", "256"))
+    AUDIENCE_CACHE_PERSIST: bool = os.getenv("AUDIENCE_CACHE_PERSIST", "0") == "1"
+    AUDIENCE_CACHE_PERSIST_MAX_ROWS: int = int(
+        os.getenv("AUDIENCE_CACHE_PERSIST_MAX_ROWS", "10000")
+    )
+
+    # JSON da hierarquia de regiões (aliases + pais); vazio usa a do Brasil
+    # embutida em src/audience_analyzer/data/regions_br.json
+    AUDIENCE_REGION_HIERARCHY: str = os.getenv("AUDIENCE_REGION_HIERARCHY", "")
+
+    # Fuso (horas em relação ao UTC) dos mapas de engajamento de postagem
+    # e nº de mapas de projeto mantidos em memória
+    POSTING_UTC_OFFSET_HOURS: float = float(os.getenv("POSTING_UTC_OFFSET_HOURS", "-3"))
+    POSTING_HEATMAP_CACHE_SIZE: int = int(
+        os.getenv("POSTING_HEATMAP_CACHE_SIZE", "128")
+    )
+
+    # JSON das regras de horário (vazio usa data/posting_rules.json) e de
+    # quanto em quanto tempo (s) verificar se o arquivo mudou
+    POSTING_RULES_PATH: str = os.getenv("POSTING_RULES_PATH", "")
+    POSTING_RULES_RELOAD_SECONDS: float = float(
+        os.getenv("POSTING_RULES_RELOAD_SECONDS", "2")
+    )
+
+    # JSON dos modelos de sugestão (vazio usa
+    # src/suggestion_engine/data/suggestion_templates.json) e intervalo (s)
+    # de verificação de mudança
+    SUGGESTION_TEMPLATES_PATH: str = os.getenv("SUGGESTION_TEMPLATES_PATH", "")
+    SUGGESTION_TEMPLATES_RELOAD_SECONDS: float = float(
+        os.getenv("SUGGESTION_TEMPLATES_RELOAD_SECONDS", "2")
+    )
+
+    # Job noturno que recalcula os mapas dos projetos com ig_user_id:
+    # ENABLED = 1 liga o agendamento na subida da API; roda todo dia na
+    # HOUR_UTC, com até WORKERS projetos em paralelo, lendo os posts novos
+    # de cada projeto em páginas de MEDIA_LIMIT (no máximo MAX_PAGES
+    # páginas). Posts com menos de SETTLE_HOURS ficam para a próxima rodada
+    # (métricas ainda crescendo).
+    POSTING_HEATMAP_JOB_ENABLED: bool = (
+        os.getenv("POSTING_HEATMAP_JOB_ENABLED", "0") == "1"
+    )
+    POSTING_HEATMAP_JOB_HOUR_UTC: int = int(
+        os.getenv("POSTING_HEATMAP_JOB_HOUR_UTC", "3")
+    )
+    POSTING_HEATMAP_JOB_WORKERS: int = int(
+        os.getenv("POSTING_HEATMAP_JOB_WORKERS", "4")
+    )
+    POSTING_HEATMAP_MEDIA_LIMIT: int = int(
+        os.getenv("POSTING_HEATMAP_MEDIA_LIMIT", "100")
+    )
+    POSTING_HEATMAP_MAX_PAGES: int = int(os.getenv("POSTING_HEATMAP_MAX_PAGES", "20"))
+    POSTING_HEATMAP_SETTLE_HOURS: float = float(
+        os.getenv("POSTING_HEATMAP_SETTLE_HOURS", "48")
+    )
+
     # (opcional) URL do banco – já está sendo tratada no sqlmodel_db via DB_PATH
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
 
@@ -2,10 +2,15 @@
 
 from typing import Generator
 
+from sqlalchemy import inspect, text
 from sqlmodel import SQLModel, create_engine, Session
 
 from src.models.project import Project  # garante que a tabela exista
 from src.models.analysis import AnalysisHistory  # nosso novo modelo
+from src.models.project_audience import ProjectAudience, ProjectAudienceTotals
+from src.models.audience_cache import AudienceAnalysisCache
+from src.models.project_heatmap import ProjectHeatmap
+from src.models.project_slot_posterior import ProjectSlotPosterior
 
 
 # 👉 Banco específico para os recursos que usarem SQLModel (ex: projetos/análises)
@@ -32,3 +37,25 @@ def init_db_sqlmodel() -> None:
     Inicializa as tabelas do SQLModel.
     """
     SQLModel.metadata.create_all(engine)
+    _add_missing_columns()
+
+
+def _add_missing_columns() -> None:
+    """
+    Migração simples: create_all não altera tabelas existentes, então colunas
+    novas (sempre opcionais) são adicionadas com ALTER TABLE.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table.name} "
+                        f"ADD COLUMN {column.name} {col_type}"
+                    )
+                )
@@ -1,6 +1,7 @@
 # src/integrations/meta_client.py
 
 import os
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 
 import requests
@@ -33,6 +34,12 @@ class MetaClient:
 
         params["access_token"] = self.access_token
         url = f"{GRAPH_BASE_URL}/{path.lstrip('/')}"
+        return self._get_url(url, params)
+
+    def _get_url(
+        self, url: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        # `paging.next` da Graph API já vem com todos os parâmetros (e o token)
         resp = requests.get(url, params=params, timeout=10)
         resp.raise_for_status()
         return resp.json()
@@ -49,20 +56,41 @@ class MetaClient:
         data = self._get(f"{self.ig_business_id}/insights", params)
         return data
 
-    def get_recent_media_insights(self, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_recent_media_insights(
+        self, limit: int = 10, since: Optional[int] = None, max_pages: int = 1
+    ) -> List[Dict[str, Any]]:
         """
         Lista os posts recentes e pega métricas básicas (likes, comments, saves, reach).
+        `since` (unix timestamp) limita aos posts publicados depois dele.
+        `limit` é o tamanho da página; com max_pages > 1 segue `paging.next`
+        (posts do mais novo para o mais antigo) até chegar em `since`, acabar
+        a lista ou ler max_pages páginas.
         """
-        media_data = self._get(
-            f"{self.ig_business_id}/media",
-            params={
-                "fields": "id,caption,media_type,permalink,timestamp",
-                "limit": limit,
-            },
-        )
+        params: Dict[str, Any] = {
+            "fields": "id,caption,media_type,permalink,timestamp",
+            "limit": limit,
+        }
+        if since is not None:
+            params["since"] = since
+        media_data = self._get(f"{self.ig_business_id}/media", params=params)
+
+        items: List[Dict[str, Any]] = []
+        for page in range(max_pages):
+            if page > 0:
+                media_data = self._get_url(next_url)
+            reached_since = False
+            for item in media_data.get("data", []):
+                posted = _timestamp(item.get("timestamp"))
+                if since is not None and posted is not None and posted <= since:
+                    reached_since = True
+                    break
+                items.append(item)
+            next_url = media_data.get("paging", {}).get("next")
+            if reached_since or not next_url:
+                break
 
         results: List[Dict[str, Any]] = []
-        for item in media_data.get("data", []):
+        for item in items:
             media_id = item["id"]
             caption = item.get("caption")
             media_type = item.get("media_type")
@@ -92,3 +120,13 @@ class MetaClient:
             )
 
         return results
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """
+    Timestamp da Graph API ("2024-05-01T12:00:00+0000") em segundos.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z").timestamp()
+    except (TypeError, ValueError):
+        return None
@@ -25,7 +25,25 @@ class AnalysisHistory(SQLModel, table=True):
     platform: str
     mode: str
 
+    # Público salvo em disco (src/audience_analyzer/storage.py). Quando
+    # preenchido, users_json fica vazio ("[]").
+    audience_id: Optional[str] = Field(default=None, index=True)
+
     users_json: str
     result_json: str
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class AnalysisCube(SQLModel, table=True):
+    """
+    Cubo faixa etária × gênero × região de uma análise (AudienceCube.to_bytes()).
+    Opcional: só existe quando a análise foi gerada com build_cube=True.
+    """
+
+    analysis_id: int = Field(primary_key=True)
+    owner_id: int = Field(index=True)
+
+    cube: bytes
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,20 @@
+# src/models/audience_cache.py
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+
+
+class AudienceAnalysisCache(SQLModel, table=True):
+    """
+    Resultado de análise de público já calculado, por digest do público
+    (persistência opcional do cache, ver AUDIENCE_CACHE_PERSIST).
+    """
+
+    digest: str = Field(primary_key=True)
+
+    # AudienceSketch.to_bytes()
+    sketch: bytes
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
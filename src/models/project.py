@@ -23,4 +23,8 @@ class Project(SQLModel, table=True):
     # novo: IG User ID associado a esse projeto (opcional)
     ig_user_id: Optional[str] = Field(default=None, max_length=64)
 
+    # Esquema de faixas etárias das análises (ver audience_analyzer/age_schemes.py);
+    # None = esquema padrão (DEFAULT_SCHEME_ID)
+    age_scheme: Optional[str] = Field(default=None, max_length=64)
+
     created_at: datetime = Field(default_factory=datetime.utcnow)
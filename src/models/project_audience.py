@@ -0,0 +1,44 @@
+# src/models/project_audience.py
+from __future__ import annotations
+
+from typing import Optional
+from datetime import datetime
+
+from sqlmodel import SQLModel, Field
+
+
+class ProjectAudienceTotals(SQLModel, table=True):
+    """
+    Totais de público acumulados por projeto (AudienceSketch serializado).
+    Atualizado a cada análise com público, sem reler o users_json antigo.
+    """
+
+    project_id: int = Field(primary_key=True)
+    owner_id: int = Field(index=True)
+
+    # Quantas análises/uploads já foram somados
+    analyses_count: int = 0
+    total_users: int = 0
+
+    # AudienceSketch.to_bytes()
+    sketch: bytes
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ProjectAudience(SQLModel, table=True):
+    """
+    Público atual do projeto (ex.: seguidores), mantido por deltas de
+    entrada/saída de usuários. AudienceSketch exato serializado.
+    """
+
+    project_id: int = Field(primary_key=True)
+    owner_id: int = Field(index=True)
+
+    total_users: int = 0
+    age_scheme: str
+
+    # AudienceSketch.to_bytes() (sempre exato: remoções exigem contagens exatas)
+    sketch: bytes
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,33 @@
+# src/models/project_heatmap.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+
+
+class ProjectHeatmap(SQLModel, table=True):
+    """
+    Mapa de engajamento dia × hora do projeto, por plataforma
+    (EngagementHeatmap serializado). Reaproveitado nas sugestões de horário
+    sem reprocessar os posts.
+    """
+
+    project_id: int = Field(primary_key=True)
+    platform: str = Field(primary_key=True)
+    owner_id: int = Field(index=True)
+
+    posts_count: int = 0
+    # Fuso (horas em relação ao UTC) usado para montar o mapa
+    utc_offset_hours: float = 0.0
+
+    # Post mais recente já incluído (UTC); o job noturno continua dele
+    last_post_at: Optional[datetime] = None
+
+    # EngagementHeatmap.to_bytes()
+    heatmap: bytes
+    # heatmap_slots() já calculado (JSON; vazio com poucos posts)
+    best_slots: Optional[str] = None
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,30 @@
+# src/models/project_slot_posterior.py
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field
+
+
+class ProjectSlotPosterior(SQLModel, table=True):
+    """
+    Estado da escolha adaptativa de horários do projeto, por plataforma
+    (SlotPosterior serializado). Atualizado a cada lote de posts recebido,
+    sem guardar nem reprocessar o histórico.
+    """
+
+    project_id: int = Field(primary_key=True)
+    platform: str = Field(primary_key=True)
+    owner_id: int = Field(index=True)
+
+    posts_count: int = 0
+    # Fuso (horas em relação ao UTC) das células; fixado no primeiro lote
+    utc_offset_hours: float = 0.0
+    # Post mais recente já incluído (UTC); posts até ele são ignorados
+    last_post_at: Optional[datetime] = None
+
+    # SlotPosterior.to_bytes()
+    state: bytes
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,468 @@
+# src/posting_time_optimizer/heatmap.py
+"""
+Mapa de engajamento dia da semana × hora (7 × 24) a partir dos posts.
+
+Cada post (ex.: itens de MetaClient.get_recent_media_insights) vira uma
+célula (dia, hora) no horário local; soma de engajamento e nº de posts por
+célula saem de um único bincount sobre o índice achatado dia * 24 + hora.
+
+As 168 células formam uma série circular (domingo 23h encosta na segunda
+0h): soma e contagem são suavizadas com o mesmo kernel (np.roll) e o
+engajamento médio da célula é encolhido em direção a zero quando há poucos
+posts nela, então horários sem histórico não passam à frente de horários
+medidos. O mapa guarda só somas e contagens,
+por isso mapas de lotes diferentes podem ser somados com `merge()`.
+"""
+
+import math
+import struct
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DAYS = 7
+HOURS = 24
+CELLS = DAYS * HOURS
+
+DAY_LABELS = ("seg", "ter", "qua", "qui", "sex", "sab", "dom")
+
+# Abaixo disso o mapa não é confiável e valem as heurísticas da plataforma
+MIN_POSTS = 20
+
+# Kernel da suavização circular (hora anterior, própria, seguinte)
+SMOOTHING_KERNEL = (0.25, 0.5, 0.25)
+# Posts "fantasmas" (engajamento 0) somados a cada célula: média com
+# poucos posts vale menos que a mesma média com muitos
+PRIOR_POSTS = 1.0
+
+DEFAULT_WINDOW_HOURS = 2
+DEFAULT_TOP_WINDOWS = 3
+
+# Formato binário: MAGIC | versão (u8) | somas (168 x f64 LE) | posts (168 x u64 LE)
+_MAGIC = b"EHMP"
+_VERSION = 1
+_HEADER = struct.Struct("<4sB")
+_SUM_DTYPE = np.dtype("<f8")
+_POSTS_DTYPE = np.dtype("<u8")
+
+# 1970-01-01 foi quinta-feira (índice 3 com segunda = 0)
+_EPOCH_WEEKDAY = 3
+
+# Instantes aceitos (época em segundos): de 1970 até o fim do ano 9999
+_MAX_EPOCH = 253_402_300_799
+
+_ENGAGEMENT_KEYS = (
+    "likes",
+    "like_count",
+    "comments",
+    "comments_count",
+    "saved",
+    "shares",
+)
+
+
+def _empty_sums() -> np.ndarray:
+    return np.zeros(CELLS, dtype=np.float64)
+
+
+def _empty_posts() -> np.ndarray:
+    return np.zeros(CELLS, dtype=np.int64)
+
+
+@dataclass
+class EngagementHeatmap:
+    # Índice achatado: dia (segunda = 0) * 24 + hora local
+    sums: np.ndarray = field(default_factory=_empty_sums)
+    posts: np.ndarray = field(default_factory=_empty_posts)
+    # heatmap_slots() já calculado (ex.: salvo pelo job noturno); usado no
+    # lugar do cálculo quando os parâmetros são os padrão
+    slots: Optional[Dict[str, Any]] = field(default=None, compare=False, repr=False)
+
+    @property
+    def total_posts(self) -> int:
+        return int(self.posts.sum())
+
+    def merge(self, other: "EngagementHeatmap") -> "EngagementHeatmap":
+        return EngagementHeatmap(
+            sums=self.sums + other.sums, posts=self.posts + other.posts
+        )
+
+    def scores(self) -> np.ndarray:
+        """
+        Matriz 7 × 24 normalizada (1.0 = melhor célula) do engajamento médio
+        por post, suavizado e descontado nas células com poucos posts.
+        """
+        return _normalized(_smoothed_mean(self.sums, self.posts)).reshape(DAYS, HOURS)
+
+    def hourly_scores(self) -> np.ndarray:
+        """
+        Perfil de 24 horas (todos os dias somados), normalizado como `scores`.
+        """
+        sums = self.sums.reshape(DAYS, HOURS).sum(axis=0)
+        posts = self.posts.reshape(DAYS, HOURS).sum(axis=0)
+        return _normalized(_smoothed_mean(sums, posts))
+
+    def top_windows(
+        self,
+        n: int = DEFAULT_TOP_WINDOWS,
+        width: int = DEFAULT_WINDOW_HOURS,
+    ) -> List[Dict[str, Any]]:
+        """
+        As `n` melhores janelas de `width` horas na semana, sem sobreposição
+        ({day, start, end, score}).
+        """
+        return describe_windows(best_windows(self.scores().ravel(), n, width), width)
+
+    def recommended_slots(
+        self,
+        n: int = DEFAULT_TOP_WINDOWS,
+        width: int = DEFAULT_WINDOW_HOURS,
+    ) -> List[str]:
+        """
+        Melhores janelas diárias no formato das heurísticas ("18:00-20:00"),
+        em ordem cronológica.
+        """
+        return slot_labels(best_windows(self.hourly_scores(), n, width), width)
+
+    def to_bytes(self) -> bytes:
+        return (
+            _HEADER.pack(_MAGIC, _VERSION)
+            + self.sums.astype(_SUM_DTYPE).tobytes()
+            + self.posts.astype(_POSTS_DTYPE).tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "EngagementHeatmap":
+        magic, version = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Mapa de engajamento com formato desconhecido.")
+        offset = _HEADER.size
+        sums = np.frombuffer(data, dtype=_SUM_DTYPE, count=CELLS, offset=offset)
+        offset += CELLS * _SUM_DTYPE.itemsize
+        posts = np.frombuffer(data, dtype=_POSTS_DTYPE, count=CELLS, offset=offset)
+        return cls(sums=sums.astype(np.float64), posts=posts.astype(np.int64))
+
+
+def hour_label(hour: int) -> str:
+    # Janela que termina à meia-noite sai como "24:00"
+    return f"{hour % HOURS if hour > HOURS else hour:02d}:00"
+
+
+def describe_windows(
+    windows: Sequence[Tuple[int, float]], width: int
+) -> List[Dict[str, Any]]:
+    """
+    Janelas da semana (início em 0..167, score) como {day, start, end, score}.
+    """
+    described = []
+    for start, score in windows:
+        day, hour = divmod(start, HOURS)
+        described.append(
+            {
+                "day": DAY_LABELS[day],
+                "start": hour_label(hour),
+                "end": hour_label(hour + width),
+                "score": round(score, 4),
+            }
+        )
+    return described
+
+
+def slot_labels(windows: Sequence[Tuple[int, float]], width: int) -> List[str]:
+    """
+    Janelas diárias (início em 0..23) como "18:00-20:00", em ordem cronológica.
+    """
+    return [
+        f"{hour_label(start)}-{hour_label(start + width)}"
+        for start, _ in sorted(windows)
+    ]
+
+
+def _smooth(values: np.ndarray) -> np.ndarray:
+    """
+    Convolução circular com SMOOTHING_KERNEL ao longo do último eixo (a
+    série dá a volta).
+    """
+    left, center, right = SMOOTHING_KERNEL
+    return (
+        left * np.roll(values, 1, axis=-1)
+        + center * values
+        + right * np.roll(values, -1, axis=-1)
+    )
+
+
+def _smoothed_mean(sums: np.ndarray, posts: np.ndarray) -> np.ndarray:
+    return _smooth(sums) / (_smooth(posts.astype(np.float64)) + PRIOR_POSTS)
+
+
+def _normalized(values: np.ndarray) -> np.ndarray:
+    # Cada linha dividida pelo próprio máximo (linhas sem valor positivo = 0)
+    peak = values.max(axis=-1, keepdims=True, initial=0.0)
+    return np.divide(values, peak, out=np.zeros_like(values), where=peak > 0)
+
+
+def best_windows_batch(
+    scores: np.ndarray, widths: Sequence[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Janelas circulares para várias séries de uma vez (linhas de `scores`):
+    uma por largura, na ordem dada, sempre a de maior média que não
+    sobrepõe as já escolhidas na mesma linha. Devolve (inícios, médias),
+    ambos linhas × len(widths); início -1 quando não coube.
+    """
+    rows, size = scores.shape
+    index = np.arange(rows)
+    starts = np.full((rows, len(widths)), -1, dtype=np.int64)
+    means = np.zeros((rows, len(widths)))
+    cumulative = np.zeros((rows, 2 * size + 1))
+    np.cumsum(np.concatenate([scores, scores], axis=1), axis=1, out=cumulative[:, 1:])
+    taken = np.zeros((rows, size), dtype=bool)
+
+    for k, width in enumerate(widths):
+        width = max(1, min(int(width), size))
+        window_means = (
+            cumulative[:, width : width + size] - cumulative[:, :size]
+        ) / width
+        # Janela [i, i + width) sobrepõe se tiver alguma posição já tomada
+        taken_cum = np.zeros((rows, 2 * size + 1), dtype=np.int64)
+        np.cumsum(np.concatenate([taken, taken], axis=1), axis=1, out=taken_cum[:, 1:])
+        blocked = taken_cum[:, width : width + size] > taken_cum[:, :size]
+        window_means = np.where(blocked, -np.inf, window_means)
+
+        best = window_means.argmax(axis=1)
+        ok = np.isfinite(window_means[index, best])
+        starts[ok, k] = best[ok]
+        means[ok, k] = window_means[index[ok], best[ok]]
+        spans = (best[ok, None] + np.arange(width)) % size
+        taken[index[ok, None], spans] = True
+    return starts, means
+
+
+def best_windows(scores: np.ndarray, n: int, width: int) -> List[Tuple[int, float]]:
+    """
+    Início e média das `n` melhores janelas circulares de `width` posições
+    (escolha gulosa, sem sobreposição).
+    """
+    starts, means = best_windows_batch(np.asarray(scores)[None, :], [width] * n)
+    return [
+        (int(start), float(mean))
+        for start, mean in zip(starts[0], means[0])
+        if start >= 0
+    ]
+
+
+def _number(value: Any) -> Optional[float]:
+    # Métrica numérica, finita e não negativa (bool e texto não contam)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    value = float(value)
+    return value if math.isfinite(value) and value >= 0 else None
+
+
+def epoch_seconds(timestamp: Any) -> Optional[float]:
+    """
+    Instante do post em segundos desde a época (None se não der para ler ou
+    estiver fora de 1970..9999). Horários sem fuso são tratados como UTC,
+    como os da Graph API.
+    """
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return None
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        timestamp = timestamp.timestamp()
+    instant = _number(timestamp)
+    return instant if instant is not None and instant <= _MAX_EPOCH else None
+
+
+def newest_post(media: Iterable[Dict[str, Any]]) -> Optional[float]:
+    """
+    Instante (época em segundos) do post mais recente com data legível.
+    """
+    instants = [epoch_seconds(item.get("timestamp")) for item in media]
+    return max((i for i in instants if i is not None), default=None)
+
+
+def utc_datetime(epoch: Optional[float]) -> Optional[datetime]:
+    """
+    Época em segundos -> datetime UTC sem fuso (como as colunas do banco).
+    """
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None)
+
+
+def post_engagement(metrics: Dict[str, Any], per_reach: bool = True) -> Optional[float]:
+    """
+    Engajamento do post: `engagement` (ou curtidas + comentários + salvos +
+    compartilhamentos) e, com `per_reach`, dividido pelo alcance. None
+    quando as métricas não permitem calcular (ausentes, não numéricas,
+    negativas ou infinitas).
+    """
+    if not isinstance(metrics, dict):
+        return None
+    if metrics.get("engagement") is not None:
+        engagement = _number(metrics["engagement"])
+    else:
+        parts = [
+            metrics[key] for key in _ENGAGEMENT_KEYS if metrics.get(key) is not None
+        ]
+        numbers = [_number(part) for part in parts]
+        if not numbers or None in numbers:
+            return None
+        engagement = sum(numbers)
+    if engagement is None:
+        return None
+
+    if not per_reach:
+        return float(engagement)
+    reach = post_reach(metrics)
+    if reach is None:
+        return None
+    return float(engagement) / reach
+
+
+def post_reach(metrics: Dict[str, Any]) -> Optional[float]:
+    """
+    Alcance do post (ou impressões, na falta dele); None se zero, ausente
+    ou não numérico.
+    """
+    if not isinstance(metrics, dict):
+        return None
+    reach = metrics.get("reach") or metrics.get("impressions")
+    reach = _number(reach)
+    return reach if reach else None
+
+
+def cell_indices(epoch_seconds: np.ndarray, utc_offset_hours: float) -> np.ndarray:
+    """
+    Índice achatado (dia * 24 + hora local) de cada instante.
+    """
+    local = np.floor(epoch_seconds + utc_offset_hours * 3600).astype(np.int64)
+    days, seconds = np.divmod(local, 86_400)
+    weekday = (days + _EPOCH_WEEKDAY) % DAYS
+    return weekday * HOURS + seconds // 3600
+
+
+def build_heatmap(
+    media: Iterable[Dict[str, Any]],
+    utc_offset_hours: float = 0.0,
+    per_reach: bool = True,
+) -> EngagementHeatmap:
+    """
+    Monta o mapa a partir dos posts ({timestamp, metrics}). Posts sem data
+    ou sem métricas utilizáveis são ignorados.
+    """
+    instants: List[float] = []
+    values: List[float] = []
+    for item in media:
+        instant = epoch_seconds(item.get("timestamp"))
+        value = post_engagement(item.get("metrics") or {}, per_reach)
+        if instant is None or value is None:
+            continue
+        instants.append(instant)
+        values.append(value)
+
+    return heatmap_from_arrays(
+        np.asarray(instants, dtype=np.float64),
+        np.asarray(values, dtype=np.float64),
+        utc_offset_hours,
+    )
+
+
+def heatmap_from_arrays(
+    epoch_seconds: np.ndarray,
+    engagement: np.ndarray,
+    utc_offset_hours: float = 0.0,
+) -> EngagementHeatmap:
+    cells = cell_indices(epoch_seconds, utc_offset_hours)
+    return EngagementHeatmap(
+        sums=np.bincount(cells, weights=engagement, minlength=CELLS),
+        posts=np.bincount(cells, minlength=CELLS).astype(np.int64),
+    )
+
+
+def heatmap_slots(
+    heatmap: Optional[EngagementHeatmap],
+    n: int = DEFAULT_TOP_WINDOWS,
+    width: int = DEFAULT_WINDOW_HOURS,
+    min_posts: int = MIN_POSTS,
+) -> Optional[Dict[str, Any]]:
+    """
+    Janelas recomendadas pelo mapa, ou None se houver poucos posts.
+    """
+    return heatmap_slots_batch([heatmap], n, width, min_posts)[0]
+
+
+def heatmap_slots_batch(
+    heatmaps: Sequence[Optional[EngagementHeatmap]],
+    n: int = DEFAULT_TOP_WINDOWS,
+    width: int = DEFAULT_WINDOW_HOURS,
+    min_posts: int = MIN_POSTS,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    `heatmap_slots` de vários mapas: os mapas com posts suficientes são
+    empilhados e suavizados/normalizados/recortados em janelas juntos (os
+    que já trazem `slots` calculados são usados direto).
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(heatmaps)
+    defaults = (n, width, min_posts) == (
+        DEFAULT_TOP_WINDOWS,
+        DEFAULT_WINDOW_HOURS,
+        MIN_POSTS,
+    )
+    dense = []
+    for i, heatmap in enumerate(heatmaps):
+        if heatmap is None or heatmap.total_posts < min_posts:
+            continue
+        if defaults and heatmap.slots is not None:
+            results[i] = heatmap.slots
+        else:
+            dense.append(i)
+    if not dense:
+        return results
+
+    sums = np.vstack([heatmaps[i].sums for i in dense])
+    posts = np.vstack([heatmaps[i].posts for i in dense])
+    weekly = _normalized(_smoothed_mean(sums, posts))
+    hourly = _normalized(
+        _smoothed_mean(
+            sums.reshape(-1, DAYS, HOURS).sum(axis=1),
+            posts.reshape(-1, DAYS, HOURS).sum(axis=1),
+        )
+    )
+    week_starts, week_means = best_windows_batch(weekly, [width] * n)
+    day_starts, day_means = best_windows_batch(hourly, [width] * n)
+
+    for row, i in enumerate(dense):
+        results[i] = {
+            "recommended_slots": slot_labels(
+                _picked(day_starts[row], day_means[row]), width
+            ),
+            "best_windows": describe_windows(
+                _picked(week_starts[row], week_means[row]), width
+            ),
+            "posts": heatmaps[i].total_posts,
+        }
+    return results
+
+
+def _picked(starts: np.ndarray, means: np.ndarray) -> List[Tuple[int, float]]:
+    return [(int(s), float(m)) for s, m in zip(starts, means) if s >= 0]
+
+
+def heatmap_matrix(heatmap: EngagementHeatmap) -> Dict[str, Any]:
+    """
+    Representação JSON do mapa (linhas = dias, colunas = horas).
+    """
+    return {
+        "days": list(DAY_LABELS),
+        "scores": np.round(heatmap.scores(), 4).tolist(),
+        "posts": heatmap.posts.reshape(DAYS, HOURS).tolist(),
+        "total_posts": heatmap.total_posts,
+    }
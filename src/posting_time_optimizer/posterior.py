@@ -0,0 +1,227 @@
+# src/posting_time_optimizer/posterior.py
+"""
+Escolha adaptativa de horários: posterior bayesiana por célula dia × hora.
+
+Cada uma das 168 células (mesmo índice do mapa de engajamento) trata o
+engajamento de um post como Poisson(taxa × alcance). Com a Gamma como
+priori, a posterior da taxa da célula é Gamma(forma, razão) com
+forma = forma0 + Σ engajamento e razão = razão0 + Σ alcance: cada post novo
+é uma soma em duas posições (O(1)) e o histórico bruto nunca é relido.
+O estado guarda só essas somas (e o nº de posts); a priori é aplicada na
+consulta, porque depende das regras da plataforma, que podem mudar:
+
+- média da priori = taxa do projeto (todas as células) × atividade
+  heurística da hora (regras da plataforma/faixa, 1 no pico), então sem
+  posts a escolha fica nas janelas heurísticas e um horário nunca testado
+  não passa à frente de um que já provou engajar acima da média;
+- peso da priori = PRIOR_STRENGTH posts de alcance médio.
+
+As janelas saem de um sorteio de Thompson (uma taxa sorteada da posterior
+de cada célula) ou do UCB (média + UCB_Z desvios): horários pouco testados,
+com incerteza alta, ainda aparecem; os que provaram ser bons ficam.
+"""
+
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.posting_time_optimizer.heatmap import (
+    CELLS,
+    DAYS,
+    DEFAULT_TOP_WINDOWS,
+    DEFAULT_WINDOW_HOURS,
+    HOURS,
+    best_windows,
+    cell_indices,
+    describe_windows,
+    epoch_seconds,
+    post_engagement,
+    post_reach,
+    slot_labels,
+)
+
+METHODS = ("thompson", "ucb")
+
+# Peso da priori, em posts de alcance médio
+PRIOR_STRENGTH = 2.0
+# Sem nenhum post: taxa de engajamento e alcance de referência
+DEFAULT_RATE = 0.03
+DEFAULT_REACH = 1_000.0
+# Desvios-padrão somados à média no UCB
+UCB_Z = 2.0
+
+# Formato binário: MAGIC | versão (u8) | engajamento (168 x f64 LE) |
+# alcance (168 x f64 LE) | posts (168 x u32 LE)
+_MAGIC = b"SPST"
+_VERSION = 1
+_HEADER = struct.Struct("<4sB")
+_SUM_DTYPE = np.dtype("<f8")
+_POSTS_DTYPE = np.dtype("<u4")
+
+
+def _zeros() -> np.ndarray:
+    return np.zeros(CELLS, dtype=np.float64)
+
+
+def _zero_posts() -> np.ndarray:
+    return np.zeros(CELLS, dtype=np.int64)
+
+
+@dataclass
+class SlotPosterior:
+    # Somas por célula (índice achatado dia * 24 + hora local)
+    engagement: np.ndarray = field(default_factory=_zeros)
+    reach: np.ndarray = field(default_factory=_zeros)
+    posts: np.ndarray = field(default_factory=_zero_posts)
+
+    @property
+    def total_posts(self) -> int:
+        return int(self.posts.sum())
+
+    def update(self, cell: int, engagement: float, reach: float) -> None:
+        """
+        Inclui um post (O(1)).
+        """
+        self.engagement[cell] += engagement
+        self.reach[cell] += reach
+        self.posts[cell] += 1
+
+    def update_many(
+        self, cells: np.ndarray, engagement: np.ndarray, reach: np.ndarray
+    ) -> None:
+        self.engagement += np.bincount(cells, weights=engagement, minlength=CELLS)
+        self.reach += np.bincount(cells, weights=reach, minlength=CELLS)
+        self.posts += np.bincount(cells, minlength=CELLS)
+
+    def parameters(self, activity: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (forma, razão) da Gamma de cada célula, com a priori centrada na
+        taxa do projeto × `activity` (168 valores, ex.: scores_from_curve da
+        curva das regras).
+        """
+        total_reach = self.reach.sum()
+        total_posts = self.total_posts
+        rate = self.engagement.sum() / total_reach if total_reach > 0 else 0.0
+        rate = rate or DEFAULT_RATE
+        mean_reach = total_reach / total_posts if total_posts else DEFAULT_REACH
+
+        # Melhor hora das regras = taxa do projeto; as demais, proporcionais
+        activity = np.asarray(activity, dtype=np.float64)
+        peak = activity.max(initial=0.0)
+        relative = activity / peak if peak > 0 else 1.0
+        prior_rate = np.full(CELLS, PRIOR_STRENGTH * mean_reach)
+        prior_shape = rate * relative * prior_rate
+        return prior_shape + self.engagement, prior_rate + self.reach
+
+    def to_bytes(self) -> bytes:
+        return (
+            _HEADER.pack(_MAGIC, _VERSION)
+            + self.engagement.astype(_SUM_DTYPE).tobytes()
+            + self.reach.astype(_SUM_DTYPE).tobytes()
+            + self.posts.astype(_POSTS_DTYPE).tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SlotPosterior":
+        magic, version = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Posterior de horários com formato desconhecido.")
+        offset = _HEADER.size
+        arrays = []
+        for dtype in (_SUM_DTYPE, _SUM_DTYPE, _POSTS_DTYPE):
+            arrays.append(np.frombuffer(data, dtype=dtype, count=CELLS, offset=offset))
+            offset += CELLS * dtype.itemsize
+        engagement, reach, posts = arrays
+        return cls(
+            engagement=engagement.astype(np.float64),
+            reach=reach.astype(np.float64),
+            posts=posts.astype(np.int64),
+        )
+
+
+def ingest_media(
+    posterior: SlotPosterior,
+    media: Iterable[Dict[str, Any]],
+    utc_offset_hours: float = 0.0,
+    since: Optional[float] = None,
+) -> Tuple[int, Optional[float]]:
+    """
+    Soma os posts ({timestamp, metrics}) à posterior. Posts sem data válida
+    ou sem engajamento e alcance numéricos são ignorados, assim como os de até `since`
+    (época em segundos do último post já incluído): reenviar a mesma lista
+    não conta nada duas vezes. Devolve (posts incluídos, época do mais
+    recente incluído).
+    """
+    instants: List[float] = []
+    engagement: List[float] = []
+    reach: List[float] = []
+    for item in media:
+        instant = epoch_seconds(item.get("timestamp"))
+        if instant is None or (since is not None and instant <= since):
+            continue
+        metrics = item.get("metrics") or {}
+        value = post_engagement(metrics, per_reach=False)
+        exposure = post_reach(metrics)
+        if value is None or exposure is None:
+            continue
+        instants.append(instant)
+        # Engajamento acima do alcance (ex.: vários likes por pessoa) satura
+        engagement.append(min(max(value, 0.0), exposure))
+        reach.append(exposure)
+
+    if not instants:
+        return 0, None
+    epochs = np.asarray(instants, dtype=np.float64)
+    posterior.update_many(
+        cell_indices(epochs, utc_offset_hours),
+        np.asarray(engagement, dtype=np.float64),
+        np.asarray(reach, dtype=np.float64),
+    )
+    return len(instants), float(epochs.max())
+
+
+def sample_scores(
+    shape: np.ndarray,
+    rate: np.ndarray,
+    method: str = "thompson",
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Score de cada célula: uma taxa sorteada da posterior (Thompson) ou o
+    limite superior média + UCB_Z desvios (UCB).
+    """
+    if method == "thompson":
+        rng = rng or np.random.default_rng()
+        return rng.gamma(shape, 1.0 / rate)
+    if method == "ucb":
+        return (shape + UCB_Z * np.sqrt(shape)) / rate
+    raise ValueError(f"Método adaptativo inválido: {method}")
+
+
+def adaptive_slots(
+    posterior: SlotPosterior,
+    activity: np.ndarray,
+    method: str = "thompson",
+    rng: Optional[np.random.Generator] = None,
+    n: int = DEFAULT_TOP_WINDOWS,
+    width: int = DEFAULT_WINDOW_HOURS,
+) -> Dict[str, Any]:
+    """
+    Janelas escolhidas pela posterior: as diárias (formato das heurísticas)
+    pela média dos dias e as melhores da semana, como em heatmap_slots.
+    """
+    shape, rate = posterior.parameters(activity)
+    scores = sample_scores(shape, rate, method, rng)
+    peak = scores.max(initial=0.0)
+    if peak > 0:
+        scores = scores / peak
+
+    daily = best_windows(scores.reshape(DAYS, HOURS).mean(axis=0), n, width)
+    return {
+        "recommended_slots": slot_labels(daily, width),
+        "best_windows": describe_windows(best_windows(scores, n, width), width),
+        "posts": posterior.total_posts,
+        "method": method,
+    }
@@ -0,0 +1,234 @@
+# src/posting_time_optimizer/rules.py
+"""
+Regras de horário de postagem lidas de um JSON (data/posting_rules.json ou
+POSTING_RULES_PATH).
+
+O arquivo define, por plataforma (com aliases), as janelas, os pesos de cada
+janela e a nota explicativa; modificadores por faixa etária (multiplicam o
+peso das janelas que começam num intervalo de horas) e os modelos das demais
+notas. A nota de faixa etária vale para qualquer esquema de faixas: o
+trecho {age_trend} sai da primeira tendência cujo `max_age` cobre a faixa
+inteira (ou da tendência sem `max_age`). Na carga tudo é compilado em tabelas de despacho (dict) com os
+resultados prontos por plataforma e por faixa, incluindo a curva de
+atividade usada na mistura de fusos; a consulta é só um acesso a dict.
+
+O arquivo é relido quando muda (mtime, verificado no máximo a cada
+POSTING_RULES_RELOAD_SECONDS). Um arquivo inválido não derruba nada: as
+regras anteriores continuam valendo e o erro vai para o log.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.audience_analyzer.age_schemes import parse_age_range
+from src.core.config import settings
+from src.posting_time_optimizer.timezones import activity_curve, parse_slot
+from src.utils.file_reload import FileReloader
+
+DEFAULT_RULES_PATH = Path(__file__).parent / "data" / "posting_rules.json"
+
+# Chave das regras que valem para qualquer faixa etária
+ANY_AGE = "*"
+
+# Campos de cada modelo de nota (validados na carga)
+_NOTE_FIELDS = {
+    "region": {"region": "SP"},
+    "timezones": {"zones": 2, "utc_offset": -3.0},
+    "sparse_heatmap": {"posts": 1},
+    "heatmap": {"posts": 1},
+    "adaptive": {"posts": 1, "method": "thompson"},
+    "heatmap_best": {"day": "seg", "start": "18:00", "end": "20:00", "score": 1.0},
+}
+
+
+class InvalidPostingRules(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SlotRule:
+    slots: Tuple[str, ...]
+    weights: Tuple[float, ...]
+    # Curva de atividade em hora local (ver timezones.activity_curve)
+    curve: np.ndarray
+
+
+@dataclass(frozen=True)
+class PlatformRule:
+    note: str
+    base: SlotRule
+    # Janelas já ajustadas para as faixas com modificadores
+    by_age: Dict[str, SlotRule]
+
+    def slots_for(self, age_bucket: Optional[str] = None) -> SlotRule:
+        return self.by_age.get(age_bucket, self.base) if age_bucket else self.base
+
+
+@dataclass(frozen=True)
+class PostingRules:
+    platforms: Dict[str, PlatformRule]  # nome e aliases em minúsculas
+    default: PlatformRule
+    age_notes: Dict[str, str]
+    # (idade máxima da faixa ou None para qualquer uma, texto), em ordem
+    age_trends: Tuple[Tuple[Optional[int], str], ...]
+    notes: Dict[str, str]
+    path: str
+    mtime: float
+
+    def platform(self, platform: str) -> PlatformRule:
+        return self.platforms.get(platform.lower(), self.default)
+
+    def age_trend(self, age_bucket: str) -> str:
+        try:
+            high = parse_age_range(age_bucket)[1]
+        except ValueError:
+            return ""
+        for max_age, text in self.age_trends:
+            if max_age is None or high <= max_age:
+                return text
+        return ""
+
+    def age_note(self, age_bucket: str) -> Optional[str]:
+        template = self.age_notes.get(age_bucket, self.age_notes.get(ANY_AGE))
+        if not template:
+            return None
+        return template.format(
+            age_bucket=age_bucket, age_trend=self.age_trend(age_bucket)
+        ).strip()
+
+    def note(self, key: str, **values: Any) -> str:
+        return self.notes[key].format(**values)
+
+
+def _slot_rule(
+    slots: Sequence[str],
+    weights: Sequence[float],
+    boosts: Sequence[Tuple[float, float, float]] = (),
+) -> SlotRule:
+    weights = list(weights)
+    for i, slot in enumerate(slots):
+        start = parse_slot(slot)[0] % 24
+        for low, high, factor in boosts:
+            if low <= start < high or low <= start + 24 < high:
+                weights[i] *= factor
+    return SlotRule(
+        slots=tuple(slots),
+        weights=tuple(weights),
+        curve=activity_curve(slots, weights=weights),
+    )
+
+
+def _platform_rule(
+    name: str, spec: Dict[str, Any], age_boosts: Dict[str, list]
+) -> PlatformRule:
+    slots = spec.get("slots")
+    if not slots:
+        raise InvalidPostingRules(f"Plataforma {name} sem janelas.")
+    weights = spec.get("weights", [1.0] * len(slots))
+    if len(weights) != len(slots) or any(w < 0 for w in weights):
+        raise InvalidPostingRules(
+            f"Plataforma {name}: um peso (>= 0) por janela é obrigatório."
+        )
+    try:
+        base = _slot_rule(slots, weights)
+        by_age = {
+            bucket: _slot_rule(slots, weights, boosts)
+            for bucket, boosts in age_boosts.items()
+        }
+    except ValueError as e:
+        raise InvalidPostingRules(f"Plataforma {name}: janela inválida ({e}).")
+    return PlatformRule(note=spec.get("note", ""), base=base, by_age=by_age)
+
+
+def compile_posting_rules(
+    data: Dict[str, Any], path: str = "", mtime: float = 0.0
+) -> PostingRules:
+    """
+    Compila o conteúdo do JSON de regras. Levanta InvalidPostingRules se
+    alguma janela, peso ou modelo de nota for inválido.
+    """
+    age_notes: Dict[str, str] = {}
+    age_boosts: Dict[str, list] = {}
+    age_buckets = data.get("age_buckets", {})
+    try:
+        for bucket, spec in age_buckets.items():
+            if "note" in spec:
+                age_notes[bucket] = spec["note"]
+            if spec.get("boost"):
+                age_boosts[bucket] = [
+                    (*parse_slot(boost["hours"]), float(boost["factor"]))
+                    for boost in spec["boost"]
+                ]
+        age_trends = tuple(
+            (
+                None if trend.get("max_age") is None else int(trend["max_age"]),
+                str(trend["note"]),
+            )
+            for trend in age_buckets.get(ANY_AGE, {}).get("trends", ())
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidPostingRules(f"Modificador de faixa etária inválido: {e}")
+
+    platforms: Dict[str, PlatformRule] = {}
+    for name, spec in data.get("platforms", {}).items():
+        rule = _platform_rule(name, spec, age_boosts)
+        for key in (name, *spec.get("aliases", ())):
+            platforms[key.lower()] = rule
+    if "default" not in data:
+        raise InvalidPostingRules("Regras sem a plataforma padrão (default).")
+    default = _platform_rule("default", data["default"], age_boosts)
+
+    notes = dict(data.get("notes", {}))
+    try:
+        for key, sample in _NOTE_FIELDS.items():
+            notes.setdefault(key, "").format(**sample)
+        for template in age_notes.values():
+            template.format(age_bucket="18-24", age_trend="")
+    except (KeyError, IndexError, ValueError) as e:
+        raise InvalidPostingRules(f"Modelo de nota inválido: {e}")
+
+    return PostingRules(
+        platforms=platforms,
+        default=default,
+        age_notes=age_notes,
+        age_trends=age_trends,
+        notes=notes,
+        path=path,
+        mtime=mtime,
+    )
+
+
+def load_posting_rules(path: Optional[str] = None) -> PostingRules:
+    path = str(path or settings.POSTING_RULES_PATH or DEFAULT_RULES_PATH)
+    mtime = os.stat(path).st_mtime
+    with open(path, encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise InvalidPostingRules(f"JSON inválido em {path}: {e}")
+    return compile_posting_rules(data, path, mtime)
+
+
+_reloader: FileReloader[PostingRules] = FileReloader(
+    "Regras de horário",
+    path=lambda: str(settings.POSTING_RULES_PATH or DEFAULT_RULES_PATH),
+    load=load_posting_rules,
+    interval=lambda: settings.POSTING_RULES_RELOAD_SECONDS,
+    errors=(InvalidPostingRules,),
+)
+
+
+def get_posting_rules() -> PostingRules:
+    """
+    Regras compiladas; relê o arquivo se ele mudou desde a última carga.
+    """
+    return _reloader.get()
+
+
+def reset_posting_rules() -> None:
+    _reloader.reset()
@@ -0,0 +1,290 @@
+# src/posting_time_optimizer/scheduler.py
+"""
+Agenda semanal de postagens com restrições de espaçamento.
+
+A semana tem 168 horas (segunda 0h = 0, horário local). Dado o score de
+cada hora, a meta de posts da semana e as restrições (intervalo mínimo
+entre posts, máximo por dia, janelas bloqueadas), a agenda sai em duas
+etapas:
+
+1. guloso vetorizado: a cada passo cada agenda pega a hora livre de maior
+   score (com uma penalidade mínima por post já marcado no dia, que só
+   desempata e espalha a semana) e bloqueia as horas a menos de
+   `min_gap_hours` dela. Várias agendas (projetos × plataformas) andam
+   juntas numa matriz agendas × 168, então o lote custa poucos passos
+   NumPy;
+2. reparo por agenda: enquanto faltar post, troca um post por dois (abre
+   espaço quando o guloso travou a semana); depois move cada post para a
+   melhor hora livre enquanto o score total subir.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.posting_time_optimizer.heatmap import DAY_LABELS, DAYS, HOURS
+from src.posting_time_optimizer.timezones import BINS_PER_HOUR, parse_slot
+
+WEEK_HOURS = DAYS * HOURS
+
+DEFAULT_MIN_GAP_HOURS = 4
+# Intervalo máximo: a janela bloqueada (2 * gap - 1 horas) cabe na semana
+MAX_MIN_GAP_HOURS = 72
+DEFAULT_MAX_PER_DAY = 2
+MAX_POSTS_PER_WEEK = 70
+
+# Desempate por dia já ocupado (scores ficam entre 0 e 1)
+SPREAD_PENALTY = 1e-3
+
+# Limite de rodadas do reparo/melhoria por agenda
+MAX_REPAIR_ROUNDS = 50
+
+
+@dataclass
+class ScheduleConstraints:
+    min_gap_hours: int = DEFAULT_MIN_GAP_HOURS
+    max_per_day: int = DEFAULT_MAX_PER_DAY
+    # Horas da semana em que se pode postar (False = bloqueada)
+    allowed: np.ndarray = field(default_factory=lambda: np.ones(WEEK_HOURS, bool))
+
+
+def blackout_mask(windows: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """
+    Horas permitidas (168) a partir das janelas bloqueadas
+    ({start, end, day?}; sem `day`, vale para todos os dias). Janelas que
+    passam da meia-noite continuam no dia seguinte.
+    """
+    allowed = np.ones(WEEK_HOURS, dtype=bool)
+    for window in windows:
+        start, end = parse_slot(f"{window['start']}-{window['end']}")
+        hours = np.arange(int(np.floor(start)), int(np.ceil(end)))
+        day = window.get("day")
+        days = range(DAYS) if day is None else [_day_index(day)]
+        for d in days:
+            allowed[(d * HOURS + hours) % WEEK_HOURS] = False
+    return allowed
+
+
+def _day_index(day: Any) -> int:
+    if isinstance(day, int) and 0 <= day < DAYS:
+        return day
+    if isinstance(day, str) and day.lower()[:3] in DAY_LABELS:
+        return DAY_LABELS.index(day.lower()[:3])
+    raise ValueError(f"Dia inválido: {day}")
+
+
+def week_scores(scores: Any) -> np.ndarray:
+    """
+    Normaliza os scores para 168 horas: aceita 24 valores (repetidos em
+    todos os dias), 7 × 24 ou 168.
+    """
+    array = np.asarray(scores, dtype=np.float64)
+    if array.size == HOURS:
+        array = np.tile(array.ravel(), DAYS)
+    if array.size != WEEK_HOURS:
+        raise ValueError("Scores devem ter 24, 7 x 24 ou 168 valores.")
+    if not np.isfinite(array).all() or (array < 0).any():
+        raise ValueError("Scores devem ser números finitos >= 0.")
+    return array.ravel()
+
+
+def scores_from_curve(curve: np.ndarray) -> np.ndarray:
+    """
+    Scores horários (168) a partir de uma curva de atividade em meias horas
+    (ex.: a curva das regras da plataforma).
+    """
+    hourly = np.asarray(curve, dtype=np.float64).reshape(HOURS, BINS_PER_HOUR).mean(1)
+    peak = hourly.max(initial=0.0)
+    return week_scores(hourly / peak if peak > 0 else hourly)
+
+
+def _circular_distance(hours: np.ndarray, chosen: np.ndarray) -> np.ndarray:
+    diff = np.abs(hours[None, :] - chosen[:, None]) % WEEK_HOURS
+    return np.minimum(diff, WEEK_HOURS - diff)
+
+
+def greedy_schedules(
+    scores: np.ndarray,
+    budgets: np.ndarray,
+    min_gaps: np.ndarray,
+    max_per_day: np.ndarray,
+    allowed: np.ndarray,
+) -> np.ndarray:
+    """
+    Etapa gulosa para várias agendas de uma vez. `scores` e `allowed` são
+    agendas × 168; devolve a matriz booleana das horas escolhidas.
+    """
+    n = scores.shape[0]
+    rows = np.arange(n)
+    hours = np.arange(WEEK_HOURS)
+    free = allowed.copy()
+    chosen = np.zeros((n, WEEK_HOURS), dtype=bool)
+    per_day = np.zeros((n, DAYS), dtype=np.int64)
+    count = np.zeros(n, dtype=np.int64)
+
+    for _ in range(int(budgets.max(initial=0))):
+        day_open = np.repeat(per_day < max_per_day[:, None], HOURS, axis=1)
+        effective = scores - SPREAD_PENALTY * np.repeat(per_day, HOURS, axis=1)
+        effective = np.where(free & day_open, effective, -np.inf)
+
+        best = effective.argmax(axis=1)
+        take = (count < budgets) & np.isfinite(effective[rows, best])
+        if not take.any():
+            break
+
+        picked = rows[take]
+        chosen[picked, best[take]] = True
+        count[picked] += 1
+        per_day[picked, best[take] // HOURS] += 1
+        near = _circular_distance(hours, best[take]) < min_gaps[picked, None]
+        free[picked] &= ~near
+
+    return chosen
+
+
+class _Schedule:
+    """
+    Estado de uma agenda para o reparo: posts marcados e, por hora, quantos
+    posts estão a menos de `gap` horas (mantido a cada inclusão/remoção).
+    """
+
+    def __init__(
+        self, scores: np.ndarray, constraints: ScheduleConstraints, posts: np.ndarray
+    ):
+        self.scores = scores
+        self.max_per_day = constraints.max_per_day
+        self.allowed = constraints.allowed
+        gap = min(max(1, constraints.min_gap_hours), MAX_MIN_GAP_HOURS)
+        self.offsets = np.arange(-(gap - 1), gap)
+        self.blocked = np.zeros(WEEK_HOURS, dtype=np.int64)
+        self.per_day = np.zeros(DAYS, dtype=np.int64)
+        self.posts: set = set()
+        for hour in posts:
+            self.add(int(hour))
+
+    def add(self, hour: int) -> None:
+        self.posts.add(hour)
+        self.blocked[(hour + self.offsets) % WEEK_HOURS] += 1
+        self.per_day[hour // HOURS] += 1
+
+    def remove(self, hour: int) -> None:
+        self.posts.discard(hour)
+        self.blocked[(hour + self.offsets) % WEEK_HOURS] -= 1
+        self.per_day[hour // HOURS] -= 1
+
+    def best_free(self, exclude: Optional[int] = None) -> Optional[int]:
+        """
+        Hora livre de maior score em que um novo post cabe (None se nenhuma).
+        """
+        ok = (
+            self.allowed
+            & (self.blocked == 0)
+            & np.repeat(self.per_day < self.max_per_day, HOURS)
+        )
+        if exclude is not None:
+            ok[exclude] = False
+        if not ok.any():
+            return None
+        return int(np.argmax(np.where(ok, self.scores, -np.inf)))
+
+    def repair(self, budget: int) -> None:
+        # Troca 1 por 2 enquanto faltar post e a troca abrir espaço
+        exchanged = False
+        for _ in range(MAX_REPAIR_ROUNDS):
+            if len(self.posts) >= budget or not self._exchange_one_for_two():
+                break
+            exchanged = True
+        # O guloso já não melhora movendo um post (cada hora que um post
+        # liberaria estava livre, com score menor, quando ele foi escolhido);
+        # só depois das trocas vale mover posts para horas melhores
+        for _ in range(MAX_REPAIR_ROUNDS if exchanged else 0):
+            if not self._improve():
+                break
+
+    def _exchange_one_for_two(self) -> bool:
+        for post in sorted(self.posts, key=lambda h: self.scores[h]):
+            self.remove(post)
+            added = []
+            for _ in range(2):
+                hour = self.best_free(exclude=post)
+                if hour is None:
+                    break
+                self.add(hour)
+                added.append(hour)
+            if len(added) == 2:
+                return True
+            for hour in added:
+                self.remove(hour)
+            self.add(post)
+        return False
+
+    def _improve(self) -> bool:
+        improved = False
+        for post in sorted(self.posts, key=lambda h: self.scores[h]):
+            self.remove(post)
+            hour = self.best_free()
+            if hour is not None and self.scores[hour] > self.scores[post] + 1e-12:
+                self.add(hour)
+                improved = True
+            else:
+                self.add(post)
+        return improved
+
+
+def schedule_batch(
+    scores: Sequence[np.ndarray],
+    budgets: Sequence[int],
+    constraints: Sequence[ScheduleConstraints],
+) -> List[List[int]]:
+    """
+    Agenda várias semanas de uma vez (uma por item). Devolve as horas da
+    semana escolhidas de cada agenda, em ordem.
+    """
+    if not scores:
+        return []
+    score_matrix = np.vstack([week_scores(s) for s in scores])
+    chosen = greedy_schedules(
+        score_matrix,
+        np.asarray(budgets, dtype=np.int64),
+        np.array(
+            [min(max(1, c.min_gap_hours), MAX_MIN_GAP_HOURS) for c in constraints],
+            dtype=np.int64,
+        ),
+        np.array([c.max_per_day for c in constraints], dtype=np.int64),
+        np.vstack([c.allowed for c in constraints]),
+    )
+
+    schedules = []
+    for i, budget in enumerate(budgets):
+        schedule = _Schedule(score_matrix[i], constraints[i], np.flatnonzero(chosen[i]))
+        schedule.repair(int(budget))
+        schedules.append(sorted(schedule.posts))
+    return schedules
+
+
+def schedule_week(
+    scores: Any, budget: int, constraints: Optional[ScheduleConstraints] = None
+) -> List[int]:
+    return schedule_batch([scores], [budget], [constraints or ScheduleConstraints()])[0]
+
+
+def describe_schedule(hours: Sequence[int], scores: Any, budget: int) -> Dict[str, Any]:
+    """
+    Representação JSON da agenda ({day, time, score} por post).
+    """
+    week = week_scores(scores)
+    return {
+        "posts_per_week": budget,
+        "scheduled": len(hours),
+        "unfilled": max(0, budget - len(hours)),
+        "total_score": round(float(week[list(hours)].sum()), 4) if hours else 0.0,
+        "posts": [
+            {
+                "day": DAY_LABELS[h // HOURS],
+                "time": f"{h % HOURS:02d}:00",
+                "score": round(float(week[h]), 4),
+            }
+            for h in hours
+        ],
+    }
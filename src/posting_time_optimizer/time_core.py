@@ -1,77 +1,187 @@
-from typing import Dict, List, Any
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.posting_time_optimizer.heatmap import EngagementHeatmap, heatmap_slots_batch
+from src.posting_time_optimizer.posterior import (
+    METHODS,
+    SlotPosterior,
+    adaptive_slots,
+)
+from src.posting_time_optimizer.rules import PostingRules, SlotRule, get_posting_rules
+from src.posting_time_optimizer.scheduler import scores_from_curve
+from src.posting_time_optimizer.timezones import timezone_mixture_batch
+
+
+@dataclass
+class BestTimesQuery:
+    platform: str
+    main_age_bucket: Optional[str] = None
+    region_main: Optional[str] = None
+    heatmap: Optional[EngagementHeatmap] = None
+    region_shares: Optional[Dict[str, float]] = None
 
 
 def _base_slots_for_platform(platform: str) -> List[str]:
     """
-    Define janelas de horário base por plataforma (heurísticas simples).
+    Janelas de horário base da plataforma (regras em data/posting_rules.json).
     """
-    platform = platform.lower()
-
-    if platform == "instagram":
-        # Manhã, fim de tarde e noite
-        return ["07:00-09:00", "12:00-14:00", "18:00-21:00"]
-    elif platform == "tiktok":
-        # Mais forte à noite
-        return ["12:00-14:00", "18:00-23:00"]
-    elif platform == "linkedin":
-        # Horário comercial
-        return ["08:00-10:00", "12:00-13:00", "17:00-19:00"]
-    else:
-        # Genérico
-        return ["09:00-11:00", "18:00-21:00"]
+    return list(get_posting_rules().platform(platform).base.slots)
 
 
 def suggest_best_times(
     platform: str,
     main_age_bucket: str | None = None,
     region_main: str | None = None,
+    heatmap: Optional[EngagementHeatmap] = None,
+    region_shares: Optional[Dict[str, float]] = None,
+    strategy: str = "heuristic",
+    posterior: Optional[SlotPosterior] = None,
+    method: str = "thompson",
+    rng: Optional[np.random.Generator] = None,
 ) -> Dict[str, Any]:
     """
     Sugere melhores horários com base na plataforma e em informações simples do público.
-    Por enquanto usa regras heurísticas, depois podemos sofisticar com dados reais.
+    Com um mapa de engajamento (posts reais do projeto) com posts suficientes,
+    as janelas saem dos dados; caso contrário, valem as regras heurísticas.
+    Com `region_shares` (ex.: summary["by_region"]), as janelas heurísticas
+    são escolhidas pela atividade combinada dos fusos do público.
+
+    Com `strategy="adaptive"`, as janelas saem da posterior do projeto
+    (`posterior`, vazia se None) por Thompson ou UCB (`method`), com as
+    regras da plataforma como priori.
     """
-    slots = _base_slots_for_platform(platform)
-    reasons: list[str] = []
+    if strategy == "adaptive":
+        return _best_times_adaptive(
+            platform, main_age_bucket, posterior or SlotPosterior(), method, rng
+        )
+    if strategy != "heuristic":
+        raise ValueError(f"Estratégia inválida: {strategy}")
 
-    platform_lower = platform.lower()
+    query = BestTimesQuery(
+        platform=platform,
+        main_age_bucket=main_age_bucket,
+        region_main=region_main,
+        heatmap=heatmap,
+        region_shares=region_shares,
+    )
+    return suggest_best_times_batch([query])[0]
 
-    if platform_lower == "instagram":
-        reasons.append(
-            "Instagram tende a performar bem em horários em que as pessoas estão "
-            "acordando, em pausa (almoço) e no pós-expediente."
-        )
-    elif platform_lower == "tiktok":
-        reasons.append(
-            "TikTok costuma ter pico de uso no fim da tarde e à noite, "
-            "quando o público está relaxando."
-        )
-    elif platform_lower == "linkedin":
-        reasons.append(
-            "LinkedIn é mais forte em horário comercial, com destaque para começo "
-            "da manhã e final do expediente."
-        )
-    else:
-        reasons.append(
-            "Como a plataforma não é reconhecida especificamente, foi aplicada "
-            "uma janela genérica de horários com boa probabilidade de engajamento."
-        )
 
-    if main_age_bucket:
-        reasons.append(
-            f"Faixa etária predominante: {main_age_bucket}. "
-            "Faixas 18-34 tendem a ser mais ativas à noite; faixas mais altas podem "
-            "concentrar mais consumo em horários de pausa e início da noite."
+def suggest_best_times_batch(queries: Sequence[BestTimesQuery]) -> List[Dict[str, Any]]:
+    """
+    `suggest_best_times` (estratégia heurística) para várias consultas de
+    uma vez, na ordem dada. Os mapas com posts suficientes são processados
+    juntos; as demais consultas são agrupadas pela regra (plataforma ×
+    faixa etária) e cada grupo faz a mistura de fusos num único passo.
+    """
+    rules = get_posting_rules()
+    from_data = heatmap_slots_batch([query.heatmap for query in queries])
+    results: List[Optional[Dict[str, Any]]] = [None] * len(queries)
+
+    groups: Dict[int, Tuple[SlotRule, List[int]]] = {}
+    for i, query in enumerate(queries):
+        if from_data[i] is not None:
+            results[i] = _best_times_from_heatmap(query.platform, from_data[i])
+            continue
+        slot_rule = rules.platform(query.platform).slots_for(query.main_age_bucket)
+        groups.setdefault(id(slot_rule), (slot_rule, []))[1].append(i)
+
+    for slot_rule, members in groups.values():
+        mixtures = timezone_mixture_batch(
+            slot_rule.slots,
+            [queries[i].region_shares for i in members],
+            curve=slot_rule.curve,
         )
+        for i, mixture in zip(members, mixtures):
+            results[i] = _heuristic_best_times(rules, queries[i], slot_rule, mixture)
+    return results
+
 
-    if region_main:
+def _heuristic_best_times(
+    rules: PostingRules,
+    query: BestTimesQuery,
+    slot_rule: SlotRule,
+    mixture: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    slots = list(slot_rule.slots)
+    reasons: list[str] = [rules.platform(query.platform).note]
+    if mixture is not None:
+        slots = mixture["recommended_slots"]
+
+    if query.main_age_bucket:
+        age_note = rules.age_note(query.main_age_bucket)
+        if age_note:
+            reasons.append(age_note)
+
+    if mixture is not None:
         reasons.append(
-            f"Região predominante: {region_main}. Os horários sugeridos consideram o "
-            "fuso horário local; em um cenário real, os horários seriam ajustados "
-            "por time zone e hábitos regionais."
+            rules.note(
+                "timezones",
+                zones=len(mixture["timezones"]),
+                utc_offset=mixture["utc_offset"],
+            )
         )
+    elif query.region_main:
+        reasons.append(rules.note("region", region=query.region_main))
 
-    return {
-        "platform": platform_lower,
+    if query.heatmap is not None:
+        reasons.append(rules.note("sparse_heatmap", posts=query.heatmap.total_posts))
+
+    result = {
+        "platform": query.platform.lower(),
         "recommended_slots": slots,
         "notes": reasons,
+        "source": "heuristic",
+    }
+    if mixture is not None:
+        result["recommended_slots_utc"] = mixture["recommended_slots_utc"]
+        result["utc_offset"] = mixture["utc_offset"]
+        result["timezones"] = mixture["timezones"]
+    return result
+
+
+def _best_times_from_heatmap(
+    platform: str, from_data: Dict[str, Any]
+) -> Dict[str, Any]:
+    rules = get_posting_rules()
+    notes = [rules.note("heatmap", posts=from_data["posts"])]
+    if from_data["best_windows"]:
+        notes.append(rules.note("heatmap_best", **from_data["best_windows"][0]))
+
+    return {
+        "platform": platform.lower(),
+        "recommended_slots": from_data["recommended_slots"],
+        "best_windows": from_data["best_windows"],
+        "notes": notes,
+        "source": "engagement",
+    }
+
+
+def _best_times_adaptive(
+    platform: str,
+    main_age_bucket: Optional[str],
+    posterior: SlotPosterior,
+    method: str,
+    rng: Optional[np.random.Generator],
+) -> Dict[str, Any]:
+    if method not in METHODS:
+        raise ValueError(f"Método adaptativo inválido: {method}")
+    rules = get_posting_rules()
+    curve = rules.platform(platform).slots_for(main_age_bucket).curve
+    from_posterior = adaptive_slots(posterior, scores_from_curve(curve), method, rng)
+
+    notes = [rules.note("adaptive", posts=from_posterior["posts"], method=method)]
+    if from_posterior["best_windows"]:
+        notes.append(rules.note("heatmap_best", **from_posterior["best_windows"][0]))
+
+    return {
+        "platform": platform.lower(),
+        "recommended_slots": from_posterior["recommended_slots"],
+        "best_windows": from_posterior["best_windows"],
+        "notes": notes,
+        "source": "adaptive",
+        "method": method,
+        "posts": from_posterior["posts"],
     }
@@ -0,0 +1,353 @@
+# src/posting_time_optimizer/timezones.py
+"""
+Fusos horários do público e janelas de postagem alinhadas em UTC.
+
+A tabela região -> fuso (data/region_offsets.json) é compilada uma vez:
+cada nó da hierarquia de regiões recebe o fuso do ancestral mais próximo
+listado (cidade -> estado -> país) e regiões fora da hierarquia (países)
+entram num mapa de grafias normalizadas. Regiões desconhecidas ficam no
+fuso padrão (POSTING_UTC_OFFSET_HOURS).
+
+A curva de atividade da plataforma (hora local, em meias horas) é deslocada
+pelo fuso de cada região e ponderada pela participação da região no
+público: a mistura é uma única indexação (fusos distintos × 48) seguida de
+um produto com os pesos, então centenas de regiões custam microssegundos.
+Vários públicos com as mesmas janelas (timezone_mixture_batch) viram uma
+matriz públicos × deslocamentos multiplicada pela matriz circulante da
+curva, e as janelas de todos são escolhidas juntas.
+"""
+
+import json
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.audience_analyzer.regions import (
+    RegionHierarchy,
+    get_region_hierarchy,
+    normalize_region,
+)
+from src.core.config import settings
+from src.posting_time_optimizer.heatmap import best_windows_batch
+
+DEFAULT_OFFSETS_PATH = Path(__file__).parent / "data" / "region_offsets.json"
+
+# Resolução da curva de atividade (meias horas: cobre fusos como +5:30)
+BINS_PER_HOUR = 2
+BINS = 24 * BINS_PER_HOUR
+
+# Atividade fora das janelas da plataforma (dentro delas = 1)
+BASELINE_ACTIVITY = 0.2
+
+# Fusos listados no resultado
+TOP_TIMEZONES = 5
+
+_MEMO_LIMIT = 100_000
+
+
+@dataclass
+class RegionOffsets:
+    hierarchy: RegionHierarchy
+    node_offsets: np.ndarray  # fuso de cada nó da hierarquia (nan = sem fuso)
+    aliases: Dict[str, float]  # grafia normalizada -> fuso (fora da hierarquia)
+    _memo: Dict[Any, Optional[float]] = field(default_factory=dict, repr=False)
+
+    def offset(self, name: Any) -> Optional[float]:
+        """
+        Fuso da região em horas (None se desconhecida).
+        """
+        if name in self._memo:
+            return self._memo[name]
+
+        offset = None
+        node = self.hierarchy.resolve(name)
+        if node is not None and not np.isnan(self.node_offsets[node]):
+            offset = float(self.node_offsets[node])
+        elif isinstance(name, str):
+            offset = self.aliases.get(normalize_region(name))
+
+        if len(self._memo) < _MEMO_LIMIT:
+            self._memo[name] = offset
+        return offset
+
+    def offsets(self, names: Sequence[Any], default: float) -> np.ndarray:
+        return np.fromiter(
+            (
+                default if (offset := self.offset(name)) is None else offset
+                for name in names
+            ),
+            dtype=np.float64,
+            count=len(names),
+        )
+
+
+def compile_region_offsets(
+    data: Dict[str, Any], hierarchy: RegionHierarchy
+) -> RegionOffsets:
+    """
+    Compila a tabela ({nodes: {id: fuso}, regions: [{name, aliases, utc_offset}]})
+    sobre a hierarquia: os nós sem fuso próprio herdam o do pai.
+    """
+    by_id = {node_id: i for i, node_id in enumerate(hierarchy.ids)}
+    own = np.full(len(hierarchy.ids), np.nan)
+    for node_id, offset in data.get("nodes", {}).items():
+        if node_id not in by_id:
+            raise ValueError(f"Região desconhecida na tabela de fusos: {node_id}")
+        own[by_id[node_id]] = offset
+
+    # Sobe pelos pais até achar um fuso (profundidade = nº de níveis)
+    node_offsets = own.copy()
+    current = np.arange(len(own))
+    for _ in range(hierarchy.ancestors.shape[0]):
+        missing = np.isnan(node_offsets) & (hierarchy.parents[current] >= 0)
+        if not missing.any():
+            break
+        current[missing] = hierarchy.parents[current[missing]]
+        node_offsets[missing] = own[current[missing]]
+
+    aliases: Dict[str, float] = {}
+    for region in data.get("regions", []):
+        for spelling in (region["name"], *region.get("aliases", ())):
+            aliases.setdefault(normalize_region(spelling), float(region["utc_offset"]))
+
+    return RegionOffsets(
+        hierarchy=hierarchy, node_offsets=node_offsets, aliases=aliases
+    )
+
+
+@lru_cache(maxsize=None)
+def _load_offsets(path: str) -> RegionOffsets:
+    with open(path, encoding="utf-8") as f:
+        return compile_region_offsets(json.load(f), get_region_hierarchy())
+
+
+def get_region_offsets() -> RegionOffsets:
+    return _load_offsets(str(DEFAULT_OFFSETS_PATH))
+
+
+# ---------- janelas ----------
+
+
+def parse_slot(slot: str) -> Tuple[float, float]:
+    """
+    "18:00-21:00" -> (18.0, 21.0). Janelas que passam da meia-noite
+    ("22:00-01:00") terminam depois de 24.
+    """
+    start, end = (_parse_hour(part) for part in slot.split("-"))
+    return start, end if end > start else end + 24
+
+
+def _parse_hour(text: str) -> float:
+    hours, _, minutes = text.strip().partition(":")
+    return int(hours) + int(minutes or 0) / 60
+
+
+def format_slot(start: float, end: float) -> str:
+    return f"{_format_hour(start)}-{_format_hour(end)}"
+
+
+def _format_hour(hour: float) -> str:
+    # 24:00 só como fim de janela; além disso dá a volta no dia
+    minutes = int(round(hour * 60))
+    if minutes != 24 * 60:
+        minutes %= 24 * 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def activity_curve(
+    slots: Sequence[str],
+    baseline: float = BASELINE_ACTIVITY,
+    weights: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """
+    Curva de atividade em hora local (BINS posições): o peso da janela
+    (1 por padrão) dentro das janelas da plataforma, `baseline` fora delas.
+    """
+    curve = np.full(BINS, baseline)
+    for i, slot in enumerate(slots):
+        start, end = parse_slot(slot)
+        bins = np.arange(
+            int(round(start * BINS_PER_HOUR)), int(round(end * BINS_PER_HOUR))
+        )
+        curve[bins % BINS] = 1.0 if weights is None else weights[i]
+    return curve
+
+
+def mixture_curve(
+    curve: np.ndarray, offsets: np.ndarray, shares: np.ndarray
+) -> np.ndarray:
+    """
+    Atividade esperada do público em cada meia hora UTC: a curva local
+    deslocada pelo fuso de cada região, ponderada pela participação.
+    """
+    shifts = np.rint(offsets * BINS_PER_HOUR).astype(np.int64)
+    # Regiões no mesmo fuso somam antes (a matriz fica fusos × BINS)
+    unique, inverse = np.unique(shifts, return_inverse=True)
+    weights = np.bincount(inverse, weights=shares, minlength=unique.size)
+    total = weights.sum()
+    if total <= 0:
+        return np.zeros(BINS)
+    # Meia hora UTC u = hora local u + fuso
+    local = (np.arange(BINS)[None, :] + unique[:, None]) % BINS
+    return weights @ curve[local] / total
+
+
+def mixture_curves(
+    curve: np.ndarray,
+    offsets: Sequence[np.ndarray],
+    shares: Sequence[np.ndarray],
+) -> np.ndarray:
+    """
+    `mixture_curve` de vários públicos com a mesma curva local: as
+    participações viram uma matriz públicos × deslocamentos (48) e a mistura
+    é um único produto com a matriz circulante da curva.
+    """
+    rows = np.repeat(np.arange(len(offsets)), [len(o) for o in offsets])
+    if rows.size == 0:
+        return np.zeros((len(offsets), BINS))
+    shifts = np.rint(np.concatenate(offsets) * BINS_PER_HOUR).astype(np.int64) % BINS
+    weights = np.bincount(
+        rows * BINS + shifts,
+        weights=np.concatenate(shares),
+        minlength=len(offsets) * BINS,
+    ).reshape(len(offsets), BINS)
+    total = weights.sum(axis=1, keepdims=True)
+    # circulant[s, u] = curva local na meia hora UTC u para o deslocamento s
+    bins = np.arange(BINS)
+    circulant = curve[(bins[None, :] + bins[:, None]) % BINS]
+    return np.divide(
+        weights @ circulant,
+        total,
+        out=np.zeros((len(offsets), BINS)),
+        where=total > 0,
+    )
+
+
+def pick_windows(curve: np.ndarray, widths: Sequence[int]) -> List[Tuple[int, int]]:
+    """
+    Uma janela circular por largura (em posições), das mais largas para as
+    mais estreitas, sempre a de maior atividade sem sobrepor as já
+    escolhidas. Devolve (início, largura).
+    """
+    return pick_windows_batch(np.asarray(curve)[None, :], widths)[0]
+
+
+def pick_windows_batch(
+    curves: np.ndarray, widths: Sequence[int]
+) -> List[List[Tuple[int, int]]]:
+    """
+    `pick_windows` para cada linha de `curves` (mesmas larguras).
+    """
+    size = curves.shape[1]
+    ordered = [max(1, min(int(w), size)) for w in sorted(widths, reverse=True)]
+    starts, _ = best_windows_batch(curves, ordered)
+    return [
+        [(int(start), width) for start, width in zip(row, ordered) if start >= 0]
+        for row in starts
+    ]
+
+
+def timezone_mixture(
+    slots: Sequence[str],
+    region_shares: Mapping[Any, float],
+    default_offset: Optional[float] = None,
+    offsets_table: Optional[RegionOffsets] = None,
+    curve: Optional[np.ndarray] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Janelas para um público espalhado por fusos. As larguras são as das
+    janelas da plataforma; os horários saem em UTC e no fuso principal do
+    público (o de maior participação). `curve` é a curva de atividade já
+    calculada das janelas (ex.: com pesos das regras). None sem
+    participações válidas.
+    """
+    return timezone_mixture_batch(
+        slots, [region_shares], default_offset, offsets_table, curve
+    )[0]
+
+
+def timezone_mixture_batch(
+    slots: Sequence[str],
+    region_shares: Sequence[Optional[Mapping[Any, float]]],
+    default_offset: Optional[float] = None,
+    offsets_table: Optional[RegionOffsets] = None,
+    curve: Optional[np.ndarray] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    `timezone_mixture` de vários públicos com as mesmas janelas: cada
+    região é resolvida uma vez para o lote todo, e a mistura e a escolha
+    das janelas são feitas para todos os públicos juntos.
+    """
+    table = offsets_table or get_region_offsets()
+    if default_offset is None:
+        default_offset = settings.POSTING_UTC_OFFSET_HOURS
+
+    audiences = []
+    names_seen: Dict[Any, None] = {}
+    for i, audience in enumerate(region_shares):
+        if not audience:
+            continue
+        names = list(audience)
+        shares = np.fromiter(
+            (audience[name] for name in names), dtype=np.float64, count=len(names)
+        ).clip(min=0)
+        if shares.sum() <= 0:
+            continue
+        audiences.append((i, names, shares))
+        names_seen.update(dict.fromkeys(names))
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(region_shares)
+    if not audiences:
+        return results
+
+    unique_names = list(names_seen)
+    lookup = dict(zip(unique_names, table.offsets(unique_names, default_offset)))
+    offsets = [
+        np.fromiter((lookup[name] for name in names), np.float64, len(names))
+        for _, names, _ in audiences
+    ]
+
+    if curve is None:
+        curve = activity_curve(slots)
+    utc_curves = mixture_curves(curve, offsets, [shares for *_, shares in audiences])
+    widths = [
+        int(round((end - start) * BINS_PER_HOUR))
+        for start, end in (parse_slot(slot) for slot in slots)
+    ]
+    picked = pick_windows_batch(utc_curves, widths)
+
+    for (i, _, shares), audience_offsets, windows in zip(audiences, offsets, picked):
+        results[i] = _mixture_result(sorted(windows), audience_offsets, shares)
+    return results
+
+
+def _mixture_result(
+    windows: List[Tuple[int, int]], offsets: np.ndarray, shares: np.ndarray
+) -> Dict[str, Any]:
+    unique, inverse = np.unique(offsets, return_inverse=True)
+    tz_shares = np.bincount(inverse, weights=shares) / shares.sum()
+    order = np.argsort(-tz_shares, kind="stable")
+    main = float(unique[order[0]])
+
+    def _slots(shift: float) -> List[str]:
+        local = sorted(
+            ((start / BINS_PER_HOUR + shift) % 24, width / BINS_PER_HOUR)
+            for start, width in windows
+        )
+        return [format_slot(start, start + width) for start, width in local]
+
+    return {
+        "recommended_slots": _slots(main),
+        "recommended_slots_utc": _slots(0.0),
+        "utc_offset": main,
+        "timezones": [
+            {
+                "utc_offset": float(unique[i]),
+                "percent": round(float(tz_shares[i]) * 100, 1),
+            }
+            for i in order[:TOP_TIMEZONES]
+        ],
+    }
@@ -1,7 +1,9 @@
 # src/schemas/content_strategy.py
 
 from typing import Any, List, Optional, Dict
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from src.audience_analyzer.age_schemes import parse_age_range
 
 
 class AudienceUser(BaseModel):
@@ -10,6 +12,33 @@ class AudienceUser(BaseModel):
     region: str
 
 
+class AudienceBreakdownRow(BaseModel):
+    """
+    Linha de público agregado, como vem das plataformas
+    (ex.: age_bucket="25-34", gender="F", count=1200).
+    """
+
+    age: Optional[int] = None
+    age_bucket: Optional[str] = None
+    gender: str
+    region: str
+    # Limite folgado: as contagens ponderadas continuam exatas (bincount)
+    count: int = Field(ge=0, le=10**12)
+
+    @field_validator("age_bucket")
+    @classmethod
+    def _known_range(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            parse_age_range(value)
+        return value
+
+    @model_validator(mode="after")
+    def _age_or_bucket(self):
+        if (self.age is None) == (self.age_bucket is None):
+            raise ValueError("Informe age ou age_bucket (apenas um).")
+        return self
+
+
 class ContentStrategyPayload(BaseModel):
     topic: str
     platform: str
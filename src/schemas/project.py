@@ -2,13 +2,23 @@
 from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+
+from src.audience_analyzer.age_schemes import AGE_SCHEMES
 
 
 class ProjectBase(BaseModel):
     name: str
     description: Optional[str] = None
     ig_user_id: Optional[str] = None
+    age_scheme: Optional[str] = None
+
+    @field_validator("age_scheme")
+    @classmethod
+    def _age_scheme_conhecido(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and value not in AGE_SCHEMES:
+            raise ValueError(f"Esquema de faixa etária desconhecido: {value}")
+        return value
 
 
 class ProjectCreate(ProjectBase):
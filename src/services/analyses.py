@@ -1,9 +1,24 @@
 # src/services/analyses.py
-from typing import List, Optional
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlmodel import Session, select
 
-from src.models.analysis import AnalysisHistory
+from src.audience_analyzer.cube import AudienceCube
+from src.audience_analyzer.storage import (
+    AudienceNotFound,
+    load_audience_columns,
+    users_from_columns,
+)
+from src.models.analysis import AnalysisCube, AnalysisHistory
+
+# Cubos já decodificados, por (owner_id, analysis_id); são imutáveis. O LRU
+# é compartilhado pelas threads do threadpool, daí o lock
+_CUBE_CACHE_SIZE = 64
+_cube_lock = threading.Lock()
+_cube_cache: "OrderedDict[Tuple[int, int], AudienceCube]" = OrderedDict()
 
 
 def create_analysis(
@@ -15,6 +30,7 @@ def create_analysis(
     mode: str,
     users_json: str,
     result_json: str,
+    audience_id: Optional[str] = None,
 ) -> AnalysisHistory:
     analysis = AnalysisHistory(
         owner_id=owner_id,
@@ -24,6 +40,7 @@ def create_analysis(
         mode=mode,
         users_json=users_json,
         result_json=result_json,
+        audience_id=audience_id,
     )
     session.add(analysis)
     session.commit()
@@ -31,6 +48,45 @@ def create_analysis(
     return analysis
 
 
+def update_analysis_audience(
+    session: Session,
+    analysis_id: int,
+    result_json: str,
+    users_json: str,
+    audience_id: Optional[str],
+) -> Optional[AnalysisHistory]:
+    """
+    Substitui o resultado/público de uma análise (ex.: passada exata que
+    sucede uma análise por amostragem).
+    """
+    analysis = session.get(AnalysisHistory, analysis_id)
+    if analysis is None:
+        return None
+
+    analysis.result_json = result_json
+    analysis.users_json = users_json
+    analysis.audience_id = audience_id
+    session.add(analysis)
+    session.commit()
+    session.refresh(analysis)
+    return analysis
+
+
+def get_analysis_users(analysis: AnalysisHistory) -> Optional[List[Dict[str, Any]]]:
+    """
+    Público da análise: lido do arquivo colunar quando há audience_id,
+    ou do users_json (análises antigas). None se o arquivo .aud não
+    existe mais (ver retenção em audience_analyzer/storage.py).
+    """
+    if analysis.audience_id:
+        try:
+            columns = load_audience_columns(analysis.audience_id)
+        except AudienceNotFound:
+            return None
+        return users_from_columns(columns)
+    return json.loads(analysis.users_json)
+
+
 def list_analyses(
     session: Session,
     owner_id: int,
@@ -57,3 +113,68 @@ def get_analysis_by_id(
         AnalysisHistory.owner_id == owner_id,
     )
     return session.exec(stmt).first()
+
+
+def get_analyses_by_ids(
+    session: Session,
+    owner_id: int,
+    analysis_ids: List[int],
+) -> Dict[int, AnalysisHistory]:
+    """
+    Várias análises do usuário numa única consulta, indexadas pelo id.
+    """
+    if not analysis_ids:
+        return {}
+    stmt = select(AnalysisHistory).where(
+        AnalysisHistory.id.in_(set(analysis_ids)),
+        AnalysisHistory.owner_id == owner_id,
+    )
+    return {analysis.id: analysis for analysis in session.exec(stmt)}
+
+
+def save_analysis_cube(
+    session: Session,
+    owner_id: int,
+    analysis_id: int,
+    cube: AudienceCube,
+) -> AnalysisCube:
+    row = AnalysisCube(
+        analysis_id=analysis_id,
+        owner_id=owner_id,
+        cube=cube.to_bytes(),
+    )
+    session.add(row)
+    session.commit()
+    return row
+
+
+def get_analysis_cube(
+    session: Session,
+    owner_id: int,
+    analysis_id: int,
+) -> Optional[AudienceCube]:
+    """
+    Retorna o cubo da análise (decodificado e mantido num LRU em memória).
+    """
+    key = (owner_id, analysis_id)
+    with _cube_lock:
+        cube = _cube_cache.get(key)
+        if cube is not None:
+            _cube_cache.move_to_end(key)
+            return cube
+
+    stmt = select(AnalysisCube).where(
+        AnalysisCube.analysis_id == analysis_id,
+        AnalysisCube.owner_id == owner_id,
+    )
+    row = session.exec(stmt).first()
+    if row is None:
+        return None
+
+    cube = AudienceCube.from_bytes(row.cube)
+    with _cube_lock:
+        _cube_cache[key] = cube
+        _cube_cache.move_to_end(key)
+        while len(_cube_cache) > _CUBE_CACHE_SIZE:
+            _cube_cache.popitem(last=False)
+    return cube
@@ -0,0 +1,133 @@
+# src/services/audience_cache.py
+"""
+Cache de resultados de análise de público, endereçado pelo conteúdo.
+
+A chave é o digest do público canônico (o audience_id do arquivo colunar,
+que é o hash das colunas codificadas) + o top-N de regiões + o esquema de
+faixas etárias. Como a chave sai das colunas, o público ainda é convertido
+e codificado a cada requisição (o arquivo .aud, já existente, não é
+regravado); um acerto poupa a contagem (sketch, heavy hitters, histograma).
+Os sketches ficam num LRU em memória, protegido por lock (as rotas síncronas
+rodam no threadpool), e, opcionalmente, também no banco SQLModel
+(sobrevivem a reinícios). A tabela guarda no máximo
+AUDIENCE_CACHE_PERSIST_MAX_ROWS linhas: a cada gravação, as mais antigas
+além do limite são apagadas.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from sqlmodel import Session, delete, func, select
+
+from src.audience_analyzer.age_schemes import DEFAULT_SCHEME_ID
+from src.audience_analyzer.sketch import AudienceSketch
+from src.core.config import settings
+from src.models.audience_cache import AudienceAnalysisCache
+
+_lock = threading.Lock()
+_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "persistent_hits": 0}
+
+
+def analysis_digest(
+    audience_id: str,
+    top_k: Optional[int],
+    age_scheme: str = DEFAULT_SCHEME_ID,
+) -> str:
+    return f"{audience_id}:{top_k or 0}:{age_scheme}"
+
+
+def _remember(digest: str, data: bytes) -> None:
+    with _lock:
+        _cache[digest] = data
+        _cache.move_to_end(digest)
+        while len(_cache) > settings.AUDIENCE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _count(*keys: str) -> None:
+    with _lock:
+        for key in keys:
+            _stats[key] += 1
+
+
+def get_cached_sketch(session: Session, digest: str) -> Optional[AudienceSketch]:
+    """
+    Sketch já calculado para o digest (memória e, se habilitado, banco).
+    """
+    if settings.AUDIENCE_CACHE_SIZE <= 0:
+        return None
+
+    with _lock:
+        data = _cache.get(digest)
+        if data is not None:
+            _cache.move_to_end(digest)
+            _stats["hits"] += 1
+    if data is not None:
+        return AudienceSketch.from_bytes(data)
+
+    if settings.AUDIENCE_CACHE_PERSIST:
+        row = session.get(AudienceAnalysisCache, digest)
+        if row is not None:
+            _remember(digest, row.sketch)
+            _count("hits", "persistent_hits")
+            return AudienceSketch.from_bytes(row.sketch)
+
+    _count("misses")
+    return None
+
+
+def store_cached_sketch(session: Session, digest: str, sketch: AudienceSketch) -> None:
+    if settings.AUDIENCE_CACHE_SIZE <= 0:
+        return
+
+    data = sketch.to_bytes()
+    _remember(digest, data)
+
+    if settings.AUDIENCE_CACHE_PERSIST:
+        session.merge(AudienceAnalysisCache(digest=digest, sketch=data))
+        session.commit()
+        _prune_persisted(session)
+
+
+def _prune_persisted(session: Session) -> None:
+    """
+    Apaga as linhas mais antigas além de AUDIENCE_CACHE_PERSIST_MAX_ROWS.
+    """
+    limit = settings.AUDIENCE_CACHE_PERSIST_MAX_ROWS
+    if limit <= 0:
+        return
+    rows = session.exec(select(func.count()).select_from(AudienceAnalysisCache)).one()
+    if rows <= limit:
+        return
+    oldest = (
+        select(AudienceAnalysisCache.digest)
+        .order_by(AudienceAnalysisCache.created_at)
+        .limit(rows - limit)
+    )
+    session.exec(
+        delete(AudienceAnalysisCache).where(AudienceAnalysisCache.digest.in_(oldest))
+    )
+    session.commit()
+
+
+def audience_cache_stats() -> Dict[str, Any]:
+    with _lock:
+        stats = dict(_stats)
+        size = len(_cache)
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        **stats,
+        "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+        "size": size,
+        "capacity": settings.AUDIENCE_CACHE_SIZE,
+        "persistent": settings.AUDIENCE_CACHE_PERSIST,
+    }
+
+
+def clear_audience_cache() -> None:
+    with _lock:
+        _cache.clear()
+        for key in _stats:
+            _stats[key] = 0
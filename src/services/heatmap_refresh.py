@@ -0,0 +1,237 @@
+# src/services/heatmap_refresh.py
+"""
+Recálculo noturno dos mapas de engajamento dos projetos ligados ao Instagram.
+
+Para cada projeto com `ig_user_id`, os posts publicados depois do último já
+incluído (ProjectHeatmap.last_post_at) são lidos da Graph API, viram um
+mapa parcial que é somado ao salvo (`merge`), e o mapa é gravado com as
+janelas recomendadas já calculadas; a posterior da estratégia adaptativa
+recebe os mesmos posts, na mesma transação. Cada rodada só lê o que é novo,
+seguindo a paginação da Graph API até o último post já incluído.
+
+A leitura dos posts (rede) roda num pool de POSTING_HEATMAP_JOB_WORKERS
+threads; a gravação fica na thread que chamou, com uma única sessão. Posts
+com menos de POSTING_HEATMAP_SETTLE_HOURS ficam para a rodada seguinte,
+quando as métricas já pararam de crescer. A falha de um projeto não
+interrompe os demais.
+
+O agendamento (uma rodada por dia na POSTING_HEATMAP_JOB_HOUR_UTC) é uma
+thread daemon iniciada na subida da API com POSTING_HEATMAP_JOB_ENABLED=1;
+para rodar uma vez (ex.: cron): python -m src.services.heatmap_refresh
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from src.core.config import settings
+from src.database.sqlmodel_db import engine
+from src.integrations.meta_client import MetaClient
+from src.models.project import Project
+from src.posting_time_optimizer.heatmap import (
+    EngagementHeatmap,
+    build_heatmap,
+    epoch_seconds,
+    newest_post,
+    utc_datetime,
+)
+from src.services.project_heatmap import (
+    get_project_heatmap_row,
+    heatmap_from_row,
+    store_project_heatmap,
+)
+from src.services.slot_posterior import ingest_project_media
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PLATFORM = "instagram"
+
+# (ig_user_id, desde quando [época em segundos, None = tudo]) -> posts
+MediaFetcher = Callable[[str, Optional[float]], List[Dict[str, Any]]]
+
+
+def fetch_instagram_media(
+    ig_user_id: str, since: Optional[float]
+) -> List[Dict[str, Any]]:
+    client = MetaClient(ig_business_id=ig_user_id)
+    return client.get_recent_media_insights(
+        limit=settings.POSTING_HEATMAP_MEDIA_LIMIT,
+        since=int(since) if since is not None else None,
+        max_pages=settings.POSTING_HEATMAP_MAX_PAGES,
+    )
+
+
+def _new_media(
+    fetch_media: MediaFetcher,
+    ig_user_id: str,
+    since: Optional[float],
+    settled_before: float,
+) -> List[Dict[str, Any]]:
+    """
+    Posts depois de `since` e antes de `settled_before` (roda no pool).
+    """
+    media = []
+    for item in fetch_media(ig_user_id, since):
+        instant = epoch_seconds(item.get("timestamp"))
+        if instant is None or instant >= settled_before:
+            continue
+        if since is None or instant > since:
+            media.append(item)
+    return media
+
+
+def refresh_project_heatmaps(
+    session: Session,
+    fetch_media: MediaFetcher = fetch_instagram_media,
+    workers: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Uma rodada do job para todos os projetos com ig_user_id. Devolve, por
+    projeto, {project_id, new_posts, posts, last_post_at} ou {project_id,
+    error}.
+    """
+    projects = session.exec(
+        select(Project).where(Project.ig_user_id.is_not(None), Project.ig_user_id != "")
+    ).all()
+    now = now or datetime.now(timezone.utc)
+    settled_before = (
+        now - timedelta(hours=settings.POSTING_HEATMAP_SETTLE_HOURS)
+    ).timestamp()
+
+    jobs: List[Tuple[Project, Optional[float]]] = []
+    for project in projects:
+        row = get_project_heatmap_row(session, project.owner_id, project.id, PLATFORM)
+        last = row.last_post_at if row is not None else None
+        jobs.append(
+            (project, last.replace(tzinfo=timezone.utc).timestamp() if last else None)
+        )
+
+    results = []
+    workers = workers or settings.POSTING_HEATMAP_JOB_WORKERS
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(
+                _new_media, fetch_media, project.ig_user_id, since, settled_before
+            ): project
+            for project, since in jobs
+        }
+        for future in as_completed(futures):
+            project = futures[future]
+            try:
+                media = future.result()
+                results.append(_store(session, project, media))
+            except Exception as e:
+                session.rollback()
+                logger.warning(f"Mapa do projeto {project.id} não atualizado: {e}")
+                results.append({"project_id": project.id, "error": str(e)})
+
+    return sorted(results, key=lambda result: result["project_id"])
+
+
+def _store(
+    session: Session, project: Project, media: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    row = get_project_heatmap_row(session, project.owner_id, project.id, PLATFORM)
+    offset = (
+        row.utc_offset_hours if row is not None else settings.POSTING_UTC_OFFSET_HOURS
+    )
+    if not media:
+        return {
+            "project_id": project.id,
+            "new_posts": 0,
+            "posts": row.posts_count if row is not None else 0,
+            "last_post_at": _iso(row.last_post_at if row is not None else None),
+        }
+
+    heatmap: EngagementHeatmap = build_heatmap(media, utc_offset_hours=offset)
+    if row is not None:
+        heatmap = heatmap_from_row(row).merge(heatmap)
+    # Mapa e posterior na mesma transação: se uma das gravações falhar,
+    # nenhuma vale e a próxima rodada relê os mesmos posts sem contá-los
+    # duas vezes
+    row = store_project_heatmap(
+        session,
+        project.owner_id,
+        project.id,
+        PLATFORM,
+        heatmap,
+        offset,
+        last_post_at=utc_datetime(newest_post(media)),
+        commit=False,
+    )
+    ingest_project_media(
+        session, project.owner_id, project.id, PLATFORM, media, offset, commit=False
+    )
+    session.commit()
+    return {
+        "project_id": project.id,
+        "new_posts": len(media),
+        "posts": row.posts_count,
+        "last_post_at": _iso(row.last_post_at),
+    }
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def run_heatmap_refresh(
+    fetch_media: MediaFetcher = fetch_instagram_media,
+) -> List[Dict[str, Any]]:
+    started = time.monotonic()
+    with Session(engine) as session:
+        results = refresh_project_heatmaps(session, fetch_media)
+    failed = sum(1 for result in results if "error" in result)
+    logger.info(
+        f"Mapas de engajamento atualizados: {len(results) - failed} projetos, "
+        f"{failed} com erro, {time.monotonic() - started:.1f}s"
+    )
+    return results
+
+
+# ---------- agendamento ----------
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def seconds_until_next_run(now: datetime, hour_utc: int) -> float:
+    next_run = now.replace(hour=hour_utc % 24, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+def _loop() -> None:
+    while not _stop.wait(
+        seconds_until_next_run(
+            datetime.now(timezone.utc), settings.POSTING_HEATMAP_JOB_HOUR_UTC
+        )
+    ):
+        try:
+            run_heatmap_refresh()
+        except Exception:
+            logger.exception("Falha no job de mapas de engajamento")
+
+
+def start_heatmap_scheduler() -> None:
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_loop, name="heatmap-refresh", daemon=True)
+    _thread.start()
+
+
+def stop_heatmap_scheduler() -> None:
+    _stop.set()
+
+
+if __name__ == "__main__":
+    run_heatmap_refresh()
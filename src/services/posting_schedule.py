@@ -0,0 +1,78 @@
+# src/services/posting_schedule.py
+"""
+Agendas semanais de postagem por projeto e plataforma.
+
+Os scores de cada hora vêm do mapa de engajamento do projeto (quando há
+posts suficientes) ou da curva das regras da plataforma. Todas as agendas
+pedidas (vários projetos × plataformas) vão juntas para o agendador, que
+faz a etapa gulosa numa única matriz.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlmodel import Session
+
+from src.posting_time_optimizer.heatmap import MIN_POSTS
+from src.posting_time_optimizer.rules import get_posting_rules
+from src.posting_time_optimizer.scheduler import (
+    ScheduleConstraints,
+    describe_schedule,
+    schedule_batch,
+    scores_from_curve,
+    week_scores,
+)
+from src.services.project_heatmap import get_project_heatmap
+
+
+@dataclass
+class ScheduleJob:
+    project_id: int
+    platform: str
+    posts_per_week: int
+    constraints: ScheduleConstraints
+    main_age_bucket: Optional[str] = None
+    # Scores informados pelo cliente (24, 7 x 24 ou 168 valores)
+    scores: Optional[Sequence[Any]] = None
+
+
+def schedule_scores(
+    session: Session, owner_id: int, job: ScheduleJob
+) -> Tuple[np.ndarray, str]:
+    """
+    Scores das 168 horas da semana para a agenda e a origem deles.
+    """
+    if job.scores is not None:
+        return week_scores(job.scores), "request"
+
+    heatmap = get_project_heatmap(session, owner_id, job.project_id, job.platform)
+    if heatmap is not None and heatmap.total_posts >= MIN_POSTS:
+        return heatmap.scores().ravel(), "engagement"
+
+    rule = get_posting_rules().platform(job.platform)
+    return scores_from_curve(rule.slots_for(job.main_age_bucket).curve), "heuristic"
+
+
+def build_schedules(
+    session: Session, owner_id: int, jobs: Sequence[ScheduleJob]
+) -> List[Dict[str, Any]]:
+    """
+    Agenda todas as combinações projeto × plataforma de uma vez; devolve,
+    na ordem dos jobs, a agenda descrita por `describe_schedule`.
+    """
+    sources = [schedule_scores(session, owner_id, job) for job in jobs]
+    schedules = schedule_batch(
+        [scores for scores, _ in sources],
+        [job.posts_per_week for job in jobs],
+        [job.constraints for job in jobs],
+    )
+    return [
+        {
+            "project_id": job.project_id,
+            "platform": job.platform.lower(),
+            "source": source,
+            **describe_schedule(hours, scores, job.posts_per_week),
+        }
+        for job, (scores, source), hours in zip(jobs, sources, schedules)
+    ]
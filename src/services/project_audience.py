@@ -0,0 +1,140 @@
+# src/services/project_audience.py
+"""
+Públicos salvos por projeto (totais acumulados e público atual por deltas).
+
+As duas atualizações são ler-somar-gravar do sketch inteiro: por projeto,
+elas são serializadas por um lock (threads deste processo) e pelo
+SELECT ... FOR UPDATE (bancos com lock de linha). Entre processos no
+SQLite, duas primeiras gravações simultâneas ainda podem colidir na chave
+primária; quem chama trata o IntegrityError.
+"""
+
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from src.audience_analyzer.sketch import AudienceSketch
+from src.audience_analyzer.columnar import AudienceColumns
+from src.models.project_audience import ProjectAudience, ProjectAudienceTotals
+
+# Locks por projeto (listras fixas: project_id % N), para não crescer com o
+# número de projetos
+_LOCK_STRIPES = 64
+_locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+
+
+def _project_lock(project_id: int) -> threading.Lock:
+    return _locks[project_id % _LOCK_STRIPES]
+
+
+def get_project_audience_totals(
+    session: Session,
+    owner_id: int,
+    project_id: int,
+    for_update: bool = False,
+) -> Optional[ProjectAudienceTotals]:
+    stmt = select(ProjectAudienceTotals).where(
+        ProjectAudienceTotals.project_id == project_id,
+        ProjectAudienceTotals.owner_id == owner_id,
+    )
+    if for_update:
+        stmt = stmt.with_for_update().execution_options(populate_existing=True)
+    return session.exec(stmt).first()
+
+
+def merge_project_audience_totals(
+    session: Session,
+    owner_id: int,
+    project_id: int,
+    sketch: AudienceSketch,
+) -> ProjectAudienceTotals:
+    """
+    Soma o sketch de uma nova análise aos totais do projeto.
+    Levanta IntegrityError se outro processo criou os totais ao mesmo tempo.
+    """
+    with _project_lock(project_id):
+        totals = get_project_audience_totals(
+            session, owner_id, project_id, for_update=True
+        )
+
+        if totals is None:
+            merged = sketch
+            totals = ProjectAudienceTotals(
+                project_id=project_id,
+                owner_id=owner_id,
+                sketch=b"",
+            )
+        else:
+            merged = AudienceSketch.from_bytes(totals.sketch).merge(sketch)
+
+        totals.sketch = merged.to_bytes()
+        totals.total_users = merged.total_users
+        totals.analyses_count += 1
+        totals.updated_at = datetime.utcnow()
+
+        session.add(totals)
+        session.commit()
+        session.refresh(totals)
+        return totals
+
+
+def get_project_audience(
+    session: Session,
+    owner_id: int,
+    project_id: int,
+    for_update: bool = False,
+) -> Optional[ProjectAudience]:
+    stmt = select(ProjectAudience).where(
+        ProjectAudience.project_id == project_id,
+        ProjectAudience.owner_id == owner_id,
+    )
+    if for_update:
+        stmt = stmt.with_for_update().execution_options(populate_existing=True)
+    return session.exec(stmt).first()
+
+
+def apply_project_audience_delta(
+    session: Session,
+    owner_id: int,
+    project_id: int,
+    age_scheme: str,
+    added: Optional[AudienceColumns] = None,
+    removed: Optional[AudienceColumns] = None,
+) -> ProjectAudience:
+    """
+    Aplica um delta (usuários que entraram / saíram) ao público do projeto.
+    Custa O(delta + valores distintos): o público inteiro nunca é recontado.
+    Levanta ValueError se a remoção não couber no público atual e
+    IntegrityError se outro processo criou o público ao mesmo tempo.
+    """
+    with _project_lock(project_id):
+        audience = get_project_audience(session, owner_id, project_id, for_update=True)
+
+        if audience is None:
+            sketch = AudienceSketch(age_scheme=age_scheme)
+            audience = ProjectAudience(
+                project_id=project_id,
+                owner_id=owner_id,
+                age_scheme=age_scheme,
+                sketch=b"",
+            )
+        else:
+            sketch = AudienceSketch.from_bytes(audience.sketch)
+
+        if added is not None:
+            sketch.add_columns(added)
+        if removed is not None:
+            sketch.subtract(
+                AudienceSketch(age_scheme=sketch.age_scheme).add_columns(removed)
+            )
+
+        audience.sketch = sketch.to_bytes()
+        audience.total_users = sketch.total_users
+        audience.updated_at = datetime.utcnow()
+
+        session.add(audience)
+        session.commit()
+        session.refresh(audience)
+        return audience
@@ -0,0 +1,180 @@
+# src/services/project_heatmap.py
+"""
+Mapas de engajamento por projeto e plataforma.
+
+O mapa fica salvo no banco (ProjectHeatmap) com as janelas recomendadas já
+calculadas, e os já lidos ficam num LRU em memória, então as sugestões de
+horário não voltam ao banco nem recalculam as janelas a cada requisição.
+Gravar um mapa novo substitui o anterior nos dois lugares.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from src.core.config import settings
+from src.models.project_heatmap import ProjectHeatmap
+from src.posting_time_optimizer.heatmap import EngagementHeatmap, heatmap_slots
+
+# (owner_id, project_id, plataforma) -> mapa
+_cache: "OrderedDict[Tuple[int, int, str], EngagementHeatmap]" = OrderedDict()
+# O LRU é usado pelas requisições e pelas threads do job noturno
+_lock = threading.Lock()
+
+
+def _key(owner_id: int, project_id: int, platform: str) -> Tuple[int, int, str]:
+    return owner_id, project_id, platform.lower()
+
+
+def _cached(key: Tuple[int, int, str]) -> Optional[EngagementHeatmap]:
+    with _lock:
+        heatmap = _cache.get(key)
+        if heatmap is not None:
+            _cache.move_to_end(key)
+        return heatmap
+
+
+def _remember(key: Tuple[int, int, str], heatmap: EngagementHeatmap) -> None:
+    if settings.POSTING_HEATMAP_CACHE_SIZE <= 0:
+        return
+    with _lock:
+        _cache[key] = heatmap
+        _cache.move_to_end(key)
+        while len(_cache) > settings.POSTING_HEATMAP_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _forget(key: Tuple[int, int, str]) -> None:
+    with _lock:
+        _cache.pop(key, None)
+
+
+def heatmap_from_row(row: ProjectHeatmap) -> EngagementHeatmap:
+    heatmap = EngagementHeatmap.from_bytes(row.heatmap)
+    heatmap.slots = json.loads(row.best_slots) if row.best_slots else None
+    return heatmap
+
+
+def get_project_heatmap_row(
+    session: Session,
+    owner_id: int,
+    project_id: int,
+    platform: str,
+) -> Optional[ProjectHeatmap]:
+    stmt = select(ProjectHeatmap).where(
+        ProjectHeatmap.project_id == project_id,
+        ProjectHeatmap.platform == platform.lower(),
+        ProjectHeatmap.owner_id == owner_id,
+    )
+    return session.exec(stmt).first()
+
+
+def get_project_heatmap(
+    session: Session,
+    owner_id: int,
+    project_id: int,
+    platform: str,
+) -> Optional[EngagementHeatmap]:
+    """
+    Mapa salvo do projeto para a plataforma (memória, depois banco).
+    """
+    key = _key(owner_id, project_id, platform)
+    heatmap = _cached(key)
+    if heatmap is not None:
+        return heatmap
+
+    row = get_project_heatmap_row(session, owner_id, project_id, platform)
+    if row is None:
+        return None
+    heatmap = heatmap_from_row(row)
+    _remember(key, heatmap)
+    return heatmap
+
+
+def get_project_heatmaps(
+    session: Session,
+    owner_id: int,
+    keys: Iterable[Tuple[int, str]],
+) -> Dict[Tuple[int, str], EngagementHeatmap]:
+    """
+    Mapas salvos de vários (projeto, plataforma) de uma vez: os que não
+    estão na memória vêm numa única consulta. Chaves sem mapa ficam de fora.
+    """
+    found: Dict[Tuple[int, str], EngagementHeatmap] = {}
+    missing = set()
+    for project_id, platform in keys:
+        key = (project_id, platform.lower())
+        heatmap = _cached(_key(owner_id, *key))
+        if heatmap is not None:
+            found[key] = heatmap
+        else:
+            missing.add(key)
+
+    if missing:
+        stmt = select(ProjectHeatmap).where(
+            ProjectHeatmap.owner_id == owner_id,
+            ProjectHeatmap.project_id.in_({project_id for project_id, _ in missing}),
+        )
+        for row in session.exec(stmt):
+            key = (row.project_id, row.platform)
+            if key in missing:
+                found[key] = heatmap_from_row(row)
+                _remember(_key(owner_id, *key), found[key])
+    return found
+
+
+def store_project_heatmap(
+    session: Session,
+    owner_id: int,
+    project_id: int,
+    platform: str,
+    heatmap: EngagementHeatmap,
+    utc_offset_hours: float,
+    last_post_at: Optional[datetime] = None,
+    commit: bool = True,
+) -> ProjectHeatmap:
+    """
+    Grava o mapa (substitui o anterior) junto com as janelas já calculadas,
+    que passam a ser servidas sem recalcular. Com commit=False a gravação
+    fica na transação de quem chamou (o LRU só é esvaziado para o projeto;
+    a próxima leitura recarrega do banco).
+    """
+    row = get_project_heatmap_row(session, owner_id, project_id, platform)
+    if row is None:
+        row = ProjectHeatmap(
+            project_id=project_id,
+            platform=platform.lower(),
+            owner_id=owner_id,
+            heatmap=b"",
+        )
+
+    heatmap.slots = None
+    heatmap.slots = heatmap_slots(heatmap)
+
+    row.heatmap = heatmap.to_bytes()
+    row.best_slots = json.dumps(heatmap.slots) if heatmap.slots else None
+    row.posts_count = heatmap.total_posts
+    row.utc_offset_hours = utc_offset_hours
+    row.last_post_at = last_post_at
+    row.updated_at = datetime.utcnow()
+
+    session.add(row)
+    if not commit:
+        session.flush()
+        _forget(_key(owner_id, project_id, platform))
+        return row
+
+    session.commit()
+    session.refresh(row)
+
+    _remember(_key(owner_id, project_id, platform), heatmap)
+    return row
+
+
+def clear_heatmap_cache() -> None:
+    with _lock:
+        _cache.clear()
@@ -1,5 +1,5 @@
 # src/services/projects.py
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
 from sqlmodel import Session, select
 
@@ -13,6 +13,7 @@ def create_project(session: Session, owner_id: int, data: ProjectCreate) -> Proj
         name=data.name,
         description=data.description,
         ig_user_id=data.ig_user_id,
+        age_scheme=data.age_scheme,
     )
     session.add(project)
     session.commit()
@@ -30,4 +31,20 @@ def list_projects(session: Session, owner_id: int) -> List[Project]:
 
 
 def get_project(session: Session, owner_id: int, project_id: int) -> Project | None:
-    return session.get(Project, project_id) if project_id else None
+    if not project_id:
+        return None
+    stmt = select(Project).where(Project.id == project_id, Project.owner_id == owner_id)
+    return session.exec(stmt).first()
+
+
+def get_projects_by_ids(
+    session: Session, owner_id: int, project_ids: Iterable[int]
+) -> Dict[int, Project]:
+    """
+    Vários projetos do usuário numa única consulta, indexados pelo id.
+    """
+    ids = set(project_ids)
+    if not ids:
+        return {}
+    stmt = select(Project).where(Project.id.in_(ids), Project.owner_id == owner_id)
+    return {project.id: project for project in session.exec(stmt)}
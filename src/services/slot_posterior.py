@@ -0,0 +1,91 @@
+# src/services/slot_posterior.py
+"""
+Posterior de horários (escolha adaptativa) por projeto e plataforma.
+
+Cada lote de posts recebido é somado ao estado salvo (ProjectSlotPosterior):
+só os posts mais novos que o último já incluído contam, então o mesmo lote
+(ou um lote que repete posts antigos) pode ser reenviado sem distorcer a
+posterior.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from src.models.project_slot_posterior import ProjectSlotPosterior
+from src.posting_time_optimizer.heatmap import utc_datetime
+from src.posting_time_optimizer.posterior import SlotPosterior, ingest_media
+
+
+def get_slot_posterior_row(
+    session: Session,
+    owner_id: int,
+    project_id: int,
+    platform: str,
+) -> Optional[ProjectSlotPosterior]:
+    stmt = select(ProjectSlotPosterior).where(
+        ProjectSlotPosterior.project_id == project_id,
+        ProjectSlotPosterior.platform == platform.lower(),
+        ProjectSlotPosterior.owner_id == owner_id,
+    )
+    return session.exec(stmt).first()
+
+
+def get_slot_posterior(
+    session: Session,
+    owner_id: int,
+    project_id: int,
+    platform: str,
+) -> Optional[SlotPosterior]:
+    row = get_slot_posterior_row(session, owner_id, project_id, platform)
+    return SlotPosterior.from_bytes(row.state) if row is not None else None
+
+
+def ingest_project_media(
+    session: Session,
+    owner_id: int,
+    project_id: int,
+    platform: str,
+    media: Iterable[Dict[str, Any]],
+    utc_offset_hours: float,
+    commit: bool = True,
+) -> Tuple[ProjectSlotPosterior, SlotPosterior, int]:
+    """
+    Soma os posts novos à posterior salva (cria na primeira vez). O fuso
+    das células é o do primeiro lote. Devolve (linha, posterior, posts
+    incluídos). Com commit=False a gravação fica na transação de quem chamou.
+    """
+    row = get_slot_posterior_row(session, owner_id, project_id, platform)
+    if row is None:
+        row = ProjectSlotPosterior(
+            project_id=project_id,
+            platform=platform.lower(),
+            owner_id=owner_id,
+            utc_offset_hours=utc_offset_hours,
+            state=b"",
+        )
+        posterior = SlotPosterior()
+    else:
+        posterior = SlotPosterior.from_bytes(row.state)
+
+    since = (
+        row.last_post_at.replace(tzinfo=timezone.utc).timestamp()
+        if row.last_post_at is not None
+        else None
+    )
+    added, newest = ingest_media(posterior, media, row.utc_offset_hours, since)
+
+    if newest is not None:
+        row.last_post_at = utc_datetime(newest)
+    row.state = posterior.to_bytes()
+    row.posts_count = posterior.total_posts
+    row.updated_at = datetime.utcnow()
+
+    session.add(row)
+    if commit:
+        session.commit()
+        session.refresh(row)
+    else:
+        session.flush()
+    return row, posterior, added
@@ -1,103 +1,81 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.suggestion_engine.templates import get_suggestion_templates
 from src.utils.helpers import normalize_topic
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-def get_basic_suggestions(topic: str):
+def get_basic_suggestions(topic: str, language: Optional[str] = None):
     """
     Sugestões básicas simples.
     """
     topic = normalize_topic(topic)
     logger.info(f"Gerando sugestões básicas para: {topic}")
 
-    return [
-        f"Ideia 1 sobre {topic}",
-        f"Ideia 2 sobre {topic}",
-        f"Ideia 3 sobre {topic}",
+    templates = get_suggestion_templates().template_set("", "basic", language)
+    return [suggestion["idea"] for suggestion in templates.render(topic)]
+
+
+def describe_persona(persona: Dict[str, Any]) -> str:
+    """
+    Descrição curta de uma persona da segmentação (faixa · gênero · região).
+    """
+    parts = [
+        persona.get("age_bucket"),
+        next(iter(persona.get("gender") or {}), None),
+        next(iter(persona.get("region") or {}), None),
     ]
+    return " · ".join(str(p) for p in parts if p)
 
 
-def get_platform_suggestions(topic: str, platform: str):
+def get_platform_suggestions(
+    topic: str,
+    platform: str,
+    persona: Optional[Dict[str, Any]] = None,
+    language: Optional[str] = None,
+):
     """
-    Sugestões mais ricas, adaptadas por plataforma.
+    Sugestões mais ricas, adaptadas por plataforma (modelos em
+    data/suggestion_templates.json).
+    Com `persona` (ver audience_analyzer.segments), cada sugestão indica o
+    público-alvo.
     """
     topic = normalize_topic(topic)
     platform = platform.lower()
     logger.info(f"Gerando sugestões ricas para '{topic}' em '{platform}'")
 
-    suggestions = []
-
-    if platform == "instagram":
-        suggestions.extend(
-            [
-                {
-                    "format": "reels",
-                    "idea": f"Reels: '3 erros que te impedem de evoluir em {topic}'.",
-                },
-                {
-                    "format": "carrossel",
-                    "idea": f"Carrossel: '5 passos para melhorar seu {topic}'.",
-                },
-                {
-                    "format": "story",
-                    "idea": f"Story: Pergunte 'Qual sua maior dúvida sobre {topic}?'",
-                },
-            ]
-        )
-
-    elif platform == "tiktok":
-        suggestions.extend(
-            [
-                {
-                    "format": "short-video",
-                    "idea": f"Vídeo curto: 'Ninguém te conta isso sobre {topic}...'",
-                },
-                {
-                    "format": "duet",
-                    "idea": f"Dueto reagindo a um vídeo polêmico sobre {topic}.",
-                },
-                {
-                    "format": "trend",
-                    "idea": f"Use uma trend para explicar um conceito de {topic}.",
-                },
-            ]
-        )
+    templates = get_suggestion_templates().template_set(platform, "rich", language)
+    suggestions = templates.render(topic)
 
-    elif platform == "linkedin":
-        suggestions.extend(
-            [
-                {
-                    "format": "texto",
-                    "idea": f"Post textual: explique um case real envolvendo {topic}.",
-                },
-                {
-                    "format": "artigo",
-                    "idea": f"Artigo: 'Panorama atual de {topic} e as próximas tendências'.",
-                },
-                {
-                    "format": "carrossel",
-                    "idea": f"Carrossel com dados e insights profissionais sobre {topic}.",
-                },
-            ]
-        )
-
-    else:
-        suggestions.extend(
-            [
-                {
-                    "format": "genérico",
-                    "idea": f"Post introdutório com o básico de {topic}.",
-                },
-                {
-                    "format": "genérico",
-                    "idea": f"Lista: '5 mitos e verdades sobre {topic}'.",
-                },
-            ]
-        )
-
-    return {
+    result = {
         "topic": topic,
         "platform": platform,
         "suggestions": suggestions,
     }
+    if persona:
+        audience = describe_persona(persona)
+        for suggestion in suggestions:
+            suggestion["audience"] = audience
+        result["persona"] = audience
+    return result
+
+
+def render_many(
+    topics: Iterable[str],
+    platform: str = "",
+    mode: str = "rich",
+    language: Optional[str] = None,
+) -> List[List[Any]]:
+    """
+    Sugestões de um modo para muitos temas de uma vez (o conjunto de
+    modelos é resolvido uma vez só). Na mesma ordem de `topics`: listas de
+    textos no modo "basic" e de {format, idea} nos demais, como em
+    get_basic_suggestions / get_platform_suggestions (sem persona).
+    """
+    templates = get_suggestion_templates().template_set(platform, mode, language)
+    rendered = templates.render_many(normalize_topic(topic) for topic in topics)
+    if mode == "basic":
+        return [[suggestion["idea"] for suggestion in row] for row in rendered]
+    return rendered
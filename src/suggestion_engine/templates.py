@@ -0,0 +1,205 @@
+# src/suggestion_engine/templates.py
+"""
+Modelos de sugestão lidos de um JSON (data/suggestion_templates.json ou
+SUGGESTION_TEMPLATES_PATH).
+
+O arquivo define, por plataforma (com aliases) e para a plataforma padrão,
+os conjuntos de sugestões de cada modo ("basic", "rich") e idioma. Cada
+sugestão é um dict de campos com modelos no formato de str.format, e o
+único campo substituível é {topic}. Na carga cada modelo é quebrado nas
+partes literais em volta de {topic}, então preencher é só
+`topic.join(partes)`; o registro é um dict (plataforma, modo, idioma) ->
+conjunto pronto.
+
+Como as regras de horário, o arquivo é relido quando muda (mtime,
+verificado no máximo a cada SUGGESTION_TEMPLATES_RELOAD_SECONDS) e um
+arquivo inválido mantém os modelos anteriores.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from string import Formatter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.core.config import settings
+from src.utils.file_reload import FileReloader
+
+DEFAULT_TEMPLATES_PATH = Path(__file__).parent / "data" / "suggestion_templates.json"
+
+# Chave interna da plataforma padrão no registro
+DEFAULT_PLATFORM = "*"
+
+# Modos que a plataforma padrão precisa ter no idioma padrão
+MODES = ("basic", "rich")
+
+SLOT = "topic"
+
+
+class InvalidSuggestionTemplates(ValueError):
+    pass
+
+
+def split_template(template: str) -> Tuple[str, ...]:
+    """
+    Partes literais em volta de cada {topic}: "a {topic} b" -> ("a ", " b").
+    Chaves escapadas ({{ }}) já saem resolvidas.
+    """
+    parts = [""]
+    try:
+        for literal, field, spec, conversion in Formatter().parse(template):
+            parts[-1] += literal
+            if field is None:
+                continue
+            if field != SLOT or spec or conversion:
+                raise InvalidSuggestionTemplates(
+                    f"Campo {{{field}}} não suportado em '{template}'."
+                )
+            parts.append("")
+    except ValueError as e:
+        raise InvalidSuggestionTemplates(f"Modelo inválido '{template}': {e}")
+    return tuple(parts)
+
+
+@dataclass(frozen=True)
+class TemplateSet:
+    # Por sugestão: ((campo, partes literais), ...)
+    items: Tuple[Tuple[Tuple[str, Tuple[str, ...]], ...], ...]
+
+    def render(self, topic: str) -> List[Dict[str, str]]:
+        return [
+            {field: topic.join(parts) for field, parts in item} for item in self.items
+        ]
+
+    def render_many(self, topics: Iterable[str]) -> List[List[Dict[str, str]]]:
+        return [self.render(topic) for topic in topics]
+
+
+@dataclass(frozen=True)
+class SuggestionTemplates:
+    sets: Dict[Tuple[str, str, str], TemplateSet]
+    platforms: Dict[str, str]  # nome e aliases em minúsculas -> nome
+    default_language: str
+    path: str
+    mtime: float
+
+    def template_set(
+        self, platform: str, mode: str, language: Optional[str] = None
+    ) -> TemplateSet:
+        """
+        Conjunto do modo para a plataforma e o idioma; cai para o idioma
+        base ("pt" de "pt-BR"), o idioma padrão e a plataforma padrão.
+        """
+        name = self.platforms.get(platform.lower(), DEFAULT_PLATFORM)
+        languages = [self.default_language]
+        if language:
+            language = language.lower()
+            languages[:0] = [language, language.split("-")[0]]
+        for key in (name, DEFAULT_PLATFORM):
+            for lang in languages:
+                found = self.sets.get((key, mode, lang))
+                if found is not None:
+                    return found
+        raise ValueError(f"Modo de sugestão desconhecido: {mode}")
+
+
+def _template_set(where: str, items: Any) -> TemplateSet:
+    if not isinstance(items, list) or not items:
+        raise InvalidSuggestionTemplates(f"{where}: lista de sugestões vazia.")
+    compiled = []
+    for item in items:
+        if not isinstance(item, dict) or not all(
+            isinstance(value, str) for value in item.values()
+        ):
+            raise InvalidSuggestionTemplates(
+                f"{where}: cada sugestão é um objeto de campos em texto."
+            )
+        compiled.append(
+            tuple((field, split_template(value)) for field, value in item.items())
+        )
+    return TemplateSet(items=tuple(compiled))
+
+
+def _platform_sets(
+    name: str, key: str, spec: Dict[str, Any]
+) -> Dict[Tuple[str, str, str], TemplateSet]:
+    sets = {}
+    for mode, by_language in spec.items():
+        if mode == "aliases":
+            continue
+        if not isinstance(by_language, dict):
+            raise InvalidSuggestionTemplates(
+                f"Plataforma {name}, modo {mode}: esperado um objeto por idioma."
+            )
+        for language, items in by_language.items():
+            sets[(key, mode, language.lower())] = _template_set(
+                f"Plataforma {name}, modo {mode}, idioma {language}", items
+            )
+    return sets
+
+
+def compile_suggestion_templates(
+    data: Dict[str, Any], path: str = "", mtime: float = 0.0
+) -> SuggestionTemplates:
+    """
+    Compila o conteúdo do JSON de modelos. Levanta InvalidSuggestionTemplates
+    se algum modelo for inválido ou se a plataforma padrão não cobrir os
+    MODES no idioma padrão.
+    """
+    default_language = str(data.get("default_language", "pt-BR")).lower()
+
+    sets: Dict[Tuple[str, str, str], TemplateSet] = {}
+    platforms: Dict[str, str] = {}
+    for name, spec in data.get("platforms", {}).items():
+        sets.update(_platform_sets(name, name.lower(), spec))
+        for key in (name, *spec.get("aliases", ())):
+            platforms[key.lower()] = name.lower()
+
+    if "default" not in data:
+        raise InvalidSuggestionTemplates("Modelos sem a plataforma padrão (default).")
+    sets.update(_platform_sets("default", DEFAULT_PLATFORM, data["default"]))
+    for mode in MODES:
+        if (DEFAULT_PLATFORM, mode, default_language) not in sets:
+            raise InvalidSuggestionTemplates(
+                f"Plataforma padrão sem o modo {mode} em {default_language}."
+            )
+
+    return SuggestionTemplates(
+        sets=sets,
+        platforms=platforms,
+        default_language=default_language,
+        path=path,
+        mtime=mtime,
+    )
+
+
+def load_suggestion_templates(path: Optional[str] = None) -> SuggestionTemplates:
+    path = str(path or settings.SUGGESTION_TEMPLATES_PATH or DEFAULT_TEMPLATES_PATH)
+    mtime = os.stat(path).st_mtime
+    with open(path, encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise InvalidSuggestionTemplates(f"JSON inválido em {path}: {e}")
+    return compile_suggestion_templates(data, path, mtime)
+
+
+_reloader: FileReloader[SuggestionTemplates] = FileReloader(
+    "Modelos de sugestão",
+    path=lambda: str(settings.SUGGESTION_TEMPLATES_PATH or DEFAULT_TEMPLATES_PATH),
+    load=load_suggestion_templates,
+    interval=lambda: settings.SUGGESTION_TEMPLATES_RELOAD_SECONDS,
+    errors=(InvalidSuggestionTemplates,),
+)
+
+
+def get_suggestion_templates() -> SuggestionTemplates:
+    """
+    Modelos compilados; relê o arquivo se ele mudou desde a última carga.
+    """
+    return _reloader.get()
+
+
+def reset_suggestion_templates() -> None:
+    _reloader.reset()
@@ -0,0 +1,75 @@
+# src/utils/file_reload.py
+"""
+Conteúdo compilado de um arquivo de configuração, relido quando ele muda.
+
+O mtime é verificado no máximo a cada `interval()` segundos; entre as
+verificações a leitura é só um acesso ao estado em memória. Um arquivo
+inválido na recarga não derruba nada: a versão anterior continua valendo e
+o erro vai para o log (na primeira carga, o erro sobe para quem chamou).
+Usado pelas regras de horário e pelos modelos de sugestão.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Generic, Optional, Protocol, Tuple, Type, TypeVar
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LoadedFile(Protocol):
+    path: str
+    mtime: float
+
+
+T = TypeVar("T", bound=LoadedFile)
+
+
+class FileReloader(Generic[T]):
+    def __init__(
+        self,
+        label: str,
+        path: Callable[[], str],
+        load: Callable[[str], T],
+        interval: Callable[[], float],
+        errors: Tuple[Type[Exception], ...] = (),
+    ):
+        # path/interval são chamados a cada verificação (seguem o settings)
+        self.label = label
+        self._path = path
+        self._load = load
+        self._interval = interval
+        self._errors = (OSError, *errors)
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._checked_at = 0.0
+
+    def get(self) -> T:
+        value = self._value
+        now = time.monotonic()
+        if value is not None and now - self._checked_at < self._interval():
+            return value
+
+        with self._lock:
+            value = self._value
+            path = self._path()
+            self._checked_at = now
+            try:
+                if value is None:
+                    value = self._load(path)
+                elif value.path != path or os.stat(path).st_mtime != value.mtime:
+                    value = self._load(path)
+                    logger.info(f"{self.label}: recarregado de {path}")
+            except self._errors as e:
+                if value is None:
+                    raise
+                logger.warning(f"{self.label}: mantido (falha ao recarregar): {e}")
+            self._value = value
+            return value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = None
+            self._checked_at = 0.0
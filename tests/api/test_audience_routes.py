@@ -0,0 +1,119 @@
+# tests/api/test_audience_routes.py
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+USERS = [
+    {"age": 32, "gender": "female", "region": "Rio de Janeiro"},
+    {"age": 28, "gender": "female", "region": "São Paulo"},
+    {"age": 19, "gender": "male", "region": "São Paulo"},
+]
+
+
+def _ndjson(users) -> bytes:
+    return "\n".join(json.dumps(u) for u in users).encode("utf-8")
+
+
+@pytest.mark.api
+def test_analyze_stream_igual_ao_endpoint_json(client: TestClient):
+    resp_json = client.post("/api/audience/analyze", json={"users": USERS})
+    resp_stream = client.post(
+        "/api/audience/analyze/stream",
+        content=_ndjson(USERS),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert resp_stream.status_code == 200, resp_stream.text
+    assert resp_stream.json()["summary"] == resp_json.json()["summary"]
+    assert resp_stream.json()["input_size"] == len(USERS)
+
+
+@pytest.mark.api
+def test_analyze_stream_registro_invalido_retorna_422(client: TestClient):
+    resp = client.post(
+        "/api/audience/analyze/stream",
+        content=b'{"age": 30, "gender": "female"}\n',
+    )
+
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["loc"] == ["body", 1, "region"]
+
+
+@pytest.mark.api
+def test_strategy_stream_mesma_audiencia_que_strategy(
+    client: TestClient, auth_headers: dict
+):
+    params = {"topic": "moda", "platform": "instagram"}
+
+    resp_json = client.post(
+        "/api/content/strategy",
+        json={**params, "users": USERS},
+        headers=auth_headers,
+    )
+    resp_stream = client.post(
+        "/api/content/strategy/stream",
+        params=params,
+        content=_ndjson(USERS),
+        headers=auth_headers,
+    )
+
+    assert resp_stream.status_code == 200, resp_stream.text
+    assert resp_stream.json()["audience"] == resp_json.json()["audience"]
+
+
+@pytest.mark.api
+def test_analyze_com_amostra_retorna_intervalos(client: TestClient):
+    resp = client.post("/api/audience/analyze?sample=2", json={"users": USERS})
+
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["input_size"] == 3
+    assert data["summary"]["total_users"] == 2
+    assert data["sampling"]["sample_size"] == 2
+    assert data["sampling"]["population"] == 3
+
+
+@pytest.mark.api
+def test_analyze_por_nivel_de_regiao(client: TestClient):
+    users = [
+        {"age": 25, "gender": "female", "region": "Rio de Janeiro"},
+        {"age": 26, "gender": "male", "region": "RJ"},
+        {"age": 27, "gender": "male", "region": "Minas Gerais"},
+    ]
+
+    resp = client.post("/api/audience/analyze", json={"users": users})
+    assert resp.json()["summary"]["by_region"] == {
+        "Rio de Janeiro": 1,
+        "RJ": 1,
+        "Minas Gerais": 1,
+    }
+
+    resp = client.post(
+        "/api/audience/analyze?region_level=state", json={"users": users}
+    )
+    assert resp.json()["summary"]["by_region"] == {
+        "Rio de Janeiro": 2,
+        "Minas Gerais": 1,
+    }
+
+    resp = client.post(
+        "/api/audience/analyze?region_level=macro_region", json={"users": users}
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["summary"]["by_region"] == {"Sudeste": 3}
+
+    resp = client.post(
+        "/api/audience/analyze?region_level=bairro", json={"users": users}
+    )
+    assert resp.status_code == 422
+
+
+@pytest.mark.api
+def test_amostra_nao_esconde_usuario_invalido(client: TestClient):
+    users = USERS * 20 + [{"age": 30, "gender": "female"}]
+
+    for url in ("/api/audience/analyze?sample=5", "/api/audience/profile?sample=5"):
+        resp = client.post(url, json={"users": users})
+        assert resp.status_code == 422, resp.text
+        assert resp.json()["detail"][0]["loc"] == ["body", "users", 60, "region"]
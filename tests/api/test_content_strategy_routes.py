@@ -74,3 +74,337 @@ def test_get_history_filtra_por_usuario_logado(client: TestClient, auth_headers:
     data = resp.json()
     assert "history" in data
     assert isinstance(data["history"], list)
+
+
+@pytest.mark.api
+def test_cubo_da_analise_responde_fatias(client: TestClient, auth_headers: dict):
+    payload = {
+        "topic": "moda",
+        "platform": "instagram",
+        "build_cube": True,
+        "users": [
+            {"age": 28, "gender": "female", "region": "Sudeste"},
+            {"age": 30, "gender": "female", "region": "Sudeste"},
+            {"age": 41, "gender": "male", "region": "Sul"},
+        ],
+    }
+    resp = client.post("/api/content/strategy", json=payload, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["cube_available"] is True
+    analysis_id = resp.json()["analysis_id"]
+
+    resp = client.get(
+        f"/api/content/history/{analysis_id}/cube",
+        params={"gender": "female", "age_bucket": "25-34", "group_by": "region"},
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["count"] == 2
+    assert data["groups"] == [{"region": "Sudeste", "count": 2}]
+
+
+@pytest.mark.api
+def test_historico_le_publico_do_arquivo_colunar(
+    client: TestClient, auth_headers: dict
+):
+    users = [
+        {"age": 22, "gender": "female", "region": "Norte"},
+        {"age": 35, "gender": "male", "region": "Sul"},
+    ]
+    payload = {"topic": "viagem", "platform": "instagram", "users": users}
+    resp = client.post("/api/content/strategy", json=payload, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    analysis_id = resp.json()["analysis_id"]
+
+    resp = client.get(f"/api/content/history/{analysis_id}", headers=auth_headers)
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["users"] == users
+
+
+@pytest.mark.api
+def test_historico_sem_arquivo_colunar_volta_sem_publico(
+    client: TestClient, auth_headers: dict
+):
+    from pathlib import Path
+
+    from sqlmodel import Session
+
+    from src.core.config import settings
+    from src.database.sqlmodel_db import engine
+    from src.models.analysis import AnalysisHistory
+
+    users = [{"age": 41, "gender": "female", "region": "Acre"}]
+    payload = {"topic": "arquivo apagado", "platform": "instagram", "users": users}
+    resp = client.post("/api/content/strategy", json=payload, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    analysis_id = resp.json()["analysis_id"]
+    with Session(engine) as session:
+        audience_id = session.get(AnalysisHistory, analysis_id).audience_id
+    (Path(settings.AUDIENCE_DATA_DIR) / f"{audience_id}.aud").unlink()
+
+    resp = client.get(f"/api/content/history/{analysis_id}", headers=auth_headers)
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["users"] is None
+    assert resp.json()["topic"] == "arquivo apagado"
+
+
+@pytest.mark.api
+def test_mesmo_publico_reaproveita_analise_do_cache(
+    client: TestClient, auth_headers: dict
+):
+    users = [
+        {"age": 19, "gender": "male", "region": "Centro-Oeste"},
+        {"age": 52, "gender": "female", "region": "Centro-Oeste"},
+    ]
+    assert client.get("/api/audience/cache/stats").status_code in (401, 403)
+    before = client.get("/api/audience/cache/stats", headers=auth_headers).json()
+
+    results = []
+    for topic in ("games", "culinária"):
+        payload = {"topic": topic, "platform": "tiktok", "users": users}
+        resp = client.post("/api/content/strategy", json=payload, headers=auth_headers)
+        assert resp.status_code == 200, resp.text
+        results.append(resp.json()["audience"])
+
+    after = client.get("/api/audience/cache/stats", headers=auth_headers).json()
+    assert results[0] == results[1]
+    assert after["hits"] >= before["hits"] + 1
+
+
+@pytest.mark.api
+def test_publico_invalido_retorna_422(client: TestClient, auth_headers: dict):
+    payload = {
+        "topic": "moda",
+        "platform": "instagram",
+        "users": [{"age": "abc", "gender": "female", "region": "Sul"}],
+    }
+    resp = client.post("/api/content/strategy", json=payload, headers=auth_headers)
+
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["loc"] == ["body", "users", 0, "age"]
+
+
+@pytest.mark.api
+def test_estrategia_por_amostra_agenda_passada_exata(
+    client: TestClient, auth_headers: dict
+):
+    users = [
+        {"age": 20 + i, "gender": "female" if i % 2 else "male", "region": "Sul"}
+        for i in range(20)
+    ]
+    payload = {"topic": "fitness", "platform": "instagram", "users": users}
+    resp = client.post(
+        "/api/content/strategy?sample=5", json=payload, headers=auth_headers
+    )
+
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["exact_pending"] is True
+    assert data["audience"]["summary"]["total_users"] == 5
+    assert data["audience"]["sampling"]["population"] == 20
+
+    # O TestClient executa as background tasks antes de devolver a resposta
+    resp = client.get(
+        f"/api/content/history/{data['analysis_id']}", headers=auth_headers
+    )
+    entry = resp.json()
+    assert entry["result"]["audience"]["summary"]["total_users"] == 20
+    assert "sampling" not in entry["result"]["audience"]
+    assert entry["users"] == users
+
+
+@pytest.mark.api
+def test_compara_publicos_de_analises_e_projeto(client: TestClient, auth_headers: dict):
+    def analysis(users):
+        resp = client.post(
+            "/api/content/strategy",
+            json={"topic": "moda", "platform": "instagram", "users": users},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 200, resp.text
+        return resp.json()["analysis_id"]
+
+    base_id = analysis(
+        [
+            {"age": 22, "gender": "female", "region": "Sul"},
+            {"age": 30, "gender": "male", "region": "Norte"},
+        ]
+    )
+    same_id = analysis([{"age": 23, "gender": "female", "region": "Sul"}] * 2)
+    project = client.post(
+        "/api/projects/", json={"name": "Projeto comparado"}, headers=auth_headers
+    ).json()
+    client.post(
+        f"/api/projects/{project['id']}/audience/add",
+        json={"users": [{"age": 50, "gender": "male", "region": "Norte"}]},
+        headers=auth_headers,
+    )
+
+    resp = client.post(
+        "/api/content/history/compare",
+        json={
+            "baseline": {"analysis_id": base_id},
+            "targets": [{"analysis_id": same_id}, {"project_id": project["id"]}],
+        },
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["baseline"] == {"analysis_id": base_id, "total_users": 2}
+    first, second = data["comparisons"]
+    assert first["fields"]["gender"]["lift"] == {"female": 2.0, "male": 0.0}
+    assert second["project_id"] == project["id"]
+    assert set(second["fields"]) == {"gender", "region", "age_bucket"}
+
+    resp = client.post(
+        "/api/content/history/compare",
+        json={"baseline": {"analysis_id": base_id}, "targets": [{"analysis_id": 0}]},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 404
+    assert resp.json()["detail"]["missing"] == [{"analysis_id": 0}]
+
+
+@pytest.mark.api
+def test_estrategia_com_publico_agregado(client: TestClient, auth_headers: dict):
+    resp = client.post(
+        "/api/content/strategy",
+        json={
+            "topic": "moda",
+            "platform": "instagram",
+            "audience_breakdown": [
+                {"age_bucket": "25-34", "gender": "F", "region": "Sul", "count": 1200},
+                {"age_bucket": "18-24", "gender": "M", "region": "Sul", "count": 300},
+            ],
+        },
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 200, resp.text
+    summary = resp.json()["audience"]["summary"]
+    assert summary["total_users"] == 1500
+    assert summary["by_gender"] == {"F": 1200, "M": 300}
+    assert resp.json()["exact_pending"] is False
+
+    resp = client.post(
+        "/api/content/strategy",
+        json={
+            "topic": "moda",
+            "platform": "instagram",
+            "audience_breakdown": [
+                {"age_bucket": "55-64", "gender": "F", "region": "Sul", "count": 10}
+            ],
+        },
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200, resp.text
+    by_age = resp.json()["audience"]["summary"]["by_age_bucket"]
+    assert by_age == {"45-59": 5, "60+": 5}
+
+
+@pytest.mark.api
+def test_historico_troca_nivel_de_regiao_sem_reprocessar(
+    client: TestClient, auth_headers: dict
+):
+    resp = client.post(
+        "/api/content/strategy",
+        json={
+            "topic": "moda",
+            "platform": "instagram",
+            "users": [
+                {"age": 22, "gender": "female", "region": "Florianópolis"},
+                {"age": 30, "gender": "male", "region": "SC"},
+                {"age": 41, "gender": "male", "region": "Recife"},
+            ],
+        },
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200, resp.text
+    analysis_id = resp.json()["analysis_id"]
+
+    resp = client.get(
+        f"/api/content/history/{analysis_id}/regions?level=state",
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["by_region"] == {"Santa Catarina": 2, "Pernambuco": 1}
+
+
+@pytest.mark.api
+def test_estrategia_por_personas(client: TestClient, auth_headers: dict):
+    users = [{"age": 20, "gender": "female", "region": "Sul"}] * 6 + [
+        {"age": 50, "gender": "male", "region": "Bahia"}
+    ] * 4
+
+    resp = client.post(
+        "/api/content/strategy",
+        json={
+            "topic": "moda",
+            "platform": "tiktok",
+            "users": users,
+            "segments": 2,
+            "age_scheme": "jovem",
+        },
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 200, resp.text
+    segments = resp.json()["audience"]["segments"]
+    assert [s["percent"] for s in segments] == [60.0, 40.0]
+    assert segments[0]["suggestions"]["persona"] == "18-21 · female · Sul"
+    assert segments[1]["best_times"]["recommended_slots"]
+
+
+@pytest.mark.api
+def test_plataforma_nao_troca_o_esquema_de_idade(
+    client: TestClient, auth_headers: dict
+):
+    users = [{"age": 20, "gender": "female", "region": "Sul"}] * 3
+    body = {"topic": "moda", "platform": "tiktok", "users": users}
+
+    resp = client.post("/api/content/strategy", json=body, headers=auth_headers)
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["audience"]["summary"]["by_age_bucket"] == {"18-24": 3}
+
+    resp = client.post(
+        "/api/content/strategy",
+        json={**body, "age_scheme": "jovem"},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["audience"]["summary"]["by_age_bucket"] == {"18-21": 3}
+    notes = resp.json()["best_times"]["notes"]
+    assert any(n.startswith("Faixa etária predominante: 18-21.") for n in notes)
+    assert not any("18-34" in n for n in notes)
+
+    resp = client.post(
+        "/api/content/strategy",
+        json={**body, "age_scheme": "inexistente"},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.api
+def test_horarios_consideram_fusos_do_publico(client: TestClient, auth_headers: dict):
+    users = [{"age": 28, "gender": "female", "region": "SP"}] * 5 + [
+        {"age": 31, "gender": "male", "region": "Portugal"}
+    ] * 5
+
+    resp = client.post(
+        "/api/content/strategy",
+        json={"topic": "viagens", "platform": "instagram", "users": users},
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 200, resp.text
+    best_times = resp.json()["best_times"]
+    assert {z["utc_offset"] for z in best_times["timezones"]} == {-3.0, 0.0}
+    assert len(best_times["recommended_slots_utc"]) == 3
@@ -0,0 +1,102 @@
+# tests/api/test_posting_time_routes.py
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.mark.api
+def test_melhores_horarios_montado(client: TestClient):
+    resp = client.post(
+        "/api/posting/best-times",
+        json={"platform": "instagram", "regions": {"SP": 80, "Portugal": 20}},
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["utc_offset"] == -3
+
+
+@pytest.mark.api
+def test_melhores_horarios_em_lote(client: TestClient, auth_headers: dict):
+    project = client.post(
+        "/api/projects/",
+        json={"name": "Projeto do lote de horários"},
+        headers=auth_headers,
+    ).json()
+    media = [
+        {
+            "timestamp": f"2024-05-{day:02d}T{hour}:00:00+0000",
+            "metrics": {"engagement": 90 if hour == 23 else 9, "reach": 1000},
+        }
+        for day in range(1, 29)
+        for hour in (10, 23)
+    ]
+    client.post(
+        f"/api/projects/{project['id']}/heatmap",
+        json={"platform": "instagram", "media": media, "utc_offset_hours": -3},
+        headers=auth_headers,
+    )
+
+    summary = {
+        "by_age_bucket": {"18-24": 10, "35-44": 40},
+        "by_region": {"SP": 30, "Portugal": 70},
+    }
+    items = [
+        {"project_id": project["id"], "platform": "Instagram"},
+        {"project_id": project["id"], "platform": "linkedin"},
+        {"platform": "tiktok", "audience_summary": summary},
+        {"platform": "tiktok", "main_age_bucket": "18-24"},
+    ]
+    resp = client.post(
+        "/api/posting/best-times/batch", json={"items": items}, headers=auth_headers
+    )
+    assert resp.status_code == 200, resp.text
+    results = resp.json()["results"]
+    assert [r["source"] for r in results] == [
+        "engagement",
+        "heuristic",
+        "heuristic",
+        "heuristic",
+    ]
+    assert results[0]["project_id"] == project["id"]
+    # O resumo preenche faixa etária e fusos do público
+    assert results[2]["utc_offset"] == 0
+    assert any("35-44" in note for note in results[2]["notes"])
+    assert results[3] == {
+        "project_id": None,
+        **client.post(
+            "/api/posting/best-times",
+            json={"platform": "tiktok", "main_age_bucket": "18-24"},
+        ).json(),
+    }
+
+    missing = client.post(
+        "/api/posting/best-times/batch",
+        json={"items": [{"project_id": 999999, "platform": "instagram"}]},
+        headers=auth_headers,
+    )
+    assert missing.status_code == 404
+    assert missing.json()["detail"]["missing"] == [999999]
+    assert client.post(
+        "/api/posting/best-times/batch", json={"items": items}
+    ).status_code in (401, 403)
+
+
+@pytest.mark.api
+def test_melhores_horarios_rejeita_pesos_invalidos(
+    client: TestClient, auth_headers: dict
+):
+    resp = client.post(
+        "/api/posting/best-times",
+        json={"platform": "instagram", "regions": {"SP": -5}},
+    )
+    assert resp.status_code == 422
+
+    for summary in (
+        {"by_region": "abc"},
+        {"by_age_bucket": {"18-24": "x", "25-34": 2}},
+        {"by_region": {"SP": -1}},
+    ):
+        resp = client.post(
+            "/api/posting/best-times/batch",
+            json={"items": [{"platform": "tiktok", "audience_summary": summary}]},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 422, summary
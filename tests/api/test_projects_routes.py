@@ -1,6 +1,15 @@
 # tests/api/test_projects_routes.py
 import pytest
 from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from src.database.sqlmodel_db import engine
+from src.models.project_audience import ProjectAudience, ProjectAudienceTotals
+from src.schemas.project import ProjectCreate
+from src.services.projects import create_project, get_project
+
+# Dono de projetos que não é o admin dos testes
+OTHER_OWNER_ID = 737373
 
 
 @pytest.mark.api
@@ -37,3 +46,484 @@ def test_criar_projeto_com_dados_validos(client: TestClient, auth_headers: dict)
     # owner_id é preenchido pelo backend a partir do usuário logado
     assert "id" in data
     assert "owner_id" in data
+
+
+@pytest.mark.api
+def test_publico_acumulado_do_projeto(client: TestClient, auth_headers: dict):
+    """
+    Cada análise com público soma no total do projeto.
+    """
+    project = client.post(
+        "/api/projects/",
+        json={"name": "Projeto com público"},
+        headers=auth_headers,
+    ).json()
+
+    users = [
+        {"age": 32, "gender": "female", "region": "Rio de Janeiro"},
+        {"age": 19, "gender": "male", "region": "São Paulo"},
+    ]
+    for _ in range(2):
+        resp = client.post(
+            "/api/content/strategy",
+            json={
+                "topic": "moda",
+                "platform": "instagram",
+                "users": users,
+                "project_id": project["id"],
+            },
+            headers=auth_headers,
+        )
+        assert resp.status_code == 200, resp.text
+
+    resp = client.get(f"/api/projects/{project['id']}/audience", headers=auth_headers)
+
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["analyses_count"] == 2
+    assert data["summary"]["total_users"] == 4
+    assert data["summary"]["by_gender"] == {"female": 2, "male": 2}
+
+
+@pytest.mark.api
+def test_esquema_de_idade_do_projeto_vale_nas_analises(
+    client: TestClient, auth_headers: dict
+):
+    project = client.post(
+        "/api/projects/",
+        json={"name": "Projeto B2B", "age_scheme": "profissional"},
+        headers=auth_headers,
+    ).json()
+    assert project["age_scheme"] == "profissional"
+
+    resp = client.post(
+        "/api/content/strategy",
+        json={
+            "topic": "carreira",
+            "platform": "instagram",
+            "users": [{"age": 40, "gender": "male", "region": "Sul"}],
+            "project_id": project["id"],
+        },
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["audience"]["summary"]["by_age_bucket"] == {"35-49": 1}
+
+
+@pytest.mark.api
+def test_criar_projeto_com_esquema_de_idade_desconhecido_retorna_422(
+    client: TestClient, auth_headers: dict
+):
+    resp = client.post(
+        "/api/projects/",
+        json={"name": "Projeto X", "age_scheme": "inexistente"},
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 422
+
+
+@pytest.mark.api
+def test_publico_do_projeto_por_deltas(client: TestClient, auth_headers: dict):
+    project = client.post(
+        "/api/projects/", json={"name": "Projeto com deltas"}, headers=auth_headers
+    ).json()
+    base = f"/api/projects/{project['id']}/audience"
+    users = [
+        {"age": 22, "gender": "female", "region": "Sul"},
+        {"age": 33, "gender": "male", "region": "Norte"},
+        {"age": 35, "gender": "female", "region": "Sul"},
+    ]
+
+    resp = client.post(f"{base}/add", json={"users": users}, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    resp = client.post(
+        f"{base}/remove", json={"users": users[1:2]}, headers=auth_headers
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["summary"]["by_region"] == {"Sul": 2}
+
+    resp = client.post(
+        f"{base}/remove", json={"users": users[1:2]}, headers=auth_headers
+    )
+    assert resp.status_code == 409
+
+    resp = client.post(
+        "/api/content/strategy",
+        json={
+            "topic": "moda",
+            "platform": "instagram",
+            "project_id": project["id"],
+            "use_project_audience": True,
+        },
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["audience"]["summary"]["total_users"] == 2
+
+
+@pytest.mark.api
+def test_conflito_ao_criar_publico_do_projeto_retorna_409(
+    client: TestClient, auth_headers: dict
+):
+    project = client.post(
+        "/api/projects/", json={"name": "Projeto disputado"}, headers=auth_headers
+    ).json()
+    # Simula a primeira gravação concorrente: a linha já existe quando o
+    # delta tenta criá-la
+    with Session(engine) as session:
+        session.add(
+            ProjectAudience(
+                project_id=project["id"],
+                owner_id=OTHER_OWNER_ID,
+                age_scheme="default",
+                sketch=b"",
+            )
+        )
+        session.commit()
+
+    resp = client.post(
+        f"/api/projects/{project['id']}/audience/add",
+        json={"users": [{"age": 30, "gender": "female", "region": "Sul"}]},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 409, resp.text
+
+
+@pytest.mark.api
+def test_mapa_de_engajamento_do_projeto(client: TestClient, auth_headers: dict):
+    """
+    O mapa enviado fica salvo no projeto e passa a guiar os horários
+    (inclusive os da estratégia de conteúdo).
+    """
+    project = client.post(
+        "/api/projects/",
+        json={"name": "Projeto com mapa"},
+        headers=auth_headers,
+    ).json()
+
+    # Posts diários às 10h e 23h UTC (7h e 20h em UTC-3); 23h engaja mais
+    media = [
+        {
+            "timestamp": f"2024-05-{day:02d}T{hour}:00:00+0000",
+            "metrics": {"engagement": 90 if hour == 23 else 9, "reach": 1000},
+        }
+        for day in range(1, 29)
+        for hour in (10, 23)
+    ]
+    media.append({"timestamp": "sem data", "metrics": {}})
+    media.append({"timestamp": media[0]["timestamp"], "metrics": [1]})
+    media.append({"timestamp": 1e30, "metrics": {"engagement": 1, "reach": 10}})
+    media.append(
+        {"timestamp": media[0]["timestamp"], "metrics": {"likes": "5", "reach": 10}}
+    )
+
+    resp = client.post(
+        f"/api/projects/{project['id']}/heatmap",
+        json={"platform": "Instagram", "media": media, "utc_offset_hours": -3},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["platform"] == "instagram"
+    assert data["ignored_media"] == 4
+    assert data["heatmap"]["total_posts"] == 56
+    assert len(data["heatmap"]["scores"]) == 7
+    assert data["best_times"]["source"] == "engagement"
+
+    stored = client.get(
+        f"/api/projects/{project['id']}/heatmap",
+        params={"platform": "instagram"},
+        headers=auth_headers,
+    )
+    assert stored.status_code == 200
+    assert stored.json()["heatmap"] == data["heatmap"]
+
+    best = client.get(
+        f"/api/projects/{project['id']}/best-times",
+        params={"platform": "instagram"},
+        headers=auth_headers,
+    ).json()
+    assert best["source"] == "engagement"
+    assert any(
+        slot.startswith(("19:00", "20:00")) for slot in best["recommended_slots"]
+    )
+
+    strategy = client.post(
+        "/api/content/strategy",
+        json={
+            "topic": "café",
+            "platform": "instagram",
+            "project_id": project["id"],
+            "users": [{"age": 30, "gender": "female", "region": "SP"}],
+        },
+        headers=auth_headers,
+    ).json()
+    assert strategy["best_times"]["recommended_slots"] == best["recommended_slots"]
+
+    # Outra plataforma (sem mapa) continua nas heurísticas
+    other = client.get(
+        f"/api/projects/{project['id']}/best-times",
+        params={"platform": "tiktok"},
+        headers=auth_headers,
+    ).json()
+    assert other["source"] == "heuristic"
+    missing = client.get(
+        f"/api/projects/{project['id']}/heatmap",
+        params={"platform": "tiktok"},
+        headers=auth_headers,
+    )
+    assert missing.status_code == 404
+    assert (
+        client.get(
+            "/api/projects/999999/best-times",
+            params={"platform": "instagram"},
+            headers=auth_headers,
+        ).status_code
+        == 404
+    )
+
+
+@pytest.mark.api
+def test_agenda_semanal_do_projeto(client: TestClient, auth_headers: dict):
+    project = client.post(
+        "/api/projects/",
+        json={"name": "Projeto com agenda"},
+        headers=auth_headers,
+    ).json()
+
+    resp = client.post(
+        f"/api/projects/{project['id']}/schedule",
+        json={
+            "platforms": {"instagram": 5, "linkedin": 3},
+            "min_gap_hours": 6,
+            "max_per_day": 1,
+            "blackout": [{"day": "dom", "start": "00:00", "end": "24:00"}],
+        },
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 200, resp.text
+    platforms = resp.json()["platforms"]
+    instagram = platforms["instagram"]
+    assert instagram["source"] == "heuristic"
+    assert instagram["scheduled"] == 5
+    assert len({post["day"] for post in instagram["posts"]}) == 5
+    assert "dom" not in {post["day"] for post in instagram["posts"]}
+    assert platforms["linkedin"]["scheduled"] == 3
+
+
+@pytest.mark.api
+def test_agenda_em_lote(client: TestClient, auth_headers: dict):
+    ids = [
+        client.post(
+            "/api/projects/",
+            json={"name": f"Projeto lote {i}"},
+            headers=auth_headers,
+        ).json()["id"]
+        for i in range(3)
+    ]
+
+    resp = client.post(
+        "/api/projects/schedule/batch",
+        json={
+            "projects": [
+                {"project_id": ids[0], "platforms": {"tiktok": 7}},
+                {
+                    "project_id": ids[1],
+                    "platforms": {"instagram": 2},
+                    "scores": {"instagram": [0] * 20 + [1] * 4},
+                },
+                {"project_id": ids[2], "platforms": {"linkedin": 4, "tiktok": 2}},
+            ]
+        },
+        headers=auth_headers,
+    )
+
+    assert resp.status_code == 200, resp.text
+    projects = {p["project_id"]: p["platforms"] for p in resp.json()["projects"]}
+    assert projects[ids[0]]["tiktok"]["scheduled"] == 7
+    custom = projects[ids[1]]["instagram"]
+    assert custom["source"] == "request"
+    assert all(post["time"] >= "20:00" for post in custom["posts"])
+    assert set(projects[ids[2]]) == {"linkedin", "tiktok"}
+
+    bad = client.post(
+        "/api/projects/schedule/batch",
+        json={"projects": [{"project_id": 999999, "platforms": {"tiktok": 1}}]},
+        headers=auth_headers,
+    )
+    assert bad.status_code == 404
+    assert bad.json()["detail"]["missing"] == [999999]
+
+    repeated = client.post(
+        "/api/projects/schedule/batch",
+        json={
+            "projects": [
+                {"project_id": ids[0], "platforms": {"tiktok": 1}},
+                {"project_id": ids[0], "platforms": {"instagram": 1}},
+            ]
+        },
+        headers=auth_headers,
+    )
+    assert repeated.status_code == 422
+    assert str(ids[0]) in repeated.text
+
+    wrong_scores = client.post(
+        f"/api/projects/{ids[0]}/schedule",
+        json={"platforms": {"tiktok": 1}, "scores": {"tiktok": [1, 2, 3]}},
+        headers=auth_headers,
+    )
+    assert wrong_scores.status_code == 400
+
+
+@pytest.mark.api
+def test_horarios_adaptativos_do_projeto(client: TestClient, auth_headers: dict):
+    project = client.post(
+        "/api/projects/",
+        json={"name": "Projeto adaptativo"},
+        headers=auth_headers,
+    ).json()
+
+    media = [
+        {
+            "timestamp": f"2024-05-{day:02d}T{hour}:00:00+0000",
+            "metrics": {"engagement": 100 if hour >= 22 else 20, "reach": 1000},
+        }
+        for day in range(1, 29)
+        for hour in (13, 22, 23)
+    ]
+    url = f"/api/projects/{project['id']}/posterior"
+    first = client.post(
+        url,
+        json={"platform": "LinkedIn", "media": media[:42], "utc_offset_hours": -3},
+        headers=auth_headers,
+    )
+    assert first.status_code == 200, first.text
+    assert first.json()["ingested_media"] == 42
+
+    # Métricas em texto não derrubam a ingestão: o post é ignorado
+    bad = client.post(
+        url,
+        json={
+            "platform": "linkedin",
+            "media": [{"timestamp": 2e9, "metrics": {"likes": "5", "reach": 10}}],
+        },
+        headers=auth_headers,
+    )
+    assert bad.status_code == 200, bad.text
+    assert bad.json()["ignored_media"] == 1
+    assert first.json()["best_times"]["source"] == "adaptive"
+
+    # Lote com posts repetidos: só os novos contam
+    second = client.post(
+        url, json={"platform": "linkedin", "media": media}, headers=auth_headers
+    ).json()
+    assert second["ingested_media"] == 42
+    assert second["ignored_media"] == 42
+    assert second["posts"] == 84
+    assert second["utc_offset_hours"] == -3
+    assert second["last_post_at"] == "2024-05-28T23:00:00"
+
+    params = {"platform": "linkedin", "strategy": "adaptive", "seed": 1}
+    best = client.get(
+        f"/api/projects/{project['id']}/best-times",
+        params=params,
+        headers=auth_headers,
+    ).json()
+    assert best["source"] == "adaptive"
+    assert best["posts"] == 84
+    again = client.get(
+        f"/api/projects/{project['id']}/best-times",
+        params=params,
+        headers=auth_headers,
+    ).json()
+    assert again == best
+
+    ucb = client.get(
+        f"/api/projects/{project['id']}/best-times",
+        params={**params, "method": "ucb"},
+        headers=auth_headers,
+    ).json()
+    assert ucb["method"] == "ucb"
+
+
+@pytest.mark.api
+def test_projeto_de_outro_usuario_retorna_404(client: TestClient, auth_headers: dict):
+    with Session(engine) as session:
+        other = create_project(
+            session,
+            OTHER_OWNER_ID,
+            ProjectCreate(name="Projeto alheio", age_scheme="profissional"),
+        )
+        assert get_project(session, OTHER_OWNER_ID, other.id) is not None
+        assert get_project(session, OTHER_OWNER_ID + 1, other.id) is None
+
+    base = f"/api/projects/{other.id}"
+    users = [{"age": 30, "gender": "female", "region": "Sul"}]
+    media = [{"timestamp": "2024-05-01T12:00:00+0000", "metrics": {"likes": 1}}]
+    requests = [
+        ("post", f"{base}/audience/add", {"users": users}),
+        ("post", f"{base}/audience/remove", {"users": users}),
+        ("post", f"{base}/heatmap", {"platform": "instagram", "media": media}),
+        ("post", f"{base}/posterior", {"platform": "instagram", "media": media}),
+        ("post", f"{base}/schedule", {"platforms": {"tiktok": 1}}),
+        (
+            "post",
+            "/api/projects/schedule/batch",
+            {"projects": [{"project_id": other.id, "platforms": {"tiktok": 1}}]},
+        ),
+        ("get", f"{base}/best-times?platform=instagram", None),
+    ]
+    for method, url, body in requests:
+        resp = client.request(method, url, json=body, headers=auth_headers)
+        assert resp.status_code == 404, (url, resp.text)
+
+    # Análise apontando para o projeto alheio: nada é salvo nem somado
+    resp = client.post(
+        "/api/content/strategy",
+        json={
+            "topic": "carreira",
+            "platform": "instagram",
+            "users": [{"age": 40, "gender": "male", "region": "Sul"}],
+            "project_id": other.id,
+        },
+        headers=auth_headers,
+    )
+    assert resp.status_code == 404
+    with Session(engine) as session:
+        assert session.get(ProjectAudienceTotals, other.id) is None
+
+
+@pytest.mark.api
+def test_falha_nos_totais_do_projeto_nao_derruba_a_analise(
+    client: TestClient, auth_headers: dict
+):
+    project = client.post(
+        "/api/projects/", json={"name": "Projeto com totais"}, headers=auth_headers
+    ).json()
+    # Linha antiga de totais gravada com outro dono para o mesmo projeto
+    with Session(engine) as session:
+        session.add(
+            ProjectAudienceTotals(
+                project_id=project["id"], owner_id=OTHER_OWNER_ID, sketch=b""
+            )
+        )
+        session.commit()
+
+    resp = client.post(
+        "/api/content/strategy",
+        json={
+            "topic": "moda",
+            "platform": "instagram",
+            "users": [{"age": 30, "gender": "female", "region": "Sul"}],
+            "project_id": project["id"],
+        },
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200, resp.text
+    history = client.get(
+        f"/api/content/history/{resp.json()['analysis_id']}", headers=auth_headers
+    )
+    assert history.json()["project_id"] == project["id"]
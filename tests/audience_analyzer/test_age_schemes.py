@@ -0,0 +1,80 @@
+# tests/audience_analyzer/test_age_schemes.py
+import numpy as np
+import pytest
+
+from src.audience_analyzer.age_schemes import (
+    DEFAULT_SCHEME_ID,
+    UnknownAgeScheme,
+    compile_age_scheme,
+    get_age_scheme,
+    resolve_age_scheme_id,
+)
+from src.audience_analyzer.columnar import columns_from_users, summarize_columns
+from src.audience_analyzer.sketch import AudienceSketch
+
+
+@pytest.mark.core
+def test_tabela_escalar_e_vetorizada_concordam():
+    scheme = get_age_scheme()
+    ages = np.array([-5, 0, 17, 18, 24, 25, 59, 60, 130, 500])
+
+    labels = [scheme.labels[c] for c in scheme.bucket_codes(ages)]
+
+    assert labels == [scheme.bucket_label(int(a)) for a in ages]
+    assert labels[:5] == ["menos de 18", "menos de 18", "menos de 18", "18-24", "18-24"]
+    assert labels[-1] == "60+"
+
+
+@pytest.mark.core
+def test_esquema_compilado_fica_em_cache():
+    assert get_age_scheme("jovem") is get_age_scheme("jovem")
+    assert get_age_scheme(None) is get_age_scheme(DEFAULT_SCHEME_ID)
+    with pytest.raises(UnknownAgeScheme):
+        get_age_scheme("inexistente")
+
+
+@pytest.mark.core
+def test_esquema_invalido_e_rejeitado():
+    with pytest.raises(ValueError):
+        compile_age_scheme("x", edges=[30, 20], labels=["a", "b", "c"], types="abc")
+    with pytest.raises(ValueError):
+        compile_age_scheme("x", edges=[20], labels=["a"], types=["a"])
+
+
+@pytest.mark.core
+def test_resolucao_pedido_projeto_padrao():
+    assert resolve_age_scheme_id("profissional", "jovem") == "jovem"
+    assert resolve_age_scheme_id("profissional") == "profissional"
+    assert resolve_age_scheme_id(None, None) == DEFAULT_SCHEME_ID
+
+
+@pytest.mark.core
+def test_resumo_e_perfis_com_outro_esquema():
+    users = [
+        {"age": 15, "gender": "f", "region": "Sul"},
+        {"age": 23, "gender": "f", "region": "Sul"},
+        {"age": 24, "gender": "m", "region": "Sul"},
+    ]
+    scheme = get_age_scheme("jovem")
+
+    summary, profiles = summarize_columns(columns_from_users(users), scheme)
+
+    assert summary["by_age_bucket"] == {"13-17": 1, "22-25": 2}
+    assert profiles[0] == {
+        "age_bucket": "22-25",
+        "type": "intermediário",
+        "percent": 66.7,
+    }
+
+
+@pytest.mark.core
+def test_sketch_guarda_o_esquema_e_nao_mistura_esquemas():
+    users = [{"age": 23, "gender": "f", "region": "Sul"}]
+    sketch = AudienceSketch.from_users(users, age_scheme="jovem")
+
+    restored = AudienceSketch.from_bytes(sketch.to_bytes())
+
+    assert restored.age_scheme == "jovem"
+    assert restored.profiles() == sketch.profiles()
+    with pytest.raises(ValueError):
+        AudienceSketch.from_users(users).merge(restored)
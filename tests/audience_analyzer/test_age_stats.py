@@ -0,0 +1,36 @@
+# tests/audience_analyzer/test_age_stats.py
+import numpy as np
+import pytest
+
+from src.audience_analyzer.age_stats import age_histogram, age_stats
+from src.audience_analyzer.sketch import AudienceSketch
+
+
+@pytest.mark.core
+def test_quantis_do_histograma_sao_exatos():
+    rng = np.random.default_rng(3)
+    ages = rng.integers(13, 80, size=10_001)
+
+    stats = age_stats(age_histogram(ages))
+
+    for name, q in (("p10", 10), ("median", 50), ("p90", 90)):
+        assert stats[name] == int(np.percentile(ages, q, method="inverted_cdf"))
+    assert stats["mean"] == round(float(ages.mean()), 1)
+    assert age_stats(age_histogram(np.array([], dtype=np.int64))) is None
+
+
+@pytest.mark.core
+def test_quantis_de_sketches_mesclados_e_serializados():
+    rng = np.random.default_rng(5)
+    users = [
+        {"age": int(a), "gender": "f", "region": "Sul"}
+        for a in rng.integers(15, 70, size=3_000)
+    ]
+    merged = AudienceSketch.from_users(users[:1_000])
+    merged.merge(AudienceSketch.from_users(users[1_000:]))
+
+    restored = AudienceSketch.from_bytes(merged.to_bytes())
+
+    assert restored.age_stats() == AudienceSketch.from_users(users).age_stats()
+    restored.subtract(AudienceSketch.from_users(users[1_000:]))
+    assert restored.age_stats() == AudienceSketch.from_users(users[:1_000]).age_stats()
@@ -0,0 +1,93 @@
+# tests/audience_analyzer/test_audience_core.py
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from src.audience_analyzer.audience_core import (
+    analyze_and_profile,
+    analyze_audience,
+    profile_audience,
+)
+
+
+def _bucket_referencia(age: int) -> str:
+    if age < 18:
+        return "menos de 18"
+    elif age < 25:
+        return "18-24"
+    elif age < 35:
+        return "25-34"
+    elif age < 45:
+        return "35-44"
+    elif age < 60:
+        return "45-59"
+    return "60+"
+
+
+USERS = [
+    {"age": 32, "gender": "female", "region": "Rio de Janeiro"},
+    {"age": 28, "gender": "female", "region": "São Paulo"},
+    {"age": 17, "gender": "male", "region": "São Paulo"},
+    {"age": 60, "gender": "male", "region": "Bahia"},
+    {"age": 45, "region": "Bahia"},
+    {"age": "40", "gender": "female"},
+    {"age": 24, "gender": "other", "region": "Minas Gerais"},
+]
+
+
+@pytest.mark.core
+def test_analyze_audience_mantem_formato_e_ordem_das_chaves():
+    summary = analyze_audience(USERS)
+
+    valid_ages = [u["age"] for u in USERS if isinstance(u["age"], int)]
+    ages = [_bucket_referencia(age) for age in valid_ages]
+    assert summary == {
+        "total_users": len(USERS),
+        "by_gender": dict(Counter(u.get("gender", "unknown") for u in USERS)),
+        "by_region": dict(Counter(u.get("region", "unknown") for u in USERS)),
+        "by_age_bucket": dict(Counter(ages)),
+        "age_stats": {
+            "count": len(valid_ages),
+            "mean": round(float(np.mean(valid_ages)), 1),
+            "p10": int(np.percentile(valid_ages, 10, method="inverted_cdf")),
+            "median": int(np.percentile(valid_ages, 50, method="inverted_cdf")),
+            "p90": int(np.percentile(valid_ages, 90, method="inverted_cdf")),
+        },
+    }
+    assert list(summary["by_region"]) == [
+        "Rio de Janeiro",
+        "São Paulo",
+        "Bahia",
+        "unknown",
+        "Minas Gerais",
+    ]
+    assert list(summary["by_age_bucket"]) == list(dict(Counter(ages)))
+
+
+@pytest.mark.core
+def test_profile_audience_percentuais_e_tipos():
+    profiles = profile_audience(USERS)
+
+    assert profiles[0] == {
+        "age_bucket": "25-34",
+        "type": "intermediário",
+        "percent": 33.3,
+    }
+    assert {p["age_bucket"]: p["type"] for p in profiles} == {
+        "25-34": "intermediário",
+        "menos de 18": "iniciante",
+        "60+": "avançado",
+        "45-59": "avançado",
+        "18-24": "iniciante",
+    }
+    assert profile_audience([]) == []
+    assert profile_audience([{"gender": "female"}]) == []
+
+
+@pytest.mark.core
+def test_analyze_and_profile_equivale_as_funcoes_separadas():
+    summary, profiles = analyze_and_profile(USERS)
+
+    assert summary == analyze_audience(USERS)
+    assert profiles == profile_audience(USERS)
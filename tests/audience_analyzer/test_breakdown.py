@@ -0,0 +1,151 @@
+# tests/audience_analyzer/test_breakdown.py
+import numpy as np
+import pytest
+
+from src.audience_analyzer.audience_core import (
+    analyze_audience,
+    analyze_breakdown,
+    profile_audience,
+    profile_breakdown,
+)
+from src.audience_analyzer.age_schemes import get_age_scheme
+from src.audience_analyzer.columnar import (
+    columns_from_breakdown,
+    summarize_columns,
+)
+from src.audience_analyzer.cube import AudienceCube
+from src.audience_analyzer.payload import (
+    InvalidAudiencePayload,
+    audience_columns_from_breakdown,
+)
+from src.audience_analyzer.storage import (
+    load_audience_columns,
+    save_audience_columns,
+    users_from_columns,
+)
+
+ROWS = [
+    {"age": 28, "gender": "F", "region": "Sudeste", "count": 1200},
+    {"age": 17, "gender": "M", "region": "Sul", "count": 300},
+    {"age": 45, "gender": "F", "region": "Sul", "count": 0},
+    {"age": 61, "gender": "M", "region": "Nordeste", "count": 45},
+    {"age": 28, "gender": "M", "region": "Sudeste", "count": 7},
+]
+
+
+def _expand(rows):
+    return [
+        {"age": r["age"], "gender": r["gender"], "region": r["region"]}
+        for r in rows
+        for _ in range(r["count"])
+    ]
+
+
+@pytest.mark.core
+def test_breakdown_equivale_a_expandir_os_usuarios():
+    users = _expand(ROWS)
+
+    assert analyze_breakdown(ROWS) == analyze_audience(users)
+    assert profile_breakdown(ROWS) == profile_audience(users)
+    assert analyze_breakdown(ROWS, top_k=1) == analyze_audience(users, top_k=1)
+
+    cube = AudienceCube.from_columns(columns_from_breakdown(ROWS))
+    assert cube.query(group_by=["gender"]) == AudienceCube.from_columns(
+        columns_from_breakdown([{**r, "count": 1} for r in _expand(ROWS)])
+    ).query(group_by=["gender"])
+
+
+@pytest.mark.core
+def test_linhas_com_faixa_etaria_contam_so_nas_faixas():
+    rows = [
+        {"age_bucket": "25-34", "gender": "F", "region": "Sul", "count": 1200},
+        {"age_bucket": "65+", "gender": "M", "region": "Sul", "count": 10},
+        {"age": 40, "gender": "M", "region": "Norte", "count": 5},
+    ]
+
+    summary = analyze_breakdown(rows)
+
+    assert summary["total_users"] == 1215
+    assert summary["by_age_bucket"] == {"25-34": 1200, "60+": 10, "35-44": 5}
+    assert summary["age_stats"]["count"] == 5
+    # Mesma saída no modo top-k (sketch): age_stats só das idades exatas
+    assert analyze_breakdown(rows, top_k=5) == summary
+
+
+# Faixas do breakdown do Instagram/Meta
+META_ROWS = [
+    {"age_bucket": bucket, "gender": "F", "region": "Sul", "count": count}
+    for bucket, count in (
+        ("13-17", 10),
+        ("18-24", 200),
+        ("25-34", 301),
+        ("35-44", 150),
+        ("45-54", 80),
+        ("55-64", 41),
+        ("65+", 8),
+    )
+]
+
+
+@pytest.mark.core
+def test_faixas_das_plataformas_sao_repartidas_no_esquema():
+    summary = analyze_breakdown(META_ROWS)
+
+    # 55-64 atravessa 45-59 e 60+: 5 anos de cada lado, 41 -> 21 + 20
+    assert summary["by_age_bucket"] == {
+        "menos de 18": 10,
+        "18-24": 200,
+        "25-34": 301,
+        "35-44": 150,
+        "45-59": 101,
+        "60+": 28,
+    }
+    assert summary["total_users"] == 790
+    assert summary["age_stats"] is None
+
+    # Esquema jovem: 18-24 vira 18-21 (4 anos) e 22-25 (3 anos) ...
+    jovem = get_age_scheme("jovem")
+    by_age = summarize_columns(columns_from_breakdown(META_ROWS), jovem)[0][
+        "by_age_bucket"
+    ]
+    assert by_age["18-21"] == 114
+    # 22-25 também recebe 1 dos 10 anos de 25-34 (30 de 301)
+    assert by_age["22-25"] == 86 + 30
+    assert sum(by_age.values()) == 790
+
+    cube = AudienceCube.from_columns(columns_from_breakdown(META_ROWS), jovem)
+    groups = cube.query(group_by=["age_bucket"])["groups"]
+    assert {g["age_bucket"]: g["count"] for g in groups} == by_age
+
+
+@pytest.mark.core
+def test_breakdown_salvo_em_disco_preserva_pesos(tmp_path):
+    rows = [
+        {"age_bucket": "25-34", "gender": "F", "region": "Sul", "count": 1200},
+        {"age": 40, "gender": "M", "region": "Norte", "count": 5},
+    ]
+    columns = columns_from_breakdown(rows)
+
+    audience_id = save_audience_columns(columns, data_dir=str(tmp_path))
+    loaded = load_audience_columns(audience_id, data_dir=str(tmp_path))
+
+    assert summarize_columns(loaded) == summarize_columns(columns)
+    assert users_from_columns(loaded) == rows
+
+
+@pytest.mark.core
+def test_breakdown_invalido_segue_formato_do_pydantic():
+    with pytest.raises(InvalidAudiencePayload) as exc:
+        audience_columns_from_breakdown(
+            [
+                {"age": 30, "gender": "F", "region": "Sul", "count": -1},
+                {"age_bucket": "trinta", "gender": "F", "region": "Sul", "count": 1},
+            ]
+        )
+
+    locs = {error["loc"] for error in exc.value.errors}
+    assert ("body", "audience_breakdown", 0, "count") in locs
+    assert ("body", "audience_breakdown", 1, "age_bucket") in locs
+    assert np.array_equal(
+        audience_columns_from_breakdown(ROWS[:2]).weights, np.array([1200, 300])
+    )
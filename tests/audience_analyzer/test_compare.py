@@ -0,0 +1,92 @@
+# tests/audience_analyzer/test_compare.py
+import math
+
+import pytest
+
+from src.audience_analyzer.audience_core import analyze_audience
+from src.audience_analyzer.compare import compare_distributions, compare_summaries
+
+
+def _chi_square(a, b):
+    # Qui-quadrado de homogeneidade calculado à mão (tabela 2 x k)
+    keys = sorted(set(a) | set(b))
+    rows = [[a.get(k, 0) for k in keys], [b.get(k, 0) for k in keys]]
+    total = sum(map(sum, rows))
+    chi = 0.0
+    for row in rows:
+        for j, observed in enumerate(row):
+            expected = sum(row) * (rows[0][j] + rows[1][j]) / total
+            if expected:
+                chi += (observed - expected) ** 2 / expected
+    return chi
+
+
+@pytest.mark.core
+def test_distribuicoes_iguais_nao_tem_distancia():
+    [result] = compare_distributions({"f": 10, "m": 30}, [{"f": 1, "m": 3}])
+
+    assert result["chi_square"] == 0
+    assert result["jsd"] == 0
+    assert result["lift"] == {"f": 1.0, "m": 1.0}
+
+
+@pytest.mark.core
+def test_metricas_batem_com_calculo_manual():
+    base = {"Sul": 50, "Norte": 30, "Sudeste": 20}
+    targets = [{"Sul": 10, "Norte": 60, "Centro-Oeste": 30}, {"Sul": 100}]
+
+    first, second = compare_distributions(base, targets)
+
+    assert first["chi_square"] == pytest.approx(_chi_square(base, targets[0]), 1e-3)
+    assert first["dof"] == 3
+    assert first["lift"] == {
+        "Sul": 0.2,
+        "Norte": 2.0,
+        "Sudeste": 0.0,
+        "Centro-Oeste": None,
+    }
+
+    p = {"Sul": 0.5, "Norte": 0.3, "Sudeste": 0.2}
+    m = {"Sul": 0.75, "Norte": 0.15, "Sudeste": 0.1}
+    jsd = 0.5 * sum(p[k] * math.log2(p[k] / m[k]) for k in p)
+    jsd += 0.5 * math.log2(1 / 0.75)
+    assert second["jsd"] == pytest.approx(jsd, abs=1e-6)
+
+
+@pytest.mark.core
+def test_distribuicoes_disjuntas_tem_jsd_maximo():
+    [result] = compare_distributions({"a": 5}, [{"b": 7}])
+
+    assert result["jsd"] == 1.0
+    assert result["lift"] == {"a": 0.0, "b": None}
+
+
+@pytest.mark.core
+def test_compara_resumos_por_campo():
+    base = {"by_gender": {"f": 2, "m": 2}, "by_age_bucket": {"18-24": 4}}
+    targets = [{"by_gender": {"f": 4}, "by_age_bucket": {"18-24": 4}}] * 300
+
+    results = compare_summaries(base, targets, fields=("gender", "age_bucket"))
+
+    assert len(results) == 300
+    assert set(results[0]) == {"gender", "age_bucket"}
+    assert results[-1]["gender"]["lift"] == {"f": 2.0, "m": 0.0}
+    assert results[-1]["age_bucket"]["jsd"] == 0
+    assert compare_distributions({"f": 1}, []) == []
+
+
+@pytest.mark.core
+def test_restante_do_top_k_nao_colide_com_regiao_real_other():
+    users = [{"age": 30, "gender": "f", "region": "other"}] * 6
+    users += [{"age": 30, "gender": "f", "region": "Sul"}] * 3
+    users += [{"age": 30, "gender": "f", "region": f"r{i}"} for i in range(40)]
+
+    summary = analyze_audience(users, top_k=2)
+
+    assert summary["by_region"]["other"] == 6
+    assert summary["approximate"]["by_region"]["other"] > 0
+
+    [result] = compare_summaries(summary, [summary], fields=("region",))
+    assert result["region"]["lift"]["other"] == 1.0
+    assert result["region"]["other_lift"] == 1.0
+    assert result["region"]["jsd"] == 0
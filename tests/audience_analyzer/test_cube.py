@@ -0,0 +1,50 @@
+# tests/audience_analyzer/test_cube.py
+import pytest
+
+from src.audience_analyzer.columnar import columns_from_users
+from src.audience_analyzer.cube import AudienceCube
+
+USERS = [
+    {"age": 28, "gender": "female", "region": "Sudeste"},
+    {"age": 30, "gender": "female", "region": "Sudeste"},
+    {"age": 31, "gender": "male", "region": "Sudeste"},
+    {"age": 26, "gender": "female", "region": "Nordeste"},
+    {"age": 50, "gender": "female", "region": "Sudeste"},
+    {"age": None, "gender": "male", "region": "Sul"},
+]
+
+
+@pytest.fixture
+def cube() -> AudienceCube:
+    return AudienceCube.from_columns(columns_from_users(USERS))
+
+
+@pytest.mark.core
+def test_fatia_mulheres_25_34_no_sudeste(cube: AudienceCube):
+    result = cube.query(age_bucket=["25-34"], gender=["female"], region=["Sudeste"])
+
+    assert result == {"count": 2, "total": 6}
+
+
+@pytest.mark.core
+def test_roll_up_por_regiao_e_genero(cube: AudienceCube):
+    result = cube.query(group_by=["region", "gender"])
+
+    assert result["groups"][0] == {"region": "Sudeste", "gender": "female", "count": 3}
+    assert {"region": "Sul", "gender": "male", "count": 1} in result["groups"]
+    assert sum(g["count"] for g in result["groups"]) == 6
+
+
+@pytest.mark.core
+def test_cubo_ida_e_volta_em_bytes(cube: AudienceCube):
+    restored = AudienceCube.from_bytes(cube.to_bytes())
+
+    assert restored.query(group_by=["age_bucket"]) == cube.query(
+        group_by=["age_bucket"]
+    )
+
+
+@pytest.mark.core
+def test_dimensao_invalida(cube: AudienceCube):
+    with pytest.raises(ValueError):
+        cube.query(group_by=["cidade"])
@@ -0,0 +1,73 @@
+# tests/audience_analyzer/test_heavy_hitters.py
+import random
+from collections import Counter
+
+import pytest
+
+from src.audience_analyzer.audience_core import analyze_audience
+from src.audience_analyzer.heavy_hitters import SpaceSaving
+
+
+def _regioes(seed: int = 7, n: int = 20_000):
+    rng = random.Random(seed)
+    frequentes = ["São Paulo"] * 40 + ["Rio de Janeiro"] * 25 + ["Salvador"] * 10
+    return [
+        (
+            rng.choice(frequentes)
+            if rng.random() < 0.6
+            else f"cidade-{rng.randint(0, 5000)}"
+        )
+        for _ in range(n)
+    ]
+
+
+@pytest.mark.core
+def test_space_saving_respeita_limites_de_erro():
+    regioes = _regioes()
+    exato = Counter(regioes)
+
+    hh = SpaceSaving(capacity=50)
+    for start in range(0, len(regioes), 1000):
+        hh.update_counts(Counter(regioes[start : start + 1000]))
+
+    assert len(hh.counts) <= 50
+    assert [h.item for h in hh.top(3)] == ["São Paulo", "Rio de Janeiro", "Salvador"]
+    for h in hh.top():
+        assert h.count - h.error <= exato[h.item] <= h.count
+    assert hh.max_error <= len(regioes) / 50
+
+
+@pytest.mark.core
+def test_merge_de_shards_space_saving():
+    regioes = _regioes()
+    a, b = SpaceSaving(50), SpaceSaving(50)
+    a.update_counts(Counter(regioes[:10_000]))
+    b.update_counts(Counter(regioes[10_000:]))
+
+    a.merge(b)
+
+    assert a.total == len(regioes)
+    assert a.top(1)[0].item == "São Paulo"
+
+
+@pytest.mark.core
+def test_analyze_audience_top_k_devolve_top_n_e_other():
+    users = [{"age": 30, "gender": "female", "region": r} for r in _regioes()]
+
+    summary = analyze_audience(users, top_k=3)
+
+    assert list(summary["by_region"]) == ["São Paulo", "Rio de Janeiro", "Salvador"]
+    info = summary["approximate"]["by_region"]
+    assert sum(summary["by_region"].values()) + info["other"] >= len(users)
+    assert info["top_k"] == 3 and info["capacity"] == 30
+    assert "by_gender" not in summary["approximate"]
+
+
+@pytest.mark.core
+def test_analyze_audience_top_k_sem_corte_mantem_resultado_exato():
+    users = [
+        {"age": 30, "gender": "female", "region": "SP"},
+        {"age": 40, "gender": "male", "region": "RJ"},
+    ]
+
+    assert analyze_audience(users, top_k=5) == analyze_audience(users)
@@ -0,0 +1,81 @@
+# tests/audience_analyzer/test_parallel.py
+import random
+
+import pytest
+
+from src.audience_analyzer import audience_core
+from src.audience_analyzer.age_schemes import get_age_scheme
+from src.audience_analyzer.columnar import columns_from_users, summarize_columns
+from src.audience_analyzer.parallel import (
+    sketch_users_parallel,
+    start_audience_pool,
+    stop_audience_pool,
+)
+from src.core.config import settings
+
+
+def _users(n: int = 5_000):
+    rng = random.Random(3)
+    return [
+        {
+            "age": rng.randint(13, 80),
+            "gender": rng.choice(["female", "male"]),
+            "region": f"Região {rng.randint(0, 40)}",
+        }
+        for _ in range(n)
+    ]
+
+
+@pytest.mark.core
+def test_shards_em_processos_equivalem_a_analise_sequencial():
+    users = _users()
+
+    sketch = sketch_users_parallel(users, workers=2, shards=3)
+
+    assert sketch.result() == summarize_columns(columns_from_users(users))
+
+
+@pytest.mark.core
+def test_pool_unico_sem_fork_e_esquema_de_idade():
+    users = _users(2_000)
+
+    sketch = sketch_users_parallel(users, workers=2, age_scheme="jovem")
+
+    assert sketch.age_scheme == "jovem"
+    assert sketch.result() == summarize_columns(
+        columns_from_users(users), get_age_scheme("jovem")
+    )
+    pool = start_audience_pool()
+    assert pool is start_audience_pool()
+    assert pool._mp_context.get_start_method() != "fork"
+
+
+@pytest.mark.core
+def test_pool_respeita_o_numero_de_processos_pedido():
+    users = _users(1_000)
+    try:
+        for workers in (1, 2, 1):
+            sketch_users_parallel(users, workers=workers)
+            pool = start_audience_pool(workers)
+            assert pool._max_workers == workers
+    finally:
+        stop_audience_pool()
+
+
+@pytest.mark.core
+def test_analyze_and_profile_usa_paralelo_acima_do_limite(monkeypatch):
+    users = _users(1_000)
+    chamadas = []
+
+    def fake_parallel(users, **kwargs):
+        chamadas.append(len(users))
+        return sketch_users_parallel(users, workers=2, **kwargs)
+
+    monkeypatch.setattr(settings, "AUDIENCE_PARALLEL_MIN_USERS", 500)
+    monkeypatch.setattr(settings, "AUDIENCE_PARALLEL_WORKERS", 2)
+    monkeypatch.setattr(audience_core, "sketch_users_parallel", fake_parallel)
+
+    summary = audience_core.analyze_audience(users)
+
+    assert chamadas == [1_000]
+    assert summary == summarize_columns(columns_from_users(users))[0]
@@ -0,0 +1,50 @@
+# tests/audience_analyzer/test_payload.py
+import pytest
+
+from src.audience_analyzer.columnar import columns_from_users, summarize_columns
+from src.audience_analyzer.payload import (
+    InvalidAudiencePayload,
+    audience_columns_from_payload,
+)
+
+USERS = [
+    {"age": 28, "gender": "female", "region": "Sudeste"},
+    {"age": 41, "gender": "male", "region": "Sul"},
+    {"age": 17, "gender": "female", "region": "Sudeste"},
+]
+
+
+@pytest.mark.core
+def test_caminho_rapido_gera_as_mesmas_colunas():
+    columns = audience_columns_from_payload(USERS)
+
+    assert summarize_columns(columns) == summarize_columns(columns_from_users(USERS))
+
+
+@pytest.mark.core
+def test_valores_convertiveis_seguem_o_pydantic():
+    users = [{"age": "28", "gender": "female", "region": "Sudeste", "extra": 1}]
+
+    columns = audience_columns_from_payload(users)
+
+    assert columns.ages.tolist() == [28]
+    assert columns.regions == ["Sudeste"]
+
+
+@pytest.mark.core
+def test_erros_mantem_formato_do_pydantic():
+    users = [USERS[0], {"age": "abc", "gender": "male"}]
+
+    with pytest.raises(InvalidAudiencePayload) as exc:
+        audience_columns_from_payload(users)
+
+    locs = {(e["loc"], e["type"]) for e in exc.value.errors}
+    assert locs == {
+        (("body", "users", 1, "age"), "int_parsing"),
+        (("body", "users", 1, "region"), "missing"),
+    }
+
+
+@pytest.mark.core
+def test_publico_ausente_vira_colunas_vazias():
+    assert len(audience_columns_from_payload(None)) == 0
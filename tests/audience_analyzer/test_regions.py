@@ -0,0 +1,92 @@
+# tests/audience_analyzer/test_regions.py
+import pytest
+
+from src.audience_analyzer.audience_core import analyze_audience
+from src.audience_analyzer.cube import AudienceCube
+from src.audience_analyzer.columnar import columns_from_users
+from src.audience_analyzer.regions import (
+    UnknownRegionLevel,
+    compile_region_hierarchy,
+    get_region_hierarchy,
+    rollup_region_counts,
+)
+
+
+@pytest.mark.core
+@pytest.mark.parametrize(
+    "name, label, state, macro",
+    [
+        ("SP", "São Paulo", "São Paulo", "Sudeste"),
+        ("sao paulo", "São Paulo", "São Paulo", "Sudeste"),
+        ("Estado de São Paulo", "São Paulo", "São Paulo", "Sudeste"),
+        ("São Paulo, São Paulo, Brazil", "São Paulo (cidade)", "São Paulo", "Sudeste"),
+        ("Campinas - SP", "Campinas", "São Paulo", "Sudeste"),
+        ("Bairro Novo, SP", "São Paulo", "São Paulo", "Sudeste"),
+        ("centro oeste", "Centro-Oeste", "Centro-Oeste", "Centro-Oeste"),
+        ("Atlântida", "Atlântida", "Atlântida", "Atlântida"),
+    ],
+)
+def test_grafias_resolvem_para_o_mesmo_no(name, label, state, macro):
+    hierarchy = get_region_hierarchy()
+
+    assert hierarchy.label(name) == label
+    assert hierarchy.label(name, "state") == state
+    assert hierarchy.label(name, "macro_region") == macro
+
+
+@pytest.mark.core
+def test_grafias_diferentes_nao_duplicam_regioes():
+    users = [
+        {"age": 30, "gender": "f", "region": "SP"},
+        {"age": 31, "gender": "f", "region": "Curitiba"},
+        {"age": 32, "gender": "m", "region": "são paulo"},
+        {"age": 33, "gender": "m", "region": "Paraná"},
+        {"age": 34, "gender": "m", "region": "Bahia"},
+    ]
+
+    # Sem nível pedido, os rótulos ficam como vieram
+    assert analyze_audience(users)["by_region"] == {
+        "SP": 1,
+        "Curitiba": 1,
+        "são paulo": 1,
+        "Paraná": 1,
+        "Bahia": 1,
+    }
+    assert analyze_audience(users, region_level="state")["by_region"] == {
+        "São Paulo": 2,
+        "Paraná": 2,
+        "Bahia": 1,
+    }
+    by_macro = {"Sudeste": 2, "Sul": 2, "Nordeste": 1}
+    assert analyze_audience(users, region_level="macro_region")["by_region"] == by_macro
+    assert rollup_region_counts(
+        analyze_audience(users)["by_region"], "macro_region"
+    ) == (by_macro)
+    assert AudienceCube.from_columns(columns_from_users(users)).regions == [
+        "SP",
+        "Curitiba",
+        "são paulo",
+        "Paraná",
+        "Bahia",
+    ]
+
+
+@pytest.mark.core
+def test_siglas_so_valem_como_valor_inteiro():
+    hierarchy = get_region_hierarchy()
+
+    assert hierarchy.label("SE") == "Sergipe"
+    assert hierarchy.label(" TO ") == "Tocantins"
+    assert hierarchy.label("Aracaju, SE", "state") == "Sergipe"
+    for text in ("se", "To", "pa", "Pa.", "(TO)", "Região SE"):
+        assert hierarchy.resolve(text) is None, text
+
+
+@pytest.mark.core
+def test_hierarquia_invalida_ou_nivel_desconhecido():
+    with pytest.raises(ValueError):
+        compile_region_hierarchy(
+            [{"id": "A", "name": "A", "level": "state", "parent": "X"}]
+        )
+    with pytest.raises(UnknownRegionLevel):
+        rollup_region_counts({"Sul": 1}, "bairro")
@@ -0,0 +1,63 @@
+# tests/audience_analyzer/test_sampling.py
+import pytest
+
+from src.audience_analyzer.payload import (
+    InvalidAudiencePayload,
+    audience_columns_from_payload,
+)
+from src.audience_analyzer.sampling import (
+    sample_indices,
+    sampling_report,
+    wilson_interval,
+)
+
+
+@pytest.mark.core
+def test_amostra_sem_reposicao_e_ordenada():
+    indices = sample_indices(1_000_000, 500, seed=7)
+
+    assert len(set(indices.tolist())) == 500
+    assert indices.tolist() == sorted(indices.tolist())
+    assert sample_indices(10, 50).tolist() == list(range(10))
+
+
+@pytest.mark.core
+def test_intervalo_de_wilson():
+    low, high = wilson_interval(50, 100)
+
+    assert low == pytest.approx(0.4038, abs=1e-4)
+    assert high == pytest.approx(0.5962, abs=1e-4)
+    assert wilson_interval(0, 100)[0] == 0.0
+
+
+@pytest.mark.core
+def test_relatorio_da_amostra():
+    summary = {
+        "total_users": 200,
+        "by_gender": {"female": 120, "male": 80},
+        "by_region": {},
+        "by_age_bucket": {},
+    }
+
+    report = sampling_report(summary, population=5_000_000)
+
+    assert report["sample_size"] == 200
+    assert report["population"] == 5_000_000
+    female = report["intervals"]["by_gender"]["female"]
+    assert female["low"] < female["percent"] == 60.0 < female["high"]
+
+
+@pytest.mark.core
+def test_usuario_invalido_fora_da_amostra_tambem_e_rejeitado():
+    users = [{"age": 20, "gender": "f", "region": "Sul"}] * 9
+    users.append({"age": "x", "gender": "f", "region": "Sul"})
+
+    # Qualquer semente: o público inteiro é validado antes da amostragem
+    for seed in range(5):
+        with pytest.raises(InvalidAudiencePayload) as exc:
+            audience_columns_from_payload(users, sample=2, seed=seed)
+        assert {e["loc"] for e in exc.value.errors} == {("body", "users", 9, "age")}
+
+    # Tipos que o Pydantic converte continuam aceitos
+    users[9] = {"age": "28", "gender": "f", "region": "Sul"}
+    assert len(audience_columns_from_payload(users, sample=2, seed=0)) == 2
@@ -0,0 +1,71 @@
+# tests/audience_analyzer/test_segments.py
+import numpy as np
+import pytest
+
+from src.audience_analyzer.audience_core import segment_audience
+from src.audience_analyzer.columnar import columns_from_breakdown, columns_from_users
+from src.audience_analyzer.segments import segment_columns
+
+
+def _two_groups(n: int):
+    rng = np.random.default_rng(11)
+    young = rng.integers(18, 25, size=n)
+    older = rng.integers(48, 58, size=n)
+    return [{"age": int(a), "gender": "female", "region": "Sul"} for a in young] + [
+        {"age": int(a), "gender": "male", "region": "Bahia"} for a in older
+    ]
+
+
+@pytest.mark.core
+def test_separa_grupos_distintos_e_e_deterministico():
+    users = _two_groups(3_000)
+
+    personas = segment_audience(users, k=2, seed=7)
+
+    assert personas == segment_audience(users, k=2, seed=7)
+    assert [p["users"] for p in personas] == [3_000, 3_000]
+    assert sum(p["percent"] for p in personas) == 100.0
+    by_gender = {next(iter(p["gender"])): p for p in personas}
+    assert by_gender["female"]["age_bucket"] == "18-24"
+    assert by_gender["female"]["region"] == {"Sul": 100.0}
+    assert by_gender["male"]["age_bucket"] == "45-59"
+    assert 48 <= by_gender["male"]["centroid"]["age"] <= 58
+
+
+@pytest.mark.core
+def test_lotes_pequenos_nao_mudam_a_memoria_nem_as_personas():
+    columns = columns_from_users(_two_groups(2_000))
+
+    personas = segment_columns(columns, k=2, seed=1, batch_size=64)
+
+    assert sorted(p["users"] for p in personas) == [2_000, 2_000]
+
+
+@pytest.mark.core
+def test_publico_agregado_usa_os_pesos():
+    rows = [
+        {"age": 30, "gender": "F", "region": "Sul", "count": 900},
+        {"age": 62, "gender": "M", "region": "Norte", "count": 100},
+    ]
+
+    personas = segment_columns(columns_from_breakdown(rows), k=2)
+
+    assert [(p["users"], p["percent"]) for p in personas] == [(900, 90.0), (100, 10.0)]
+    assert personas[1]["centroid"]["age"] == 62.0
+    assert segment_columns(columns_from_breakdown([]), k=2) == []
+    with pytest.raises(ValueError):
+        segment_columns(columns_from_breakdown(rows), k=0)
+
+
+@pytest.mark.core
+def test_faixas_das_plataformas_sao_repartidas_nas_personas():
+    # 55-64 atravessa 45-59 e 60+ no esquema padrão: metade vai para cada
+    rows = [
+        {"age_bucket": "55-64", "gender": "F", "region": "Sul", "count": 100},
+        {"age_bucket": "65+", "gender": "F", "region": "Sul", "count": 60},
+    ]
+
+    (persona,) = segment_columns(columns_from_breakdown(rows), k=1)
+
+    assert persona["users"] == 160
+    assert persona["age_bucket"] == "60+"
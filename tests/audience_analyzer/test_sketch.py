@@ -0,0 +1,82 @@
+# tests/audience_analyzer/test_sketch.py
+import pytest
+
+from src.audience_analyzer.age_schemes import AGE_SCHEMES, DEFAULT_SCHEME_ID
+from src.audience_analyzer.audience_core import analyze_and_profile
+from src.audience_analyzer.sketch import AudienceSketch
+
+USERS = [
+    {"age": 32, "gender": "female", "region": "Rio de Janeiro"},
+    {"age": 28, "gender": "female", "region": "São Paulo"},
+    {"age": 17, "gender": "male", "region": "São Paulo"},
+    {"age": 61, "gender": "male", "region": "Bahia"},
+    {"age": 45, "gender": "female", "region": "Bahia"},
+    {"gender": "other", "region": None},
+]
+
+
+@pytest.mark.core
+def test_merge_de_shards_equivale_ao_publico_inteiro():
+    shards = [USERS[:2], USERS[2:3], USERS[3:]]
+
+    merged = AudienceSketch()
+    for shard in shards:
+        merged.merge(AudienceSketch.from_users(shard))
+
+    assert merged.result() == analyze_and_profile(USERS)
+
+
+@pytest.mark.core
+def test_to_bytes_from_bytes_ida_e_volta():
+    sketch = AudienceSketch.from_users(USERS)
+
+    restored = AudienceSketch.from_bytes(sketch.to_bytes())
+
+    assert restored == sketch
+    assert list(restored.by_region) == list(sketch.by_region)
+
+
+@pytest.mark.core
+def test_from_bytes_rejeita_formato_invalido():
+    with pytest.raises(ValueError):
+        AudienceSketch.from_bytes(b"XXXX" + bytes(9))
+
+
+@pytest.mark.core
+def test_to_bytes_rejeita_esquema_com_nome_longo_demais(monkeypatch):
+    default = AGE_SCHEMES[DEFAULT_SCHEME_ID]
+    monkeypatch.setitem(AGE_SCHEMES, "é" * 127, default)
+    monkeypatch.setitem(AGE_SCHEMES, "x" * 256, default)
+
+    restored = AudienceSketch.from_bytes(
+        AudienceSketch(age_scheme="é" * 127).to_bytes()
+    )
+    assert restored.age_scheme == "é" * 127
+    with pytest.raises(ValueError):
+        AudienceSketch(age_scheme="x" * 256).to_bytes()
+
+
+@pytest.mark.core
+def test_subtract_remove_usuarios_do_sketch():
+    base = [
+        {"age": 28, "gender": "female", "region": "Sudeste"},
+        {"age": 41, "gender": "male", "region": "Sul"},
+        {"age": 30, "gender": "female", "region": "Sudeste"},
+    ]
+    sketch = AudienceSketch.from_users(base)
+
+    sketch.subtract(AudienceSketch.from_users(base[1:2]))
+
+    assert sketch.result() == AudienceSketch.from_users(base[::2]).result()
+
+
+@pytest.mark.core
+def test_subtract_recusa_remocao_maior_que_o_publico():
+    sketch = AudienceSketch.from_users([{"age": 28, "gender": "f", "region": "Sul"}])
+    before = sketch.to_bytes()
+
+    with pytest.raises(ValueError):
+        sketch.subtract(
+            AudienceSketch.from_users([{"age": 28, "gender": "f", "region": "Norte"}])
+        )
+    assert sketch.to_bytes() == before
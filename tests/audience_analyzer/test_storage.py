@@ -0,0 +1,76 @@
+# tests/audience_analyzer/test_storage.py
+import numpy as np
+import pytest
+
+from src.audience_analyzer.columnar import columns_from_users, summarize_columns
+from src.audience_analyzer.storage import (
+    AudienceNotFound,
+    load_audience_columns,
+    save_audience_columns,
+    users_from_columns,
+)
+
+USERS = [
+    {"age": 28, "gender": "female", "region": "Sudeste"},
+    {"age": 41, "gender": "male", "region": "Sul"},
+    {"age": None, "gender": "female", "region": "Nordeste"},
+    {"age": 300, "gender": "male", "region": "Sudeste"},
+]
+
+
+@pytest.mark.core
+def test_publico_salvo_e_lido_via_mmap(tmp_path):
+    columns = columns_from_users(USERS)
+    audience_id = save_audience_columns(columns, data_dir=str(tmp_path))
+
+    loaded = load_audience_columns(audience_id, data_dir=str(tmp_path))
+
+    assert isinstance(loaded.ages.base, np.memmap)
+    assert loaded.ages.dtype == np.dtype("<u2")
+    assert summarize_columns(loaded) == summarize_columns(columns)
+    assert users_from_columns(loaded) == USERS
+
+
+@pytest.mark.core
+def test_idades_fora_do_intervalo_comum_nao_sao_cortadas(tmp_path):
+    users = [
+        {"age": 30, "gender": "f", "region": "Sul"},
+        {"age": -5, "gender": "m", "region": "Sul"},
+        {"age": None, "gender": "f", "region": "Sul"},
+        {"age": 2**40, "gender": "m", "region": "Sul"},
+    ]
+    typical = save_audience_columns(columns_from_users(users[:1]), str(tmp_path))
+    extreme = save_audience_columns(columns_from_users(users), str(tmp_path))
+
+    assert load_audience_columns(typical, str(tmp_path)).ages.dtype == np.uint8
+    loaded = load_audience_columns(extreme, str(tmp_path))
+    assert loaded.ages.dtype == np.dtype("<i8")
+    assert users_from_columns(loaded) == users
+
+
+@pytest.mark.core
+def test_publicos_iguais_compartilham_o_arquivo(tmp_path):
+    first = save_audience_columns(columns_from_users(USERS), data_dir=str(tmp_path))
+    second = save_audience_columns(columns_from_users(USERS), data_dir=str(tmp_path))
+
+    assert first == second
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+@pytest.mark.core
+def test_vocabulario_grande_usa_codigos_de_16_bits(tmp_path):
+    users = [{"age": 20, "gender": "x", "region": f"cidade-{i}"} for i in range(300)]
+    audience_id = save_audience_columns(columns_from_users(users), str(tmp_path))
+
+    loaded = load_audience_columns(audience_id, data_dir=str(tmp_path))
+
+    assert loaded.region_codes.dtype == np.dtype("<u2")
+    assert users_from_columns(loaded) == users
+
+
+@pytest.mark.core
+def test_audience_id_invalido_ou_inexistente(tmp_path):
+    with pytest.raises(ValueError):
+        load_audience_columns("../../etc/passwd", data_dir=str(tmp_path))
+    with pytest.raises(AudienceNotFound):
+        load_audience_columns("0" * 32, data_dir=str(tmp_path))
@@ -0,0 +1,70 @@
+# tests/audience_analyzer/test_streaming.py
+import asyncio
+import json
+
+import pytest
+
+from src.audience_analyzer.audience_core import analyze_and_profile
+from src.audience_analyzer.streaming import (
+    InvalidAudienceRecord,
+    analyze_ndjson_stream,
+)
+
+USERS = [
+    {"age": 32, "gender": "female", "region": "Rio de Janeiro"},
+    {"age": 28, "gender": "female", "region": "São Paulo"},
+    {"age": 17, "gender": "male", "region": "São Paulo"},
+    {"age": 61, "gender": "male", "region": "Bahia"},
+    {"age": 45, "gender": "female", "region": "Bahia"},
+]
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+@pytest.mark.core
+def test_stream_em_pedacos_equivale_a_analise_completa():
+    # Mistura linhas com um usuário e linhas com lote (array)
+    body = "\n".join(
+        [json.dumps(USERS[0]), json.dumps(USERS[1:3]), "", json.dumps(USERS[3])]
+        + [json.dumps(USERS[4])]
+    ).encode("utf-8")
+
+    stream = asyncio.run(analyze_ndjson_stream(_chunks(body, 7), batch_size=2))
+
+    assert stream.result() == analyze_and_profile(USERS)
+
+
+@pytest.mark.core
+def test_stream_registro_invalido_indica_linha():
+    body = b'{"age": 30, "gender": "female", "region": "SP"}\n{"age": "x"}\n'
+
+    with pytest.raises(InvalidAudienceRecord) as exc:
+        asyncio.run(analyze_ndjson_stream(_chunks(body, 1024)))
+
+    assert exc.value.line == 2
+    assert exc.value.errors[0]["loc"][:2] == ("body", 2)
+
+
+@pytest.mark.core
+def test_stream_rejeita_linha_longa_demais():
+    line = json.dumps(USERS).encode("utf-8")
+    body = json.dumps(USERS[0]).encode("utf-8") + b"\n" + line + b"\n"
+
+    stream = asyncio.run(
+        analyze_ndjson_stream(_chunks(body, 3), max_line_bytes=len(line))
+    )
+    assert stream.total_users == len(USERS) + 1
+
+    # Com ou sem quebra de linha no fim, a linha longa não é acumulada
+    for tail in (b"\n", b""):
+        with pytest.raises(InvalidAudienceRecord) as exc:
+            asyncio.run(
+                analyze_ndjson_stream(
+                    _chunks(body + line + tail, 3), max_line_bytes=len(line) - 1
+                )
+            )
+        assert exc.value.line == 2
+        assert exc.value.errors[0]["type"] == "line_too_long"
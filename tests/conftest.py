@@ -5,6 +5,19 @@ import pytest
 from fastapi.testclient import TestClient
 
 from src.api.main import app
+from src.core.config import settings
+
+
+@pytest.fixture(scope="session", autouse=True)
+def audience_data_dir(tmp_path_factory) -> Generator[str, None, None]:
+    """
+    Públicos salvos (.aud) vão para um diretório temporário da sessão, e
+    não para o AUDIENCE_DATA_DIR real.
+    """
+    data_dir = str(tmp_path_factory.mktemp("audiences"))
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "AUDIENCE_DATA_DIR", data_dir)
+        yield data_dir
 
 
 @pytest.fixture(scope="session")
@@ -0,0 +1,56 @@
+# tests/posting_time_optimizer/test_best_times_batch.py
+import numpy as np
+import pytest
+
+from src.posting_time_optimizer.heatmap import EngagementHeatmap
+from src.posting_time_optimizer.time_core import (
+    BestTimesQuery,
+    suggest_best_times,
+    suggest_best_times_batch,
+)
+
+
+def _heatmap(posts_per_cell, seed):
+    rng = np.random.default_rng(seed)
+    posts = np.full(168, posts_per_cell, dtype=np.int64)
+    return EngagementHeatmap(sums=rng.random(168) * posts, posts=posts)
+
+
+@pytest.mark.core
+def test_lote_igual_as_consultas_individuais():
+    queries = [
+        BestTimesQuery(platform="instagram"),
+        BestTimesQuery(platform="IG", main_age_bucket="18-24", region_main="SP"),
+        BestTimesQuery(platform="tiktok", region_shares={"SP": 70, "Portugal": 30}),
+        BestTimesQuery(
+            platform="instagram",
+            main_age_bucket="35-44",
+            region_shares={"Índia": 5, "Estados Unidos": 3, "AM": 2},
+        ),
+        BestTimesQuery(platform="linkedin", region_shares={"desconhecida": 1}),
+        BestTimesQuery(platform="linkedin", region_shares={"SP": 0}),
+        BestTimesQuery(platform="instagram", heatmap=_heatmap(1, seed=0)),
+        BestTimesQuery(platform="instagram", heatmap=_heatmap(0, seed=0)),
+        BestTimesQuery(platform="tiktok", heatmap=_heatmap(2, seed=1)),
+        BestTimesQuery(platform="plataforma nova", region_shares={"RJ": 1}),
+    ]
+
+    batch = suggest_best_times_batch(queries)
+    single = [
+        suggest_best_times(
+            platform=q.platform,
+            main_age_bucket=q.main_age_bucket,
+            region_main=q.region_main,
+            heatmap=q.heatmap,
+            region_shares=q.region_shares,
+        )
+        for q in queries
+    ]
+    assert batch == single
+    assert [r["source"] for r in batch[6:9]] == [
+        "engagement",
+        "heuristic",
+        "engagement",
+    ]
+    assert batch[3]["utc_offset"] == 5.5
+    assert suggest_best_times_batch([]) == []
@@ -0,0 +1,140 @@
+# tests/posting_time_optimizer/test_heatmap.py
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from src.posting_time_optimizer.heatmap import (
+    CELLS,
+    MIN_POSTS,
+    EngagementHeatmap,
+    build_heatmap,
+    cell_indices,
+    post_engagement,
+    post_reach,
+)
+from src.posting_time_optimizer.time_core import suggest_best_times
+
+
+def _media(hours_utc, days=28, strong_hour=None, start=datetime(2024, 5, 6)):
+    """
+    Posts diários nas horas (UTC) dadas; o da `strong_hour` engaja 10x mais.
+    """
+    items = []
+    for d in range(days):
+        for h in hours_utc:
+            ts = (start + timedelta(days=d, hours=h)).replace(tzinfo=timezone.utc)
+            engagement = 100 if h == strong_hour else 10
+            items.append(
+                {
+                    "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S+0000"),
+                    "metrics": {"engagement": engagement, "reach": 1000},
+                }
+            )
+    return items
+
+
+@pytest.mark.core
+def test_celulas_no_horario_local():
+    # 2024-05-06 (segunda) 02:00 UTC = domingo 23:00 em UTC-3
+    instant = datetime(2024, 5, 6, 2, tzinfo=timezone.utc).timestamp()
+    cells = cell_indices(np.array([instant]), utc_offset_hours=-3)
+    assert cells.tolist() == [6 * 24 + 23]
+    assert cell_indices(np.array([instant]), 0).tolist() == [2]
+
+
+@pytest.mark.core
+def test_janelas_saem_dos_dados():
+    heatmap = build_heatmap(_media((12, 15, 22), strong_hour=22), utc_offset_hours=-3)
+
+    assert heatmap.total_posts == 84
+    result = suggest_best_times("instagram", heatmap=heatmap)
+    assert result["source"] == "engagement"
+    # 22h UTC = 19h em UTC-3
+    assert any(
+        slot.startswith(("18:00", "19:00")) for slot in result["recommended_slots"]
+    )
+    assert result["best_windows"][0]["start"] in ("18:00", "19:00")
+    assert heatmap.scores().shape == (7, 24)
+    assert heatmap.scores().max() == 1.0
+
+
+@pytest.mark.core
+def test_poucos_posts_voltam_para_heuristica():
+    heatmap = build_heatmap(_media((12,), days=MIN_POSTS - 1))
+
+    result = suggest_best_times("instagram", heatmap=heatmap)
+
+    assert result["source"] == "heuristic"
+    assert result["recommended_slots"] == ["07:00-09:00", "12:00-14:00", "18:00-21:00"]
+    assert suggest_best_times("instagram")["source"] == "heuristic"
+
+
+@pytest.mark.core
+def test_suavizacao_circular_atravessa_a_semana():
+    # Todos os posts no domingo 23h: a segunda 0h (outra ponta) herda parte
+    instant = datetime(2024, 5, 12, 23, tzinfo=timezone.utc).timestamp()
+    heatmap = build_heatmap(
+        [{"timestamp": instant, "metrics": {"engagement": 5}}] * 30, per_reach=False
+    )
+    scores = heatmap.scores()
+    assert scores[6, 23] == 1.0
+    assert scores[0, 0] > 0
+    assert scores[3, 12] == 0
+
+
+@pytest.mark.core
+def test_metricas_e_posts_invalidos():
+    assert post_engagement({"likes": 3, "comments": 1, "reach": 8}) == 0.5
+    assert post_engagement({"engagement": 4}) is None
+    assert post_engagement({"engagement": 4}, per_reach=False) == 4.0
+
+    heatmap = build_heatmap(
+        [
+            {"timestamp": "ontem", "metrics": {"engagement": 1, "reach": 1}},
+            {"timestamp": "2024-05-06T10:00:00Z", "metrics": {}},
+            {
+                "timestamp": "2024-05-06T10:00:00Z",
+                "metrics": {"engagement": 1, "reach": 2},
+            },
+        ]
+    )
+    assert heatmap.total_posts == 1
+
+
+@pytest.mark.core
+def test_metricas_nao_numericas_e_instantes_absurdos_sao_ignorados():
+    when = "2024-05-06T10:00:00Z"
+    heatmap = build_heatmap(
+        [
+            {"timestamp": when, "metrics": {"likes": "5", "reach": 10}},
+            {"timestamp": when, "metrics": {"engagement": 2, "reach": "10"}},
+            {"timestamp": when, "metrics": {"engagement": float("nan"), "reach": 1}},
+            {"timestamp": when, "metrics": {"engagement": 1, "reach": float("inf")}},
+            {"timestamp": when, "metrics": {"engagement": True, "reach": 2}},
+            {"timestamp": when, "metrics": [1]},
+            {"timestamp": 1e30, "metrics": {"engagement": 1, "reach": 2}},
+            {"timestamp": float("inf"), "metrics": {"engagement": 1, "reach": 2}},
+            {"timestamp": -86_400, "metrics": {"engagement": 1, "reach": 2}},
+            {"timestamp": when, "metrics": {"engagement": 1, "reach": 2}},
+        ]
+    )
+
+    assert heatmap.total_posts == 1
+    assert post_reach([1]) is None
+
+
+@pytest.mark.core
+def test_serializacao_e_merge():
+    a = build_heatmap(_media((9,), days=7))
+    b = build_heatmap(_media((20,), days=7))
+
+    merged = a.merge(b)
+    restored = EngagementHeatmap.from_bytes(merged.to_bytes())
+
+    assert restored.total_posts == 14
+    np.testing.assert_array_equal(restored.posts, merged.posts)
+    np.testing.assert_allclose(restored.sums, merged.sums)
+    assert restored.sums.shape == (CELLS,)
+    with pytest.raises(ValueError):
+        EngagementHeatmap.from_bytes(b"XXXX\x01" + bytes(16))
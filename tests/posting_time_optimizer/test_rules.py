@@ -0,0 +1,120 @@
+# tests/posting_time_optimizer/test_rules.py
+import json
+import os
+
+import pytest
+
+from src.core.config import settings
+from src.posting_time_optimizer.rules import (
+    DEFAULT_RULES_PATH,
+    InvalidPostingRules,
+    compile_posting_rules,
+    get_posting_rules,
+    reset_posting_rules,
+)
+from src.posting_time_optimizer.time_core import suggest_best_times
+
+
+@pytest.fixture
+def rules_file(tmp_path, monkeypatch):
+    data = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf-8"))
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    monkeypatch.setattr(settings, "POSTING_RULES_PATH", str(path))
+    monkeypatch.setattr(settings, "POSTING_RULES_RELOAD_SECONDS", 0.0)
+    reset_posting_rules()
+    yield path, data
+    reset_posting_rules()
+
+
+def _rewrite(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    # Garante mtime diferente mesmo em sistemas de arquivos com resolução baixa
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+@pytest.mark.core
+def test_regras_padrao():
+    rules = get_posting_rules()
+
+    assert rules.platform("Instagram") is rules.platform("ig")
+    assert rules.platform("orkut") is rules.default
+    result = suggest_best_times("linkedin", main_age_bucket="35-44", region_main="SP")
+    assert result["recommended_slots"] == ["08:00-10:00", "12:00-13:00", "17:00-19:00"]
+    assert result["notes"][0].startswith("LinkedIn é mais forte")
+    assert "35-44" in result["notes"][1]
+    assert result["notes"][2].startswith("Região predominante: SP")
+
+
+@pytest.mark.core
+def test_modificador_de_faixa_etaria_muda_os_pesos():
+    rule = get_posting_rules().platform("instagram")
+
+    young = rule.slots_for("18-24")
+    assert young.slots == rule.base.slots
+    assert young.weights == (1.0, 1.0, 1.2)  # só a janela da noite
+    assert rule.slots_for("35-44") is rule.base
+    assert young.curve.max() == 1.2
+
+
+@pytest.mark.core
+def test_nova_plataforma_sem_mudar_codigo(rules_file):
+    path, data = rules_file
+    assert suggest_best_times("threads")["recommended_slots"] == [
+        "09:00-11:00",
+        "18:00-21:00",
+    ]
+
+    data["platforms"]["threads"] = {
+        "slots": ["10:00-12:00"],
+        "note": "Threads acompanha o Instagram, com pico no fim da manhã.",
+    }
+    _rewrite(path, data)
+
+    result = suggest_best_times("Threads")
+    assert result["recommended_slots"] == ["10:00-12:00"]
+    assert result["notes"][0].startswith("Threads acompanha")
+
+
+@pytest.mark.core
+def test_arquivo_invalido_mantem_regras_anteriores(rules_file):
+    path, data = rules_file
+    before = get_posting_rules()
+
+    path.write_text("{ quebrado", encoding="utf-8")
+    _rewrite(path, data | {"default": {"slots": ["25h"]}})
+
+    assert get_posting_rules() is before
+
+
+@pytest.mark.core
+def test_validacao_das_regras():
+    base = json.loads(DEFAULT_RULES_PATH.read_text(encoding="utf-8"))
+
+    with pytest.raises(InvalidPostingRules):
+        compile_posting_rules({**base, "default": {"slots": []}})
+    with pytest.raises(InvalidPostingRules):
+        compile_posting_rules(
+            {**base, "default": {"slots": ["09:00-11:00"], "weights": [1, 2]}}
+        )
+    with pytest.raises(InvalidPostingRules):
+        compile_posting_rules({**base, "notes": {"region": "Região {estado}"}})
+    with pytest.raises(InvalidPostingRules):
+        compile_posting_rules(
+            {**base, "age_buckets": {"*": {"trends": [{"max_age": 30}]}}}
+        )
+
+
+@pytest.mark.core
+def test_nota_de_faixa_etaria_segue_o_esquema():
+    rules = get_posting_rules()
+
+    jovem = rules.age_note("18-21")
+    assert jovem.startswith("Faixa etária predominante: 18-21.")
+    assert "jovens" in jovem and "18-34" not in jovem
+    assert "mais velhos" in rules.age_note("30-39")
+    assert "mais velhos" in rules.age_note("50+")
+    assert "jovens" in rules.age_note("até 24")
+    # Rótulo fora de qualquer esquema: só a faixa, sem tendência
+    assert rules.age_note("desconhecida") == "Faixa etária predominante: desconhecida."
@@ -0,0 +1,95 @@
+# tests/posting_time_optimizer/test_scheduler.py
+import numpy as np
+import pytest
+
+from src.posting_time_optimizer.scheduler import (
+    HOURS,
+    ScheduleConstraints,
+    blackout_mask,
+    describe_schedule,
+    schedule_batch,
+    schedule_week,
+    week_scores,
+)
+
+
+def _gaps(hours):
+    hours = sorted(hours)
+    return [(b - a) % 168 for a, b in zip(hours, hours[1:] + hours[:1])]
+
+
+@pytest.mark.core
+def test_respeita_intervalo_e_maximo_por_dia():
+    rng = np.random.default_rng(3)
+    scores = rng.random(168)
+    constraints = ScheduleConstraints(min_gap_hours=6, max_per_day=2)
+
+    hours = schedule_week(scores, 12, constraints)
+
+    assert len(hours) == 12
+    assert min(_gaps(hours)) >= 6
+    assert np.bincount(np.array(hours) // HOURS, minlength=7).max() <= 2
+
+
+@pytest.mark.core
+def test_janelas_bloqueadas():
+    scores = np.tile(np.linspace(0, 1, HOURS), 7)  # 23h é sempre a melhor hora
+    allowed = blackout_mask(
+        [
+            {"start": "22:00", "end": "02:00"},
+            {"day": "dom", "start": "00:00", "end": "24:00"},
+        ]
+    )
+
+    hours = schedule_week(
+        scores, 6, ScheduleConstraints(max_per_day=1, allowed=allowed)
+    )
+
+    assert len(hours) == 6
+    assert all(h % HOURS == 21 for h in hours)
+    assert all(h // HOURS != 6 for h in hours)
+
+
+@pytest.mark.core
+def test_reparo_troca_um_por_dois():
+    # O guloso pega a hora 12 e bloqueia 9..15; as horas 8 e 16 valem mais juntas
+    scores = np.zeros(168)
+    scores[[8, 12, 16]] = [0.9, 1.0, 0.9]
+    allowed = np.zeros(168, dtype=bool)
+    allowed[[8, 12, 16]] = True
+
+    hours = schedule_week(
+        scores, 2, ScheduleConstraints(min_gap_hours=5, max_per_day=2, allowed=allowed)
+    )
+
+    assert hours == [8, 16]
+
+
+@pytest.mark.core
+def test_lote_igual_a_agendas_individuais():
+    rng = np.random.default_rng(9)
+    scores = [rng.random(168) for _ in range(50)]
+    budgets = list(rng.integers(1, 15, size=50))
+    constraints = [
+        ScheduleConstraints(min_gap_hours=int(g), max_per_day=int(m))
+        for g, m in zip(rng.integers(1, 12, size=50), rng.integers(1, 4, size=50))
+    ]
+
+    batch = schedule_batch(scores, budgets, constraints)
+
+    assert batch == [
+        schedule_week(s, b, c) for s, b, c in zip(scores, budgets, constraints)
+    ]
+
+
+@pytest.mark.core
+def test_meta_impossivel_e_descricao():
+    scores = np.ones(24)
+    hours = schedule_week(scores, 20, ScheduleConstraints(max_per_day=1))
+
+    described = describe_schedule(hours, scores, 20)
+    assert described["scheduled"] == 7
+    assert described["unfilled"] == 13
+    assert described["posts"][0] == {"day": "seg", "time": "00:00", "score": 1.0}
+    with pytest.raises(ValueError):
+        week_scores([1, 2, 3])
@@ -0,0 +1,77 @@
+# tests/posting_time_optimizer/test_timezones.py
+import numpy as np
+import pytest
+
+from src.posting_time_optimizer.time_core import suggest_best_times
+from src.posting_time_optimizer.timezones import (
+    BINS,
+    activity_curve,
+    format_slot,
+    get_region_offsets,
+    mixture_curve,
+    parse_slot,
+    timezone_mixture,
+)
+
+
+@pytest.mark.core
+def test_fusos_por_hierarquia_e_por_pais():
+    table = get_region_offsets()
+
+    assert table.offset("SP") == -3
+    assert table.offset("Rio Branco, AC") == -5  # cidade herda do estado
+    assert table.offset("Amazonas") == -4
+    assert table.offset("Sudeste") == -3
+    assert table.offset("portugal") == 0
+    assert table.offset("India") == 5.5
+    assert table.offset("Atlântida") is None
+
+
+@pytest.mark.core
+def test_slots_e_curva():
+    assert parse_slot("22:00-01:00") == (22.0, 25.0)
+    assert format_slot(23.5, 25.0) == "23:30-01:00"
+    assert format_slot(21, 24) == "21:00-24:00"
+
+    curve = activity_curve(["18:00-21:00"])
+    assert curve.shape == (BINS,)
+    assert curve[36:42].tolist() == [1.0] * 6
+    assert curve[42] < 1
+
+
+@pytest.mark.core
+def test_mistura_desloca_pelo_fuso():
+    curve = activity_curve(["18:00-19:00"], baseline=0)
+    # Metade do público em UTC-3 e metade em UTC+0
+    utc = mixture_curve(curve, np.array([-3.0, 0.0]), np.array([1.0, 1.0]))
+    assert utc[42] == utc[43] == 0.5  # 21h UTC = 18h em UTC-3
+    assert utc[36] == utc[37] == 0.5  # 18h UTC = 18h em UTC+0
+    assert utc.sum() == pytest.approx(2.0)
+
+
+@pytest.mark.core
+def test_um_fuso_mantem_as_janelas_da_plataforma():
+    result = suggest_best_times("instagram", region_shares={"SP": 70, "RJ": 30})
+
+    assert result["recommended_slots"] == ["07:00-09:00", "12:00-14:00", "18:00-21:00"]
+    assert result["recommended_slots_utc"] == [
+        "10:00-12:00",
+        "15:00-17:00",
+        "21:00-24:00",
+    ]
+    assert result["timezones"] == [{"utc_offset": -3.0, "percent": 100.0}]
+
+
+@pytest.mark.core
+def test_publico_multipais():
+    shares = {"SP": 45, "Portugal": 45, "other": 10}
+
+    mixture = timezone_mixture(["18:00-21:00"], shares)
+
+    # A janela de 3h cai onde as noites de Brasil e Portugal se cruzam
+    start, end = parse_slot(mixture["recommended_slots_utc"][0])
+    assert end - start == 3
+    assert 18 <= start <= 21
+    assert {z["utc_offset"] for z in mixture["timezones"]} == {-3.0, 0.0}
+    assert timezone_mixture(["18:00-21:00"], {}) is None
+    assert timezone_mixture(["18:00-21:00"], {"SP": 0}) is None
@@ -0,0 +1,107 @@
+# tests/services/test_audience_cache_service.py
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlmodel import Session, select
+
+from src.audience_analyzer.sketch import AudienceSketch
+from src.core.config import settings
+from src.database.sqlmodel_db import engine
+from src.models.audience_cache import AudienceAnalysisCache
+from src.services.audience_cache import (
+    analysis_digest,
+    audience_cache_stats,
+    clear_audience_cache,
+    get_cached_sketch,
+    store_cached_sketch,
+)
+
+USERS = [
+    {"age": 28, "gender": "female", "region": "Sudeste"},
+    {"age": 41, "gender": "male", "region": "Sul"},
+]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_audience_cache()
+    yield
+    clear_audience_cache()
+
+
+@pytest.mark.services
+def test_cache_conta_hits_e_misses():
+    digest = analysis_digest("a" * 32, top_k=50)
+    sketch = AudienceSketch.from_users(USERS)
+
+    with Session(engine) as session:
+        assert get_cached_sketch(session, digest) is None
+        store_cached_sketch(session, digest, sketch)
+        cached = get_cached_sketch(session, digest)
+
+    assert cached.result() == sketch.result()
+    stats = audience_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+@pytest.mark.services
+def test_cache_descarta_o_menos_usado(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIENCE_CACHE_SIZE", 2)
+    sketch = AudienceSketch.from_users(USERS)
+
+    with Session(engine) as session:
+        for name in ("a", "b", "c"):
+            store_cached_sketch(session, analysis_digest(name * 32, None), sketch)
+        assert get_cached_sketch(session, analysis_digest("a" * 32, None)) is None
+        assert get_cached_sketch(session, analysis_digest("c" * 32, None))
+
+
+@pytest.mark.services
+def test_cache_persistido_no_banco(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIENCE_CACHE_PERSIST", True)
+    digest = analysis_digest("d" * 32, None)
+
+    with Session(engine) as session:
+        store_cached_sketch(session, digest, AudienceSketch.from_users(USERS))
+        clear_audience_cache()  # simula um reinício do processo
+        cached = get_cached_sketch(session, digest)
+
+    assert cached.total_users == 2
+    assert audience_cache_stats()["persistent_hits"] == 1
+
+
+@pytest.mark.services
+def test_cache_persistido_mantem_so_as_linhas_mais_recentes(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIENCE_CACHE_PERSIST", True)
+    monkeypatch.setattr(settings, "AUDIENCE_CACHE_PERSIST_MAX_ROWS", 2)
+    sketch = AudienceSketch.from_users(USERS)
+    digests = [analysis_digest(name * 32, None) for name in ("7", "8", "9")]
+
+    with Session(engine) as session:
+        for digest in digests:
+            store_cached_sketch(session, digest, sketch)
+        clear_audience_cache()
+
+        assert len(session.exec(select(AudienceAnalysisCache)).all()) == 2
+        assert get_cached_sketch(session, digests[0]) is None
+        assert get_cached_sketch(session, digests[2]) is not None
+
+
+@pytest.mark.services
+def test_cache_aguenta_acesso_concorrente(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIENCE_CACHE_SIZE", 4)
+    sketch = AudienceSketch.from_users(USERS)
+
+    def hammer(worker):
+        with Session(engine) as session:
+            for i in range(300):
+                digest = analysis_digest(f"{(worker + i) % 8:x}" * 32, None)
+                if get_cached_sketch(session, digest) is None:
+                    store_cached_sketch(session, digest, sketch)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(hammer, range(8)))
+
+    stats = audience_cache_stats()
+    assert stats["hits"] + stats["misses"] == 8 * 300
+    assert stats["size"] == 4
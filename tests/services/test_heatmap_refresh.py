@@ -0,0 +1,199 @@
+# tests/services/test_heatmap_refresh.py
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlmodel import Session
+
+from src.database.sqlmodel_db import engine
+from src.posting_time_optimizer.heatmap import EngagementHeatmap, heatmap_slots
+from src.posting_time_optimizer.time_core import suggest_best_times
+from src.schemas.project import ProjectCreate
+from src.services import heatmap_refresh
+from src.services.heatmap_refresh import (
+    fetch_instagram_media,
+    refresh_project_heatmaps,
+    seconds_until_next_run,
+)
+from src.services.project_heatmap import (
+    clear_heatmap_cache,
+    get_project_heatmap,
+    get_project_heatmap_row,
+)
+from src.services.projects import create_project
+from src.services.slot_posterior import get_slot_posterior
+
+OWNER_ID = 424242
+NOW = datetime(2024, 6, 10, 12, tzinfo=timezone.utc)
+
+
+def _post(instant, engagement):
+    return {
+        "timestamp": instant.strftime("%Y-%m-%dT%H:%M:%S+0000"),
+        "metrics": {"engagement": engagement, "reach": 1000},
+    }
+
+
+# Posts diários às 10h e 23h UTC em maio; 23h engaja mais. O de 09/06 é
+# recente demais (métricas ainda crescendo) e fica para a próxima rodada.
+MAY = [
+    _post(datetime(2024, 5, day, hour, tzinfo=timezone.utc), 90 if hour == 23 else 9)
+    for day in range(1, 29)
+    for hour in (10, 23)
+]
+RECENT = _post(datetime(2024, 6, 9, 20, tzinfo=timezone.utc), 50)
+JUNE = _post(datetime(2024, 6, 1, 23, tzinfo=timezone.utc), 90)
+
+
+@pytest.mark.services
+def test_job_recalcula_mapas_de_forma_incremental():
+    clear_heatmap_cache()
+    ig_ok, ig_fail = f"ig-{uuid.uuid4().hex}", f"ig-{uuid.uuid4().hex}"
+    feeds = {ig_ok: MAY + [RECENT]}
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(ig_user_id, since):
+        if ig_user_id == ig_fail:
+            raise RuntimeError("Graph API fora do ar")
+        with lock:
+            calls.append((ig_user_id, since))
+        return list(feeds.get(ig_user_id, []))
+
+    with Session(engine) as session:
+        project = create_project(
+            session, OWNER_ID, ProjectCreate(name="Projeto IG", ig_user_id=ig_ok)
+        )
+        failing = create_project(
+            session, OWNER_ID, ProjectCreate(name="Projeto IG 2", ig_user_id=ig_fail)
+        )
+
+        results = refresh_project_heatmaps(session, fetch, workers=3, now=NOW)
+        by_project = {r["project_id"]: r for r in results}
+        assert by_project[project.id] == {
+            "project_id": project.id,
+            "new_posts": 56,
+            "posts": 56,
+            "last_post_at": "2024-05-28T23:00:00",
+        }
+        assert "Graph API" in by_project[failing.id]["error"]
+
+        # Janelas salvas junto com o mapa e servidas sem recalcular
+        row = get_project_heatmap_row(session, OWNER_ID, project.id, "instagram")
+        assert row.best_slots is not None
+        clear_heatmap_cache()
+        heatmap = get_project_heatmap(session, OWNER_ID, project.id, "instagram")
+        assert heatmap.slots is not None
+        fresh = EngagementHeatmap(sums=heatmap.sums, posts=heatmap.posts)
+        assert heatmap.slots == heatmap_slots(fresh)
+        assert suggest_best_times("instagram", heatmap=heatmap)["source"] == (
+            "engagement"
+        )
+        assert (
+            get_slot_posterior(session, OWNER_ID, project.id, "instagram").total_posts
+            == 56
+        )
+
+        # Segunda rodada: só o que é novo desde o último post incluído
+        feeds[ig_ok] = feeds[ig_ok] + [JUNE]
+        calls.clear()
+        again = refresh_project_heatmaps(session, fetch, workers=3, now=NOW)
+        assert {r["project_id"]: r for r in again}[project.id]["new_posts"] == 1
+        since = datetime(2024, 5, 28, 23, tzinfo=timezone.utc).timestamp()
+        assert (ig_ok, since) in calls
+        row = get_project_heatmap_row(session, OWNER_ID, project.id, "instagram")
+        session.refresh(row)
+        assert row.posts_count == 57
+        assert row.last_post_at == datetime(2024, 6, 1, 23)
+
+
+@pytest.mark.services
+def test_falha_na_posterior_nao_grava_o_mapa(monkeypatch):
+    clear_heatmap_cache()
+    ig_user_id = f"ig-{uuid.uuid4().hex}"
+
+    def fetch(user_id, since):
+        return list(MAY) if user_id == ig_user_id else []
+
+    def broken_ingest(*args, **kwargs):
+        raise RuntimeError("posterior indisponível")
+
+    with Session(engine) as session:
+        project = create_project(
+            session, OWNER_ID, ProjectCreate(name="Projeto IG 3", ig_user_id=ig_user_id)
+        )
+        with monkeypatch.context() as patched:
+            patched.setattr(heatmap_refresh, "ingest_project_media", broken_ingest)
+            results = refresh_project_heatmaps(session, fetch, workers=1, now=NOW)
+        assert "posterior" in {r["project_id"]: r for r in results}[project.id]["error"]
+        assert (
+            get_project_heatmap_row(session, OWNER_ID, project.id, "instagram") is None
+        )
+        assert get_project_heatmap(session, OWNER_ID, project.id, "instagram") is None
+
+        # A rodada seguinte relê os mesmos posts e conta cada um uma vez
+        refresh_project_heatmaps(session, fetch, workers=1, now=NOW)
+        row = get_project_heatmap_row(session, OWNER_ID, project.id, "instagram")
+        assert row.posts_count == 56
+        assert (
+            get_slot_posterior(session, OWNER_ID, project.id, "instagram").total_posts
+            == 56
+        )
+
+
+@pytest.mark.services
+def test_leitura_dos_posts_segue_a_paginacao(monkeypatch):
+    from src.integrations import meta_client
+
+    since = datetime(2024, 5, 10, tzinfo=timezone.utc).timestamp()
+    pages = {
+        "media": {
+            "data": [{"id": "1", "timestamp": "2024-05-20T10:00:00+0000"}],
+            "paging": {"next": "https://graph.test/page-2"},
+        },
+        "https://graph.test/page-2": {
+            "data": [
+                {"id": "2", "timestamp": "2024-05-15T10:00:00+0000"},
+                {"id": "3", "timestamp": "2024-05-10T00:00:00+0000"},
+            ],
+            "paging": {"next": "https://graph.test/page-3"},
+        },
+    }
+    requested = []
+
+    class Response:
+        def __init__(self, data):
+            self.data = data
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self.data
+
+    def get(url, params=None, timeout=None):
+        requested.append(url)
+        if url.endswith("/insights"):
+            return Response({"data": [{"name": "reach", "values": [{"value": 10}]}]})
+        return Response(pages["media" if url.endswith("/media") else url])
+
+    monkeypatch.setattr(meta_client, "META_ACCESS_TOKEN", "token")
+    monkeypatch.setattr(meta_client.requests, "get", get)
+
+    media = fetch_instagram_media("ig-paginado", since)
+
+    # Para no primeiro post já incluído, sem pedir a página 3
+    assert [item["id"] for item in media] == ["1", "2"]
+    assert "https://graph.test/page-3" not in requested
+    assert media[0]["metrics"] == {"reach": 10}
+
+
+@pytest.mark.services
+def test_proxima_rodada():
+    now = datetime(2024, 6, 10, 2, 30, tzinfo=timezone.utc)
+    assert seconds_until_next_run(now, 3) == timedelta(minutes=30).total_seconds()
+    assert (
+        seconds_until_next_run(now, 2)
+        == timedelta(hours=23, minutes=30).total_seconds()
+    )
@@ -0,0 +1,72 @@
+# tests/services/test_project_audience_service.py
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlmodel import Session, delete
+
+from src.audience_analyzer.age_schemes import resolve_age_scheme_id
+from src.audience_analyzer.columnar import columns_from_users
+from src.audience_analyzer.sketch import AudienceSketch
+from src.database.sqlmodel_db import engine
+from src.models.project_audience import ProjectAudience, ProjectAudienceTotals
+from src.services.project_audience import (
+    apply_project_audience_delta,
+    get_project_audience,
+    get_project_audience_totals,
+    merge_project_audience_totals,
+)
+
+OWNER_ID = 1
+PROJECT_ID = 919191
+USERS = [
+    {"age": 28, "gender": "female", "region": "Sudeste"},
+    {"age": 41, "gender": "male", "region": "Sul"},
+]
+
+
+@pytest.fixture(autouse=True)
+def empty_project_audience():
+    # O banco de teste persiste entre execuções
+    with Session(engine) as session:
+        for model in (ProjectAudience, ProjectAudienceTotals):
+            session.exec(delete(model).where(model.project_id == PROJECT_ID))
+        session.commit()
+
+
+@pytest.mark.services
+def test_deltas_simultaneos_nao_perdem_atualizacoes():
+    columns = columns_from_users(USERS)
+
+    def add(_):
+        with Session(engine) as session:
+            apply_project_audience_delta(
+                session,
+                owner_id=OWNER_ID,
+                project_id=PROJECT_ID,
+                age_scheme=resolve_age_scheme_id(None),
+                added=columns,
+            )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(add, range(16)))
+
+    with Session(engine) as session:
+        audience = get_project_audience(session, OWNER_ID, PROJECT_ID)
+    assert audience.total_users == 16 * len(USERS)
+
+
+@pytest.mark.services
+def test_totais_simultaneos_nao_perdem_analises():
+    sketch = AudienceSketch.from_users(USERS)
+
+    def merge(_):
+        with Session(engine) as session:
+            merge_project_audience_totals(session, OWNER_ID, PROJECT_ID, sketch)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(merge, range(16)))
+
+    with Session(engine) as session:
+        totals = get_project_audience_totals(session, OWNER_ID, PROJECT_ID)
+    assert totals.analyses_count == 16
+    assert totals.total_users == 16 * len(USERS)
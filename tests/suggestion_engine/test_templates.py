@@ -0,0 +1,119 @@
+# tests/suggestion_engine/test_templates.py
+import json
+import os
+
+import pytest
+
+from src.core.config import settings
+from src.suggestion_engine.suggestion_core import (
+    get_basic_suggestions,
+    get_platform_suggestions,
+    render_many,
+)
+from src.suggestion_engine.templates import (
+    DEFAULT_TEMPLATES_PATH,
+    InvalidSuggestionTemplates,
+    compile_suggestion_templates,
+    get_suggestion_templates,
+    reset_suggestion_templates,
+    split_template,
+)
+
+
+@pytest.fixture
+def templates_file(tmp_path, monkeypatch):
+    data = json.loads(DEFAULT_TEMPLATES_PATH.read_text(encoding="utf-8"))
+    path = tmp_path / "templates.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    monkeypatch.setattr(settings, "SUGGESTION_TEMPLATES_PATH", str(path))
+    monkeypatch.setattr(settings, "SUGGESTION_TEMPLATES_RELOAD_SECONDS", 0.0)
+    reset_suggestion_templates()
+    yield path, data
+    reset_suggestion_templates()
+
+
+def _rewrite(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+
+@pytest.mark.core
+def test_modelos_padrao():
+    assert split_template("{topic}: {{dica}} sobre {topic}.") == (
+        "",
+        ": {dica} sobre ",
+        ".",
+    )
+    assert get_basic_suggestions(" Marketing ") == [
+        "Ideia 1 sobre marketing",
+        "Ideia 2 sobre marketing",
+        "Ideia 3 sobre marketing",
+    ]
+    result = get_platform_suggestions("Café", "Instagram")
+    assert result["platform"] == "instagram"
+    assert result["suggestions"][0] == {
+        "format": "reels",
+        "idea": "Reels: '3 erros que te impedem de evoluir em café'.",
+    }
+    # Plataforma desconhecida e idioma sem modelos caem no padrão
+    generic = get_platform_suggestions("café", "orkut", language="en-US")
+    assert [s["format"] for s in generic["suggestions"]] == ["genérico", "genérico"]
+
+    with pytest.raises(ValueError):
+        get_suggestion_templates().template_set("instagram", "desconhecido")
+
+
+@pytest.mark.core
+def test_render_many_igual_ao_caminho_unitario():
+    topics = [f"Tema {i} {{x}}" for i in range(500)]
+
+    rich = render_many(topics, "linkedin")
+    assert len(rich) == 500
+    for topic, suggestions in zip(topics[::50], rich[::50]):
+        assert suggestions == get_platform_suggestions(topic, "linkedin")["suggestions"]
+    basic = render_many(topics[:3], mode="basic")
+    assert basic == [get_basic_suggestions(topic) for topic in topics[:3]]
+    assert render_many([]) == []
+
+
+@pytest.mark.core
+def test_nova_plataforma_e_idioma_sem_mudar_codigo(templates_file):
+    path, data = templates_file
+    data["platforms"]["youtube"] = {
+        "aliases": ["yt"],
+        "rich": {
+            "pt-BR": [{"format": "shorts", "idea": "Shorts: {topic} em 30s."}],
+            "en": [{"format": "shorts", "idea": "Shorts: {topic} in 30s."}],
+        },
+    }
+    _rewrite(path, data)
+
+    assert get_platform_suggestions("café", "YT")["suggestions"] == [
+        {"format": "shorts", "idea": "Shorts: café em 30s."}
+    ]
+    english = get_platform_suggestions("café", "youtube", language="en-US")
+    assert english["suggestions"][0]["idea"] == "Shorts: café in 30s."
+
+    # Arquivo inválido: os modelos anteriores continuam valendo
+    data["platforms"]["youtube"]["rich"]["en"] = [{"idea": "{assunto}"}]
+    _rewrite(path, data)
+    assert render_many(["café"], "yt", language="en") == [
+        [{"format": "shorts", "idea": "Shorts: café in 30s."}]
+    ]
+
+
+@pytest.mark.core
+def test_modelos_invalidos():
+    data = json.loads(DEFAULT_TEMPLATES_PATH.read_text(encoding="utf-8"))
+    compile_suggestion_templates(data)
+
+    for bad in ("{topic!r}", "{topic:>10}", "{0}", "{topic"):
+        with pytest.raises(InvalidSuggestionTemplates):
+            split_template(bad)
+
+    without_basic = dict(data, default={"rich": data["default"]["rich"]})
+    with pytest.raises(InvalidSuggestionTemplates):
+        compile_suggestion_templates(without_basic)
+    with pytest.raises(InvalidSuggestionTemplates):
+        compile_suggestion_templates({"platforms": data["platforms"]})